@@ -13,6 +13,11 @@ from l1l2py import tools
 # ---- slowest but requires no external libraries or environments
 job_container_type = 'kdvs.fw.impl.job.SimpleJob.SimpleJobContainer'
 job_container_cfg = {}
+# ---- small jobs (estimated cost n*p) may be executed together; ridge problems
+# ---- of L1L2_OLS and L1L2_RLS jobs of the batch are solved with vectorized calls
+# job_container_cfg = {
+#    'batch_cost' : 100000,
+#    }
 
 # ---- this job container can be used if PPlus is installed
 # job_container_type = 'kdvs.fw.impl.job.PPlusJob.PPlusJobContainer'
@@ -28,6 +33,27 @@ job_container_cfg = {}
 #    'local_workers_number' : 6,
 #    }
 
+# ---- this job container executes jobs in local worker processes; with 'pool' set,
+# ---- worker processes with numpy and l1l2py already imported are reused
+# job_container_type = 'kdvs.fw.impl.job.ProcessJob.ProcessJobContainer'
+# job_container_cfg = {
+#    'workers' : 6,
+#    'pool' : True,
+# ---- number of BLAS threads per worker process
+#    'blas_threads' : 1,
+# ---- jobs are started only when their estimated memory fits in the budget (bytes)
+#    'memory_budget' : 8 * 1024 ** 3,
+#    }
+
+# ---- this job container can be used if machines share a file system; workers are
+# ---- started with 'python wrapper.py kdvs/bin/worker.py -q <queue_dir>' on each node
+# job_container_type = 'kdvs.fw.impl.job.FSQueueJob.FSQueueJobContainer'
+# job_container_cfg = {
+#    'queue_dir' : '/shared/kdvs_queue',
+# ---- number of workers started locally, in addition to the ones on other nodes
+#    'local_workers' : 0,
+#    }
+
 # ---- 2. experiment profile definition
 
 # ---- instance of experiment profile
@@ -151,6 +177,15 @@ experiment_profile_inst = {
                 'global_degrees_of_freedom' : tuple(['mu%d' % i for i in range(3)]),
                 # placeholder for external splits
                 'ext_split_sets' : None,
+                # ---- solver engine (optional)
+                # use native solver with warm starts and screening instead of l1l2py
+#                'engine' : 'native',
+#                'engine_options' : {'kmax' : 100000, 'tolerance' : 1e-5, 'screening' : True},
+                # coarse-to-fine search of (tau, lambda) grid instead of the whole grid
+#                'engine_options' : {'grid' : 'adaptive', 'grid_levels' : 2, 'grid_points' : 8},
+                # ---- mu scaling (optional)
+                # estimate extreme eigenvalues iteratively for Gram matrices larger than 'exact_size'
+#                'mu_scaling_options' : {'tolerance' : 1e-8, 'exact_size' : 500},
                 # ---- job related parameters
                 # is job importable for remote job containers?
 #                'job_importable' : True,
@@ -187,12 +222,37 @@ experiment_profile_inst = {
                 'job_importable' : False,
             },
         },
+#        'L1L2_Cascade' : {
+#            'kdvs.fw.impl.stat.L1L2.L1L2_Cascade' : {
+#                # ---- individual parameters
+#                # cheap screening technique, in the same format as above
+#                'screening_technique' : {
+#                    'kdvs.fw.impl.stat.L1L2.L1L2_RLS' : {
+#                        # the same parameters as for L1L2_RLS above
+#                    },
+#                },
+#                # full model selection, in the same format as above
+#                'full_technique' : {
+#                    'kdvs.fw.impl.stat.L1L2.L1L2_L1L2' : {
+#                        # the same parameters as for L1L2_L1L2 above
+#                    },
+#                },
+#                # full model selection only if screening error is below
+#                'screening_threshold' : 0.4,
+#                # ---- global parameters
+#                # use DOFs of full technique
+#                'global_degrees_of_freedom' : None,
+#                # ---- job related parameters
+#                'job_importable' : False,
+#            },
+#        },
     },
 
     'subset_outer_selectors' : {
         'PKCSelector_ClsErrThr' : {
             'kdvs.fw.impl.stat.PKCSelector.OuterSelector_ClassificationErrorThreshold' : {
                 'error_threshold' : 0.3,
+#                'early_rejection_splits' : 2,
             },
         },
     },
@@ -238,6 +298,12 @@ experiment_profile_inst = {
                 'extSplitPlaceholderParam' : 'ext_split_sets',
             }
         },
+#        'L1L2_GramStatisticsProvider_SCNull' : {
+#            'kdvs.fw.impl.envop.L1L2.L1L2_GramStatisticsProvider' : {
+#                'enclosingCategorizerID' : 'SCNull',
+#                'maxMemory' : 1024 * 1024 * 1024,
+#            }
+#        },
     },
 
 
@@ -256,6 +322,7 @@ experiment_profile_inst = {
                 'inner_selector' : None,
                 'reporter' : ['L1L2_PKC_UTL_Reporter'],
                 'preenvop' : ['L1L2_UniformExtSplitProvider_SCNull'],
+#                'preenvop' : ['L1L2_UniformExtSplitProvider_SCNull', 'L1L2_GramStatisticsProvider_SCNull'],
 #                'preenvop' : [],
                 'postenvop' : [],
                 'misc' : {
@@ -282,6 +349,7 @@ experiment_profile_inst = {
             '>' : {
                 'orderer' : 'SONull',
                 'technique' : 'L1L2_L1L2',
+#                'technique' : 'L1L2_Cascade',
                 'outer_selector' : 'PKCSelector_ClsErrThr',
                 'inner_selector' : 'VarSelector_ClsErrThr_L1L2_VarsFreqThr',
                 'reporter' : ['L1L2_VarFreq_Reporter', 'L1L2_VarCount_Reporter', 'L1L2_PKC_Reporter'],
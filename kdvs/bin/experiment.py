@@ -26,11 +26,14 @@ refined more. Some details are still hard--coded.
 
 from kdvs.core.error import Error, Warn
 from kdvs.core.util import getFileNameComponent, importComponent, serializeObj, \
-    pprintObj, deserializeObj, writeObj, serializeTxt, quote, resolveIndexes
+    pprintObj, deserializeObj, writeObj, serializeTxt, quote, resolveIndexes, \
+    className, BackgroundWriter
 from kdvs.fw.Annotation import get_em2annotation
 from kdvs.fw.Categorizer import Categorizer
 from kdvs.fw.DSV import DSV
-from kdvs.fw.Job import NOTPRODUCED
+from kdvs.fw.Job import NOTPRODUCED, JOBCANCELLED, JobStatus, \
+    CompletionJobGroupManager, JOB_TELEMETRY_COLUMNS, deriveSeed, seededRandomState
+from kdvs.fw.JobCache import JobResultCache, computeJobKey, isCacheableResult
 from kdvs.fw.Map import SetBDMap
 from kdvs.fw.Stat import Labels, RESULTS_PLOTS_ID_KEY
 from kdvs.fw.impl.annotation.HGNC import correctHGNCApprovedSymbols, \
@@ -39,7 +42,9 @@ from kdvs.fw.impl.app.CmdLineApp import CmdLineApp
 from kdvs.fw.impl.data.PKDrivenData import PKDrivenDBDataManager, \
     PKDrivenDBSubsetHierarchy
 from kdvs.fw.impl.pk.go.GeneOntology import GO_id2num, GO_num2id
+import cPickle
 import collections
+import copy
 import glob
 import operator
 import os
@@ -740,6 +745,9 @@ def submitSubsetOperations(env):
         Action that does the following:
 
             * instantiates requested concrete :class:`~kdvs.fw.Job.JobContainer` and :class:`~kdvs.fw.Job.JobGroupManager` instances, as specified in configuration file(s)
+            * if requested (see 'job_result_cache_dir'), provides job container with
+                :class:`~kdvs.fw.JobCache.JobResultCache`, so that jobs whose results
+                were cached in previous runs are not executed again
             * for each category:
 
                 * executes associated pre--Env-Op(s)
@@ -756,9 +764,51 @@ def submitSubsetOperations(env):
                 * executes associated orderer(s) on the generated submission order
                 * for each data subset:
 
-                    * generates all job(s) and adds them to job container
-
-            * starts job container
+                    * generates all job(s) and adds them to job container; if output directory
+                        of an interrupted run was specified (see 'resume_dir'), each job whose
+                        raw output is present there and was produced by identical job (i.e. the key
+                        of the job, see :func:`~kdvs.fw.JobCache.computeJobKey`, stored with its
+                        descriptor, matches), is added to job container as already finished, with
+                        that raw output as its result, and is not executed again; if the experiment is seeded (see 'random_seed'), jobs
+                        of each data subset are created with random stream derived from the seed
+                        and the subset name, and each job gets its own seed derived from the seed,
+                        the subset name and the index of the job (split)
+
+            * if outer selector of the category supports early rejection (see
+                :meth:`~kdvs.fw.impl.stat.PKCSelector.OuterSelector.rejectEarly`), registers
+                callback that, each time the job of data subset finishes, collects errors of
+                its splits processed so far (see :meth:`~kdvs.fw.Stat.Technique.collectSplitErrors`);
+                if the data subset is rejected, its remaining jobs are cancelled (see
+                :meth:`~kdvs.fw.Job.JobContainer.cancelJob`), and its Results are produced
+                from splits already processed; rejected data subsets are available as
+                'ss_rejected', {subset_ID : number of splits processed}
+
+            * if statistical technique creates follow-up jobs (see
+                :meth:`~kdvs.fw.Stat.Technique.createFollowUpJob`), registers callback that
+                detects data subsets whose jobs are all finished; follow-up jobs of such data
+                subsets are created and submitted to the same job container and job group
+                after the container is flushed, until the technique creates no more jobs;
+                only then the job group is sealed; data subsets that need follow-up jobs are
+                available as 'ss_followup', {subset_ID : (technique, submission context)}
+
+            * registers job group manager to be notified about finished jobs, to track
+                completion of job groups; if job group manager signals completion of job
+                groups only when no more jobs are expected for them (see
+                :class:`~kdvs.fw.Job.CompletionJobGroupManager`), registers callbacks that
+                produce :class:`~kdvs.fw.Stat.Results` for each job group as soon as it is
+                completed, while remaining jobs are still executed; if requested (see
+                'incremental_results_serialization'), produced Results are also serialized
+                immediately
+
+            * starts job container; in streaming mode (see 'job_submission_window'), the
+                container is started before submission, at most requested number of jobs
+                is added before the container is flushed, and arguments of finished jobs
+                are released, so only lightweight job data are kept
+
+            * job descriptors of jobs with custom IDs are serialized in background (see
+                'background_writer_threads'), while next jobs are submitted and executed;
+                raw outputs of these jobs are serialized in background as soon as the jobs
+                finish, so that they are available to resume the run if it is interrupted
 
             * serializes the following technical mapping: { internal_job_ID : custom_job_ID },
                 where internal job ID is assigned by job container and custom job ID comes
@@ -778,10 +828,20 @@ def submitSubsetOperations(env):
     job_container_type = env.var('job_container_type')
     job_container_cfg = env.var('job_container_cfg')
     jobContainer = importComponent(job_container_type)(**job_container_cfg)
+    # ---- use cache of job results, if requested
+    job_result_cache_dir = env.var('job_result_cache_dir')
+    if job_result_cache_dir is not None:
+        resultCache = JobResultCache(job_result_cache_dir, env.var('job_result_cache_max_size'))
+        jobContainer.setResultCache(resultCache)
+        env.logger.info('Job result cache used in %s (%d results cached)' % (resultCache.cache_dir, len(resultCache)))
     # ---- instantiate job group manager
     job_group_manager_type = env.var('job_group_manager_type')
     job_group_manager_cfg = env.var('job_group_manager_cfg')
     jobGroupManager = importComponent(job_group_manager_type)(**job_group_manager_cfg)
+    # ---- seed random streams, if requested
+    random_seed = env.var('random_seed')
+    if random_seed is not None:
+        env.logger.info('Random streams derived from seed %s' % random_seed)
     # get location of subsets
     rootsm = env.var('rootsm')
     rloc = env.var('root_output_location')
@@ -799,8 +859,34 @@ def submitSubsetOperations(env):
     env.addVar('jobs_location_id', jobsloc)
     jobs_path = rootsm.getLocation(jobsloc)
     env.addVar('jobs_path', jobs_path)
+    # job descriptors and raw job outputs are serialized in background
+    backgroundWriter = BackgroundWriter(threads=env.var('background_writer_threads'),
+                                        max_pending=env.var('background_writer_max_pending'))
+    env.addVar('backgroundWriter', backgroundWriter)
     # get text suffix
     txt_suffix = env.var('txt_suffix')
+    # resolve jobs location of interrupted run, if resuming
+    jobs_raw_output_suffix = env.var('jobs_raw_output_suffix')
+    resume_dir = env.var('resume_dir')
+    if resume_dir is not None:
+        resume_jobs_path = os.path.join(resume_dir, rloc, jobs_location_part)
+        if not os.path.isdir(resume_jobs_path):
+            raise Error('Jobs location of interrupted run not found! (got %s)' % quote(resume_jobs_path))
+        env.logger.info('Resuming with raw job outputs found in %s' % resume_jobs_path)
+    else:
+        resume_jobs_path = None
+    # IDs of jobs resumed from interrupted run
+    resumed_jobs = list()
+    # determine submission mode
+    job_submission_window = env.var('job_submission_window')
+    if job_submission_window is not None:
+        if job_submission_window < 1:
+            raise Error('Job submission window must be positive! (got %s)' % job_submission_window)
+        # jobs in streaming mode are executed as they are added
+        jobContainer.start()
+        env.logger.info('Job container started in streaming mode (window: %d jobs)' % job_submission_window)
+    # jobs added since job container was last flushed
+    window_jobs = list()
     # cached job dictionaries
     # jobs grouped by categorizers
     ss_jobs = dict()
@@ -811,6 +897,105 @@ def submitSubsetOperations(env):
     jobIDmap = dict()
     # default additional job data
     additionalJobData = { 'samples' : samples }
+    # ---- produce Results as soon as job groups are completed, if requested
+    # Results produced so far
+    ss_incremental_results = dict()
+    # subsets with Results already serialized
+    ss_stored_results = set()
+    # ---- reject hopeless subsets early, if requested by outer selectors
+    # subset -> (technique, outer selector)
+    ss_rejectors = dict()
+    # subset -> number of splits processed when rejected
+    ss_rejected = dict()
+    rejectionNotifier, rejectGroup = _earlyRejector(env, jobContainer, jobGroupManager, all_jobs,
+                                                    ss_rejectors, ss_rejected)
+    jobContainer.addJobFinishedCallback(rejectionNotifier)
+    # job group manager tracks completion of job groups
+    jobContainer.addJobFinishedCallback(_jobFinishedNotifier(jobContainer, jobGroupManager))
+    # raw outputs of jobs with custom IDs are written as soon as jobs finish
+    rawOutputNotifier, writeRawOutput = _rawOutputWriter(jobContainer, all_jobs, backgroundWriter,
+                                                         jobs_path, jobs_raw_output_suffix)
+    jobContainer.addJobFinishedCallback(rawOutputNotifier)
+    incremental_results = isinstance(jobGroupManager, CompletionJobGroupManager)
+    # ---- submit single job of data subset
+    def submitJob(customID, job, ssctx):
+        ssname = ssctx['ssname']
+        job_group = ssname
+        categorizerID, category, pkcid = ssctx['categorizerID'], ssctx['category'], ssctx['pkcid']
+        technique_id = ssctx['technique_id']
+        if customID is not None:
+            # key identifies the job across runs
+            job_key = computeJobKey(job)
+            # raw job data are stored as submitted; job is copied since
+            # it changes during execution
+            stored_job = copy.copy(job)
+        # reuse verified raw output of interrupted run, if any
+        if resume_jobs_path is not None and customID is not None:
+            resumed_result = _resumeJobResult(resume_jobs_path, customID,
+                                              jobs_raw_output_suffix, job_key)
+        else:
+            resumed_result = NOTPRODUCED
+        if resumed_result is not NOTPRODUCED:
+            # add already finished job to container
+            jobID = jobContainer.addFinishedJob(job, resumed_result)
+            resumed_jobs.append(jobID)
+            env.logger.info('Raw output of interrupted run reused for job %s (%s)' % (jobID, customID))
+            if job_submission_window is not None:
+                job.call_args = tuple()
+        else:
+            # add job to container
+            jobID = jobContainer.addJob(job, importable=ssctx['job_importable'])
+            if job_submission_window is not None:
+                window_jobs.append(job)
+#        jobID = jobContainer.addJob(job)
+        # assign job to group
+        jobGroupManager.addJobIDToGroup(job_group, jobID)
+        # add to cache grouped by categorizers
+        ss_jobs[categorizerID][category][pkcid][jobID] = dict()
+        ss_jobs[categorizerID][category][pkcid][jobID]['job'] = job
+        ss_jobs[categorizerID][category][pkcid][jobID]['mat'] = ssname
+        ss_jobs[categorizerID][category][pkcid][jobID]['technique'] = technique_id
+#        ss_jobs[categorizerID][category][pkcid][jobID]['reporter'] = reporter_id
+        # add to linear cache
+        all_jobs[jobID] = dict()
+        all_jobs[jobID]['job'] = job
+        all_jobs[jobID]['mat'] = ssname
+        all_jobs[jobID]['technique'] = technique_id
+#        all_jobs[jobID]['reporter'] = reporter_id
+        # job may be already finished, or its group already rejected
+        rejectGroup(job_group)
+        # store original job information in jobs location
+        if customID is not None:
+            jobIDmap[jobID] = customID
+            env.logger.info('Custom ID provided for job %s: %s' % (jobID, customID))
+            ss_jobs[categorizerID][category][pkcid][jobID]['customID'] = customID
+            all_jobs[jobID]['customID'] = customID
+            # store these raw job data
+            job_stor = dict(all_jobs[jobID])
+            job_stor['job'] = stored_job
+            job_stor['key'] = job_key
+            job_stor_key = customID
+            _serializeInBackground(backgroundWriter, job_stor, os.path.join(jobs_path, job_stor_key))
+            # job may be already finished
+            if jobContainer.getJobStatus(jobID) == JobStatus.FINISHED:
+                writeRawOutput(jobID)
+#            job_stor_txt_key = '%s%s' % (job_stor_key, txt_suffix)
+#            with open(os.path.join(jobs_path, job_stor_txt_key), 'wb') as f:
+#                pprintObj(job_stor, f)
+        # submission finished
+        env.logger.info('Job submitted for %s (%d of %d) (in group %s): %s' % (pkcid, ssctx['index'] + 1, ssctx['total'], job_group, jobID))
+        return jobID
+    # ---- techniques may create follow-up jobs once jobs of subset are finished
+    # subset -> (technique, submission context of subset)
+    ss_followup = dict()
+    followUpNotifier, checkFollowUp, submitFollowUpJobs = _followUpScheduler(env, jobContainer, jobGroupManager,
+                                                                             all_jobs, ss_followup, ss_rejected,
+                                                                             submitJob, random_seed, incremental_results)
+    jobContainer.addJobFinishedCallback(followUpNotifier)
+    if incremental_results:
+        jobGroupManager.addGroupCompletedCallback(_groupResultsProducer(env, jobGroupManager, all_jobs,
+                                                  ss_incremental_results, ss_stored_results))
+        env.logger.info('Results will be produced as soon as job groups are completed')
     # # get pkc2ss mapping
     # misc = env.var('misc')
     # pkc2ss = misc['data_pkc2ss']
@@ -843,7 +1028,8 @@ def submitSubsetOperations(env):
             if preenvops is not None:
                 env.logger.info('Found %d pre-EnvOps for category %s : %s' % (len(preenvops), category, operations_map_img[category]['__preenvops__']))
                 for preenvopID, preenvop in zip(operations_map_img[category]['__preenvops__'], preenvops):
-                    preenvop.perform(env)
+                    with seededRandomState(_streamSeed(random_seed, category, preenvopID)):
+                        preenvop.perform(env)
                     env.logger.info('Pre-EnvOp %s executed' % (preenvopID))
             else:
                 env.logger.info('No pre-EnvOps present for category %s' % (category))
@@ -868,6 +1054,8 @@ def submitSubsetOperations(env):
                 env.logger.info('Found orderer for category %s : %s' % (category, operations_map_img[category]['__orderer__']))
             else:
                 env.logger.info('No orderer present for category %s' % (category))
+            # get outer selector instance, it may reject subsets early
+            outer_selector = cdata['__outer_selector__']
             # ---- get all subset symbols for this category
             symbols = set([s for s in cdata.keys() if not s.startswith('__') and not s.endswith('__')])
             env.logger.info('Symbols found for category %s : %d' % (category, len(symbols)))
@@ -924,55 +1112,76 @@ def submitSubsetOperations(env):
                     ss_jobs[categorizerID][category][pkcid] = dict()
                     # resolve assignment of jobs to group
                     job_group = ssname
+                    if outer_selector is not None:
+                        ss_rejectors[job_group] = (technique, outer_selector)
                     # job may be importable if run with remote job container
                     job_importable = technique.parameters['job_importable']
-                    # lazy evaluation of jobs
-                    for customID, job in technique.createJob(ssname, ss_num, labels_num, additionalJobData):
-                        # add job to container
-                        jobID = jobContainer.addJob(job, importable=job_importable)
-#                        jobID = jobContainer.addJob(job)
-                        # assign job to group
-                        jobGroupManager.addJobIDToGroup(job_group, jobID)
-                        # add to cache grouped by categorizers
-                        ss_jobs[categorizerID][category][pkcid][jobID] = dict()
-                        ss_jobs[categorizerID][category][pkcid][jobID]['job'] = job
-                        ss_jobs[categorizerID][category][pkcid][jobID]['mat'] = ssname
-                        ss_jobs[categorizerID][category][pkcid][jobID]['technique'] = technique_id
-#                        ss_jobs[categorizerID][category][pkcid][jobID]['reporter'] = reporter_id
-                        # add to linear cache
-                        all_jobs[jobID] = dict()
-                        all_jobs[jobID]['job'] = job
-                        all_jobs[jobID]['mat'] = ssname
-                        all_jobs[jobID]['technique'] = technique_id
-#                        all_jobs[jobID]['reporter'] = reporter_id
-                        # store original job information in jobs location
-                        if customID is not None:
-                            jobIDmap[jobID] = customID
-                            env.logger.info('Custom ID provided for job %s: %s' % (jobID, customID))
-                            ss_jobs[categorizerID][category][pkcid][jobID]['customID'] = customID
-                            all_jobs[jobID]['customID'] = customID
-                            # store these raw job data
-                            job_stor = all_jobs[jobID]
-                            job_stor_key = customID
-                            with open(os.path.join(jobs_path, job_stor_key), 'wb') as f:
-                                serializeObj(job_stor, f)
-#                            job_stor_txt_key = '%s%s' % (job_stor_key, txt_suffix)
-#                            with open(os.path.join(jobs_path, job_stor_txt_key), 'wb') as f:
-#                                pprintObj(job_stor, f)
-                        # submission finished
-                        env.logger.info('Job submitted for %s (%d of %d) (in group %s): %s' % (pkcid, i + 1, total_ss_jobs, job_group, jobID))
+                    # technique of the job may be recognized by job container
+                    techniqueJobData = dict(additionalJobData)
+                    techniqueJobData['technique'] = technique_id
+                    techniqueJobData['technique_class'] = '%s.%s' % (technique.__class__.__module__, className(technique))
+                    if random_seed is not None:
+                        # random streams of the subset do not depend on the order of processing
+                        with seededRandomState(_streamSeed(random_seed, ssname)):
+                            createdJobs = list(technique.createJob(ssname, ss_num, labels_num, techniqueJobData))
+                        for split, (_, job) in enumerate(createdJobs):
+                            job.additional_data['seed'] = _streamSeed(random_seed, ssname, split)
+                    else:
+                        # lazy evaluation of jobs
+                        createdJobs = technique.createJob(ssname, ss_num, labels_num, techniqueJobData)
+                    # submission context of subset, shared with follow-up jobs
+                    ssctx = {
+                        'categorizerID' : categorizerID,
+                        'category' : category,
+                        'pkcid' : pkcid,
+                        'ssname' : ssname,
+                        'technique_id' : technique_id,
+                        'job_importable' : job_importable,
+                        'index' : i,
+                        'total' : total_ss_jobs,
+                    }
+                    for customID, job in createdJobs:
+                        submitJob(customID, job, ssctx)
+                        # in streaming mode, wait for full window of jobs to finish
+                        if job_submission_window is not None and len(window_jobs) >= job_submission_window:
+                            _flushJobWindow(jobContainer, window_jobs)
+                            env.logger.info('Job container flushed (%d jobs)' % job_submission_window)
+                            # subsets whose jobs are finished may need more jobs
+                            submitFollowUpJobs()
+                    if technique.follow_up:
+                        # more jobs may follow once these are finished
+                        ss_followup[job_group] = (technique, ssctx)
+                        checkFollowUp(job_group)
+                    elif incremental_results:
+                        # no more jobs for this group
+                        jobGroupManager.sealGroup(job_group)
                     ss_submitted[categorizerID][category].append(pkcid)
             env.logger.info('Finished processing operations for category %s' % category)
     # finished, preserve submission order
     env.addVar('submission_order', submission_order)
     #
-    jobContainer.start()
-    env.logger.info('Job container started with %d jobs' % (jobContainer.getJobCount()))
+    if job_submission_window is not None:
+        # finish remaining jobs
+        flushed_count = len(window_jobs)
+        _flushJobWindow(jobContainer, window_jobs)
+        env.logger.info('Job container flushed (%d jobs)' % flushed_count)
+        env.logger.info('Job container finished streaming with %d jobs' % (jobContainer.getJobCount()))
+    else:
+        jobContainer.start()
+        env.logger.info('Job container started with %d jobs' % (jobContainer.getJobCount()))
+    if resume_jobs_path is not None:
+        env.logger.info('Jobs resumed from interrupted run: %d' % len(resumed_jobs))
     env.addVar('jobContainer', jobContainer)
     env.addVar('ss_jobs', ss_jobs)
     env.addVar('all_jobs', all_jobs)
     env.addVar('ss_submitted', ss_submitted)
     env.addVar('jobGroupManager', jobGroupManager)
+    env.addVar('jobRawOutputWriter', writeRawOutput)
+    env.addVar('ss_followup', ss_followup)
+    env.addVar('jobFollowUpSubmitter', submitFollowUpJobs)
+    env.addVar('ss_incremental_results', ss_incremental_results)
+    env.addVar('ss_stored_results', ss_stored_results)
+    env.addVar('ss_rejected', ss_rejected)
     # immediately store jobIDmap if any customIDs were provided
     jobID_map_key = env.var('jobID_map_key')
     if len(jobIDmap.keys()) > 0:
@@ -1005,12 +1214,19 @@ def executeSubsetOperations(env):
     r"""
 Action that performs the following:
 
+    * if follow-up jobs may still be created (see 'ss_followup'), flushes job container and submits
+        follow-up jobs repeatedly, until no more follow-up jobs are created; these calls are blocking
+
     * closes job container and executes submitted jobs; this call is blocking for most job containers;
         any exceptions from jobs are serialized for further manual inspection
 
-    * :meth:`postClose`-ses job container and serializes its technical data obtained with :meth:`getMiscData`, if any
+    * :meth:`postClose`-ses job container and serializes its technical data obtained with :meth:`getMiscData`, if any;
+        job telemetry recorded by job container, if any, is also stored as tab--separated table
+
+    * collects all raw job results and prepares them for further post--processing and generation of :class:`~kdvs.fw.Stat.Results` instances;
+        raw job results of jobs with custom IDs not serialized yet (e.g. of jobs that never finished) are serialized in background
 
-    * collects all raw job results and prepares them for further post--processing and generation of :class:`~kdvs.fw.Stat.Results` instances
+    * waits until all job descriptors and raw job results are written; error of any write is raised here
     """
     env.logger.info('Started executing subset operations')
     # get root output location (for subsets)
@@ -1021,16 +1237,37 @@ Action that performs the following:
     ssreslocpath = rootsm.getLocation(ssresloc)
     # retrieve jobs location path
     jobs_path = env.var('jobs_path')
-    jobs_raw_output_suffix = env.var('jobs_raw_output_suffix')
     txt_suffix = env.var('txt_suffix')
     #
     jobContainer = env.var('jobContainer')
 #    ss_jobs = env.var('ss_jobs')
     all_jobs = env.var('all_jobs')
+    backgroundWriter = env.var('backgroundWriter')
+    writeRawOutput = env.var('jobRawOutputWriter')
+    # ---- execute jobs until no more follow-up jobs are created
+    ss_followup = env.var('ss_followup')
+    submitFollowUpJobs = env.var('jobFollowUpSubmitter')
+    while len(ss_followup) > 0:
+        # blocking call
+        env.logger.info('About to flush job container (%d job groups may need follow-up jobs)' % len(ss_followup))
+        jobContainer.flush()
+        if submitFollowUpJobs() == 0:
+            break
     # possibly blocking call
     env.logger.info('About to close job container (possibly blocking call)')
     jexc = jobContainer.close()
     env.logger.info('Job container closed (%d job exceptions)' % (len(jexc)))
+    resultCache = jobContainer.getResultCache()
+    if resultCache is not None:
+        cstats = resultCache.getStatistics()
+        env.logger.info('Job result cache: %d hits, %d misses, %d stored, %d evicted (%d results, %d bytes cached)' % (
+                        cstats['hits'], cstats['misses'], cstats['stores'], cstats['evictions'],
+                        cstats['entries'], cstats['size']))
+    submissionStats = jobContainer.getMiscData().get('submissionStats')
+    if submissionStats is not None and submissionStats['jobs_per_second'] is not None:
+        env.logger.info('Job submission: %d jobs in %.3f s (%.1f jobs/s)' % (
+                        submissionStats['jobs'], submissionStats['seconds'],
+                        submissionStats['jobs_per_second']))
     if len(jexc) > 0:
         jobs_exceptions_key = env.var('jobs_exceptions_key')
         jobs_exceptions_txt_key = '%s%s' % (jobs_exceptions_key, txt_suffix)
@@ -1054,24 +1291,38 @@ Action that performs the following:
     with open(os.path.join(destPath, jobs_misc_data_txt_key), 'wb') as f:
         pprintObj(jmdata, f)
     env.logger.info('Job container misc data serialized to %s' % jobs_misc_data_key)
+    # ---- store job telemetry as table
+    telemetry_rows = jobContainer.getJobTelemetryTable()
+    if len(telemetry_rows) > 0:
+        jobs_telemetry_key = env.var('jobs_telemetry_key')
+        jobs_telemetry_txt_key = '%s%s' % (jobs_telemetry_key, txt_suffix)
+        telemetry_lines = ['%s\n' % '\t'.join(JOB_TELEMETRY_COLUMNS)]
+        telemetry_lines.extend(['%s\n' % '\t'.join([str(v) for v in row]) for row in telemetry_rows])
+        with open(os.path.join(destPath, jobs_telemetry_txt_key), 'wb') as f:
+            serializeTxt(telemetry_lines, f)
+        env.logger.info('Job telemetry (%d jobs) stored in %s' % (len(telemetry_rows), jobs_telemetry_txt_key))
+        _logMemoryEstimates(env, telemetry_rows)
+    memoryAdmission = jmdata.get('memoryAdmission')
+    if memoryAdmission is not None:
+        env.logger.info('Memory admission: budget %d bytes, peak reserved %d bytes, %d jobs deferred, %d jobs over budget' % (
+                        memoryAdmission['budget'], memoryAdmission['peak_reserved'],
+                        memoryAdmission['deferred'], len(memoryAdmission['oversized'])))
 
     # ---- retrieve results
     # the content of all_jobs and ss_jobs will be updated simultaneously
     for jobID, jobdata in all_jobs.iteritems():
         jobResult = jobContainer.getJobResult(jobID)
         jobdata['job'].result = jobResult
-        # save raw output immediately if customID was provided
-        try:
-            customID = jobdata['customID']
-            jobs_raw_output_key = '%s_%s' % (customID, jobs_raw_output_suffix)
-            with open(os.path.join(jobs_path, jobs_raw_output_key), 'wb') as f:
-                serializeObj(jobResult, f)
+        # save raw output if customID was provided and not saved when job finished
+        if jobdata.get('customID') is not None:
+            writeRawOutput(jobID)
 #            jobs_raw_output_txt_key = '%s%s' % (jobs_raw_output_key, txt_suffix)
 #            with open(os.path.join(jobs_path, jobs_raw_output_txt_key), 'wb') as f:
 #                pprintObj(jobResult, f)
-        except:
-            pass
     env.logger.info('Job results collected')
+    # ---- wait for background writes, files may be read back from now on
+    backgroundWriter.close()
+    env.logger.info('Job descriptors and raw job outputs written')
 
     # TODO: decide if we want to store such large object!
 #    use_debug_output = env.var('use_debug_output')
@@ -1118,32 +1369,18 @@ Action that performs the following:
     stechs = env.var('pc_stechs')
     # get job group manager
     jobGroupManager = env.var('jobGroupManager')
+    # get Results already produced for groups completed earlier, if any
+    ss_incremental_results = env.var('ss_incremental_results')
 
-    # prepare dictionary of completed groups
-    groupsCompleted = dict()
-    allJobGroups = jobGroupManager.getGroups()
-    for jobGroup in allJobGroups:
-        groupJobs = jobGroupManager.getGroupJobsIDs(jobGroup)
-        groupsCompleted[jobGroup] = dict()
-        groupsCompleted[jobGroup]['jobs'] = dict()
-        for gj in groupJobs:
-            groupsCompleted[jobGroup]['jobs'][gj] = False
-        groupsCompleted[jobGroup]['completed'] = False
-
-    # ---- loop through all jobs and check their status
+    # ---- completion of groups is tracked by job group manager
 
-    for jobID, jobdata in all_jobs.iteritems():
-        jobGroup = jobGroupManager.findGroupByJobID(jobID)
-        jobResult = jobdata['job'].result
-        if jobResult != NOTPRODUCED:
-            groupsCompleted[jobGroup]['jobs'][jobID] = True
-    cmpl_count = 0
-    for jobGroup in allJobGroups:
-        cmpl_status = all(groupsCompleted[jobGroup]['jobs'].values())
-        groupsCompleted[jobGroup]['completed'] = cmpl_status
-        if cmpl_status:
-            cmpl_count += 1
+    allJobGroups = jobGroupManager.getGroups()
+    cmpl_count = len(jobGroupManager.getCompletedGroups())
     env.logger.info('Job groups completed: %d, not completed: %d' % (cmpl_count, len(allJobGroups) - cmpl_count))
+    for jobGroup in allJobGroups:
+        if not jobGroupManager.isGroupCompleted(jobGroup):
+            env.logger.info('Job group %s not completed (%d jobs not finished)' % (jobGroup,
+                            jobGroupManager.getOutstandingJobsCount(jobGroup)))
 
     # ---- send jobs from completed groups to postprocessing and produce final Results
 
@@ -1153,32 +1390,24 @@ Action that performs the following:
     env.logger.info('Started job postprocessing')
 
     for jobGroup in allJobGroups:
-        if groupsCompleted[jobGroup]['completed']:
+        if jobGroupManager.isGroupCompleted(jobGroup):
             groupJobIDs = jobGroupManager.getGroupJobsIDs(jobGroup)
             # determine common technique and subset name across completed jobs
-            groupTechnique = set()
-            groupSSName = set()
-            groupJobs = list()
-            for jobID in groupJobIDs:
-                jobdata = all_jobs[jobID]
-                groupTechnique.add(all_jobs[jobID]['technique'])
-                groupSSName.add(all_jobs[jobID]['mat'])
-                groupJobs.append(all_jobs[jobID]['job'])
-            # should not be thrown but to be safe
-            if len(groupTechnique) > 1 or len(groupSSName) > 1:
-                raise Error('Jobs of group %s not having same technique and/or ssname! (%s,%s)' % (list(groupTechnique), list(groupSSName)))
-            ssname = next(iter(groupSSName))
-            techID = next(iter(groupTechnique))
+            ssname, techID, groupJobs = _resolveGroupJobs(jobGroup, groupJobIDs, all_jobs)
             # group ssnames across techniques
             technique2ssname[techID].add(ssname)
-            technique = stechs[techID]
-            # compile runtime data for this technique
-            # runtime data consists of useful information that can be later used
-            # in reporting results
-            runtime_data = dict()
-            runtime_data['techID'] = techID
-            # ---- produce Results
-            result = technique.produceResults(ssname, groupJobs, runtime_data)
+            if ssname in ss_incremental_results:
+                # ---- Results already produced when group was completed
+                result = ss_incremental_results[ssname]
+            else:
+                technique = stechs[techID]
+                # compile runtime data for this technique
+                # runtime data consists of useful information that can be later used
+                # in reporting results
+                runtime_data = dict()
+                runtime_data['techID'] = techID
+                # ---- produce Results
+                result = technique.produceResults(ssname, groupJobs, runtime_data)
             # store Results
             ssIndResults[ssname] = result
 #            # ---- serialize Results
@@ -1212,6 +1441,17 @@ Action that performs the following:
 
     env.logger.info('Finished job postprocessing')
 
+    # serialize exceptions raised when producing Results for completed groups, if any
+    if isinstance(jobGroupManager, CompletionJobGroupManager) and len(jobGroupManager.callbackExceptions) > 0:
+        ssrootreslocpath = rootsm.getLocation(ssrootresloc)
+        job_group_callbacks_exceptions_key = env.var('job_group_callbacks_exceptions_key')
+        job_group_callbacks_exceptions_txt_key = '%s%s' % (job_group_callbacks_exceptions_key, txt_suffix)
+        with open(os.path.join(ssrootreslocpath, job_group_callbacks_exceptions_key), 'wb') as f:
+            serializeObj(jobGroupManager.callbackExceptions, f)
+        with open(os.path.join(ssrootreslocpath, job_group_callbacks_exceptions_txt_key), 'wb') as f:
+            pprintObj(jobGroupManager.callbackExceptions, f)
+        env.logger.info('Job group callbacks exceptions (%d) serialized to %s' % (len(jobGroupManager.callbackExceptions), job_group_callbacks_exceptions_key))
+
     # serialize very useful technique2ssname map in results root location
     ssrootreslocpath = rootsm.getLocation(ssrootresloc)
     technique2ssname = dict([(k, list(v)) for k, v in technique2ssname.iteritems()])
@@ -1234,6 +1474,14 @@ Action that performs the following:
     use_debug_output = env.var('use_debug_output')
     debug_output_path = env.var('debug_output_path')
     if use_debug_output:
+        # prepare dictionary of completed groups
+        groupsCompleted = dict()
+        for jobGroup in allJobGroups:
+            groupsCompleted[jobGroup] = dict()
+            groupsCompleted[jobGroup]['jobs'] = dict()
+            for gj in jobGroupManager.getGroupJobsIDs(jobGroup):
+                groupsCompleted[jobGroup]['jobs'][gj] = jobGroupManager.isJobFinished(gj)
+            groupsCompleted[jobGroup]['completed'] = jobGroupManager.isGroupCompleted(jobGroup)
         group_completion_key = env.var('group_completion_key')
         group_completion_txt_key = '%s%s' % (group_completion_key, txt_suffix)
         group_completion_path = os.path.join(debug_output_path, group_completion_key)
@@ -1416,43 +1664,20 @@ Action that performs the following:
         * create individual location for results under current storage manager
         * save all generated plots as physical files there
         * serialize :class:`~kdvs.fw.Stat.Results` instance there
+
+    data subsets with Results already serialized when their job groups were completed,
+    are skipped
     """
     env.logger.info('Started storing complete job results')
 
-    rootsm = env.var('rootsm')
-    # get main results location
-    ssrootresloc = env.var('subsets_results_location_id')
-    subset_results_suffix = env.var('subset_results_suffix')
-    txt_suffix = env.var('txt_suffix')
-
     ssIndResults = env.var('ssIndResults')
+    ss_stored_results = env.var('ss_stored_results')
 
     for ssname, result in ssIndResults.iteritems():
-        # ---- serialize Results
-        # create individual location for subset
-        ssresloc = rootsm.sublocation_separator.join([ssrootresloc, ssname])
-        rootsm.createLocation(ssresloc)
-        ssreslocpath = rootsm.getLocation(ssresloc)
-        # first save any plots separately
-        ssplots = result[RESULTS_PLOTS_ID_KEY]
-        for plotname in sorted(ssplots.keys()):
-            plotcontent = ssplots[plotname]
-            plotpath = os.path.join(ssreslocpath, plotname)
-            with open(plotpath, 'wb') as f:
-                writeObj(plotcontent, f)
-            env.logger.info('Plot %s saved' % (plotname))
-        # serialize individual output
-        result_img = dict((k, result[k]) for k in result.keys())
-        del result_img[RESULTS_PLOTS_ID_KEY]
-        ind_subset_result_key = '%s%s' % (ssname, subset_results_suffix)
-        ind_subset_result_path = os.path.join(ssreslocpath, ind_subset_result_key)
-        with open(ind_subset_result_path, 'wb') as f:
-            serializeObj(result_img, f)
-        ind_subset_result_txt_key = '%s%s' % (ind_subset_result_key, txt_suffix)
-        ind_subset_result_txt_path = os.path.join(ssreslocpath, ind_subset_result_txt_key)
-        with open(ind_subset_result_txt_path, 'wb') as f:
-            pprintObj(result_img, f)
-        env.logger.info('Results for %s serialized to %s' % (ssname, ind_subset_result_key))
+        # Results may already be serialized when group was completed
+        if ssname not in ss_stored_results:
+            _storeSubsetResults(env, ssname, result)
+            ss_stored_results.add(ssname)
 
     env.logger.info('Finished storing complete job results')
 
@@ -1630,6 +1855,230 @@ Action that performs the following:
 
 # ---- private functions
 
+def _storeSubsetResults(env, ssname, result):
+    rootsm = env.var('rootsm')
+    # get main results location
+    ssrootresloc = env.var('subsets_results_location_id')
+    subset_results_suffix = env.var('subset_results_suffix')
+    txt_suffix = env.var('txt_suffix')
+
+    # ---- serialize Results
+    # create individual location for subset
+    ssresloc = rootsm.sublocation_separator.join([ssrootresloc, ssname])
+    rootsm.createLocation(ssresloc)
+    ssreslocpath = rootsm.getLocation(ssresloc)
+    # first save any plots separately
+    ssplots = result[RESULTS_PLOTS_ID_KEY]
+    for plotname in sorted(ssplots.keys()):
+        plotcontent = ssplots[plotname]
+        plotpath = os.path.join(ssreslocpath, plotname)
+        with open(plotpath, 'wb') as f:
+            writeObj(plotcontent, f)
+        env.logger.info('Plot %s saved' % (plotname))
+    # serialize individual output
+    result_img = dict((k, result[k]) for k in result.keys())
+    del result_img[RESULTS_PLOTS_ID_KEY]
+    ind_subset_result_key = '%s%s' % (ssname, subset_results_suffix)
+    ind_subset_result_path = os.path.join(ssreslocpath, ind_subset_result_key)
+    with open(ind_subset_result_path, 'wb') as f:
+        serializeObj(result_img, f)
+    ind_subset_result_txt_key = '%s%s' % (ind_subset_result_key, txt_suffix)
+    ind_subset_result_txt_path = os.path.join(ssreslocpath, ind_subset_result_txt_key)
+    with open(ind_subset_result_txt_path, 'wb') as f:
+        pprintObj(result_img, f)
+    env.logger.info('Results for %s serialized to %s' % (ssname, ind_subset_result_key))
+
+def _resolveGroupJobs(jobGroup, groupJobIDs, all_jobs):
+    groupTechnique = set()
+    groupSSName = set()
+    groupJobs = list()
+    for jobID in groupJobIDs:
+        groupTechnique.add(all_jobs[jobID]['technique'])
+        groupSSName.add(all_jobs[jobID]['mat'])
+        groupJobs.append(all_jobs[jobID]['job'])
+    # should not be thrown but to be safe
+    if len(groupTechnique) > 1 or len(groupSSName) > 1:
+        raise Error('Jobs of group %s not having same technique and/or ssname! (%s,%s)' % (jobGroup, list(groupTechnique), list(groupSSName)))
+    ssname = next(iter(groupSSName))
+    techID = next(iter(groupTechnique))
+    return ssname, techID, groupJobs
+
+def _streamSeed(random_seed, *components):
+    # seed of independent random stream, None if experiment is not seeded
+    if random_seed is None:
+        return None
+    return deriveSeed(random_seed, *components)
+
+def _jobFinishedNotifier(jobContainer, jobGroupManager):
+    # only jobs that produced results can complete their group
+    def _notify(jobID):
+        if jobContainer.getJobResult(jobID) != NOTPRODUCED:
+            jobGroupManager.jobFinished(jobID)
+    return _notify
+
+def _earlyRejector(env, jobContainer, jobGroupManager, all_jobs, ss_rejectors, ss_rejected):
+    # groups that cannot pass outer selection are rejected, and their jobs not
+    # executed yet are cancelled
+    def _reject(jobGroup):
+        if jobGroup not in ss_rejectors:
+            return
+        groupJobIDs = jobGroupManager.getGroupJobsIDs(jobGroup)
+        if jobGroup not in ss_rejected:
+            technique, outer_selector = ss_rejectors[jobGroup]
+            finished = [jobContainer.getJob(jid) for jid in groupJobIDs
+                        if jobContainer.getJobStatus(jid) == JobStatus.FINISHED]
+            split_errors = technique.collectSplitErrors(jobGroup, finished)
+            if split_errors is None or not outer_selector.rejectEarly(*split_errors):
+                return
+            ss_rejected[jobGroup] = len(split_errors[0])
+            env.logger.info('Job group %s rejected early (after %d splits)' % (jobGroup, ss_rejected[jobGroup]))
+        cancelled = [jid for jid in groupJobIDs
+                     if jobContainer.getJobStatus(jid) == JobStatus.ADDED and jobContainer.cancelJob(jid)]
+        if len(cancelled) > 0:
+            env.logger.info('Jobs cancelled for job group %s: %d' % (jobGroup, len(cancelled)))
+    def _notify(jobID):
+        # jobs not assigned to group yet are checked during submission
+        jobdata = all_jobs.get(jobID)
+        if jobdata is None or jobContainer.getJobResult(jobID) == JOBCANCELLED:
+            return
+        _reject(jobdata['mat'])
+    return _notify, _reject
+
+def _followUpScheduler(env, jobContainer, jobGroupManager, all_jobs, ss_followup, ss_rejected,
+                       submitJob, random_seed, seal):
+    # technique may create more jobs for the subset once all jobs created so far
+    # are finished; they are submitted outside of job container calls, since
+    # job containers may not accept new jobs while they execute or collect jobs
+    ready = collections.OrderedDict()
+    def _check(jobGroup):
+        if jobGroup not in ss_followup or jobGroup in ready:
+            return
+        for jid in jobGroupManager.getGroupJobsIDs(jobGroup):
+            if jobContainer.getJobStatus(jid) != JobStatus.FINISHED:
+                return
+        ready[jobGroup] = True
+    def _notify(jobID):
+        # jobs not assigned to group yet are checked during submission
+        jobdata = all_jobs.get(jobID)
+        if jobdata is None:
+            return
+        _check(jobdata['mat'])
+    def _submit():
+        submitted = 0
+        while len(ready) > 0:
+            jobGroup, _ = ready.popitem(last=False)
+            technique, ssctx = ss_followup[jobGroup]
+            ssname = ssctx['ssname']
+            groupJobIDs = jobGroupManager.getGroupJobsIDs(jobGroup)
+            followUpJobs = list()
+            # rejected subsets need no more jobs
+            if jobGroup not in ss_rejected:
+                finished = [jobContainer.getJob(jid) for jid in groupJobIDs]
+                with seededRandomState(_streamSeed(random_seed, ssname, 'followup', len(groupJobIDs))):
+                    followUpJobs = list(technique.createFollowUpJob(ssname, finished))
+            if len(followUpJobs) == 0:
+                # no more jobs for this group
+                del ss_followup[jobGroup]
+                if seal:
+                    jobGroupManager.sealGroup(jobGroup)
+                continue
+            for split, (customID, job) in enumerate(followUpJobs, len(groupJobIDs)):
+                if random_seed is not None:
+                    job.additional_data['seed'] = _streamSeed(random_seed, ssname, split)
+                submitJob(customID, job, ssctx)
+            submitted += len(followUpJobs)
+            env.logger.info('Follow-up jobs submitted for job group %s: %d' % (jobGroup, len(followUpJobs)))
+            # follow-up jobs may be already finished
+            _check(jobGroup)
+        return submitted
+    return _notify, _check, _submit
+
+def _groupResultsProducer(env, jobGroupManager, all_jobs, ss_incremental_results, ss_stored_results):
+    stechs = env.var('pc_stechs')
+    incremental_results_serialization = env.var('incremental_results_serialization')
+    def _produce(jobGroup):
+        groupJobIDs = jobGroupManager.getGroupJobsIDs(jobGroup)
+        ssname, techID, groupJobs = _resolveGroupJobs(jobGroup, groupJobIDs, all_jobs)
+        runtime_data = dict()
+        runtime_data['techID'] = techID
+        result = stechs[techID].produceResults(ssname, groupJobs, runtime_data)
+        ss_incremental_results[ssname] = result
+        env.logger.info('Results produced for completed job group %s' % jobGroup)
+        if incremental_results_serialization:
+            _storeSubsetResults(env, ssname, result)
+            ss_stored_results.add(ssname)
+    return _produce
+
+def _logMemoryEstimates(env, telemetry_rows):
+    # log estimated memory footprint of jobs against actual peak RSS of worker
+    # process; the latter includes the baseline of the process itself
+    est_col = JOB_TELEMETRY_COLUMNS.index('est_memory')
+    peak_col = JOB_TELEMETRY_COLUMNS.index('peak_rss')
+    pairs = list()
+    for row in telemetry_rows:
+        est, peak = row[est_col], row[peak_col]
+        if est is not None and peak is not None:
+            env.logger.debug('Job %s: estimated memory %d bytes, peak RSS %d bytes' % (row[0], est, peak))
+            pairs.append((est, peak))
+    if len(pairs) > 0:
+        underestimated = len([1 for est, peak in pairs if peak > est])
+        env.logger.info('Job memory: largest estimate %d bytes, largest peak RSS %d bytes, %d of %d jobs exceeded estimate' % (
+                        max([p[0] for p in pairs]), max([p[1] for p in pairs]), underestimated, len(pairs)))
+
+def _serializeInBackground(backgroundWriter, obj, path):
+    # stop early if previous writes already failed
+    backgroundWriter.check()
+    backgroundWriter.submit(_serializeToPath, obj, path)
+
+def _serializeToPath(obj, path):
+    with open(path, 'wb') as f:
+        serializeObj(obj, f)
+
+def _flushJobWindow(jobContainer, window_jobs):
+    # blocking call
+    jobContainer.flush()
+    # arguments of finished jobs are not needed anymore
+    for job in window_jobs:
+        job.call_args = tuple()
+    del window_jobs[:]
+
+def _rawOutputWriter(jobContainer, all_jobs, backgroundWriter, jobs_path, raw_output_suffix):
+    # raw output of each job with custom ID is serialized in background once
+    written = set()
+    def _write(jobID):
+        if jobID in written:
+            return
+        written.add(jobID)
+        raw_output_key = '%s_%s' % (all_jobs[jobID]['customID'], raw_output_suffix)
+        _serializeInBackground(backgroundWriter, jobContainer.getJobResult(jobID),
+                               os.path.join(jobs_path, raw_output_key))
+    def _notify(jobID):
+        # jobs without custom ID registered yet are written during submission
+        jobdata = all_jobs.get(jobID)
+        if jobdata is None or jobdata.get('customID') is None:
+            return
+        _write(jobID)
+    return _notify, _write
+
+def _resumeJobResult(resume_jobs_path, customID, raw_output_suffix, jobKey):
+    # job of interrupted run must have the same key, i.e. the same function,
+    # arguments and seed
+    try:
+        with open(os.path.join(resume_jobs_path, customID), 'rb') as f:
+            job_stor = deserializeObj(f)
+        if job_stor.get('key') != jobKey:
+            return NOTPRODUCED
+        raw_output_key = '%s_%s' % (customID, raw_output_suffix)
+        with open(os.path.join(resume_jobs_path, raw_output_key), 'rb') as f:
+            result = deserializeObj(f)
+    except (IOError, OSError, EOFError, cPickle.UnpicklingError):
+        # missing or truncated files cannot be reused
+        return NOTPRODUCED
+    # results that signal not executed or failed job cannot be reused
+    if not isCacheableResult(result):
+        return NOTPRODUCED
+    return result
+
 def _resolveProfileInstanceGroup(profile_ig_data):
     instances = dict()
     for instID, instData in profile_ig_data.iteritems():
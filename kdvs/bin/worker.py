@@ -0,0 +1,61 @@
+# Knowledge Driven Variable Selection (KDVS)
+# Copyright (C) 2014 KDVS Developers. All rights reserved.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+r"""
+Worker application that executes jobs submitted by
+:class:`~kdvs.fw.impl.job.FSQueueJob.FSQueueJobContainer` to the shared queue
+directory. Can be started on any machine that mounts the queue directory, as many
+times as needed. See 'worker.py -h' for help.
+"""
+
+from kdvs.core.error import Error
+from kdvs.core.log import StreamLogger, _LEVELS
+from kdvs.fw.impl.job.FSQueueJob import FSQueueWorker, DEFAULT_POLL_INTERVAL, \
+    DEFAULT_HEARTBEAT
+from optparse import OptionParser
+import os
+
+def main():
+    desc = 'Knowledge Driven Variable Selection Queue Worker'
+    parser = OptionParser(description=desc)
+    parser.add_option("-q", "--queue-dir", action="store", dest="queue_dir",
+        help="execute jobs from shared queue directory QDIR", metavar="QDIR", default=None)
+    parser.add_option("--session", action="store", dest="session",
+        help="execute jobs only from session SESSIONID", metavar="SESSIONID", default=None)
+    parser.add_option("--poll-interval", action="store", type="float", dest="poll_interval",
+        help="scan queue every SECS seconds when idle", metavar="SECS", default=DEFAULT_POLL_INTERVAL)
+    parser.add_option("--heartbeat", action="store", type="float", dest="heartbeat",
+        help="refresh lease of executed job every SECS seconds", metavar="SECS", default=DEFAULT_HEARTBEAT)
+    parser.add_option("--idle-timeout", action="store", type="float", dest="idle_timeout",
+        help="finish when no job was available for SECS seconds", metavar="SECS", default=None)
+    parser.add_option("--max-jobs", action="store", type="int", dest="max_jobs",
+        help="finish after executing NUM jobs", metavar="NUM", default=None)
+    parser.add_option("--log-level", action="store", dest="log_level",
+        help="set log level to specified", default='INFO')
+    options = parser.parse_args()[0]
+    if not options.queue_dir:
+        raise Error('Queue directory not specified! Use -h option for more details.')
+    logger = StreamLogger(name='kdvs-worker', level=_LEVELS[options.log_level])
+    worker = FSQueueWorker(os.path.abspath(options.queue_dir), session=options.session,
+                           poll_interval=options.poll_interval, heartbeat=options.heartbeat,
+                           idle_timeout=options.idle_timeout, max_jobs=options.max_jobs,
+                           logger=logger)
+    logger.info('Worker started (queue: %s)' % worker.queue_dir)
+    executed = worker.run()
+    logger.info('Worker finished (%d jobs executed)' % executed)
+
+if __name__ == '__main__':
+    main()
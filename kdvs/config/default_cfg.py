@@ -48,6 +48,37 @@ job_group_manager_type = 'kdvs.fw.Job.JobGroupManager'
 job_group_manager_cfg = {
     }
 
+# if integer, jobs are submitted in streaming mode: job container is started first,
+# and it is flushed each time the specified number of jobs has been added; arguments
+# of finished jobs are released immediately; if None, all jobs are added first and
+# executed when job container is started
+job_submission_window = None
+
+# if True, and job group manager signals completion of job groups (e.g.
+# 'kdvs.fw.Job.CompletionJobGroupManager'), Results of each group are serialized
+# as soon as they are produced, while remaining jobs are still executed
+incremental_results_serialization = False
+
+# if not None, results of jobs are cached in specified directory and reused across
+# runs, as long as job arguments and versions of used libraries are the same; the
+# total size of cached results (in bytes) is limited, least recently used ones are
+# evicted first
+job_result_cache_dir = None
+job_result_cache_max_size = 1024 * 1024 * 1024
+
+# if not None, the seed of the experiment; random streams are derived from it for
+# each data subset (used when jobs are created) and for each job (installed right
+# before job execution), so the results do not depend on job container used nor
+# on the order of execution
+random_seed = None
+
+# number of background threads that serialize job descriptors and raw job outputs,
+# overlapping disk I/O with submission and execution of jobs (if 0, files are
+# written synchronously), and the maximum number of files waiting to be written
+# (submission blocks when reached; if 0, the number is not limited)
+background_writer_threads = 4
+background_writer_max_pending = 256
+
 # ---- default storage identifiers
 
 # default tablespace name where all data tables will be stored
@@ -72,6 +103,7 @@ jobID_map_key = 'JOBID_MAP'
 submission_order_key = 'SUBMISSION_ORDER'
 jobs_exceptions_key = 'JEXC'
 jobs_misc_data_key = 'JC_MISC_DATA'
+jobs_telemetry_key = 'JC_TELEMETRY'
 group_completion_key = 'GRCOMP'
 technique2dof_key = 'TECH2DOF'
 technique2ssname_key = 'TECH2SS'
@@ -80,7 +112,7 @@ inner_selection_key = 'INNER_SELECTION'
 em2annotation_key = 'EM2ANNOTATION'
 pkcid2ssname_key = 'PKCID2SS'
 
-# job_group_callbacks_exceptions_key = 'GREXC'
+job_group_callbacks_exceptions_key = 'GREXC'
 
 misc_view_key = 'MISC'
 
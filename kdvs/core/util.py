@@ -20,11 +20,13 @@ Provides various utility classes and functions.
 
 from kdvs import ROOT_IMPORT_PATH
 from kdvs.core.error import Error
+import Queue
 import cPickle
 import inspect
 import itertools
 import os
 import sys
+import threading
 import types
 import uuid
 import pprint
@@ -491,3 +493,123 @@ In current implementation, it represents 'text' with '<text>'.
         return self.srepr
     def __repr__(self):
         return self.__str__()
+
+
+class BackgroundWriter(object):
+    r"""
+Pool of background threads that execute submitted calls, typically writing of files
+(e.g. serialization with :func:`serializeObj`), while the caller continues its work.
+Calls are executed in the order of submission, but may finish in any order. Errors
+raised by calls are collected and reported by :meth:`wait`.
+    """
+    def __init__(self, threads=4, max_pending=0):
+        r"""
+Parameters
+----------
+threads : integer
+    number of background threads; if 0, calls are executed immediately during
+    submission; 4 by default
+
+max_pending : integer
+    maximum number of calls waiting for execution; submission blocks when reached;
+    if 0, the number is not limited; 0 by default
+
+Raises
+------
+Error
+    if number of threads is negative
+        """
+        if threads < 0:
+            raise Error('Number of threads must not be negative! (got %s)' % threads)
+        self._queue = Queue.Queue(max_pending)
+        self._errors = list()
+        self._lock = threading.Lock()
+        self._closed = False
+        self._threads = list()
+        for _ in range(threads):
+            th = threading.Thread(target=self._run)
+            th.daemon = True
+            th.start()
+            self._threads.append(th)
+
+    def submit(self, func, *args, **kwargs):
+        r"""
+Submit call func(\*args, \*\*kwargs) for execution in background.
+
+Raises
+------
+Error
+    if the writer is already closed
+        """
+        if self._closed:
+            raise Error('Background writer already closed!')
+        if len(self._threads) == 0:
+            self._call(func, args, kwargs)
+        else:
+            self._queue.put((func, args, kwargs))
+
+    def wait(self):
+        r"""
+Wait until all calls submitted so far are finished.
+
+Raises
+------
+Error
+    if any call submitted so far raised an exception; the first one is reported
+        """
+        self._queue.join()
+        self.check()
+
+    def check(self):
+        r"""
+Report errors of calls finished so far, without waiting for the remaining ones.
+Useful to stop submitting early when writing already failed.
+
+Raises
+------
+Error
+    if any call finished so far raised an exception; the first one is reported
+        """
+        with self._lock:
+            errors = self._errors
+            self._errors = list()
+        if len(errors) > 0:
+            raise Error('Background call failed! (Reason: %s) (%d failed calls)' % (errors[0], len(errors)))
+
+    def close(self):
+        r"""
+Wait until all submitted calls are finished and stop background threads.
+
+Raises
+------
+Error
+    if any submitted call raised an exception; the first one is reported
+        """
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            self.wait()
+        finally:
+            for _ in self._threads:
+                self._queue.put(None)
+            for th in self._threads:
+                th.join()
+            self._threads = list()
+
+    def _run(self):
+        while True:
+            task = self._queue.get()
+            try:
+                if task is None:
+                    break
+                self._call(*task)
+            finally:
+                self._queue.task_done()
+
+    def _call(self, func, args, kwargs):
+        try:
+            func(*args, **kwargs)
+        except Exception, e:
+            with self._lock:
+                self._errors.append(e)
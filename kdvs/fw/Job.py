@@ -21,8 +21,14 @@ Provides high--level functionality for handling of computational jobs by KDVS.
 from kdvs.core.error import Warn, Error
 from kdvs.core.util import quote, isListOrTuple, Constant
 from kdvs.fw.Map import SetBDMap
+import collections
+import contextlib
+import hashlib
 import itertools
+import numpy
 import os
+import random
+import time
 import types
 import uuid
 
@@ -36,11 +42,34 @@ r"""
 Constant used to signal when job ended with an error.
 """
 
+JOBCANCELLED = Constant('JobCancelled')
+r"""
+Constant used as the result of job that was cancelled before its execution (see
+:meth:`JobContainer.cancelJob`).
+"""
+
 DEFAULT_CALLARGS_LISTING_THR = 2
 r"""
 Default number of job arguments presented, used in job listings, logs, etc.
 """
 
+JOB_TELEMETRY_COLUMNS = ('jobID', 'worker', 'wall_time', 'cpu_time', 'peak_rss',
+                         'est_memory', 'n', 'p', 'input_bytes', 'output_bytes')
+r"""
+Columns of job telemetry recorded by job containers: job ID, worker ID (host:PID),
+wall time and CPU time of execution (in seconds), peak RSS of worker process (in
+bytes), estimated memory footprint of the job (in bytes, see :func:`estimateJobMemory`),
+shape of job input data (n, p), and estimated size of job input and output data
+(in bytes, see :func:`getDataSize`). Unavailable values are recorded as None.
+"""
+
+DEFAULT_JOB_MEMORY_FACTOR = 4
+r"""
+Default number of copies of job input data assumed to be held in memory during job
+execution, used to estimate memory footprint of the job when it is not known better
+(see :func:`estimateJobMemory`).
+"""
+
 class JobStatus(object):
     r"""
 A container for constants that represent the state of the job during its lifecycle.
@@ -56,7 +85,10 @@ class Job(object):
     r"""
 High--level wrapper over computational job that KDVS manages. Job consists of
 a function with arguments and possibly with some additional data. Newly created
-Job is in the state of CREATED, and its results are NOTPRODUCED.
+Job is in the state of CREATED, and its results are NOTPRODUCED. If 'seed' key is
+present in additional data, random number generators are seeded with it right
+before job function is executed (see :func:`seededRandomState`), therefore the
+result does not depend on the process that executes the job.
     """
     def __init__(self, call_func, call_args, additional_data={}):
         r"""
@@ -112,7 +144,8 @@ Error
     with the underlying details
         """
         try:
-            return self.call_func(*self.call_args)
+            with seededRandomState(self.additional_data.get('seed')):
+                return self.call_func(*self.call_args)
         except Exception, e:
             raise Error('Could not execute %s! (Reason: %s)' % (self.__class__.__name__, e))
 
@@ -136,6 +169,302 @@ Error
         return self.__str__()
 
 
+# ---- utils for reproducible random streams
+
+def deriveSeed(seed, *components):
+    r"""
+Derive the seed of independent random stream from given seed and any components
+that identify the stream (e.g. name of data subset and index of split). The same
+arguments always give the same seed, regardless of the process and of the order
+of calls.
+
+Parameters
+----------
+seed : integer
+    base seed, typically the seed of the whole experiment
+
+components : iterable
+    any objects that identify the stream; their string representations are used
+
+Returns
+-------
+seed : integer
+    derived seed, in the range [0, 2**32)
+    """
+    elems = list()
+    for c in (seed,) + components:
+        if isinstance(c, unicode):
+            c = c.encode('utf-8')
+        elems.append('%s' % (c,))
+    return int(hashlib.sha1('\t'.join(elems)).hexdigest()[:8], 16)
+
+def installSeed(seed):
+    r"""
+Seed random number generators of 'random' module and 'numpy.random' module (if
+available) in current process. Self--contained function, can be used as depfunc
+with :class:`~kdvs.fw.impl.job.PPlusJob.PPlusJobContainer`.
+    """
+    import random
+    random.seed(seed)
+    try:
+        import numpy
+        numpy.random.seed(seed)
+    except ImportError:
+        pass
+
+@contextlib.contextmanager
+def seededRandomState(seed):
+    r"""
+Context manager that seeds random number generators (see :func:`installSeed`)
+with given seed, and restores their previous state on exit. If seed is None,
+random number generators are left intact.
+    """
+    if seed is None:
+        yield
+        return
+    random_state = random.getstate()
+    numpy_state = numpy.random.get_state()
+    installSeed(seed)
+    try:
+        yield
+    finally:
+        random.setstate(random_state)
+        numpy.random.set_state(numpy_state)
+
+
+# ---- utils for job telemetry (self contained, can be used as depfuncs)
+
+def getWorkerID():
+    r"""
+Return identifier of current worker process as 'host:PID'. Self--contained function,
+can be used as depfunc with :class:`~kdvs.fw.impl.job.PPlusJob.PPlusJobContainer`.
+    """
+    import os
+    import socket
+    return '%s:%d' % (socket.gethostname(), os.getpid())
+
+def getProcessUsage():
+    r"""
+Return resource usage of current process. Self--contained function, can be used
+as depfunc with :class:`~kdvs.fw.impl.job.PPlusJob.PPlusJobContainer`.
+
+Returns
+-------
+(cpu_time, peak_rss) : tuple
+    CPU time (user and system) used so far, in seconds, and peak resident set size
+    of the process so far, in bytes; the latter is None if not available
+    """
+    import os
+    import sys
+    cpu_time = sum(os.times()[:2])
+    try:
+        import resource
+        peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # reported in kilobytes everywhere except Mac OS X
+        if sys.platform != 'darwin':
+            peak_rss *= 1024
+    except ImportError:
+        peak_rss = None
+    return cpu_time, peak_rss
+
+def getDataSize(obj):
+    r"""
+Return estimated size of data held by given object, in bytes, used in job telemetry.
+Numpy arrays contribute the size of their data buffers; lists, tuples, sets and
+dictionaries are traversed, and any other object contributes its own size only.
+Nothing is copied or serialized, so that the estimate is cheap and does not affect
+memory usage of the process. Self--contained function, can be used as depfunc with :class:`~kdvs.fw.impl.job.PPlusJob.PPlusJobContainer`.
+    """
+    import sys
+    import numpy
+    size = 0
+    seen = set()
+    pending = [obj]
+    while len(pending) > 0:
+        o = pending.pop()
+        if id(o) in seen:
+            continue
+        seen.add(id(o))
+        if isinstance(o, numpy.ndarray):
+            size += o.nbytes
+            if o.dtype == object:
+                pending.extend(o.flat)
+        elif isinstance(o, (list, tuple, set, frozenset)):
+            size += sys.getsizeof(o, 0)
+            pending.extend(o)
+        elif isinstance(o, dict):
+            size += sys.getsizeof(o, 0)
+            pending.extend(o.keys())
+            pending.extend(o.values())
+        else:
+            size += sys.getsizeof(o, 0)
+    return size
+
+def getJobDataShape(job):
+    r"""
+Return shape (n, p) of input data of given job. It is taken from 'data_shape' key
+of job additional data, if present; otherwise, shape of the first 2--dimensional
+job argument is returned. If shape cannot be determined, (None, None) is returned.
+    """
+    try:
+        n, p = job.additional_data['data_shape']
+        return n, p
+    except (KeyError, TypeError, ValueError):
+        pass
+    for arg in job.call_args:
+        shape = getattr(arg, 'shape', None)
+        if shape is not None and len(shape) == 2:
+            return shape[0], shape[1]
+    return None, None
+
+def estimateJobCost(job):
+    r"""
+Return estimated cost of given job, used by job containers to coalesce small jobs
+into batches. It is taken from 'cost' key of job additional data, if present;
+otherwise, it is estimated as n*p from the shape of job input data (see
+:func:`getJobDataShape`). If cost cannot be estimated, None is returned.
+    """
+    try:
+        return job.additional_data['cost']
+    except KeyError:
+        pass
+    n, p = getJobDataShape(job)
+    if n is None or p is None:
+        return None
+    return n * p
+
+def estimateJobMemory(job):
+    r"""
+Return estimated memory footprint of given job, in bytes, used by job containers
+to admit concurrent jobs within memory budget. It is taken from 'memory' key of job
+additional data, if present (techniques that know better fill it when creating the
+job); otherwise, it is estimated as :data:`DEFAULT_JOB_MEMORY_FACTOR` copies of job
+input data of double precision, from the shape of job input data (see
+:func:`getJobDataShape`). If memory footprint cannot be estimated, None is returned.
+    """
+    try:
+        return job.additional_data['memory']
+    except KeyError:
+        pass
+    n, p = getJobDataShape(job)
+    if n is None or p is None:
+        return None
+    return DEFAULT_JOB_MEMORY_FACTOR * n * p * numpy.dtype(numpy.float64).itemsize
+
+def _initialTelemetry(job):
+    n, p = getJobDataShape(job)
+    return {
+        'worker' : getWorkerID(),
+        'n' : n,
+        'p' : p,
+        'est_memory' : estimateJobMemory(job),
+        'input_bytes' : None,
+        'output_bytes' : None,
+    }
+
+def measureJobExecution(job):
+    r"""
+Execute given job in current process, as :meth:`Job.execute` does, and measure
+its execution.
+
+Parameters
+----------
+job : :class:`Job`
+    job to be executed
+
+Returns
+-------
+(exception, result, telemetry) : tuple
+    exception raised during execution or None, result of the job (:data:`NOTPRODUCED`
+    if exception was raised), and dictionary of telemetry keyed with the columns
+    of :data:`JOB_TELEMETRY_COLUMNS` (except 'jobID'); note that peak RSS refers
+    to the whole current process
+    """
+    telemetry = _initialTelemetry(job)
+    cpu_start, _ = getProcessUsage()
+    wall_start = time.time()
+    try:
+        result = job.execute()
+        exception = None
+    except Exception, e:
+        result = NOTPRODUCED
+        exception = e
+    telemetry['wall_time'] = time.time() - wall_start
+    cpu_end, peak_rss = getProcessUsage()
+    telemetry['cpu_time'] = cpu_end - cpu_start
+    telemetry['peak_rss'] = peak_rss
+    # data sizes are estimated after peak RSS is sampled
+    telemetry['input_bytes'] = getDataSize(job.call_args)
+    if exception is None:
+        telemetry['output_bytes'] = getDataSize(result)
+    return exception, result, telemetry
+
+def measureBatchExecution(jobs):
+    r"""
+Execute given jobs in current process, one after another, and measure their
+execution, as :func:`measureJobExecution` does for each of them. Consecutive jobs
+that share the same batch function, found in 'batch_call' key of job additional
+data, are executed together with single call of that function instead. The batch
+function accepts the list of argument tuples of the jobs and returns the list of
+their results, in the same order; techniques provide it to solve many small
+problems at once in vectorized manner. Seeds of individual jobs are not installed
+for joint execution, therefore batch functions must not depend on random number
+generators. Wall time and CPU time of joint execution are divided evenly among its
+jobs. If the batch function fails, its jobs are executed separately, so that
+errors refer to individual jobs.
+
+Parameters
+----------
+jobs : iterable of :class:`Job`
+    jobs to be executed
+
+Returns
+-------
+outcomes : generator
+    generator of tuples (exception, result, telemetry), one for each job, in the
+    order of jobs (see :func:`measureJobExecution`); the outcome of the job is
+    yielded as soon as it is known
+    """
+    jobs = list(jobs)
+    start = 0
+    while start < len(jobs):
+        batch_call = jobs[start].additional_data.get('batch_call')
+        end = start + 1
+        if batch_call is not None:
+            while end < len(jobs) and jobs[end].additional_data.get('batch_call') is batch_call:
+                end += 1
+        if end - start > 1:
+            for outcome in _measureJointExecution(batch_call, jobs[start:end]):
+                yield outcome
+        else:
+            yield measureJobExecution(jobs[start])
+        start = end
+
+def _measureJointExecution(batch_call, jobs):
+    cpu_start, _ = getProcessUsage()
+    wall_start = time.time()
+    try:
+        results = list(batch_call([job.call_args for job in jobs]))
+        if len(results) != len(jobs):
+            raise Error('Batch function must return one result per job! (got %d results for %d jobs)' % (len(results), len(jobs)))
+    except Exception:
+        # jobs are executed separately
+        return [measureJobExecution(job) for job in jobs]
+    wall_time = (time.time() - wall_start) / len(jobs)
+    cpu_end, peak_rss = getProcessUsage()
+    cpu_time = (cpu_end - cpu_start) / len(jobs)
+    outcomes = list()
+    for job, result in zip(jobs, results):
+        telemetry = _initialTelemetry(job)
+        telemetry['wall_time'] = wall_time
+        telemetry['cpu_time'] = cpu_time
+        telemetry['peak_rss'] = peak_rss
+        telemetry['input_bytes'] = getDataSize(job.call_args)
+        telemetry['output_bytes'] = getDataSize(result)
+        outcomes.append((None, result, telemetry))
+    return outcomes
+
+
 class JobContainer(object):
     r"""
 An abstract container that manages jobs. Must be subclassed.
@@ -159,6 +488,10 @@ uuid
             self._idgen = self._generateUUIDJobID
         self.jobs = dict()
         self.miscData = dict()
+        self._finishedCallbacks = list()
+        self._resultCache = None
+        # job -> cache key, for jobs not found in cache
+        self._cacheKeys = dict()
 
     def addJob(self, job, **kwargs):
         r"""
@@ -182,6 +515,71 @@ jobID : string
         self.jobs[jobID] = job
         return jobID
 
+    def addFinishedJob(self, job, result):
+        r"""
+Add job that has already been executed elsewhere (e.g. during previous, interrupted
+run of an experiment), together with its result. The job is not scheduled for
+execution; it changes its status to FINISHED immediately, and its result is
+available through :meth:`getJobResult` as for any other job.
+
+Parameters
+----------
+job : :class:`Job`
+    job to be added
+
+result : object
+    result already produced by the job
+
+Returns
+-------
+jobID : string
+    identifier assigned to the new job
+        """
+        jobID = self._idgen()
+        job.status = JobStatus.FINISHED
+        job.result = result
+        self.jobs[jobID] = job
+        self._notifyJobFinished(jobID)
+        return jobID
+
+    def addJobFinishedCallback(self, callback):
+        r"""
+Register callable that will be called each time the job managed by this container
+finishes, either normally or with an error. The callable receives single argument,
+the ID of finished job; job status and result are already updated when it is called.
+Subclasses decide when exactly jobs are considered finished; typically, callbacks are
+called from within :meth:`start`, :meth:`flush` or :meth:`close`.
+
+Parameters
+----------
+callback : callable
+    callable to be called as callback(jobID)
+        """
+        self._finishedCallbacks.append(callback)
+
+    def setResultCache(self, cache):
+        r"""
+Use given cache of job results. Before the job is scheduled for execution, the
+container looks for its result in the cache; if found, the job is added as already
+finished (see :meth:`addFinishedJob`) and not executed. Results of jobs executed
+normally are stored in the cache when jobs finish. IDs of jobs found in the cache
+are listed in miscellaneous data under 'cachedJobs' key.
+
+Parameters
+----------
+cache : :class:`~kdvs.fw.JobCache.JobResultCache`/None
+    cache of job results; if None, no cache is used
+        """
+        self._resultCache = cache
+        if cache is not None:
+            self.miscData.setdefault('cachedJobs', list())
+
+    def getResultCache(self):
+        r"""
+Return cache of job results used by this container, or None if no cache is used.
+        """
+        return self._resultCache
+
     def getJobCount(self):
         r"""
 Return number of jobs currently managed by this container. NOTE: this method
@@ -243,6 +641,36 @@ result : object
         """
         return self._job(jobID).result
 
+    def cancelJob(self, jobID):
+        r"""
+Cancel requested job, if it has not been executed yet. Cancelled job is not
+executed; it changes its status to FINISHED immediately, its result is
+:data:`JOBCANCELLED`, and the callbacks registered with :meth:`addJobFinishedCallback`
+are called as for any other finished job. IDs of cancelled jobs are listed in
+miscellaneous data under 'cancelledJobs' key. Whether the job can still be
+withheld from execution is decided by the subclass (see :meth:`_withdrawJob`);
+by default, jobs cannot be cancelled.
+
+Parameters
+----------
+jobID : string
+    job ID
+
+Returns
+-------
+cancelled : boolean
+    True if the job was cancelled, False if it is already executed, being
+    executed, or cannot be withheld from execution anymore
+        """
+        job = self._job(jobID)
+        if job.status != JobStatus.ADDED or not self._withdrawJob(jobID):
+            return False
+        job.status = JobStatus.FINISHED
+        job.result = JOBCANCELLED
+        self.miscData.setdefault('cancelledJobs', list()).append(jobID)
+        self._notifyJobFinished(jobID)
+        return True
+
     def removeJob(self, jobID):
         r"""
 Remove requested job from this manager.
@@ -282,6 +710,15 @@ Must be implemented in subclass.
         """
         raise NotImplementedError('Must be implemented in subclass!')
 
+    def flush(self):
+        r"""
+Must be implemented in subclass. Used for streaming submission of jobs: when called
+on already started container, all jobs added so far are executed and the call returns
+when they are finished. Blocking call. Exceptions raised during execution are not
+reported here; they are returned by :meth:`close` as usual.
+        """
+        raise NotImplementedError('Must be implemented in subclass!')
+
     def close(self):
         r"""
 Typically implemented in subclass to clean after itself. By default it does nothing.
@@ -299,6 +736,36 @@ it checks if given destination path exists.
         if not os.path.exists(destPath):
             raise Error('Destination path "%s" does not exist!' % destPath)
 
+    def getJobTelemetry(self, jobID):
+        r"""
+Return telemetry recorded for execution of requested job, if any.
+
+Parameters
+----------
+jobID : string
+    job ID
+
+Returns
+-------
+telemetry : dict/None
+    dictionary keyed with the columns of :data:`JOB_TELEMETRY_COLUMNS` (except
+    'jobID'), or None if no telemetry was recorded for the job
+        """
+        return self.miscData.get('jobTelemetry', {}).get(jobID)
+
+    def getJobTelemetryTable(self):
+        r"""
+Return telemetry recorded for all executed jobs as the table. Each row is the tuple
+of values ordered as the columns in :data:`JOB_TELEMETRY_COLUMNS`; rows are sorted
+by job ID.
+        """
+        telemetry = self.miscData.get('jobTelemetry', {})
+        rows = list()
+        for jobID in sorted(telemetry.keys()):
+            jt = telemetry[jobID]
+            rows.append(tuple([jobID] + [jt.get(c) for c in JOB_TELEMETRY_COLUMNS[1:]]))
+        return rows
+
     def getMiscData(self):
         r"""
 Return any miscellaneous data associated with this container. Typically, subclasses
@@ -321,11 +788,60 @@ Remove any miscellaneous data associated with this container.
     def _job(self, jobID):
         return self.jobs[jobID]
 
+    def _withdrawJob(self, jobID):
+        # used by cancelJob(); subclasses that can withhold added job from
+        # execution do it here and return True
+        return False
+
+    def _recordJobTelemetry(self, jobID, telemetry):
+        # telemetry is exposed in miscellaneous data
+        self.miscData.setdefault('jobTelemetry', dict())[jobID] = telemetry
+
+    def _addCachedJob(self, job):
+        # used by subclasses in addJob(); returns ID of the job added as finished
+        # if its result was found in the cache, or None otherwise
+        if self._resultCache is None:
+            return None
+        try:
+            key = self._resultCache.jobKey(job)
+        except Exception:
+            # job that cannot be identified is not cached
+            return None
+        result = self._resultCache.get(key)
+        if result is NOTPRODUCED:
+            self._cacheKeys[job] = key
+            return None
+        jobID = self.addFinishedJob(job, result)
+        self.miscData['cachedJobs'].append(jobID)
+        return jobID
+
+    def _notifyJobFinished(self, jobID):
+        if self._resultCache is not None:
+            job = self._job(jobID)
+            key = self._cacheKeys.pop(job, None)
+            if key is not None:
+                self._resultCache.put(key, job.result)
+        for callback in self._finishedCallbacks:
+            callback(jobID)
+
 
 class JobGroupManager(object):
     r"""
 Simple manager of groups of jobs. Can be used for finer execution control and
 to facilitate reporting.
+
+The manager also tracks completion of groups. It shall be notified about each
+finished job (typically by registering :meth:`jobFinished` in job container, see
+:meth:`JobContainer.addJobFinishedCallback`). For each group, the number of
+outstanding (i.e. not finished yet) jobs is maintained, therefore the cost of
+notification does not depend on the size of the group. The group is completed as
+soon as it has no outstanding jobs; completed groups may be queried at any time,
+also while jobs are still executed, and all registered callbacks are called with
+the name of each completed group. Exceptions raised by callbacks are not
+propagated but collected, since callbacks are usually called from within job
+container. NOTE: if unfinished job is added to already completed group, the group
+is not completed anymore, and will be completed again later; to avoid that, use
+:class:`CompletionJobGroupManager`.
     """
     def __init__(self, **kwargs):
         r"""
@@ -336,11 +852,20 @@ kwargs : dict
     in sublass); currently, no arguments are used
         """
         self._jgmap = SetBDMap()
+        self._finished = set()
+        # group -> number of outstanding jobs
+        self._outstanding = dict()
+        # completed group -> number of its completion; completion log records
+        # all completions in order, also of groups reopened or removed later
+        self._completed = collections.OrderedDict()
+        self._completions = list()
+        self._callbacks = list()
+        self.callbackExceptions = list()
 
     def addJobIDToGroup(self, group_name, jobID):
         r"""
 Add requested job to specified job group. If group was not defined before, it will
-be created.
+be created. The job may be already finished.
 
 Parameters
 ----------
@@ -350,7 +875,17 @@ group_name : string
 jobID : string
     job ID
         """
+        groupJobs = self._jgmap.getFwdMap().get(group_name)
+        if groupJobs is not None and jobID in groupJobs:
+            return
         self._jgmap[group_name] = jobID
+        outstanding = self._outstanding.get(group_name, 0)
+        if jobID not in self._finished:
+            outstanding += 1
+            # group is not completed anymore
+            self._completed.pop(group_name, None)
+        self._outstanding[group_name] = outstanding
+        self._checkCompletion(group_name)
 
     def addGroup(self, group_name, group_job_ids):
         r"""
@@ -370,21 +905,30 @@ group_job_ids : iterable of string
 
     def remGroup(self, group_name):
         r"""
-Remove specified job group from this manager. All associated job IDs are removed as
-well. NOTE: physical jobs are left intact.
+Remove specified job group from this manager, together with its completion state.
+All associated job IDs are removed as well. NOTE: physical jobs are left intact.
 
 Parameters
 ----------
 group_name : string
     name of the group
         """
+        for jobID in self.getGroupJobsIDs(group_name):
+            self._finished.discard(jobID)
         del self._jgmap[group_name]
+        self._outstanding.pop(group_name, None)
+        self._completed.pop(group_name, None)
 
     def clear(self):
         r"""
-Removes all job groups from this manager.
+Removes all job groups from this manager, together with their completion state.
         """
         self._jgmap.clear()
+        self._finished.clear()
+        self._outstanding.clear()
+        self._completed.clear()
+        del self._completions[:]
+        del self.callbackExceptions[:]
 
     def getGroupJobsIDs(self, group_name):
         r"""
@@ -433,3 +977,168 @@ Error
 Get list of all job group names managed by this manager.
         """
         return self._jgmap.getFwdMap().keys()
+
+    def addGroupCompletedCallback(self, callback):
+        r"""
+Register callable that will be called each time the job group is completed.
+
+Parameters
+----------
+callback : callable
+    callable to be called as callback(group_name)
+        """
+        self._callbacks.append(callback)
+
+    def jobFinished(self, jobID):
+        r"""
+Notify this manager that requested job is finished. The job may not be assigned
+to any group yet. Repeated notifications about the same job are ignored.
+
+Parameters
+----------
+jobID : string
+    job ID
+        """
+        if jobID in self._finished:
+            return
+        self._finished.add(jobID)
+        groups = self._jgmap.getBwdMap().get(jobID)
+        if groups:
+            for group_name in groups:
+                self._outstanding[group_name] -= 1
+                self._checkCompletion(group_name)
+
+    def isJobFinished(self, jobID):
+        r"""
+Return True if this manager has been notified that requested job is finished,
+False otherwise.
+
+Parameters
+----------
+jobID : string
+    job ID
+        """
+        return jobID in self._finished
+
+    def getOutstandingJobsCount(self, group_name):
+        r"""
+Get number of jobs of specified job group that are not finished yet.
+
+Parameters
+----------
+group_name : string
+    name of the group
+
+Raises
+------
+Error
+    if group is not managed by this manager
+        """
+        try:
+            return self._outstanding[group_name]
+        except KeyError:
+            raise Error('Unknown job group! (got %s)' % group_name)
+
+    def isGroupCompleted(self, group_name):
+        r"""
+Return True if specified job group has been completed, False otherwise.
+
+Parameters
+----------
+group_name : string
+    name of the group
+        """
+        return group_name in self._completed
+
+    def getCompletedGroups(self):
+        r"""
+Get list of names of all completed job groups, in the order of completion.
+        """
+        return self._completed.keys()
+
+    def iterCompletedGroups(self):
+        r"""
+Iterate over names of completed job groups, in the order of completion. Groups
+completed during the iteration are also visited. Groups that are not completed
+anymore when their turn comes (reopened or removed) are skipped; reopened group
+is visited again after it is completed again.
+        """
+        i = 0
+        while i < len(self._completions):
+            group_name, completion = self._completions[i]
+            i += 1
+            if self._completed.get(group_name) == completion:
+                yield group_name
+
+    def _canComplete(self, group_name):
+        return True
+
+    def _checkCompletion(self, group_name):
+        if group_name in self._completed or self._outstanding.get(group_name, 1) > 0:
+            return
+        if not self._canComplete(group_name):
+            return
+        completion = len(self._completions)
+        self._completed[group_name] = completion
+        self._completions.append((group_name, completion))
+        for callback in self._callbacks:
+            try:
+                callback(group_name)
+            except Exception, e:
+                self.callbackExceptions.append((group_name, e))
+
+
+class CompletionJobGroupManager(JobGroupManager):
+    r"""
+Manager of groups of jobs that detects completion of groups only when no more jobs
+are expected for them. Since jobs may finish before all jobs of the group are
+added, the group must be sealed when no more jobs are expected for it; the group
+is completed when it is sealed and all its jobs are finished. See
+:class:`JobGroupManager` for details of completion tracking.
+    """
+    def __init__(self, **kwargs):
+        r"""
+Parameters
+----------
+kwargs : dict
+    any keyworded arguments that may be used by the user for finer control (e.g.
+    in sublass); currently, no arguments are used
+        """
+        super(CompletionJobGroupManager, self).__init__(**kwargs)
+        self._sealed = set()
+
+    def sealGroup(self, group_name):
+        r"""
+Notify this manager that no more jobs will be added to specified job group. The
+group may be completed immediately, if all its jobs are already finished.
+
+Parameters
+----------
+group_name : string
+    name of the group
+        """
+        self._sealed.add(group_name)
+        self._checkCompletion(group_name)
+
+    def remGroup(self, group_name):
+        r"""
+Remove specified job group from this manager, together with its completion state.
+NOTE: physical jobs are left intact.
+
+Parameters
+----------
+group_name : string
+    name of the group
+        """
+        super(CompletionJobGroupManager, self).remGroup(group_name)
+        self._sealed.discard(group_name)
+
+    def clear(self):
+        r"""
+Removes all job groups from this manager, together with their completion state.
+        """
+        super(CompletionJobGroupManager, self).clear()
+        self._sealed.clear()
+
+    def _canComplete(self, group_name):
+        return group_name in self._sealed
@@ -0,0 +1,324 @@
+# Knowledge Driven Variable Selection (KDVS)
+# Copyright (C) 2014 KDVS Developers. All rights reserved.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+r"""
+Provides persistent, content--addressed cache of job results, that can be shared
+across runs of the experiment. Job containers consult the cache before executing
+the job, and populate it with results of executed jobs (see
+:meth:`~kdvs.fw.Job.JobContainer.setResultCache`).
+"""
+
+from kdvs.core._version import version as kdvs_version
+from kdvs.core.error import Error
+from kdvs.core.util import serializeObj, deserializeObj, Constant
+from kdvs.fw.Job import NOTPRODUCED, JOBERROR
+import collections
+import hashlib
+import numpy
+import os
+import re
+import sys
+import types
+import uuid
+
+DEFAULT_CACHE_MAX_SIZE = 1024 * 1024 * 1024
+r"""
+Default maximum size of all cached results, in bytes (1 GB).
+"""
+
+_CACHE_KEY_PATT = re.compile('^[a-f0-9]{40}$')
+
+def _updateDigest(digest, obj):
+    # feed digest with stable representation of the object
+    if obj is None or isinstance(obj, (bool, int, long, float, complex, basestring)):
+        digest.update('%s:%r;' % (type(obj).__name__, obj))
+    elif isinstance(obj, numpy.ndarray):
+        digest.update('ndarray:%s:%r;' % (obj.dtype.str, obj.shape))
+        if obj.dtype.hasobject:
+            for elem in obj.ravel().tolist():
+                _updateDigest(digest, elem)
+        else:
+            digest.update(numpy.ascontiguousarray(obj).tostring())
+    elif isinstance(obj, numpy.generic):
+        digest.update('%s:%r;' % (type(obj).__name__, obj))
+    elif isinstance(obj, (list, tuple)):
+        digest.update('%s:%d;' % (type(obj).__name__, len(obj)))
+        for elem in obj:
+            _updateDigest(digest, elem)
+    elif isinstance(obj, dict):
+        digest.update('dict:%d;' % len(obj))
+        # order of keys is not stable
+        items = [(_digestOf(k), k, v) for k, v in obj.iteritems()]
+        for kd, _, v in sorted(items, key=lambda i: i[0]):
+            digest.update(kd)
+            _updateDigest(digest, v)
+    elif isinstance(obj, (set, frozenset)):
+        digest.update('set:%d;' % len(obj))
+        for ed in sorted([_digestOf(e) for e in obj]):
+            digest.update(ed)
+    elif isinstance(obj, (types.FunctionType, types.BuiltinFunctionType, types.ClassType, type)):
+        digest.update('callable:%s.%s;' % (obj.__module__, obj.__name__))
+    elif isinstance(obj, Constant):
+        digest.update('constant:%s;' % obj.srepr)
+    elif hasattr(obj, '__dict__'):
+        digest.update('object:%s.%s;' % (obj.__class__.__module__, obj.__class__.__name__))
+        _updateDigest(digest, vars(obj))
+    else:
+        digest.update('%s:%r;' % (type(obj).__name__, obj))
+
+def _digestOf(obj):
+    digest = hashlib.sha1()
+    _updateDigest(digest, obj)
+    return digest.hexdigest()
+
+def computeDigest(obj):
+    r"""
+Compute stable digest of the content of given object, as used for job keys (see
+:func:`computeJobKey`): numpy arrays are digested by content, dictionaries and
+sets regardless of the order of their elements, and functions and classes by
+their qualified names. Equal content gives equal digest across processes and runs.
+
+Parameters
+----------
+obj : object
+    object to compute the digest for
+
+Returns
+-------
+digest : string
+    hexadecimal SHA1 digest of the object
+    """
+    return _digestOf(obj)
+
+def _moduleVersion(name):
+    module = sys.modules.get(name)
+    if module is None:
+        try:
+            module = __import__(name)
+        except ImportError:
+            return None
+    return getattr(module, '__version__', None)
+
+def computeJobKey(job):
+    r"""
+Compute stable key of given job, used to identify its result in the cache. The key
+is the SHA1 digest of: the version of KDVS, the class of the technique that created
+the job (as found in 'technique_class' key of job additional data, if present),
+the name of job function, all job arguments (numpy arrays are digested by content),
+the seed of the job (as found in 'seed' key of job additional data, if present),
+and versions of all modules used by the job (as listed in 'modules' key of job
+additional data, if present). Therefore, all parameters that influence the result
+must be passed to the job function as arguments.
+
+Parameters
+----------
+job : :class:`~kdvs.fw.Job.Job`
+    job to compute the key for
+
+Returns
+-------
+key : string
+    hexadecimal digest of the job
+    """
+    modules = sorted(job.additional_data.get('modules', ()))
+    elems = (
+        kdvs_version,
+        job.additional_data.get('technique_class'),
+        '%s.%s' % (job.call_func.__module__, job.call_func.__name__),
+        job.call_args,
+        job.additional_data.get('seed'),
+        [(m, _moduleVersion(m)) for m in modules],
+    )
+    return _digestOf(elems)
+
+def isCacheableResult(result):
+    r"""
+Return True if given job result may be cached, False otherwise. Results that
+signal not executed job, or job that ended with an error, are not cached.
+    """
+    if isinstance(result, Constant):
+        return False
+    if isinstance(result, tuple) and len(result) > 0:
+        if isinstance(result[0], (basestring, Constant)) and str(result[0]) == JOBERROR.srepr:
+            return False
+    return True
+
+
+class JobResultCache(object):
+    r"""
+Persistent cache of job results, stored in specified directory as one serialized
+file per result, named after job key (see :func:`computeJobKey`). The total size
+of cached results is limited; when exceeded, least recently used results are
+evicted. The order of usage is kept in modification times of the files, therefore
+the cache may be reused across runs. Basic statistics of cache usage are collected.
+    """
+    def __init__(self, cache_dir, max_size=DEFAULT_CACHE_MAX_SIZE):
+        r"""
+Parameters
+----------
+cache_dir : string
+    path to the cache directory; created if does not exist
+
+max_size : integer
+    maximum total size of cached results, in bytes; :data:`DEFAULT_CACHE_MAX_SIZE`
+    by default
+
+Raises
+------
+Error
+    if cache directory could not be created
+Error
+    if maximum size is not positive
+        """
+        if max_size <= 0:
+            raise Error('Maximum cache size must be positive! (got %s)' % max_size)
+        if not os.path.isdir(cache_dir):
+            try:
+                os.makedirs(cache_dir)
+            except OSError, e:
+                raise Error('Could not create cache directory %s! (Reason: %s)' % (cache_dir, e))
+        self.cache_dir = os.path.abspath(cache_dir)
+        self.max_size = max_size
+        self.stats = {'hits' : 0, 'misses' : 0, 'stores' : 0, 'evictions' : 0}
+        # key -> size, in the order of usage (least recently used first)
+        self._index = collections.OrderedDict()
+        self._size = 0
+        self._buildIndex()
+
+    def jobKey(self, job):
+        r"""
+Return the key of given job; see :func:`computeJobKey`.
+        """
+        return computeJobKey(job)
+
+    def get(self, key):
+        r"""
+Return cached result for given key, or :data:`~kdvs.fw.Job.NOTPRODUCED` if there
+is none. Returned result becomes the most recently used one.
+        """
+        if key not in self._index:
+            self.stats['misses'] += 1
+            return NOTPRODUCED
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                result = deserializeObj(f)
+        except Exception:
+            # unreadable entry is discarded
+            self._remove(key)
+            self.stats['misses'] += 1
+            return NOTPRODUCED
+        self._touch(key)
+        self.stats['hits'] += 1
+        return result
+
+    def put(self, key, result):
+        r"""
+Store given result under given key, and evict least recently used results if
+the total size is exceeded. Results that cannot be cached (see
+:func:`isCacheableResult`) are ignored.
+
+Returns
+-------
+stored : boolean
+    True if the result was stored, False otherwise
+        """
+        if not isCacheableResult(result):
+            return False
+        path = self._path(key)
+        tmppath = os.path.join(self.cache_dir, '.%s.%s.tmp' % (key, uuid.uuid4().hex))
+        try:
+            with open(tmppath, 'wb') as f:
+                serializeObj(result, f)
+            os.rename(tmppath, path)
+        except Exception:
+            # results that cannot be serialized are not cached
+            if os.path.exists(tmppath):
+                os.remove(tmppath)
+            return False
+        if key in self._index:
+            self._size -= self._index.pop(key)
+        size = os.path.getsize(path)
+        self._index[key] = size
+        self._size += size
+        self.stats['stores'] += 1
+        self._evict()
+        return key in self._index
+
+    def __contains__(self, key):
+        return key in self._index
+
+    def __len__(self):
+        return len(self._index)
+
+    def getSize(self):
+        r"""
+Return total size of cached results, in bytes.
+        """
+        return self._size
+
+    def getStatistics(self):
+        r"""
+Return statistics of cache usage as dictionary with the following keys: 'hits',
+'misses', 'stores', 'evictions', 'entries' (number of cached results), and 'size'
+(total size of cached results, in bytes).
+        """
+        stats = dict(self.stats)
+        stats['entries'] = len(self._index)
+        stats['size'] = self._size
+        return stats
+
+    def clear(self):
+        r"""
+Remove all cached results.
+        """
+        for key in self._index.keys():
+            self._remove(key)
+
+    def _buildIndex(self):
+        entries = list()
+        for name in os.listdir(self.cache_dir):
+            if _CACHE_KEY_PATT.match(name) is None:
+                continue
+            st = os.stat(self._path(name))
+            entries.append((st.st_mtime, name, st.st_size))
+        for _, key, size in sorted(entries):
+            self._index[key] = size
+            self._size += size
+        self._evict()
+
+    def _evict(self):
+        while self._size > self.max_size and len(self._index) > 0:
+            key = next(iter(self._index))
+            self._remove(key)
+            self.stats['evictions'] += 1
+
+    def _touch(self, key):
+        self._index[key] = self._index.pop(key)
+        try:
+            os.utime(self._path(key), None)
+        except OSError:
+            pass
+
+    def _remove(self, key):
+        self._size -= self._index.pop(key)
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key)
@@ -175,6 +175,13 @@ Standard :class:`~kdvs.fw.Stat.Results` element that refers to any information a
 that needs to be included with the result itself.
 """
 
+RESULTS_SCREENED_OUT_KEY = 'screened_out'
+r"""
+Key of runtime information of :class:`~kdvs.fw.Stat.Results` (see :data:`RESULTS_RUNTIME_KEY`), set to
+True by techniques that rejected data subset by screening, without full analysis. Outer selectors must
+not select such data subsets, regardless of their errors.
+"""
+
 class Results(object):
     r"""
 Wrapper for results obtained from statistical technique. Result is typically
@@ -280,7 +287,9 @@ that use cross validation extensively. Concrete implementation must implement
 :meth:`produceResults` and reimplement :meth:`createJob` methods. In the simplest case,
 single job that wraps single function call may be generated. More complicated
 implementations may require generation of cross validation splits, processing
-them in separated jobs, and merging partial results into single one.
+them in separated jobs, and merging partial results into single one. Technique
+that decides what to compute next based on the results of jobs already executed
+sets 'follow_up' attribute to True and reimplements :meth:`createFollowUpJob`.
     """
     def __init__(self, ref_parameters, **kwargs):
         r"""
@@ -297,6 +306,7 @@ kwargs : dict
         super(Technique, self).__init__(ref_parameters, **kwargs)
         self.results_elements = list(DEFAULT_RESULTS)
         self.techdata = dict()
+        self.follow_up = False
 
     # needs to be overriden by subclass
     # if properly subclassed, yields pair(s) of (jname, j)
@@ -367,6 +377,59 @@ final_results : :class:`~kdvs.fw.Stat.Results`
         # techID,...
         raise NotImplementedError('Must be implemented in subclass!')
 
+    def collectSplitErrors(self, ssname, jobs):
+        r"""
+Collect classification errors obtained so far on test parts of individual splits,
+from already finished job(s) of single data subset. Used to reject hopeless data
+subsets before all their jobs are executed (see
+:meth:`~kdvs.fw.impl.stat.PKCSelector.OuterSelector.rejectEarly`); it makes sense
+only for techniques that process each split in separate job. By default, errors
+are not collected and None is returned.
+
+Parameters
+----------
+ssname : string
+    identifier of data subset being processed; typically, equivalent to associated
+    prior knowledge concept
+
+jobs : iterable of :class:`~kdvs.fw.Job.Job`
+    finished job(s) that contain(s) raw results
+
+Returns
+-------
+(split_errors, numof_splits) : iterable of dict, integer
+    tuple of the following: classification errors obtained on splits processed
+    so far, each one as dictionary {DOF : error}, and the total number of splits
+    processed by the technique; or None, if errors are not collected
+        """
+        return None
+
+    def createFollowUpJob(self, ssname, jobs):
+        r"""
+Create jobs that follow already finished job(s) of single data subset. Used in
+'experiment' application for techniques with 'follow_up' attribute set to True:
+each time all jobs created so far for the data subset are finished, follow--up
+jobs are requested, and executed by the same job container, until none are created.
+Then :meth:`produceResults` receives all jobs created for the data subset. By
+default, all jobs are created by :meth:`createJob` and no follow--up jobs are created.
+
+Parameters
+----------
+ssname : string
+    identifier of data subset being processed; typically, equivalent to associated
+    prior knowledge concept
+
+jobs : iterable of :class:`~kdvs.fw.Job.Job`
+    finished job(s) created so far for the data subset
+
+Returns
+-------
+(jID, job) : iterable of (string, :class:`~kdvs.fw.Job.Job`)
+    tuples of the following: custom job ID, and Job instance to be executed; empty
+    if no more jobs follow
+        """
+        return ()
+
     def _check_input(self, ssname, data, labels):
         if data is not None and not isinstance(data, (numpy.ndarray, ndarray)):
             raise Error('(%s) %s expected! (got %s)' % (ssname, 'numpy.ndarray', data.__class__))
@@ -71,6 +71,9 @@ specific logging mechanism, initializes default paths, and creates concrete
             help="write (lots of) detailed debug output", default=False)
         parser.add_option("--log-level", action="store", dest="log_level",
             help="set log level to specified", default='INFO')
+        parser.add_option("--resume-from", action="store", dest="resume_dir",
+            help="reuse verified raw job outputs found in PREVOUTDIR (output directory of interrupted run)",
+            metavar="PREVOUTDIR", default=None)
         # get only options here
         options = parser.parse_args()[0]
         # check user config file
@@ -87,6 +90,13 @@ specific logging mechanism, initializes default paths, and creates concrete
             output_dir = options.output_dir
         if not isDirWritable(output_dir):
             raise Error('Designated output directory %s is not writable!' % quote(output_dir))
+        # check output directory of interrupted run, if any
+        if options.resume_dir is None:
+            resume_dir = None
+        else:
+            resume_dir = os.path.abspath(options.resume_dir)
+            if not os.path.isdir(resume_dir):
+                raise Error('Output directory %s of interrupted run not available!' % quote(resume_dir))
         # ---- process config file
         cfg_vars = evaluateUserCfg(options.cfg_file, options.ignore_default_cfg)
         # ---- configure logging facilities
@@ -123,6 +133,7 @@ specific logging mechanism, initializes default paths, and creates concrete
         self.env.addVar('output_dir', output_dir)
         self.env.addVar('data_path', data_path)
         self.env.addVar('use_debug_output', options.use_debug_output)
+        self.env.addVar('resume_dir', resume_dir)
         # shortcut for logger
         self.logger = self.env.logger
 
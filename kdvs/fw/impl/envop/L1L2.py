@@ -23,7 +23,10 @@ from kdvs.core.dep import verifyDepModule
 from kdvs.core.error import Error
 from kdvs.core.util import pairwise
 from kdvs.fw.EnvOp import EnvOp
+from kdvs.fw.impl.stat.Gram import GramStatistics
+import itertools
 import l1l2py
+import numpy
 
 class L1L2_UniformExtSplitProvider(EnvOp):
     r"""
@@ -195,3 +198,135 @@ Error
         # store external splits data directly in the instance of each technique involved
         for tech in techs.values():
             tech.parameters[extSplitPlaceholderParam] = ext_split_sets
+
+
+class L1L2_GramStatisticsProvider(EnvOp):
+    r"""
+The parametrizable pre--EnvOp that computes Gram statistics of primary data set
+once (see :class:`~kdvs.fw.impl.stat.Gram.GramStatistics`), for the whole data and
+for the training part of each external split, and places them into 'gram_statistics'
+parameter of statistical techniques. This way, the covariance matrices of variables
+of overlapping data subsets are obtained by slicing, and not computed for each data
+subset again. This approach is used in :class:`~kdvs.fw.impl.stat.L1L2.L1L2_L1L2` and
+:class:`~kdvs.fw.impl.stat.L1L2.L1L2_RLS` techniques. To use it, the instance of this
+class must be configured with the following parameters:
+
+    * 'enclosingCategorizerID' -- the identifier of the :class:`~kdvs.fw.Categorizer.Categorizer` on the level this EnvOp will be called
+    * 'maxMemory' -- maximum memory occupied by Gram statistics, in bytes; statistics that do not fit are not computed, and techniques compute them for each data subset
+
+Only data subsets with no more variables than samples are considered, since only
+for them the covariance matrix of variables is used. Statistics are computed for
+the variables of those subsets only, with normalizers and external splits of
+their statistical techniques; if external splits are shared, this EnvOp must be
+executed after :class:`L1L2_UniformExtSplitProvider`. Statistical techniques that
+do not expose 'data_normalizer' parameter are not considered. This EnvOp works
+assuming the following conditions are met:
+
+    * (1) in all statistical techniques considered, normalizers and external splits are the same
+    * (2) in all categories on current hierarchy level, all data subsets have the same single statistical technique assigned for processing,
+    * (3) there is at least one valid categorizer BELOW the enclosing one.
+
+If any of those conditions is NOT met, an Error is raised.
+    """
+    version = '1.0.5'
+    gsp_parameters = ('enclosingCategorizerID', 'maxMemory')
+
+    def __init__(self, **kwargs):
+        r"""
+Parameters
+----------
+kwargs : dict
+    actual parameters supplied during instantiation; they will be checked against
+    reference ones; the parameters are: 'enclosingCategorizerID', 'maxMemory'
+
+Raises
+------
+Error
+    if specific version of 'l1l2py' library is not present
+        """
+        verifyDepModule('l1l2py')
+        if self._verify_version():
+            super(L1L2_GramStatisticsProvider, self).__init__(self.gsp_parameters, **kwargs)
+        else:
+            raise Error('L1L2Py version "%s" must be provided to use this class!' % self.version)
+
+    def _verify_version(self):
+        return l1l2py.__version__ == self.version
+
+    def perform(self, env):
+        r"""
+Compute Gram statistics and put them into all statistical techniques considered.
+
+Parameters
+----------
+env : :class:`~kdvs.core.env.ExecutionEnvironment`
+    concrete instance of ExecutionEnvironment that will be modified in--place
+
+Raises
+------
+Error
+    if the enclosing categorizer was not found
+Error
+    in the cases explained above
+        """
+        labels = env.var('labels_num')
+        subsets = env.var('subsets')
+        gedm_dsv = env.var('gedm_dsv')
+        operations_map = env.var('operations_map')
+        # ---- access categorizer immediately below us in the chain
+        enclosingCategorizerID = self.parameters['enclosingCategorizerID']
+        cchain = env.var('profile')['subset_hierarchy_categorizers_chain']
+        nextCategorizerID = None
+        for currentID, nextID in pairwise(iter(cchain)):
+            if currentID == enclosingCategorizerID:
+                nextCategorizerID = nextID
+                break
+        if nextCategorizerID is None:
+            raise Error('Next immediate categorizer of %s in the chain was not found! (Check if there are categorizers below)' % enclosingCategorizerID)
+        categorizer = env.var('pc_categorizers')[nextCategorizerID]
+        categories = [categorizer.uniquifyCategory(c) for c in categorizer.categories()]
+        # ---- collect techniques and their data subsets
+        techs = list()
+        configs = set()
+        pkcids = list()
+        for category in categories:
+            copmap = operations_map[category]
+            csymbols = [s for s in copmap.keys() if not s.startswith('__') and not s.endswith('__')]
+            ctech = set([copmap[csymbol]['__technique__'] for csymbol in csymbols])
+            if len(ctech) != 1:
+                raise Error('Unique category was not determined across PKCs for category %s! (found %d)' % (category, len(ctech)))
+            ctechnique = next(iter(ctech))
+            if ctechnique is None or 'data_normalizer' not in ctechnique.parameters:
+                continue
+            techs.append(ctechnique)
+            configs.add((ctechnique.parameters['data_normalizer'], ctechnique.parameters['labels_normalizer'],
+                         id(ctechnique.parameters.get('ext_split_sets'))))
+            pkcids.extend(csymbols)
+        if len(configs) > 1:
+            raise Error('Unique normalizers and external splits were not determined across categories! (found %d)' % len(configs))
+        if len(techs) == 0:
+            return
+        data_normalizer = techs[0].parameters['data_normalizer']
+        labels_normalizer = techs[0].parameters['labels_normalizer']
+        split_sets = techs[0].parameters.get('ext_split_sets')
+        # ---- only subsets with no more variables than samples are considered
+        n = labels.shape[0]
+        pkcids = [pkcid for pkcid in pkcids if len(subsets[pkcid]['vars']) <= n]
+        if len(pkcids) == 0:
+            return
+        all_vars = sorted(set(itertools.chain.from_iterable([subsets[pkcid]['vars'] for pkcid in pkcids])))
+        samples = list(subsets[pkcids[0]]['samples'])
+        # ---- query variables in the same order as data subsets were queried
+        cs = gedm_dsv.get(columns=[gedm_dsv.id_column] + samples, rows=all_vars)
+        rows = cs.fetchall()
+        variables = [r[0] for r in rows]
+        data = numpy.array([r[1:] for r in rows], dtype=numpy.float64).T
+        gram_stats = GramStatistics(data, labels, variables, split_sets, data_normalizer,
+                                    labels_normalizer, self.parameters['maxMemory'])
+        positions = dict([(v, i) for i, v in enumerate(variables)])
+        for pkcid in pkcids:
+            ssvars = sorted(subsets[pkcid]['vars'], key=positions.__getitem__)
+            gram_stats.addSubset(subsets[pkcid]['mat'], ssvars)
+        # ---- store statistics directly in the instance of each technique involved
+        for tech in techs:
+            tech.parameters['gram_statistics'] = gram_stats
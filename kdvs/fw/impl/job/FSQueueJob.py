@@ -0,0 +1,538 @@
+# Knowledge Driven Variable Selection (KDVS)
+# Copyright (C) 2014 KDVS Developers. All rights reserved.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+r"""
+Provides job container that uses shared file system directory as the work queue,
+and worker that executes jobs from that queue. Workers may run on any machine that
+mounts the queue directory (see 'kdvs/bin/worker.py'); no external services are
+required. The files with raw job input and output are named as in
+:class:`~kdvs.fw.impl.job.PPlusJob.PPlusJobContainer`.
+
+The queue directory contains one session directory per job container, with the
+following subdirectories:
+
+    * 'pending' -- job input files '<jobID>_IN' waiting to be executed
+    * 'running' -- job input files claimed by workers; worker claims the job by
+      atomic renaming of its input file from 'pending' and keeps refreshing its
+      modification time (heartbeat) as long as the job is executed
+    * 'done' -- job output files '<jobID>_OUT' and telemetry files '<jobID>_TEL'
+
+Job container puts back into 'pending' each job whose heartbeat was not refreshed
+within the lease time (e.g. because its worker died). When the container is closed,
+'STOP' file is created in session directory and workers ignore it afterwards; 'STOP'
+file created directly in the queue directory stops all workers.
+"""
+
+from kdvs.core.error import Error
+from kdvs.core.util import serializeObj, deserializeObj, importComponent
+from kdvs.fw.Job import Job, JobContainer, JobStatus, JOBERROR, NOTPRODUCED, \
+    measureJobExecution
+from kdvs.fw.impl.job.PPlusJob import _KEY2JOBID_PATT
+import multiprocessing
+import os
+import threading
+import time
+import uuid
+
+FSQ_PENDING = 'pending'
+r"""
+Name of the subdirectory of session directory with jobs waiting to be executed.
+"""
+
+FSQ_RUNNING = 'running'
+r"""
+Name of the subdirectory of session directory with jobs claimed by workers.
+"""
+
+FSQ_DONE = 'done'
+r"""
+Name of the subdirectory of session directory with outputs of finished jobs.
+"""
+
+FSQ_STOP = 'STOP'
+r"""
+Name of the file that stops workers; if present in session directory, workers
+ignore the session; if present in queue directory, workers finish.
+"""
+
+DEFAULT_POLL_INTERVAL = 0.1
+r"""
+Default interval (in seconds) between consecutive scans of the queue.
+"""
+
+DEFAULT_HEARTBEAT = 5.0
+r"""
+Default interval (in seconds) between consecutive heartbeats of the worker.
+"""
+
+DEFAULT_LEASE = 60.0
+r"""
+Default time (in seconds) after which the job claimed by the worker without
+heartbeat is put back into the queue.
+"""
+
+def _atomicSerialize(obj, path):
+    # the file appears under final name only when completely written
+    dirname, basename = os.path.split(path)
+    tmppath = os.path.join(dirname, '.%s.%s.tmp' % (basename, uuid.uuid4().hex))
+    with open(tmppath, 'wb') as f:
+        serializeObj(obj, f)
+    os.rename(tmppath, path)
+
+def _heartbeatAge(path):
+    # renaming refreshes ctime, heartbeat refreshes both mtime and ctime
+    st = os.stat(path)
+    return time.time() - max(st.st_mtime, st.st_ctime)
+
+
+class _Heartbeat(threading.Thread):
+
+    def __init__(self, path, interval):
+        super(_Heartbeat, self).__init__()
+        self.daemon = True
+        self.path = path
+        self.interval = interval
+        self._stopped = threading.Event()
+
+    def run(self):
+        while not self._stopped.wait(self.interval):
+            try:
+                os.utime(self.path, None)
+            except OSError:
+                # job was put back into the queue
+                break
+
+    def stop(self):
+        self._stopped.set()
+        self.join()
+
+
+class FSQueueWorker(object):
+    r"""
+Worker that executes jobs from the queue directory, one by one. Jobs are claimed
+from all sessions present in the queue directory (or from single session, if
+specified), except the ones already stopped. Job functions must be importable on
+worker machine.
+    """
+    def __init__(self, queue_dir, session=None, poll_interval=DEFAULT_POLL_INTERVAL,
+                 heartbeat=DEFAULT_HEARTBEAT, idle_timeout=None, max_jobs=None, logger=None):
+        r"""
+Parameters
+----------
+queue_dir : string
+    path to the queue directory
+
+session : string/None
+    if not None, only jobs of this session are executed, and the worker finishes
+    when this session is stopped
+
+poll_interval : float
+    interval (in seconds) between consecutive scans of the queue when no job is
+    available; :data:`DEFAULT_POLL_INTERVAL` by default
+
+heartbeat : float
+    interval (in seconds) between consecutive heartbeats of executed job;
+    :data:`DEFAULT_HEARTBEAT` by default
+
+idle_timeout : float/None
+    if not None, the worker finishes when no job was available for that many seconds
+
+max_jobs : integer/None
+    if not None, the worker finishes after executing that many jobs
+
+logger : :class:`~kdvs.core.log.Logger`/None
+    logger used to report executed jobs; if None, nothing is reported
+
+Raises
+------
+Error
+    if queue directory does not exist
+        """
+        if not os.path.isdir(queue_dir):
+            raise Error('Queue directory does not exist! (got %s)' % queue_dir)
+        self.queue_dir = queue_dir
+        self.session = session
+        self.poll_interval = poll_interval
+        self.heartbeat = heartbeat
+        self.idle_timeout = idle_timeout
+        self.max_jobs = max_jobs
+        self.logger = logger
+
+    def run(self):
+        r"""
+Execute jobs from the queue until the worker is stopped, or idle timeout expires,
+or maximum number of jobs was executed.
+
+Returns
+-------
+executed : integer
+    number of jobs executed
+        """
+        executed = 0
+        idle_start = time.time()
+        while not self.isStopped():
+            if self.max_jobs is not None and executed >= self.max_jobs:
+                break
+            claimed = self.claim()
+            if claimed is None:
+                if self.idle_timeout is not None and time.time() - idle_start > self.idle_timeout:
+                    break
+                time.sleep(self.poll_interval)
+                continue
+            self.execute(*claimed)
+            executed += 1
+            idle_start = time.time()
+        return executed
+
+    def isStopped(self):
+        r"""
+Return True if the worker shall finish, False otherwise.
+        """
+        if os.path.exists(os.path.join(self.queue_dir, FSQ_STOP)):
+            return True
+        if self.session is not None:
+            return os.path.exists(os.path.join(self.queue_dir, self.session, FSQ_STOP))
+        return False
+
+    def claim(self):
+        r"""
+Claim single pending job by moving its input file to 'running' subdirectory.
+
+Returns
+-------
+(session_dir, input_key) : tuple/None
+    path to session directory and the name of the input file of claimed job, or
+    None if no job could be claimed
+        """
+        if self.session is not None:
+            sessions = [self.session]
+        else:
+            sessions = sorted(os.listdir(self.queue_dir))
+        for session in sessions:
+            session_dir = os.path.join(self.queue_dir, session)
+            pending_dir = os.path.join(session_dir, FSQ_PENDING)
+            if not os.path.isdir(pending_dir) or os.path.exists(os.path.join(session_dir, FSQ_STOP)):
+                continue
+            for key in sorted(os.listdir(pending_dir)):
+                if key.startswith('.') or _KEY2JOBID_PATT.match(key) is None:
+                    # not completely written yet
+                    continue
+                running_path = os.path.join(session_dir, FSQ_RUNNING, key)
+                try:
+                    os.rename(os.path.join(pending_dir, key), running_path)
+                except OSError:
+                    # claimed by another worker
+                    continue
+                return session_dir, key
+        return None
+
+    def execute(self, session_dir, input_key):
+        r"""
+Execute claimed job and store its output and telemetry in 'done' subdirectory.
+If the job failed, the output is the tuple (JOBERROR.srepr, e), as in
+:class:`~kdvs.fw.impl.job.PPlusJob.PPlusJobContainer`.
+
+Parameters
+----------
+session_dir : string
+    path to session directory
+
+input_key : string
+    name of the input file of claimed job
+        """
+        jobID = _KEY2JOBID_PATT.match(input_key).groups()[0]
+        running_path = os.path.join(session_dir, FSQ_RUNNING, input_key)
+        heartbeat = _Heartbeat(running_path, self.heartbeat)
+        heartbeat.start()
+        telemetry = None
+        try:
+            with open(running_path, 'rb') as f:
+                jobwrap = deserializeObj(f)
+            call_func = importComponent('%s.%s' % (jobwrap['callmodule'], jobwrap['callname']))
+            job = Job(call_func, jobwrap['callargs'], additional_data={'seed' : jobwrap.get('seed')})
+            e, result, telemetry = measureJobExecution(job)
+        except Exception, e:
+            # job could not be reconstructed
+            result = NOTPRODUCED
+        finally:
+            heartbeat.stop()
+        if e is not None:
+            result = (JOBERROR.srepr, Error('%s' % e))
+        done_dir = os.path.join(session_dir, FSQ_DONE)
+        if telemetry is not None:
+            _atomicSerialize(telemetry, os.path.join(done_dir, '%s_TEL' % jobID))
+        # output file signals completion of the job
+        _atomicSerialize(result, os.path.join(done_dir, '%s_OUT' % jobID))
+        try:
+            os.remove(running_path)
+        except OSError:
+            # job was put back into the queue in the meantime
+            pass
+        if self.logger is not None:
+            self.logger.info('Job %s executed (session: %s)' % (jobID, os.path.basename(session_dir)))
+
+
+def runFSQueueWorker(queue_dir, **kwargs):
+    r"""
+Create :class:`FSQueueWorker` with given parameters and run it. Used as the target
+of local worker processes.
+    """
+    return FSQueueWorker(queue_dir, **kwargs).run()
+
+
+class FSQueueJobContainer(JobContainer):
+    r"""
+Job container that uses shared file system directory as the work queue. Each job
+is serialized as input file in 'pending' subdirectory of the session directory
+created for this container, and executed by any worker that claims it (see
+:class:`FSQueueWorker`). Workers may be started independently on any machine that
+mounts the queue directory, or locally by the container itself. Since workers
+import job functions by name, jobs must be importable on worker machines. Flushing
+and closing the container blocks until all jobs added so far have their output.
+
+Job claimed by the worker is leased: the worker refreshes the modification time of
+job input file periodically, and if it was not refreshed within the lease time, the
+job is put back into the queue. NOTE: lease time shall be much longer than heartbeat
+interval of the workers, to account for the latency and clock differences of the
+shared file system. Recognized parameters:
+
+    * 'queue_dir' (string) -- path to the queue directory; must exist
+    * 'incrementID' (boolean) -- as in :class:`~kdvs.fw.Job.JobContainer`; True by default
+    * 'local_workers' (integer) -- number of worker processes started locally by the container; 0 by default
+    * 'lease' (float) -- lease time of claimed job, in seconds; :data:`DEFAULT_LEASE` by default
+    * 'max_requeues' (integer) -- how many times the job with expired lease is put back into the queue; 2 by default
+    * 'poll_interval' (float) -- interval between consecutive scans of the queue, in seconds; :data:`DEFAULT_POLL_INTERVAL` by default
+    * 'heartbeat' (float) -- heartbeat interval of local workers, in seconds; :data:`DEFAULT_HEARTBEAT` by default
+
+The following technical details are available in miscellaneous data:
+
+    * 'queueDir' -- path to the queue directory
+    * 'sessionID' -- identifier of session directory of this container
+    * 'sessionPath' -- path to session directory of this container
+    * 'requeuedJobs' -- {jobID : number of times put back into the queue}
+    * 'failedJobs' -- list of IDs of jobs that failed or whose lease finally expired
+    * 'jobTelemetry' -- telemetry of executed jobs, measured by workers
+        (see :meth:`~kdvs.fw.Job.JobContainer.getJobTelemetry`)
+    """
+    def __init__(self, **kwargs):
+        r"""
+Parameters
+----------
+kwargs : dict
+    actual parameters supplied during instantiation, as described above
+
+Raises
+------
+Error
+    if queue directory was not specified or does not exist
+Error
+    if unrecognized parameter was specified
+        """
+        params = dict(kwargs)
+        queue_dir = params.pop('queue_dir', None)
+        incrementID = params.pop('incrementID', True)
+        self.local_workers = params.pop('local_workers', 0)
+        self.lease = params.pop('lease', DEFAULT_LEASE)
+        self.max_requeues = params.pop('max_requeues', 2)
+        self.poll_interval = params.pop('poll_interval', DEFAULT_POLL_INTERVAL)
+        self.heartbeat = params.pop('heartbeat', DEFAULT_HEARTBEAT)
+        if len(params) > 0:
+            raise Error('Unrecognized parameters! (got %s)' % sorted(params.keys()))
+        if queue_dir is None or not os.path.isdir(queue_dir):
+            raise Error('Existing queue directory expected! (got %s)' % queue_dir)
+        super(FSQueueJobContainer, self).__init__(incrementID)
+        self.queue_dir = os.path.abspath(queue_dir)
+        self.session = uuid.uuid4().hex[:16]
+        self.session_dir = os.path.join(self.queue_dir, self.session)
+        for subdir in (FSQ_PENDING, FSQ_RUNNING, FSQ_DONE):
+            os.makedirs(os.path.join(self.session_dir, subdir))
+        self.submitted = list()
+        self._exceptions = list()
+        self._workers = list()
+        self.miscData['queueDir'] = self.queue_dir
+        self.miscData['sessionID'] = self.session
+        self.miscData['sessionPath'] = self.session_dir
+        self.miscData['requeuedJobs'] = dict()
+        self.miscData['failedJobs'] = list()
+
+    def addJob(self, job, **kwargs):
+        r"""
+The job is serialized as input file in 'pending' subdirectory, where it can be
+claimed by any worker. Once added, its status is changed to EXECUTING.
+
+Parameters
+----------
+job : :class:`~kdvs.fw.Job.Job`
+    job to be executed by this container
+
+kwargs : dict
+    any other arguments; not used
+        """
+        # result may be already known
+        jobID = self._addCachedJob(job)
+        if jobID is not None:
+            return jobID
+        jobID = super(FSQueueJobContainer, self).addJob(job)
+        jobwrap = {
+            'callmodule' : job.call_func.__module__,
+            'callname' : job.call_func.__name__,
+            'callargs' : job.call_args,
+            'seed' : job.additional_data.get('seed'),
+        }
+        _atomicSerialize(jobwrap, self._path(FSQ_PENDING, self.getJobInputKey(jobID)))
+        self.submitted.append(jobID)
+        self._job(jobID).status = JobStatus.EXECUTING
+        return jobID
+
+    def getJobInputKey(self, jobID):
+        r"""
+Get the name of the file that contains job raw input for the specific job.
+        """
+        return '%s_IN' % jobID
+
+    def getJobOutputKey(self, jobID):
+        r"""
+Get the name of the file that contains job raw output for the specific job.
+        """
+        return '%s_OUT' % jobID
+
+    def getJobTelemetryKey(self, jobID):
+        r"""
+Get the name of the file that contains telemetry measured by the worker for the
+specific job.
+        """
+        return '%s_TEL' % jobID
+
+    def getJobIDForKey(self, filekey):
+        r"""
+Get identifier of the job for specific file name (input/output/telemetry).
+        """
+        return _KEY2JOBID_PATT.match(filekey).groups()[0]
+
+    def start(self):
+        r"""
+Start local worker processes, if requested. Workers started independently may
+execute jobs as soon as they are added.
+        """
+        for _ in range(self.local_workers - len(self._workers)):
+            proc = multiprocessing.Process(target=runFSQueueWorker, args=(self.queue_dir,),
+                                           kwargs={'session' : self.session,
+                                                   'poll_interval' : self.poll_interval,
+                                                   'heartbeat' : self.heartbeat})
+            proc.daemon = True
+            proc.start()
+            self._workers.append(proc)
+
+    def flush(self):
+        r"""
+Wait until all jobs added so far have their output, and collect it. Blocking call.
+        """
+        self._collect()
+
+    def close(self):
+        r"""
+Wait until all jobs added so far have their output, collect it, stop the session
+and local workers, and return any exceptions raised during execution. Blocking call.
+
+Returns
+-------
+exceptions : list of tuples
+    list of the following tuples: (jobID, e), where 'jobID' is the identifier
+    of the job that failed or whose lease finally expired, and 'e' is an instance
+    of :class:`~kdvs.core.error.Error` that describes the reason
+        """
+        super(FSQueueJobContainer, self).close()
+        self._collect()
+        self.stopWorkers()
+        return self._exceptions
+
+    def stopWorkers(self):
+        r"""
+Stop the session of this container, so that workers ignore it, and wait for local
+worker processes to finish.
+        """
+        open(os.path.join(self.session_dir, FSQ_STOP), 'w').close()
+        for proc in self._workers:
+            proc.join()
+        self._workers = list()
+
+    def postClose(self, destPath, *args):
+        r"""
+Do nothing in post--closing stage.
+        """
+        super(FSQueueJobContainer, self).postClose(destPath)
+
+    def _collect(self):
+        remaining = set(self.submitted)
+        while len(remaining) > 0:
+            done = set(os.listdir(os.path.join(self.session_dir, FSQ_DONE)))
+            finished = [jobID for jobID in remaining if self.getJobOutputKey(jobID) in done]
+            for jobID in sorted(finished):
+                remaining.remove(jobID)
+                self._finish(jobID)
+            if len(finished) == 0:
+                for jobID in sorted(remaining):
+                    if self._checkLease(jobID):
+                        remaining.remove(jobID)
+                time.sleep(self.poll_interval)
+        self.submitted = list()
+
+    def _checkLease(self, jobID):
+        # returns True if the job finally failed
+        running_path = self._path(FSQ_RUNNING, self.getJobInputKey(jobID))
+        try:
+            age = _heartbeatAge(running_path)
+        except OSError:
+            # pending, or finished in the meantime
+            return False
+        if age <= self.lease:
+            return False
+        requeued = self.miscData['requeuedJobs'].get(jobID, 0)
+        if requeued < self.max_requeues:
+            try:
+                os.rename(running_path, self._path(FSQ_PENDING, self.getJobInputKey(jobID)))
+                self.miscData['requeuedJobs'][jobID] = requeued + 1
+            except OSError:
+                # finished in the meantime
+                pass
+            return False
+        e = Error('Job lease expired! (no heartbeat for %s seconds)' % self.lease)
+        self._job(jobID).status = JobStatus.FINISHED
+        self._exceptions.append((jobID, e))
+        self.miscData['failedJobs'].append(jobID)
+        self._notifyJobFinished(jobID)
+        return True
+
+    def _finish(self, jobID):
+        with open(self._path(FSQ_DONE, self.getJobOutputKey(jobID)), 'rb') as f:
+            result = deserializeObj(f)
+        try:
+            with open(self._path(FSQ_DONE, self.getJobTelemetryKey(jobID)), 'rb') as f:
+                self._recordJobTelemetry(jobID, deserializeObj(f))
+        except Exception:
+            # telemetry is not essential
+            pass
+        job = self._job(jobID)
+        job.status = JobStatus.FINISHED
+        job.result = result
+        if isinstance(result, tuple) and len(result) == 2 and \
+            isinstance(result[0], basestring) and result[0] == JOBERROR.srepr:
+            self._exceptions.append((jobID, result[1]))
+            self.miscData['failedJobs'].append(jobID)
+        self._notifyJobFinished(jobID)
+
+    def _path(self, subdir, key):
+        return os.path.join(self.session_dir, subdir, key)
@@ -23,9 +23,13 @@ only with PPlus v0.5.2.
 from kdvs import ROOT_IMPORT_PATH
 from kdvs.core.dep import verifyDepModule
 from kdvs.core.error import Error
-from kdvs.core.util import serializeObj, deserializeObj, importComponent
-from kdvs.fw.Job import JobContainer, JobStatus, JOBERROR
+from kdvs.core.util import serializeObj, deserializeObj, importComponent, \
+    BackgroundWriter
+from kdvs.fw.Job import JobContainer, JobStatus, JOBERROR, getWorkerID, \
+    getProcessUsage, getJobDataShape, getDataSize, estimateJobCost, \
+    installSeed
 import copy
+import itertools
 import os
 import re
 import shutil
@@ -38,14 +42,31 @@ try:
 except ImportError:
     pass
 
-# keys: <jobID>_IN | <jobID>_OUT
-_KEY2JOBID_PATT = re.compile('([a-zA-Z0-9]+)_(IN|OUT)')
+DEFAULT_WARMUP_TIMEOUT = 5.0
 r"""
-Regular expression of the file with raw input and raw output for each job.
+Default maximum time, in seconds, to wait for PPlus workers to become available.
+"""
+
+DEFAULT_SUBMISSION_BATCH = 100
+r"""
+Default number of jobs physically submitted to PPlus at once.
+"""
+
+_WARMUP_POLL_INTERVAL = 0.1
+
+# keys: <jobID>_IN | <jobID>_OUT | <jobID>_TEL
+#       <batchID>_IN | <batchID>_OUT | <batchID>_TEL
+_KEY2JOBID_PATT = re.compile('([a-zA-Z0-9]+)_(IN|OUT|TEL)')
+r"""
+Regular expression of the file with raw input and raw output for each job (or
+batch of jobs).
 """
 
 # wrapper executed on worker machine
-def _pplusJobWrapper(pc, input_key, output_key, job_error_signal):
+def _pplusJobWrapper(pc, input_key, output_key, job_error_signal, telemetry_key):
+    import time
+    cpu_start, _ = getProcessUsage()
+    wall_start = time.time()
     # reconstruct input data
     with open(pc.get_path(input_key), 'rb') as in_fh:
         jobwrap = deserializeObj(in_fh)
@@ -70,6 +91,9 @@ def _pplusJobWrapper(pc, input_key, output_key, job_error_signal):
                 pc.session_logger.error(globals())
                 pc.session_logger.error(locals())
     call_args = jobwrap['callargs']
+    # install seed of the job, if any
+    if jobwrap.get('seed') is not None:
+        installSeed(jobwrap['seed'])
     # execute call
     try:
         call_result = call_func(*call_args)
@@ -80,13 +104,99 @@ def _pplusJobWrapper(pc, input_key, output_key, job_error_signal):
         # serialize output data
         with pc.write_remotely(output_key, binary=True) as out_fh:
             serializeObj(call_result, out_fh, protocol=None)
+        # serialize telemetry measured on worker machine
+        cpu_end, peak_rss = getProcessUsage()
+        telemetry = {
+            'worker' : getWorkerID(),
+            'wall_time' : time.time() - wall_start,
+            'cpu_time' : cpu_end - cpu_start,
+            'peak_rss' : peak_rss,
+        }
+        with pc.write_remotely(telemetry_key, binary=True) as tel_fh:
+            serializeObj(telemetry, tel_fh, protocol=None)
+
+
+# wrapper executed on worker machine for the batch of jobs
+def _pplusBatchWrapper(pc, input_key, output_key, job_error_signal, telemetry_key):
+    import time
+    # reconstruct input data
+    with open(pc.get_path(input_key), 'rb') as in_fh:
+        batch = deserializeObj(in_fh)
+    results = dict()
+    telemetry = dict()
+    error = None
+    # execute jobs back to back
+    for jobID, jobwrap in batch:
+        cpu_start, _ = getProcessUsage()
+        wall_start = time.time()
+        # reconstruct call func
+        call_module = jobwrap['callmodule']
+        call_name = jobwrap['callname']
+        try:
+            if call_module is not None:
+                # importable job, from one of submitted modules
+                import sys
+                module = sys.modules[call_module]
+                call_func = getattr(module, call_name)
+            else:
+                # just find the call
+                try:
+                    call_func = globals()[call_name]
+                except KeyError:
+                    call_func = locals()[call_name]
+            # install seed of the job, if any
+            if jobwrap.get('seed') is not None:
+                installSeed(jobwrap['seed'])
+            results[jobID] = call_func(*jobwrap['callargs'])
+        except BaseException, e:
+            pc.session_logger.error('Job %s failed in batch %s! (Reason: %s)' % (jobID, input_key, e))
+            results[jobID] = (job_error_signal, e)
+            if error is None:
+                error = e
+        cpu_end, peak_rss = getProcessUsage()
+        telemetry[jobID] = {
+            'worker' : getWorkerID(),
+            'wall_time' : time.time() - wall_start,
+            'cpu_time' : cpu_end - cpu_start,
+            'peak_rss' : peak_rss,
+        }
+    # serialize output data and telemetry of all jobs
+    with pc.write_remotely(output_key, binary=True) as out_fh:
+        serializeObj(results, out_fh, protocol=None)
+    with pc.write_remotely(telemetry_key, binary=True) as tel_fh:
+        serializeObj(telemetry, tel_fh, protocol=None)
+    if error is not None:
+        raise error
 
 
 class PPlusJobContainer(JobContainer):
     r"""
 Job container that uses PPlus v0.5.2. During instantiation, all parameters except
-'incrementID', are passed directly to 'pplus.PPlusConnection'. Refer to the PPlus
-documentation for more details.
+'incrementID', 'batch_cost', 'warmup_timeout', 'min_workers', 'submission_batch'
+and 'writer_threads', are passed directly to 'pplus.PPlusConnection'. Refer to the
+PPlus documentation for more details.
+
+Jobs are submitted in bulk: call of each job is resolved only once per function,
+raw job inputs are written by pool of background threads (see
+:class:`~kdvs.core.util.BackgroundWriter`) while next jobs are prepared, and jobs
+are physically submitted to PPlus when 'submission_batch' of them is accumulated,
+or when the container is flushed or closed. Submission throughput is recorded in
+miscellaneous data under 'submissionStats' key, as dictionary with the following
+keys: 'jobs', 'seconds', 'jobs_per_second'.
+
+If 'batch_cost' is specified, small jobs are coalesced into batches: consecutive
+jobs are packed into single PPlus task up to the total estimated cost specified
+(see :func:`~kdvs.fw.Job.estimateJobCost`), with single input and output file
+per batch; jobs with unknown cost are never batched. Jobs of the batch are executed
+back to back on worker machine, and their results are unpacked when collected.
+Batches are listed in miscellaneous data under 'jobBatches' key, as {batchID :
+list of job IDs}. Job IDs are not affected by batching.
+
+Telemetry of executed jobs is recorded in miscellaneous data (see
+:meth:`~kdvs.fw.Job.JobContainer.getJobTelemetry`); wall time, CPU time, peak RSS
+and worker ID are measured on worker machine, while sizes of serialized input and
+output refer to compressed files with raw job input and output (for batched jobs,
+to serialized job arguments and result).
 
 See Also
 --------
@@ -98,8 +208,18 @@ pplus.PPlusConnection
 Parameters
 ----------
 kwargs : dict
-    keyworded parameters passed directly to PPlusConnection, except 'incrementID'
-    (if present)
+    keyworded parameters passed directly to PPlusConnection, except the following
+    ones (if present): 'incrementID'; 'batch_cost'; 'warmup_timeout', maximum time
+    to wait for workers in :meth:`start` (:data:`DEFAULT_WARMUP_TIMEOUT` by default);
+    'min_workers', number of worker CPUs to wait for (1 by default);
+    'submission_batch', number of jobs physically submitted at once
+    (:data:`DEFAULT_SUBMISSION_BATCH` by default); 'writer_threads', number of
+    threads that write raw job inputs (4 by default)
+
+Raises
+------
+Error
+    if submission batch is not positive
         """
         verifyDepModule('pplus')
         # process one argument explicitly
@@ -108,6 +228,13 @@ kwargs : dict
             del kwargs['incrementID']
         except KeyError:
             incrementID = True
+        self.batch_cost = kwargs.pop('batch_cost', None)
+        self.warmup_timeout = kwargs.pop('warmup_timeout', DEFAULT_WARMUP_TIMEOUT)
+        self.min_workers = kwargs.pop('min_workers', 1)
+        self.submission_batch = kwargs.pop('submission_batch', DEFAULT_SUBMISSION_BATCH)
+        writer_threads = kwargs.pop('writer_threads', 4)
+        if self.submission_batch < 1:
+            raise Error('Submission batch must be positive! (got %s)' % self.submission_batch)
         # check if there are no more arguments
         if len(kwargs) == 0:
             # local connection with minimum workers allocated
@@ -118,6 +245,25 @@ kwargs : dict
         super(PPlusJobContainer, self).__init__(incrementID)
         self.submitted = list()
         self._exceptions = list()
+        self._telemetry = dict()
+        # jobs waiting for submission as the batch
+        self._batch = list()
+        self._batchCost = 0
+        self._batchCount = itertools.count()
+        # jobID -> batchID
+        self._jobBatch = dict()
+        # (module, name) -> (call, call path)
+        self._calls = dict()
+        # paths added to sys.path for the lifetime of the container
+        self._addedPaths = list()
+        self._addPath(os.path.abspath(os.path.dirname(__file__)))
+        # inputs are written in background and jobs are submitted in bulk
+        self._writer = BackgroundWriter(threads=writer_threads)
+        self._pendingSubmits = list()
+        self._submissionTime = 0.0
+        self._submittedCount = 0
+        self.miscData['jobBatches'] = dict()
+        self.miscData['submissionStats'] = self._submissionStats()
         self.miscData['experimentID'] = self.pconn.id
         self.miscData['sessionID'] = self.pconn.session_id
         self.miscData['diskDataPath'] = self.pconn.disk_path
@@ -126,15 +272,23 @@ kwargs : dict
 
     def start(self):
         r"""
-By default, provide some time for auto--discovery of Parallel Python to warm up
-(by sleeping for 5 secs).
-
-See Also
---------
-time.sleep
+Wait until auto--discovery of Parallel Python finds at least 'min_workers' worker
+CPUs, but not longer than 'warmup_timeout' seconds. If the number of workers
+cannot be determined, just provide 'warmup_timeout' seconds for auto--discovery.
+Time spent is recorded in miscellaneous data under 'warmupTime' key.
         """
-        # provide some time for pp auto-discovery
-        time.sleep(5)
+        started = time.time()
+        deadline = started + self.warmup_timeout
+        while time.time() < deadline:
+            workers = self._activeWorkers()
+            if workers is None:
+                # readiness unknown, provide some time for pp auto-discovery
+                time.sleep(max(0.0, deadline - time.time()))
+                break
+            if workers >= self.min_workers:
+                break
+            time.sleep(_WARMUP_POLL_INTERVAL)
+        self.miscData['warmupTime'] = time.time() - started
 
     def addJob(self, job, importable=False):
         r"""
@@ -143,6 +297,8 @@ Parallel Python scheduler. Once added, its status is changed to EXECUTING. The
 job is actually passed as 'depfunc', together with its name, found in proper scope
 on worker machine, and executed there. NOTE: earlier versions of PPlus will raise
 an exception here since they require submission of job as callable, not as name.
+If jobs are coalesced into batches, the job remains ADDED until its batch is
+submitted, i.e. when the batch is full, or when the container is flushed or closed.
 
 Parameters
 ----------
@@ -156,6 +312,11 @@ importable : boolean
     said to be 'not importable', in the second case the job is 'importable';
     True if the job is importable, False if not; False by default
         """
+        # result may be already known
+        jobID = self._addCachedJob(job)
+        if jobID is not None:
+            return jobID
+        started = time.time()
         # add job to container
         jobID = super(PPlusJobContainer, self).addJob(job)
         # prepare depfuncs and modules
@@ -170,13 +331,14 @@ importable : boolean
         # modules for use by job wrapper
         modules.extend(['sys', 're'])
         # depfuncs to use by job wrapper
-        depfuncs.extend([serializeObj, deserializeObj])
+        depfuncs.extend([serializeObj, deserializeObj, getWorkerID, getProcessUsage, installSeed])
 
         # prepare jobwrap instance
         jobwrap = dict()
         # make deep copy of call arguments
         jobwrap['callargs'] = self._copy_args(job.call_args)
         jobwrap['jobdata'] = dict()
+        jobwrap['seed'] = job.additional_data.get('seed')
         # resolve job call handling
         call_name = job.call_func.__name__
         if importable:
@@ -186,53 +348,18 @@ importable : boolean
             jobwrap['callmodule'] = call_module
         else:
             # otherwise we add call itself as depfunc
-            # first import module that contains the call
-            call_module = importComponent(job.call_func.__module__)
-            # find requested function
-            call_func = getattr(call_module, call_name)
-            # make call visible to PP for adding as depfunc
-            callpath = os.path.abspath(os.path.join(ROOT_IMPORT_PATH, call_func.__module__))
-            sys.path.insert(0, callpath)
+            call_func = self._resolveCall(job.call_func.__module__, call_name)
             # request call to be added as depfunc
             depfuncs.append(call_func)
             jobwrap['callmodule'] = None
 
         jobwrap['callname'] = call_name
 
-        # serialize jobwrap as input object
-        input_key = self.getJobInputKey(jobID)
-        with self.pconn.write_remotely(input_key, binary=True) as out_fh:
-            serializeObj(jobwrap, out_fh)
-# DEBUG
-#        with self.pconn.write_remotely(input_key + '.txt', binary=True) as outtxt:
-#            pprintObj(jobwrap, outtxt)
-# DEBUG
-        # obtain output key for this job
-        output_key = self.getJobOutputKey(jobID)
-        # obtain job error signal
-        job_error_signal = JOBERROR.srepr
-        # make job wrapper call visible to PP for adding as depfunc
-        wrapperpath = os.path.abspath(os.path.dirname(__file__))
-        sys.path.insert(0, wrapperpath)
-        # request job wrapper to be added as depfunc
-        depfuncs.append(_pplusJobWrapper)
-        # physical submission
-        # NOTE: we submit function NAME here, not function itself; since
-        # depfuncs are 'exec'-uted by PP before resolving of actual job call,
-        # PPlus may perform the lookup of function object in globals()/locals()
-        # by name
-        self.pconn.submit(_pplusJobWrapper.func_name,
-                          args=(input_key, output_key, job_error_signal),
-                          depfuncs=tuple(depfuncs),
-                          modules=tuple(modules))
-        # we are done here, remove wrapper path
-        sys.path.pop(0)
-        # we are done here, remove call path
-        if not importable:
-            sys.path.pop(0)
-        # finish submission in job container
-        self.submitted.append(jobID)
-        self._job(jobID).status = JobStatus.EXECUTING
+        if self.batch_cost is None:
+            self._submitJob(jobID, jobwrap, depfuncs, modules)
+        else:
+            self._batchJob(jobID, jobwrap, depfuncs, modules)
+        self._submissionTime += time.time() - started
         return jobID
 
     def getJobInputKey(self, jobID):
@@ -275,6 +402,27 @@ See 'File key' in PPlus documentation
         """
         return '%s_OUT' % jobID
 
+    def getJobTelemetryKey(self, jobID):
+        r"""
+Get PPlus key for the file that contains telemetry measured on worker machine for
+the specific job.
+
+Parameters
+----------
+jobID : string
+    identifier of already added job
+
+Returns
+-------
+key : string
+    PPlus key for the requested file
+
+Notes
+-----
+See 'File key' in PPlus documentation
+        """
+        return '%s_TEL' % jobID
+
     def getJobIDForKey(self, filekey):
         r"""
 Get identifier of the job for specific PPlus file key.
@@ -313,9 +461,26 @@ PPlusConnection.collect
 PPlusError
         """
         super(PPlusJobContainer, self).close()
-        self._collect()
+        try:
+            self._collect()
+        finally:
+            self._writer.close()
+            self._removePaths()
         return self._exceptions
 
+    def flush(self):
+        r"""
+Collect raw results from jobs added since the container was started or last flushed,
+without closing the container. Blocking call. Exceptions, if any, are returned later
+by :meth:`close`.
+
+See Also
+--------
+PPlusConnection.collect
+        """
+        self._collect()
+        self.submitted = list()
+
     def postClose(self, destPath, *args):
         r"""
 Perform the following operations AFTER the container has been close()d: copy
@@ -345,23 +510,228 @@ See 'PPlus logging' in PPlus documentation
         shutil.copy(wmasterlog_path, dmaster_path)
 
 
+    def _submitJob(self, jobID, jobwrap, depfuncs, modules):
+        # serialize jobwrap as input object in background
+        input_key = self.getJobInputKey(jobID)
+        self._writer.submit(self._writeInput, input_key, jobwrap)
+# DEBUG
+#        with self.pconn.write_remotely(input_key + '.txt', binary=True) as outtxt:
+#            pprintObj(jobwrap, outtxt)
+# DEBUG
+        # obtain output key for this job
+        output_key = self.getJobOutputKey(jobID)
+        # obtain telemetry key for this job
+        telemetry_key = self.getJobTelemetryKey(jobID)
+        # telemetry known on master machine; input size is known after writing
+        n, p = getJobDataShape(self._job(jobID))
+        self._telemetry[jobID] = {
+            'n' : n,
+            'p' : p,
+            'input_bytes' : None,
+        }
+        self._queueSubmit(_pplusJobWrapper, input_key, output_key, telemetry_key,
+                          depfuncs, modules, [jobID])
+
+    def _batchJob(self, jobID, jobwrap, depfuncs, modules):
+        cost = estimateJobCost(self._job(jobID))
+        # job of unknown cost or the one that exceeds the budget starts new batch
+        if len(self._batch) > 0 and (cost is None or self._batchCost + cost > self.batch_cost):
+            self._submitBatch()
+        self._batch.append((jobID, jobwrap, depfuncs, modules))
+        if cost is None or cost >= self.batch_cost:
+            self._submitBatch()
+        else:
+            self._batchCost += cost
+
+    def _submitBatch(self):
+        batchID = 'Batch%d' % self._batchCount.next()
+        jobIDs = list()
+        jobwraps = list()
+        depfuncs = list()
+        modules = list()
+        for jobID, jobwrap, jdepfuncs, jmodules in self._batch:
+            jobIDs.append(jobID)
+            jobwraps.append((jobID, jobwrap))
+            depfuncs.extend([d for d in jdepfuncs if d not in depfuncs])
+            modules.extend([m for m in jmodules if m not in modules])
+            # telemetry known on master machine
+            n, p = getJobDataShape(self._job(jobID))
+            self._telemetry[jobID] = {
+                'n' : n,
+                'p' : p,
+                'input_bytes' : getDataSize(jobwrap['callargs']),
+            }
+        self._batch = list()
+        self._batchCost = 0
+        # serialize all jobwraps as single input object in background
+        input_key = self.getJobInputKey(batchID)
+        self._writer.submit(self._writeInput, input_key, jobwraps)
+        self.miscData['jobBatches'][batchID] = jobIDs
+        for jobID in jobIDs:
+            self._jobBatch[jobID] = batchID
+        self._queueSubmit(_pplusBatchWrapper, input_key, self.getJobOutputKey(batchID),
+                          self.getJobTelemetryKey(batchID), depfuncs, modules, jobIDs)
+
+    def _writeInput(self, input_key, obj):
+        with self.pconn.write_remotely(input_key, binary=True) as out_fh:
+            serializeObj(obj, out_fh)
+
+    def _queueSubmit(self, wrapper, input_key, output_key, telemetry_key, depfuncs,
+                     modules, jobIDs):
+        # request job wrapper to be added as depfunc
+        depfuncs = tuple(depfuncs) + (wrapper,)
+        self._pendingSubmits.append((wrapper, input_key, output_key, telemetry_key,
+                                     depfuncs, tuple(modules), jobIDs))
+        # finish submission in job container
+        for jobID in jobIDs:
+            self.submitted.append(jobID)
+            self._job(jobID).status = JobStatus.EXECUTING
+        if len(self._pendingSubmits) >= self.submission_batch:
+            self._submitPending()
+
+    def _submitPending(self):
+        if len(self._pendingSubmits) == 0:
+            return
+        started = time.time()
+        # all inputs must be present before physical submission
+        self._writer.wait()
+        # obtain job error signal
+        job_error_signal = JOBERROR.srepr
+        for wrapper, input_key, output_key, telemetry_key, depfuncs, modules, jobIDs in self._pendingSubmits:
+            # physical submission
+            # NOTE: we submit function NAME here, not function itself; since
+            # depfuncs are 'exec'-uted by PP before resolving of actual job call,
+            # PPlus may perform the lookup of function object in globals()/locals()
+            # by name
+            self.pconn.submit(wrapper.func_name,
+                              args=(input_key, output_key, job_error_signal, telemetry_key),
+                              depfuncs=depfuncs,
+                              modules=modules)
+            if wrapper is _pplusJobWrapper:
+                self._telemetry[jobIDs[0]]['input_bytes'] = self._fileSize(input_key)
+            self._submittedCount += len(jobIDs)
+        self._pendingSubmits = list()
+        self._submissionTime += time.time() - started
+        self.miscData['submissionStats'] = self._submissionStats()
+
+    def _submissionStats(self):
+        if self._submissionTime > 0:
+            rate = self._submittedCount / self._submissionTime
+        else:
+            rate = None
+        return {
+            'jobs' : self._submittedCount,
+            'seconds' : self._submissionTime,
+            'jobs_per_second' : rate,
+        }
+
+    def _resolveCall(self, module_name, call_name):
+        # resolve each call only once
+        try:
+            return self._calls[(module_name, call_name)][0]
+        except KeyError:
+            pass
+        # first import module that contains the call
+        call_module = importComponent(module_name)
+        # find requested function
+        call_func = getattr(call_module, call_name)
+        # call must be visible to PP for adding as depfunc
+        callpath = os.path.abspath(os.path.join(ROOT_IMPORT_PATH, call_func.__module__))
+        self._addPath(callpath)
+        self._calls[(module_name, call_name)] = (call_func, callpath)
+        return call_func
+
+    def _addPath(self, path):
+        if path not in sys.path:
+            sys.path.insert(0, path)
+            self._addedPaths.append(path)
+
+    def _removePaths(self):
+        for path in self._addedPaths:
+            try:
+                sys.path.remove(path)
+            except ValueError:
+                pass
+        self._addedPaths = list()
+
+    def _activeWorkers(self):
+        # number of worker CPUs discovered by pp, None if unknown
+        try:
+            return sum(self.pconn._server.get_active_nodes().values())
+        except Exception:
+            return None
+
     def _collect(self):
 #        # blocking call
+        if len(self._batch) > 0:
+            self._submitBatch()
+        self._submitPending()
+        notified = set()
+        batches = dict()
         try:
             self.pconn.collect()
             for jobID in self.submitted:
                 self.jobs[jobID].status = JobStatus.FINISHED
-                output_key = self.getJobOutputKey(jobID)
-                with open(self.pconn.get_path(output_key), 'rb') as in_fh:
-                    finalResult = deserializeObj(in_fh)
-#                with self.pconn.write_remotely(output_key, binary=True) as out_fh:
-#                    serializeObj(res, out_fh, protocol=None)
-                self.jobs[jobID].result = finalResult
+                batchID = self._jobBatch.pop(jobID, None)
+                if batchID is None:
+                    output_key = self.getJobOutputKey(jobID)
+                    with open(self.pconn.get_path(output_key), 'rb') as in_fh:
+                        finalResult = deserializeObj(in_fh)
+#                    with self.pconn.write_remotely(output_key, binary=True) as out_fh:
+#                        serializeObj(res, out_fh, protocol=None)
+                    self.jobs[jobID].result = finalResult
+                    self._collectTelemetry(jobID)
+                else:
+                    # unpack results of the batch
+                    if batchID not in batches:
+                        batches[batchID] = self._readBatch(batchID)
+                    results, telemetry = batches[batchID]
+                    finalResult = results[jobID]
+                    self.jobs[jobID].result = finalResult
+                    self._collectBatchTelemetry(jobID, telemetry.get(jobID, {}), finalResult)
+                self._notifyJobFinished(jobID)
+                notified.add(jobID)
         except PPlusError, e:
             for jobID in self.submitted:
                 self.jobs[jobID].status = JobStatus.FINISHED
+                if jobID not in notified:
+                    self._notifyJobFinished(jobID)
             self._exceptions.append(('PPlusJobs', e))
 
+    def _collectTelemetry(self, jobID):
+        telemetry = self._telemetry.pop(jobID, {})
+        telemetry['output_bytes'] = self._fileSize(self.getJobOutputKey(jobID))
+        try:
+            with open(self.pconn.get_path(self.getJobTelemetryKey(jobID)), 'rb') as in_fh:
+                telemetry.update(deserializeObj(in_fh))
+        except Exception:
+            # telemetry is not essential
+            pass
+        self._recordJobTelemetry(jobID, telemetry)
+
+    def _readBatch(self, batchID):
+        with open(self.pconn.get_path(self.getJobOutputKey(batchID)), 'rb') as in_fh:
+            results = deserializeObj(in_fh)
+        try:
+            with open(self.pconn.get_path(self.getJobTelemetryKey(batchID)), 'rb') as in_fh:
+                telemetry = deserializeObj(in_fh)
+        except Exception:
+            # telemetry is not essential
+            telemetry = dict()
+        return results, telemetry
+
+    def _collectBatchTelemetry(self, jobID, workerTelemetry, result):
+        telemetry = self._telemetry.pop(jobID, {})
+        telemetry['output_bytes'] = getDataSize(result)
+        telemetry.update(workerTelemetry)
+        self._recordJobTelemetry(jobID, telemetry)
+
+    def _fileSize(self, key):
+        try:
+            return os.path.getsize(self.pconn.get_path(key))
+        except Exception:
+            return None
+
     def __del__(self):
         try:
             if self.pconn._server is not None:
@@ -0,0 +1,519 @@
+# Knowledge Driven Variable Selection (KDVS)
+# Copyright (C) 2014 KDVS Developers. All rights reserved.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+r"""
+Provides job container that executes jobs in separate local worker processes, with
+optional per--job timeouts, retries, resource limits, memory budget and coalescing
+of small jobs into batches. It uses only standard
+'multiprocessing' and 'resource' modules; resource limits are available only on
+platforms that provide the latter. Worker processes may be also taken from the
+persistent pool (see :mod:`kdvs.fw.impl.job.WorkerPool`).
+"""
+
+from kdvs.core.error import Error
+from kdvs.fw.Job import JobContainer, JobStatus, measureBatchExecution, \
+    estimateJobCost, estimateJobMemory
+from kdvs.fw.impl.job.WorkerPool import WorkerPool, getSharedWorkerPool, \
+    DEFAULT_BLAS_THREADS
+import collections
+import itertools
+import math
+import multiprocessing
+import time
+try:
+    import resource
+except ImportError:
+    resource = None
+
+DEFAULT_POLL_INTERVAL = 0.01
+r"""
+Default interval (in seconds) between consecutive checks of running worker processes.
+"""
+
+DEFAULT_POOL_WAIT_TIMEOUT = 3600.0
+r"""
+Default maximum time (in seconds) to wait for worker process of exhausted pool,
+when no job of the container is running.
+"""
+
+def _applyResourceLimits(max_memory, max_cpu_time, persistent=False):
+    # executed in worker process; only soft limits are changed; in persistent
+    # worker process, limits of previous batch are lifted and CPU time limit
+    # refers to CPU time used from now on
+    if resource is None:
+        return
+    if max_memory is not None or persistent:
+        _, hard = resource.getrlimit(resource.RLIMIT_AS)
+        resource.setrlimit(resource.RLIMIT_AS, (hard if max_memory is None else max_memory, hard))
+    if max_cpu_time is not None or persistent:
+        _, hard = resource.getrlimit(resource.RLIMIT_CPU)
+        if max_cpu_time is not None and persistent:
+            usage = resource.getrusage(resource.RUSAGE_SELF)
+            max_cpu_time += int(math.ceil(usage.ru_utime + usage.ru_stime))
+        resource.setrlimit(resource.RLIMIT_CPU, (hard if max_cpu_time is None else max_cpu_time, hard))
+
+# executed in worker process; jobs of the batch are executed back to back and
+# outcome of each job is sent as soon as it is known; returns False if worker
+# process gave up
+def _executeBatch(conn, batch, max_memory, max_cpu_time, persistent=False):
+    try:
+        _applyResourceLimits(max_memory, max_cpu_time, persistent)
+        outcomes = measureBatchExecution([job for _, job in batch])
+        for (jobID, _), (e, result, telemetry) in itertools.izip(batch, outcomes):
+            if e is None:
+                conn.send((jobID, True, result, telemetry))
+            else:
+                conn.send((jobID, False, Error('%s' % e), telemetry))
+        return True
+    except BaseException, e:
+        # outcome of current job could not be sent; remaining jobs are abandoned
+        try:
+            conn.send((None, False, Error('%s' % e), None))
+        except BaseException:
+            pass
+        return False
+
+def _processJobWorker(conn, batch, max_memory, max_cpu_time):
+    try:
+        _executeBatch(conn, batch, max_memory, max_cpu_time)
+    finally:
+        conn.close()
+
+
+class ProcessJobContainer(JobContainer):
+    r"""
+Job container that executes jobs in separate local worker processes, one process
+per job attempt, with limited number of processes running at the same time. Jobs
+are executed when the container is flushed or closed; both calls are blocking.
+Each job may be interrupted after specified wall time (timeout); in addition, the
+memory (address space) and CPU time of worker process may be limited with
+'resource.setrlimit'. Jobs that failed or timed out may be retried. Timeouts may be
+specified per technique; the technique is recognized by 'technique' key in job
+additional data, if present.
+
+Small jobs may be coalesced into batches to avoid starting separate process for
+each of them. Jobs of single batch are executed back to back in one worker process,
+up to the total estimated cost specified with 'batch_cost' (see
+:func:`~kdvs.fw.Job.estimateJobCost`); jobs with unknown cost are never batched.
+Consecutive jobs of the batch that share the same batch function are executed
+with single vectorized call of it (see :func:`~kdvs.fw.Job.measureBatchExecution`).
+Timeouts, retries and results still refer to individual jobs; when the job of the
+batch fails in a way that ends the worker process, the remaining jobs of the batch
+are put back into the queue. Jobs waiting in the queue may be cancelled (see
+:meth:`~kdvs.fw.Job.JobContainer.cancelJob`).
+
+Concurrent jobs may be kept within the memory budget specified with 'memory_budget'.
+The memory footprint of each job is estimated before it is started (see
+:func:`~kdvs.fw.Job.estimateJobMemory`), and the job is admitted only when its
+footprint, together with the footprints of jobs already running, fits in the budget;
+otherwise it waits until enough running jobs finish. Jobs are admitted in the order
+of the queue. The footprint of the batch is the largest footprint of its jobs, since
+they are executed one after another; jobs of unknown footprint are assumed to take no
+memory. The job that alone exceeds the budget is admitted only when no other job is
+running. Note that the budget is not enforced in worker processes; use 'max_memory'
+to that end.
+
+Instead of starting new process for each job attempt, worker processes may be taken
+from persistent pool (see :class:`~kdvs.fw.impl.job.WorkerPool.WorkerPool`), that
+has the heavy modules already imported, controls the number of BLAS threads per
+worker process, and may be shared with other job containers; the jobs are then sent
+to worker processes, therefore their functions must be importable. When all worker
+processes of shared pool are acquired by other job containers, jobs wait until
+some of them is released, but not longer than 'pool_wait_timeout'; afterwards, the
+batch that could not be started fails. Resource limits are applied to each batch executed by
+pooled worker process. Recognized parameters:
+
+    * 'incrementID' (boolean) -- as in :class:`~kdvs.fw.Job.JobContainer`; True by default
+    * 'workers' (integer) -- maximum number of worker processes running at the same time; number of CPUs by default
+    * 'timeout' (float) -- default timeout of single job attempt, in seconds; None (no timeout) by default
+    * 'technique_timeouts' (dict) -- timeouts for jobs of specific techniques, {techniqueID : timeout}; empty by default
+    * 'max_retries' (integer) -- how many times failed or timed out job is executed again; 0 by default
+    * 'max_memory' (integer) -- limit of address space of worker process, in bytes; None (no limit) by default
+    * 'max_cpu_time' (integer) -- limit of CPU time of worker process, in seconds; None (no limit) by default
+    * 'batch_cost' (number) -- maximum total estimated cost of jobs executed as single batch; None (no batching) by default
+    * 'memory_budget' (integer) -- maximum total estimated memory footprint of jobs running at the same time, in bytes; None (no budget) by default
+    * 'pool' (boolean/:class:`~kdvs.fw.impl.job.WorkerPool.WorkerPool`) -- pool of worker processes to use; if True, the pool of 'workers' size shared in current process is used (see :func:`~kdvs.fw.impl.job.WorkerPool.getSharedWorkerPool`); None (new process for each job attempt) by default
+    * 'blas_threads' (integer) -- number of BLAS threads per worker process of shared pool; :data:`~kdvs.fw.impl.job.WorkerPool.DEFAULT_BLAS_THREADS` by default
+    * 'pool_wait_timeout' (float) -- maximum time to wait for worker process of exhausted pool when no job of this container is running, in seconds; None (wait indefinitely) is possible; :data:`DEFAULT_POOL_WAIT_TIMEOUT` by default
+
+The following technical details are available in miscellaneous data:
+
+    * 'timedOutJobs' -- list of IDs of jobs that finally timed out
+    * 'failedJobs' -- list of IDs of jobs that finally failed for other reasons
+    * 'jobRetries' -- {jobID : number of retries} for jobs that were retried
+    * 'jobBatches' -- list of batches started, each one as the list of job IDs
+    * 'jobTelemetry' -- telemetry of the last attempt of each job, measured in worker process
+        (see :meth:`~kdvs.fw.Job.JobContainer.getJobTelemetry`)
+    * 'memoryAdmission' -- if memory budget was specified, the dictionary with the following
+        keys: 'budget', 'peak_reserved' (the largest total estimated footprint of jobs running
+        at the same time), 'deferred' (number of jobs whose start was deferred due to the
+        budget), 'oversized' (list of IDs of jobs that alone exceeded the budget)
+    """
+    def __init__(self, **kwargs):
+        r"""
+Parameters
+----------
+kwargs : dict
+    actual parameters supplied during instantiation, as described above
+
+Raises
+------
+Error
+    if unrecognized parameter was specified
+Error
+    if resource limits were requested but are not supported on this platform
+Error
+    if number of BLAS threads was specified without shared pool
+Error
+    if memory budget is not positive
+Error
+    if pool wait timeout is negative
+        """
+        params = dict(kwargs)
+        incrementID = params.pop('incrementID', True)
+        self.workers = params.pop('workers', multiprocessing.cpu_count())
+        self.timeout = params.pop('timeout', None)
+        self.technique_timeouts = dict(params.pop('technique_timeouts', {}))
+        self.max_retries = params.pop('max_retries', 0)
+        self.max_memory = params.pop('max_memory', None)
+        self.max_cpu_time = params.pop('max_cpu_time', None)
+        self.batch_cost = params.pop('batch_cost', None)
+        self.memory_budget = params.pop('memory_budget', None)
+        pool = params.pop('pool', None)
+        blas_threads = params.pop('blas_threads', None)
+        self.pool_wait_timeout = params.pop('pool_wait_timeout', DEFAULT_POOL_WAIT_TIMEOUT)
+        if len(params) > 0:
+            raise Error('Unrecognized parameters! (got %s)' % sorted(params.keys()))
+        if self.workers < 1:
+            raise Error('Number of workers must be positive! (got %s)' % self.workers)
+        if self.pool_wait_timeout is not None and self.pool_wait_timeout < 0:
+            raise Error('Pool wait timeout must not be negative! (got %s)' % self.pool_wait_timeout)
+        if self.memory_budget is not None and self.memory_budget <= 0:
+            raise Error('Memory budget must be positive! (got %s)' % self.memory_budget)
+        if resource is None and (self.max_memory is not None or self.max_cpu_time is not None):
+            raise Error('Resource limits not supported on this platform!')
+        if blas_threads is not None and pool is not True:
+            raise Error('Number of BLAS threads may be specified only for shared pool! (got %s)' % blas_threads)
+        if pool is True:
+            if blas_threads is None:
+                blas_threads = DEFAULT_BLAS_THREADS
+            pool = getSharedWorkerPool(size=self.workers, blas_threads=blas_threads)
+        elif pool is not None and not isinstance(pool, WorkerPool):
+            raise Error('%s instance or boolean expected! (got %s)' % (WorkerPool.__name__, pool.__class__))
+        self.pool = pool if pool is not False else None
+        super(ProcessJobContainer, self).__init__(incrementID)
+        self._queue = collections.deque()
+        self._exceptions = list()
+        self._deferred = set()
+        self.miscData['timedOutJobs'] = list()
+        self.miscData['failedJobs'] = list()
+        self.miscData['jobRetries'] = dict()
+        self.miscData['jobBatches'] = list()
+        if self.memory_budget is not None:
+            self.miscData['memoryAdmission'] = {'budget' : self.memory_budget, 'peak_reserved' : 0,
+                                                'deferred' : 0, 'oversized' : list()}
+
+    def addJob(self, job, **kwargs):
+        r"""
+The job is added to internal queue and executed when the container is flushed
+or closed.
+
+Parameters
+----------
+job : :class:`~kdvs.fw.Job.Job`
+    job to be executed by this container
+
+kwargs : dict
+    any other arguments; not used
+        """
+        # result may be already known
+        jobID = self._addCachedJob(job)
+        if jobID is not None:
+            return jobID
+        jobID = super(ProcessJobContainer, self).addJob(job)
+        self._queue.append(jobID)
+        return jobID
+
+    def getJobTimeout(self, jobID):
+        r"""
+Get timeout of single attempt of requested job, in seconds. Timeout specified
+for the technique of the job takes precedence over the default one.
+
+Parameters
+----------
+jobID : string
+    identifier of already added job
+
+Returns
+-------
+timeout : float/None
+    timeout in seconds, or None if the job is not timed out
+        """
+        techID = self._job(jobID).additional_data.get('technique')
+        return self.technique_timeouts.get(techID, self.timeout)
+
+    def start(self):
+        r"""
+Do nothing; jobs are executed when the container is flushed or closed.
+        """
+        pass
+
+    def flush(self):
+        r"""
+Execute all jobs added so far in worker processes. Blocking call.
+        """
+        self._execute()
+
+    def close(self):
+        r"""
+Execute remaining jobs in worker processes and return any exceptions raised during
+execution. Blocking call.
+
+Returns
+-------
+exceptions : list of tuples
+    list of the following tuples: (jobID, e), where 'jobID' is the identifier
+    of the job that finally failed or timed out, and 'e' is an instance of
+    :class:`~kdvs.core.error.Error` that describes the reason; note that some jobs
+    may still finish correctly so the length of this list may vary
+        """
+        super(ProcessJobContainer, self).close()
+        self._execute()
+        return self._exceptions
+
+    def postClose(self, destPath, *args):
+        r"""
+Do nothing in post--closing stage.
+        """
+        super(ProcessJobContainer, self).postClose(destPath)
+
+    def _execute(self):
+        # worker process -> (connection, jobs of the batch not yet finished,
+        #                    start time of current job of the batch)
+        running = dict()
+        # worker process -> estimated memory footprint of its batch
+        reserved = dict()
+        attempts = collections.defaultdict(int)
+        workers = self.workers if self.pool is None else min(self.workers, self.pool.size)
+        while len(self._queue) > 0 or len(running) > 0:
+            # start new worker processes
+            while len(self._queue) > 0 and len(running) < workers:
+                batch = self._nextBatch()
+                memory = self._batchMemory(batch)
+                if not self._admit(batch, memory, reserved):
+                    # wait until running jobs release enough memory
+                    self._queue.extendleft(reversed(batch))
+                    break
+                # wait for pooled worker process only when no job is running
+                started = self._startWorker(batch, len(running) > 0)
+                if started is None:
+                    continue
+                if started is False:
+                    # wait until worker process of the pool is released
+                    break
+                proc, conn = started
+                running[proc] = (conn, collections.deque(batch), [time.time()])
+                reserved[proc] = memory
+            # check running worker processes
+            changed = False
+            for proc in running.keys():
+                conn, pending, started = running[proc]
+                # outcomes already sent by worker process
+                ended = False
+                while len(pending) > 0 and conn.poll():
+                    changed = True
+                    try:
+                        jobID, ok, payload, telemetry = conn.recv()
+                    except EOFError:
+                        ended = True
+                        break
+                    if jobID is None:
+                        # worker process gave up on current job
+                        self._abortBatch(pending, payload, False, attempts)
+                        ended = True
+                        break
+                    pending.popleft()
+                    started[0] = time.time()
+                    if telemetry is not None:
+                        # telemetry of the last attempt
+                        self._recordJobTelemetry(jobID, telemetry)
+                    self._outcome(jobID, ok, payload, attempts)
+                # pooled worker process that finished the batch may be reused
+                reusable = len(pending) == 0 and not ended
+                if len(pending) > 0 and not ended:
+                    if not proc.is_alive():
+                        proc.join()
+                        if conn.poll():
+                            # outcome sent just before exit
+                            continue
+                        self._abortBatch(pending, self._endedError(proc), False, attempts)
+                    elif self._timedOut(pending[0], started[0]):
+                        proc.terminate()
+                        timeout = self.getJobTimeout(pending[0])
+                        self._abortBatch(pending, Error('Job timed out! (after %s seconds)' % timeout), True, attempts)
+                    else:
+                        continue
+                elif len(pending) > 0:
+                    # connection closed without outcome of current job
+                    proc.join()
+                    self._abortBatch(pending, self._endedError(proc), False, attempts)
+                self._stopWorker(proc, conn, reusable)
+                del running[proc]
+                del reserved[proc]
+                changed = True
+            if not changed:
+                time.sleep(DEFAULT_POLL_INTERVAL)
+
+    def _nextBatch(self):
+        # coalesce consecutive jobs from the queue up to the cost budget
+        batch = [self._queue.popleft()]
+        if self.batch_cost is None:
+            return batch
+        total = estimateJobCost(self._job(batch[0]))
+        if total is None:
+            return batch
+        while len(self._queue) > 0:
+            cost = estimateJobCost(self._job(self._queue[0]))
+            if cost is None or total + cost > self.batch_cost:
+                break
+            total += cost
+            batch.append(self._queue.popleft())
+        return batch
+
+    def _batchMemory(self, batch):
+        # jobs of the batch are executed one after another
+        memory = [estimateJobMemory(self._job(jobID)) for jobID in batch]
+        return max([0] + [m for m in memory if m is not None])
+
+    def _admit(self, batch, memory, reserved):
+        if self.memory_budget is None:
+            return True
+        admission = self.miscData['memoryAdmission']
+        total = sum(reserved.values())
+        if len(reserved) > 0 and total + memory > self.memory_budget:
+            if batch[0] not in self._deferred:
+                self._deferred.add(batch[0])
+                admission['deferred'] += 1
+            return False
+        if memory > self.memory_budget:
+            # admitted alone
+            admission['oversized'].extend(batch)
+        admission['peak_reserved'] = max(admission['peak_reserved'], total + memory)
+        return True
+
+    def _withdrawJob(self, jobID):
+        # only jobs waiting in the queue can be withdrawn
+        try:
+            self._queue.remove(jobID)
+        except ValueError:
+            return False
+        return True
+
+    def _timedOut(self, jobID, started):
+        timeout = self.getJobTimeout(jobID)
+        return timeout is not None and time.time() - started > timeout
+
+    def _endedError(self, proc):
+        return Error('Worker process ended unexpectedly! (exit code %s)' % proc.exitcode)
+
+    def _abortBatch(self, pending, e, timedOut, attempts):
+        # current job of the batch ends with given error, remaining ones are
+        # put back at the front of the queue
+        jobID = pending.popleft()
+        self._outcome(jobID, None if timedOut else False, e, attempts)
+        self._queue.extendleft(reversed(pending))
+        pending.clear()
+
+    def _outcome(self, jobID, ok, payload, attempts):
+        # ok is True (finished), False (failed) or None (timed out)
+        if ok:
+            self._finish(jobID, payload)
+        elif attempts[jobID] < self.max_retries:
+            # execute again
+            attempts[jobID] += 1
+            self.miscData['jobRetries'][jobID] = attempts[jobID]
+            self._job(jobID).status = JobStatus.ADDED
+            self._queue.append(jobID)
+        else:
+            self._fail(jobID, payload, timedOut=ok is None)
+
+    def _startWorker(self, batch, deferrable):
+        for jobID in batch:
+            self._job(jobID).status = JobStatus.EXECUTING
+        self.miscData['jobBatches'].append(list(batch))
+        if self.pool is not None:
+            return self._startPooledWorker(batch, deferrable)
+        parent_conn, child_conn = multiprocessing.Pipe(duplex=False)
+        proc = multiprocessing.Process(target=_processJobWorker,
+                                       args=(child_conn, [(jobID, self._job(jobID)) for jobID in batch],
+                                             self.max_memory, self.max_cpu_time))
+        proc.daemon = True
+        proc.start()
+        # worker end of the pipe is not used in this process
+        child_conn.close()
+        return proc, parent_conn
+
+    def _startPooledWorker(self, batch, deferrable):
+        task = (_executeBatch, ([(jobID, self._job(jobID)) for jobID in batch],
+                                self.max_memory, self.max_cpu_time, True))
+        try:
+            worker = self.pool.acquire(timeout=0.0 if deferrable else self.pool_wait_timeout)
+        except Error, e:
+            if deferrable and not self.pool.isClosed() and self.pool.isExhausted():
+                # all worker processes are acquired, e.g. by another container
+                # that shares the pool; put the batch back and wait until
+                # running jobs of this container finish
+                for jobID in batch:
+                    self._job(jobID).status = JobStatus.ADDED
+                self.miscData['jobBatches'].pop()
+                self._queue.extendleft(reversed(batch))
+                return False
+            for jobID in batch:
+                self._fail(jobID, Error('Worker process could not be acquired! (Reason: %s)' % e), timedOut=False)
+            return None
+        try:
+            worker.conn.send(task)
+        except Exception, e:
+            # jobs that cannot be sent will not succeed when retried
+            self.pool.release(worker)
+            for jobID in batch:
+                self._fail(jobID, Error('Job could not be sent to worker process! (Reason: %s)' % e), timedOut=False)
+            return None
+        return worker, worker.conn
+
+    def _stopWorker(self, proc, conn, reusable):
+        if self.pool is None:
+            proc.join()
+            conn.close()
+        elif reusable:
+            self.pool.release(proc)
+        else:
+            self.pool.discard(proc)
+
+    def _finish(self, jobID, result):
+        job = self._job(jobID)
+        job.status = JobStatus.FINISHED
+        job.result = result
+        self._notifyJobFinished(jobID)
+
+    def _fail(self, jobID, e, timedOut):
+        self._job(jobID).status = JobStatus.FINISHED
+        self._exceptions.append((jobID, e))
+        if timedOut:
+            self.miscData['timedOutJobs'].append(jobID)
+        else:
+            self.miscData['failedJobs'].append(jobID)
+        self._notifyJobFinished(jobID)
@@ -22,12 +22,24 @@ no external libraries.
 
 from kdvs.core.error import Error
 from kdvs.core.util import isListOrTuple
-from kdvs.fw.Job import JobContainer, JobStatus
+from kdvs.fw.Job import JobContainer, JobStatus, measureBatchExecution, \
+    estimateJobCost
+import itertools
 
 class SimpleJobContainer(JobContainer):
     r"""
-Simple 'null' job container. It recognizes single parameter 'incrementID'; if not
-present, it is assumed to be True.
+Simple 'null' job container. It recognizes parameter 'incrementID'; if not
+present, it is assumed to be True. Jobs not executed yet may be cancelled (see
+:meth:`~kdvs.fw.Job.JobContainer.cancelJob`). Telemetry of executed jobs is recorded in
+miscellaneous data (see :meth:`~kdvs.fw.Job.JobContainer.getJobTelemetry`).
+
+It also recognizes parameter 'batch_cost'; if present, consecutive small jobs are
+coalesced into batches up to the total estimated cost specified (see
+:func:`~kdvs.fw.Job.estimateJobCost`), and jobs of the batch that share the same
+batch function are executed with single vectorized call of it (see
+:func:`~kdvs.fw.Job.measureBatchExecution`); jobs with unknown cost are never
+batched. Results still refer to individual jobs. If not present, jobs are executed
+one by one.
     """
     def __init__(self, **kwargs):
         r"""
@@ -37,14 +49,15 @@ kwargs : dict
     actual parameters supplied during instantiation; they will be checked against
     reference ones
         """
-        # we recognize only one argument here
         try:
             incrementID = kwargs['incrementID']
         except KeyError:
             incrementID = True
         super(SimpleJobContainer, self).__init__(incrementID)
+        self.batch_cost = kwargs.get('batch_cost', None)
         self.joblist = list()
         self._exceptions = None
+        self._executed = 0
 
     def addJob(self, job, **kwargs):
         r"""
@@ -58,6 +71,10 @@ job : :class:`~kdvs.fw.Job.Job`
 kwargs : dict
     any other arguments; not used
         """
+        # result may be already known
+        jobID = self._addCachedJob(job)
+        if jobID is not None:
+            return jobID
         jobID = super(SimpleJobContainer, self).addJob(job)
         self.joblist.append((jobID, job))
         return jobID
@@ -68,16 +85,61 @@ Finish job submission stage and execute already added jobs, in the order of addi
 Blocking call.
         """
         self._exceptions = list()
-        for jobID, jobObj in self.joblist:
-            self.jobs[jobID].status = JobStatus.EXECUTING
-            try:
-                # blocking call
-                result = jobObj.execute()
-                self.jobs[jobID].status = JobStatus.FINISHED
-                self.jobs[jobID].result = result
-            except Exception, e:
-                self.jobs[jobID].status = JobStatus.FINISHED
-                self._exceptions.append((jobID, e))
+        self._execute()
+
+    def flush(self):
+        r"""
+Execute jobs added since the container was started or last flushed, in the order
+of adding. Blocking call.
+        """
+        self._execute()
+
+    def _execute(self):
+        # execute jobs not executed yet
+        while self._executed < len(self.joblist):
+            batch = self._nextBatch()
+            self._executed += len(batch)
+            # cancelled jobs are skipped
+            batch = [(jobID, jobObj) for jobID, jobObj in batch if jobObj.status == JobStatus.ADDED]
+            if len(batch) == 0:
+                continue
+            for jobID, _ in batch:
+                self.jobs[jobID].status = JobStatus.EXECUTING
+            # blocking call
+            outcomes = measureBatchExecution([jobObj for _, jobObj in batch])
+            for (jobID, _), (e, result, telemetry) in itertools.izip(batch, outcomes):
+                self._finishJob(jobID, e, result, telemetry)
+
+    def _nextBatch(self):
+        # consecutive jobs not executed yet, up to the total estimated cost
+        batch = [self.joblist[self._executed]]
+        if self.batch_cost is None:
+            return batch
+        total = estimateJobCost(batch[0][1])
+        if total is None:
+            return batch
+        index = self._executed + 1
+        while index < len(self.joblist):
+            cost = estimateJobCost(self.joblist[index][1])
+            if cost is None or total + cost > self.batch_cost:
+                break
+            total += cost
+            batch.append(self.joblist[index])
+            index += 1
+        return batch
+
+    def _withdrawJob(self, jobID):
+        # added job is skipped when its turn comes
+        return True
+
+    def _finishJob(self, jobID, e, result, telemetry):
+        self.jobs[jobID].status = JobStatus.FINISHED
+        if e is None:
+            self.jobs[jobID].result = result
+        else:
+            self._exceptions.append((jobID, e))
+        self._recordJobTelemetry(jobID, telemetry)
+        self._notifyJobFinished(jobID)
 
     def close(self):
         r"""
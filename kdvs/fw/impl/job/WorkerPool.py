@@ -0,0 +1,476 @@
+# Knowledge Driven Variable Selection (KDVS)
+# Copyright (C) 2014 KDVS Developers. All rights reserved.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+r"""
+Provides persistent pool of local worker processes, that can be used by job
+containers (see :class:`~kdvs.fw.impl.job.ProcessJob.ProcessJobContainer`).
+
+Worker processes are forked by the fork server: separate, fresh Python interpreter
+that imports heavy modules (e.g. numpy, l1l2py) only once, and forks new worker
+process on request; forked workers start with all these modules already imported.
+Since the fork server does not inherit the state of the current process, the number
+of threads used by BLAS libraries in worker processes can be controlled with
+environment variables (see :data:`BLAS_THREADS_VARIABLES`), regardless of the
+libraries already loaded in the current process. Workers stay alive between jobs
+and are reused by subsequent job containers; pools may be shared across job
+containers and experiments executed in the same process (see
+:func:`getSharedWorkerPool`). Available only on platforms that support 'os.fork'.
+"""
+
+from kdvs import ROOT_IMPORT_PATH
+from kdvs.core.error import Error
+from multiprocessing.connection import Listener, Client
+import atexit
+import binascii
+import multiprocessing
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+
+DEFAULT_PRELOAD_MODULES = ('numpy', 'l1l2py', 'kdvs.fw.Job', 'kdvs.fw.impl.job.ProcessJob')
+r"""
+Default modules imported by the fork server before forking any worker process.
+Modules that are not installed are silently skipped.
+"""
+
+DEFAULT_BLAS_THREADS = 1
+r"""
+Default number of threads used by BLAS libraries in single worker process.
+"""
+
+BLAS_THREADS_VARIABLES = ('OMP_NUM_THREADS', 'MKL_NUM_THREADS', 'OPENBLAS_NUM_THREADS')
+r"""
+Environment variables that control the number of threads used by BLAS libraries.
+"""
+
+DEFAULT_START_TIMEOUT = 60.0
+r"""
+Default maximum time, in seconds, to wait for the fork server or forked worker
+process to connect.
+"""
+
+_FS_ADDRESS_VAR = 'KDVS_FORKSERVER_ADDRESS'
+_FS_AUTHKEY_VAR = 'KDVS_FORKSERVER_AUTHKEY'
+_FS_COMMAND = 'from kdvs.fw.impl.job.WorkerPool import _serveForks; _serveForks()'
+
+# executed in forked worker process; each task is (func, args), and func(conn, *args)
+# is called; when func returns False, worker process ends
+def _workerLoop(conn):
+    conn.send(os.getpid())
+    while True:
+        try:
+            task = conn.recv()
+        except EOFError:
+            break
+        if task is None:
+            break
+        func, args = task
+        if func(conn, *args) is False:
+            break
+    conn.close()
+
+# executed in fork server process
+def _serveForks():
+    address = os.environ.pop(_FS_ADDRESS_VAR)
+    authkey = binascii.unhexlify(os.environ.pop(_FS_AUTHKEY_VAR))
+    conn = Client(address, authkey=authkey)
+    sys_path, preload = conn.recv()
+    sys.path[:] = sys_path
+    preloaded = list()
+    for name in preload:
+        try:
+            __import__(name)
+            preloaded.append(name)
+        except ImportError:
+            pass
+    conn.send(preloaded)
+    # forked workers are reaped automatically
+    signal.signal(signal.SIGCHLD, signal.SIG_IGN)
+    while True:
+        try:
+            request = conn.recv()
+        except EOFError:
+            break
+        if request is None:
+            break
+        if os.fork() == 0:
+            code = 0
+            try:
+                signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+                conn.close()
+                _workerLoop(Client(address, authkey=authkey))
+            except BaseException:
+                code = 1
+            finally:
+                sys.stdout.flush()
+                sys.stderr.flush()
+                os._exit(code)
+    conn.close()
+
+
+class _ForkedWorker(object):
+    # worker process forked by the fork server; mimics the part of the interface
+    # of multiprocessing.Process
+    def __init__(self, pid, conn):
+        self.pid = pid
+        self.conn = conn
+        self.exitcode = None
+
+    def is_alive(self):
+        try:
+            os.kill(self.pid, 0)
+        except OSError:
+            return False
+        return True
+
+    def terminate(self):
+        try:
+            os.kill(self.pid, signal.SIGTERM)
+        except OSError:
+            pass
+
+    def join(self, timeout=None):
+        started = time.time()
+        while self.is_alive():
+            if timeout is not None and time.time() - started > timeout:
+                break
+            time.sleep(0.01)
+
+
+class ForkServer(object):
+    r"""
+Fork server running as separate Python interpreter, that imports requested modules
+once and forks worker processes on request. Forked worker process executes tasks
+sent through its connection; each task is the tuple (func, args), where 'func' is
+importable function called as func(conn, \*args) in worker process; when 'func'
+returns False, worker process ends.
+    """
+    def __init__(self, preload=DEFAULT_PRELOAD_MODULES, blas_threads=DEFAULT_BLAS_THREADS,
+                 start_timeout=DEFAULT_START_TIMEOUT):
+        r"""
+Parameters
+----------
+preload : iterable of string
+    names of modules to be imported by the fork server; modules that are not
+    installed are skipped; :data:`DEFAULT_PRELOAD_MODULES` by default
+
+blas_threads : integer/None
+    number of threads used by BLAS libraries in worker processes, set through
+    :data:`BLAS_THREADS_VARIABLES`; if None, environment of current process is
+    used unchanged; :data:`DEFAULT_BLAS_THREADS` by default
+
+start_timeout : float
+    maximum time to wait for the fork server or forked worker process to connect,
+    in seconds; :data:`DEFAULT_START_TIMEOUT` by default
+
+Raises
+------
+Error
+    if 'os.fork' is not supported on this platform
+Error
+    if the fork server could not be started
+        """
+        if not hasattr(os, 'fork'):
+            raise Error('Fork server not supported on this platform!')
+        self.blas_threads = blas_threads
+        self.start_timeout = start_timeout
+        self._conn = None
+        authkey = os.urandom(16)
+        self._listener = Listener(family='AF_UNIX', authkey=authkey)
+        env = dict(os.environ)
+        if blas_threads is not None:
+            for var in BLAS_THREADS_VARIABLES:
+                env[var] = str(blas_threads)
+        env[_FS_ADDRESS_VAR] = self._listener.address
+        env[_FS_AUTHKEY_VAR] = binascii.hexlify(authkey)
+        pythonpath = [p for p in env.get('PYTHONPATH', '').split(os.pathsep) if len(p) > 0]
+        env['PYTHONPATH'] = os.pathsep.join([ROOT_IMPORT_PATH] + pythonpath)
+        self._server = subprocess.Popen([sys.executable, '-c', _FS_COMMAND], env=env, close_fds=True)
+        self._conn = self._accept()
+        self._conn.send((list(sys.path), list(preload)))
+        self.preloaded = self._conn.recv()
+
+    def fork(self):
+        r"""
+Fork new worker process.
+
+Returns
+-------
+worker : object
+    handle of worker process, with the following attributes: 'pid', 'conn' (the
+    connection to send tasks through), 'exitcode' (always None); and the following
+    methods, as in multiprocessing.Process: 'is_alive', 'terminate', 'join'
+
+Raises
+------
+Error
+    if the fork server is closed
+Error
+    if worker process could not be forked
+        """
+        if self._conn is None:
+            raise Error('Fork server already closed!')
+        try:
+            self._conn.send('fork')
+        except (IOError, OSError), e:
+            self.close()
+            raise Error('Fork server ended unexpectedly! (Reason: %s)' % e)
+        conn = self._accept()
+        return _ForkedWorker(conn.recv(), conn)
+
+    def isAlive(self):
+        r"""
+Return True if the fork server is running, False otherwise.
+        """
+        return self._conn is not None and self._server.poll() is None
+
+    def close(self):
+        r"""
+Stop the fork server. Worker processes already forked are not affected.
+        """
+        if self._conn is not None:
+            try:
+                self._conn.send(None)
+            except (IOError, OSError):
+                pass
+            self._conn.close()
+            self._conn = None
+        if self._listener is not None:
+            self._listener.close()
+            self._listener = None
+        if self._server.poll() is None:
+            self._server.wait()
+
+    def _accept(self):
+        # accept connection, but do not wait forever for the server that died
+        accepted = list()
+        def _acceptor():
+            try:
+                accepted.append(self._listener.accept())
+            except Exception, e:
+                accepted.append(e)
+        th = threading.Thread(target=_acceptor)
+        th.daemon = True
+        th.start()
+        deadline = time.time() + self.start_timeout
+        while th.is_alive():
+            th.join(0.05)
+            if th.is_alive() and (self._server.poll() is not None or time.time() > deadline):
+                code = self._server.poll()
+                if code is None:
+                    self._server.kill()
+                self._conn = None
+                self.close()
+                raise Error('Fork server did not respond! (exit code %s)' % code)
+        if isinstance(accepted[0], Exception):
+            self.close()
+            raise Error('Fork server did not respond! (Reason: %s)' % accepted[0])
+        return accepted[0]
+
+
+class WorkerPool(object):
+    r"""
+Pool of persistent worker processes forked by :class:`ForkServer`. Worker process
+is acquired for the execution of some tasks, and released afterwards; released
+worker processes are reused. Worker processes that have ended or were terminated
+are replaced with new ones when needed. The pool may be used by many threads at
+the same time; the state of the pool is guarded by single condition variable,
+and the callers of :meth:`acquire` may wait for worker processes released by
+other threads.
+    """
+    def __init__(self, size=None, preload=DEFAULT_PRELOAD_MODULES, blas_threads=DEFAULT_BLAS_THREADS):
+        r"""
+Parameters
+----------
+size : integer/None
+    maximum number of worker processes; if None, the number of CPUs is used;
+    None by default
+
+preload : iterable of string
+    names of modules imported by the fork server; :data:`DEFAULT_PRELOAD_MODULES`
+    by default
+
+blas_threads : integer/None
+    number of threads used by BLAS libraries in single worker process;
+    :data:`DEFAULT_BLAS_THREADS` by default
+
+Raises
+------
+Error
+    if size is not positive
+Error
+    if the fork server could not be started
+        """
+        if size is None:
+            size = multiprocessing.cpu_count()
+        if size < 1:
+            raise Error('Size of worker pool must be positive! (got %s)' % size)
+        self.size = size
+        self.blas_threads = blas_threads
+        self.server = ForkServer(preload=preload, blas_threads=blas_threads)
+        self._cond = threading.Condition()
+        self._idle = list()
+        self._busy = set()
+        self._closed = False
+        self.stats = {'forked' : 0, 'reused' : 0}
+
+    def acquire(self, timeout=0.0):
+        r"""
+Return idle worker process, or fork new one if there is none (see
+:meth:`ForkServer.fork`). If all worker processes of the pool are already
+acquired, wait until some of them is released or discarded. Acquired worker
+process must be either released or discarded.
+
+Parameters
+----------
+timeout : float/None
+    maximum time to wait for worker process, in seconds; if None, wait until
+    worker process is available; 0 (do not wait) by default
+
+Raises
+------
+Error
+    if the pool is closed
+Error
+    if all worker processes of the pool are still acquired after timeout
+        """
+        deadline = None if timeout is None else time.time() + timeout
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise Error('Worker pool already closed!')
+                while len(self._idle) > 0:
+                    worker = self._idle.pop()
+                    if worker.is_alive():
+                        self._busy.add(worker)
+                        self.stats['reused'] += 1
+                        return worker
+                    worker.conn.close()
+                if len(self._busy) < self.size:
+                    break
+                if deadline is None:
+                    self._cond.wait()
+                    continue
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    raise Error('No idle worker process in the pool! (size %d, waited %s seconds)' % (self.size, timeout))
+                self._cond.wait(remaining)
+            # the fork server serves single request at a time
+            worker = self.server.fork()
+            self._busy.add(worker)
+            self.stats['forked'] += 1
+            return worker
+
+    def release(self, worker):
+        r"""
+Return acquired worker process to the pool, for reuse. Worker process that has
+ended is discarded.
+        """
+        with self._cond:
+            self._busy.discard(worker)
+            reusable = worker.is_alive() and not self._closed
+            if reusable:
+                self._idle.append(worker)
+            self._cond.notify()
+        if not reusable:
+            self._terminate(worker)
+
+    def discard(self, worker):
+        r"""
+Terminate acquired worker process and remove it from the pool.
+        """
+        with self._cond:
+            self._busy.discard(worker)
+            self._cond.notify()
+        self._terminate(worker)
+
+    def isExhausted(self):
+        r"""
+Return True if all worker processes of the pool are acquired, i.e. no worker
+process can be acquired until some of them is released or discarded, False
+otherwise.
+        """
+        with self._cond:
+            return len(self._busy) >= self.size
+
+    def isClosed(self):
+        r"""
+Return True if the pool is closed, False otherwise.
+        """
+        return self._closed
+
+    def close(self):
+        r"""
+Stop all worker processes and the fork server. Callers waiting in
+:meth:`acquire` are woken up.
+        """
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            idle = self._idle
+            busy = list(self._busy)
+            self._idle = list()
+            self._busy.clear()
+            self._cond.notify_all()
+        for worker in idle:
+            try:
+                worker.conn.send(None)
+            except (IOError, OSError):
+                pass
+            worker.join(timeout=1.0)
+            self._terminate(worker)
+        for worker in busy:
+            self._terminate(worker)
+        self.server.close()
+
+    def _terminate(self, worker):
+        if worker.is_alive():
+            worker.terminate()
+            worker.join()
+        worker.conn.close()
+
+
+_SHARED_POOLS = dict()
+
+def getSharedWorkerPool(size=None, preload=DEFAULT_PRELOAD_MODULES, blas_threads=DEFAULT_BLAS_THREADS):
+    r"""
+Return worker pool with requested parameters that is shared by all callers in
+current process; the pool is created if it does not exist yet. Shared pools are
+closed automatically when current process exits. See :class:`WorkerPool` for the
+description of parameters.
+    """
+    if size is None:
+        size = multiprocessing.cpu_count()
+    key = (size, tuple(preload), blas_threads)
+    pool = _SHARED_POOLS.get(key)
+    if pool is None or pool.isClosed() or not pool.server.isAlive():
+        pool = WorkerPool(size=size, preload=preload, blas_threads=blas_threads)
+        _SHARED_POOLS[key] = pool
+    return pool
+
+def closeSharedWorkerPools():
+    r"""
+Close all worker pools shared in current process.
+    """
+    for pool in _SHARED_POOLS.values():
+        pool.close()
+    _SHARED_POOLS.clear()
+
+atexit.register(closeSharedWorkerPools)
@@ -0,0 +1,185 @@
+# Knowledge Driven Variable Selection (KDVS)
+# Copyright (C) 2014 KDVS Developers. All rights reserved.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+r"""
+Provides Gram statistics of primary data set, computed once and shared across all
+data subsets. Since data subsets overlap, the covariance matrix of variables of any
+subset is obtained as a block of the covariance matrix of all variables, instead
+of being computed from scratch for each subset.
+"""
+
+from kdvs.core.error import Error
+import numpy
+
+DEFAULT_GRAM_MAX_MEMORY = 1024 * 1024 * 1024
+r"""
+Default maximum memory occupied by all Gram statistics, in bytes (1 GB).
+"""
+
+class GramStatistics(object):
+    r"""
+Gram statistics of the whole primary data set, and of training parts of its
+splits (if given): the covariance matrix of variables :math:`X^T X`, and the
+correlation of variables with labels :math:`X^T Y`, both computed from normalized
+data and labels. Statistics are computed for the whole data first, and then for
+subsequent splits, as long as they fit within the memory limit; statistics that
+do not fit are not computed, and the caller shall compute them per subset. Data
+subsets are registered with the identifiers of their variables, and their
+statistics are obtained by index slicing.
+
+Since normalization is applied to the whole data set and not to individual
+subsets, the statistics of a subset are exact only if normalizers work on each
+variable separately (e.g. :func:`l1l2py.tools.center` and
+:func:`l1l2py.tools.standardize`).
+    """
+    def __init__(self, data, labels, variables, split_sets=None, data_normalizer=None,
+                 labels_normalizer=None, max_memory=DEFAULT_GRAM_MAX_MEMORY):
+        r"""
+Parameters
+----------
+data : :class:`numpy.ndarray`
+    primary data set of shape (samples, variables)
+
+labels : :class:`numpy.ndarray`
+    associated label information, of shape (samples,) or (samples, 1)
+
+variables : iterable of string
+    identifiers of variables, in the order of columns of data
+
+split_sets : iterable of (iterable of int, iterable of int)/None
+    index sets of training and test parts of splits, as produced by
+    :func:`l1l2py.tools.stratified_kfold_splits`; None if statistics are computed
+    only for the whole data; None by default
+
+data_normalizer : callable/None
+    callable used to normalize data, None if not used; None by default
+
+labels_normalizer : callable/None
+    callable used to normalize labels, None if not used; None by default
+
+max_memory : integer
+    maximum memory occupied by all statistics, in bytes; :data:`DEFAULT_GRAM_MAX_MEMORY`
+    by default
+
+Raises
+------
+Error
+    if the number of variables does not match the data
+Error
+    if maximum memory is not positive
+        """
+        variables = list(variables)
+        if data.shape[1] != len(variables):
+            raise Error('Number of variables must match data! (got %d and %s)' % (len(variables), data.shape))
+        if max_memory <= 0:
+            raise Error('Maximum memory must be positive! (got %s)' % max_memory)
+        self.variables = variables
+        self.split_sets = split_sets
+        self.data_normalizer = data_normalizer
+        self.labels_normalizer = labels_normalizer
+        self.max_memory = max_memory
+        self._var_idxs = dict([(v, i) for i, v in enumerate(variables)])
+        self._subsets = dict()
+        self._stats = dict()
+        self._size = 0
+        labels = labels.reshape(-1, 1)
+        keys = [None]
+        if split_sets is not None:
+            keys.extend(range(len(split_sets)))
+        p = data.shape[1]
+        entry_size = (p * p + p) * numpy.dtype(numpy.float64).itemsize
+        for key in keys:
+            if self._size + entry_size > max_memory:
+                break
+            if key is None:
+                X, Y = data, labels
+            else:
+                train_idxs = split_sets[key][0]
+                X, Y = data[train_idxs, :], labels[train_idxs, :]
+            if data_normalizer is not None:
+                X = data_normalizer(X)
+            if labels_normalizer is not None:
+                Y = labels_normalizer(Y)
+            X = numpy.asarray(X, dtype=numpy.float64)
+            self._stats[key] = (numpy.dot(X.T, X), numpy.dot(X.T, Y).ravel())
+            self._size += entry_size
+
+    def addSubset(self, ssname, variables):
+        r"""
+Register data subset with identifiers of its variables, in the order of columns
+of the subset.
+
+Raises
+------
+Error
+    if any variable is unknown
+        """
+        try:
+            idxs = numpy.array([self._var_idxs[v] for v in variables], dtype=numpy.intp)
+        except KeyError, e:
+            raise Error('Unknown variable in subset %s! (got %s)' % (ssname, e.args[0]))
+        self._subsets[ssname] = idxs
+
+    def hasSubset(self, ssname):
+        r"""
+Return True if data subset was registered, False otherwise.
+        """
+        return ssname in self._subsets
+
+    def hasStatistics(self, split=None):
+        r"""
+Return True if statistics of given split (None for the whole data) were computed,
+False otherwise.
+        """
+        return split in self._stats
+
+    def getGram(self, ssname, split=None):
+        r"""
+Return covariance matrix of variables of given data subset, computed from the
+whole data (if `split` is None) or from the training part of given split, or None
+if the subset was not registered or the statistics were not computed.
+        """
+        if ssname not in self._subsets or split not in self._stats:
+            return None
+        idxs = self._subsets[ssname]
+        return self._stats[split][0][numpy.ix_(idxs, idxs)]
+
+    def getCorrelation(self, ssname, split=None):
+        r"""
+Return correlation of variables of given data subset with labels, of shape (p,),
+computed from the whole data (if `split` is None) or from the training part of
+given split, or None if the subset was not registered or the statistics were not
+computed.
+        """
+        if ssname not in self._subsets or split not in self._stats:
+            return None
+        return self._stats[split][1][self._subsets[ssname]]
+
+    def getSize(self):
+        r"""
+Return memory occupied by all computed statistics, in bytes.
+        """
+        return self._size
+
+    def matches(self, data_normalizer, labels_normalizer, split_sets=None):
+        r"""
+Return True if statistics were computed with given normalizers and, if `split_sets`
+is not None, for given splits (all compared by identity), False otherwise.
+Techniques shall use statistics only if they match their own configuration.
+        """
+        if data_normalizer is not self.data_normalizer or labels_normalizer is not self.labels_normalizer:
+            return False
+        return split_sets is None or split_sets is self.split_sets
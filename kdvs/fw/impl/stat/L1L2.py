@@ -22,11 +22,13 @@ Provides concrete implementation of statistical techniques that use
 from kdvs.core.dep import verifyDepModule
 from kdvs.core.error import Error, Warn
 from kdvs.core.util import isListOrTuple, importComponent
-from kdvs.fw.Job import Job, NOTPRODUCED
+from kdvs.fw.Job import Job, NOTPRODUCED, JOBCANCELLED, \
+    DEFAULT_JOB_MEMORY_FACTOR
+from kdvs.fw.JobCache import computeDigest
 from kdvs.fw.Stat import Technique, DEFAULT_CLASSIFICATION_RESULTS, \
     calculateConfusionMatrix, calculateMCC, Results, DEFAULT_GLOBAL_PARAMETERS, \
     RESULTS_PLOTS_ID_KEY, DEFAULT_SELECTION_RESULTS, DEFAULT_RESULTS, \
-    RESULTS_RUNTIME_KEY
+    RESULTS_RUNTIME_KEY, RESULTS_SCREENED_OUT_KEY, NOTPRESENT
 from kdvs.fw.impl.stat.Plot import MATPLOTLIB_GRAPH_BACKEND_PDF, MatplotlibPlot
 import itertools
 import l1l2py
@@ -34,13 +36,210 @@ import numpy
 import os
 
 
+def _job_memory(data, labels, paths, predictions):
+    # estimated memory footprint of the job, in bytes: copies of input data,
+    # 'paths' vectors of length p (e.g. beta paths) and 'predictions' vectors
+    # of length n (e.g. predicted labels), all of double precision
+    n = labels.shape[0]
+    p = data.size // max(n, 1)
+    itemsize = numpy.dtype(numpy.float64).itemsize
+    return itemsize * (DEFAULT_JOB_MEMORY_FACTOR * n * p + paths * p + predictions * n)
+
+# ---- ridge regression solvers
+
+RIDGE_FORMULATIONS = ('primal', 'dual')
+r"""
+Formulations of ridge regression: 'primal' decomposes the covariance matrix of
+variables (p x p), 'dual' decomposes the kernel matrix of samples (n x n).
+"""
+
+def l1l2_ridge_formulation(n, p):
+    r"""
+Choose formulation of ridge regression for data of shape (n, p): the dual one if
+there are more variables than samples, the primal one otherwise; the decomposed
+matrix is then the smaller one. Self--contained function, can be used as depfunc
+with :class:`~kdvs.fw.impl.job.PPlusJob.PPlusJobContainer`.
+
+Returns
+-------
+formulation : string
+    'dual' or 'primal' (see :data:`RIDGE_FORMULATIONS`)
+    """
+    if p > n:
+        return 'dual'
+    return 'primal'
+
+def l1l2_ridge_path(data, labels, lambda_range, formulation=None, gram=None):
+    r"""
+Compute solutions of ridge regression for all values of lambda parameter at once,
+from single eigendecomposition of either the covariance matrix of variables
+(primal formulation) or the kernel matrix of samples (dual formulation). Each
+solution is equivalent (within numerical tolerance) to the one obtained with
+:func:`l1l2py.algorithms.ridge_regression` called with the same value of lambda,
+including the scaling of lambda with the number of samples and the cutoff of small
+eigenvalues for lambda equal to 0. Self--contained function, can be used as depfunc
+with :class:`~kdvs.fw.impl.job.PPlusJob.PPlusJobContainer` (together with
+:func:`l1l2_ridge_formulation`).
+
+Parameters
+----------
+data : :class:`numpy.ndarray`
+    data matrix of shape (n, p)
+
+labels : :class:`numpy.ndarray`
+    labels vector of shape (n,) or (n, 1)
+
+lambda_range : iterable of float
+    values of lambda parameter
+
+formulation : string/None
+    'primal' or 'dual' (see :data:`RIDGE_FORMULATIONS`); if None, it is chosen
+    with :func:`l1l2_ridge_formulation`; None by default
+
+gram : :class:`numpy.ndarray`/None
+    precomputed covariance matrix of variables :math:`X^T X`, used in primal
+    formulation (see :class:`~kdvs.fw.impl.stat.Gram.GramStatistics`); if None,
+    it is computed from data; None by default
+
+Returns
+-------
+betas : :class:`numpy.ndarray`
+    solutions of shape (p, number of lambda values); column 'j' is the solution
+    obtained for j--th value of lambda
+    """
+    import numpy
+    n, p = data.shape
+    if formulation is None:
+        formulation = l1l2_ridge_formulation(n, p)
+    y = labels.reshape(-1, 1)
+    if formulation == 'dual':
+        # beta = X^T (X X^T + lambda * n * I)^-1 y
+        w, Q = numpy.linalg.eigh(numpy.dot(data, data.T))
+        Qty = numpy.dot(Q.T, y).ravel()
+    else:
+        # beta = (X^T X + lambda * n * I)^-1 X^T y
+        if gram is None:
+            gram = numpy.dot(data.T, data)
+        w, Q = numpy.linalg.eigh(gram)
+        Qty = numpy.dot(Q.T, numpy.dot(data.T, y)).ravel()
+    lambdas = numpy.asarray(lambda_range, dtype=numpy.float64).reshape(-1, 1)
+    # inverted eigenvalues 1 / (w + lambda * n), one row per lambda
+    denom = w + lambdas * n
+    # for lambda equal to 0 the pseudoinverse neglects small eigenvalues
+    cutoff = numpy.abs(w) <= 1e-15 * numpy.abs(w).max()
+    unregularized = (lambdas == 0).ravel()
+    denom[numpy.ix_(unregularized, cutoff)] = numpy.inf
+    coefs = numpy.dot(Q, (Qty / denom).T)
+    if formulation == 'dual':
+        return numpy.dot(data.T, coefs)
+    return coefs
+
+def l1l2_ridge_path_batch(datas, labels, lambda_range, formulations=None, grams=None):
+    r"""
+Compute solutions of ridge regression for many problems at once, as
+:func:`l1l2_ridge_path` does for each of them. Problems with the same number of
+samples that are solved in the same formulation are stacked into 3--dimensional
+arrays and decomposed with single call of :func:`numpy.linalg.eigh`; data of
+problems with fewer variables are padded with zero variables, which changes neither
+the decomposed matrix in dual formulation nor the solution in primal one (solutions
+for padded variables are zero, and are discarded). It pays off for many small
+problems, where single decomposition is dominated by the overhead of the call. If
+stacked linear algebra is not available (numpy older than 1.10), problems are solved
+one by one. Self--contained function, can be used as depfunc with
+:class:`~kdvs.fw.impl.job.PPlusJob.PPlusJobContainer` (together with
+:func:`l1l2_ridge_formulation` and :func:`l1l2_ridge_path`).
+
+Parameters
+----------
+datas : list of :class:`numpy.ndarray`
+    data matrices of problems, each one of shape (n, p)
+
+labels : list of :class:`numpy.ndarray`
+    labels vectors of problems, each one of shape (n,) or (n, 1)
+
+lambda_range : iterable of float
+    values of lambda parameter, common for all problems
+
+formulations : list of string/None
+    formulation of each problem, 'primal' or 'dual' (see :data:`RIDGE_FORMULATIONS`);
+    if None, it is chosen with :func:`l1l2_ridge_formulation`; if the whole list
+    is None, all formulations are chosen; None by default
+
+grams : list of :class:`numpy.ndarray`/None
+    precomputed covariance matrix of variables of each problem, used in primal
+    formulation (see :func:`l1l2_ridge_path`), or None if not available; if the
+    whole list is None, none is available; None by default
+
+Returns
+-------
+betas : list of :class:`numpy.ndarray`
+    solutions of problems, each one as returned by :func:`l1l2_ridge_path`
+    """
+    import numpy
+    if formulations is None:
+        formulations = [None] * len(datas)
+    if grams is None:
+        grams = [None] * len(datas)
+    if not hasattr(numpy, 'matmul'):
+        return [l1l2_ridge_path(data, lab, lambda_range, formulation, gram)
+                for data, lab, formulation, gram in zip(datas, labels, formulations, grams)]
+    # group problems that can be stacked
+    groups = dict()
+    for k, (data, formulation) in enumerate(zip(datas, formulations)):
+        n, p = data.shape
+        if formulation is None:
+            formulation = l1l2_ridge_formulation(n, p)
+        groups.setdefault((n, formulation), list()).append(k)
+    lambdas = numpy.asarray(lambda_range, dtype=numpy.float64)
+    unregularized = lambdas == 0
+    betas = [None] * len(datas)
+    for (n, formulation), members in groups.iteritems():
+        # stack data padded with zero variables, and labels
+        p_max = max([datas[k].shape[1] for k in members])
+        X = numpy.zeros((len(members), n, p_max))
+        y = numpy.empty((len(members), n, 1))
+        for b, k in enumerate(members):
+            X[b, :, :datas[k].shape[1]] = datas[k]
+            y[b] = labels[k].reshape(-1, 1)
+        Xt = X.transpose(0, 2, 1)
+        if formulation == 'dual':
+            # beta = X^T (X X^T + lambda * n * I)^-1 y
+            w, Q = numpy.linalg.eigh(numpy.matmul(X, Xt))
+            Qty = numpy.matmul(Q.transpose(0, 2, 1), y)[:, :, 0]
+        else:
+            # beta = (X^T X + lambda * n * I)^-1 X^T y
+            if any([grams[k] is not None for k in members]):
+                # precomputed matrices are padded as data are
+                G = numpy.zeros((len(members), p_max, p_max))
+                for b, k in enumerate(members):
+                    p = datas[k].shape[1]
+                    G[b, :p, :p] = grams[k] if grams[k] is not None else numpy.dot(datas[k].T, datas[k])
+            else:
+                G = numpy.matmul(Xt, X)
+            w, Q = numpy.linalg.eigh(G)
+            Qty = numpy.matmul(Q.transpose(0, 2, 1), numpy.matmul(Xt, y))[:, :, 0]
+        # inverted eigenvalues 1 / (w + lambda * n), of shape (problems, lambdas, eigenvalues)
+        denom = w[:, numpy.newaxis, :] + lambdas[numpy.newaxis, :, numpy.newaxis] * n
+        # for lambda equal to 0 the pseudoinverse neglects small eigenvalues
+        absw = numpy.abs(w)
+        cutoff = absw <= 1e-15 * absw.max(axis=1)[:, numpy.newaxis]
+        denom[unregularized[numpy.newaxis, :, numpy.newaxis] & cutoff[:, numpy.newaxis, :]] = numpy.inf
+        coefs = numpy.matmul(Q, (Qty[:, numpy.newaxis, :] / denom).transpose(0, 2, 1))
+        if formulation == 'dual':
+            coefs = numpy.matmul(Xt, coefs)
+        for b, k in enumerate(members):
+            betas[k] = coefs[b, :datas[k].shape[1], :]
+    return betas
+
 # ---- L1L2_OLS classifier
 
 def l1l2_ols_job_wrapper(*args):
     r"""
-Wrapper job function for :func:`l1l2py.algorithms.ridge_regression`. This function
-transposes data subset if the dimensions do not match with labels vector, performs
-the call, and calculates classification error with supplied error function. See
+Wrapper job function that solves ridge regression with mu=0.0, as
+:func:`l1l2py.algorithms.ridge_regression` does. This function transposes data
+subset if the dimensions do not match with labels vector, obtains the solution with
+:func:`l1l2_ridge_path_batch` in requested formulation, and calculates classification
+error with supplied error function. See
 `l1l2py documentation <http://slipguru.disi.unige.it/Software/L1L2Py/algorithms.html#regularization-algorithms>`__
 for more details.
 
@@ -55,6 +254,10 @@ labels : :class:`numpy.ndarray`
 error_func : callable
     callable used as error function
 
+formulation : string/None
+    optional; 'primal' or 'dual' (see :data:`RIDGE_FORMULATIONS`); if None or not
+    specified, it is chosen with :func:`l1l2_ridge_formulation`
+
 Returns
 -------
 beta : :class:`numpy.ndarray`
@@ -69,22 +272,52 @@ labels : :class:`numpy.ndarray`
 labels_predicted : :class:`numpy.ndarray`
     labels predicted with the obtained solution
     """
-    data, labels, error_func = args
-    # try to transpose if dimensions do not match
-    if data.shape[0] != labels.shape[0]:
-        data = data.T
-    # calculate beta
-    beta = l1l2py.algorithms.ridge_regression(data, labels)
-    # calculate error
-    labels_predicted = numpy.dot(data, beta)
-    error = error_func(labels, labels_predicted)
-    return (beta, error, labels, labels_predicted)
+    return l1l2_ols_batch_wrapper([args])[0]
+
+def l1l2_ols_batch_wrapper(args_list):
+    r"""
+Batch function of :func:`l1l2_ols_job_wrapper` (see
+:func:`~kdvs.fw.Job.measureBatchExecution`), that solves problems of many jobs
+at once with :func:`l1l2_ridge_path_batch`.
+
+Parameters
+----------
+args_list : list of tuple
+    arguments of :func:`l1l2_ols_job_wrapper` for each job
+
+Returns
+-------
+results : list of tuple
+    results of :func:`l1l2_ols_job_wrapper` for each job, in the same order
+    """
+    datas = list()
+    for args in args_list:
+        data, labels = args[:2]
+        # try to transpose if dimensions do not match
+        if data.shape[0] != labels.shape[0]:
+            data = data.T
+        datas.append(data)
+    all_labels = [args[1] for args in args_list]
+    formulations = [args[3] if len(args) > 3 else None for args in args_list]
+    # calculate betas
+    betas = l1l2_ridge_path_batch(datas, all_labels, (0.0,), formulations)
+    results = list()
+    for args, data, beta in zip(args_list, datas, betas):
+        labels, error_func = args[1:3]
+        # calculate error
+        labels_predicted = numpy.dot(data, beta)
+        error = error_func(labels, labels_predicted)
+        results.append((beta, error, labels, labels_predicted))
+    return results
 
 
 class L1L2_OLS(Technique):
     r"""
 Classifier based on :func:`l1l2py.algorithms.ridge_regression` (called with mu=0.0).
-It uses l1l2py v1.0.5. It can be configured with the following parameters:
+It uses l1l2py v1.0.5. The problem is solved in primal or dual formulation, whichever
+decomposes the smaller matrix for the shape of data subset (see
+:func:`l1l2_ridge_formulation`); the formulation used is stored as 'formulation'
+in runtime data of Results. It can be configured with the following parameters:
 
     * 'error_func' (callable) -- callable used as error function
     * 'return_predictions' (boolean) -- if predictions shall be returned
@@ -104,7 +337,10 @@ technique uses single virtual degree of freedom (DOF). The following
         }
 
 This technique creates empty 'Selection' Results element. This technique produces
-single Job instance. This technique does not generate any plots.
+single Job instance; jobs of many small subsets may be executed together by job
+container that coalesces small jobs into batches (see
+:func:`~kdvs.fw.Job.measureBatchExecution` and :func:`l1l2_ols_batch_wrapper`).
+This technique does not generate any plots.
 
 See Also
 --------
@@ -174,10 +410,15 @@ primary data set; labels must be in the same order. By definition, KDVS does not
 check this.
         """
         super(L1L2_OLS, self).createJob(ssname, data, labels)
-        call_args = (data, labels, self.parameters['error_func'])
+        n = labels.shape[0]
+        formulation = l1l2_ridge_formulation(n, data.size // max(n, 1))
+        call_args = (data, labels, self.parameters['error_func'], formulation)
         jobData = {
-            'depfuncs' : (),
+            'depfuncs' : (l1l2_ridge_formulation, l1l2_ridge_path, l1l2_ridge_path_batch,
+                          l1l2_ols_batch_wrapper),
             'modules' : ('l1l2py', 'numpy', 'os'),
+            'formulation' : formulation,
+            'batch_call' : l1l2_ols_batch_wrapper,
             }
         jobData.update(additionalJobData)
         job = Job(call_func=l1l2_ols_job_wrapper, call_args=call_args, additional_data=jobData)
@@ -249,6 +490,7 @@ Error
         results['Selection'] = dict()
         # store selected runtime information
         results[RESULTS_RUNTIME_KEY]['techID'] = runtime_data['techID']
+        results[RESULTS_RUNTIME_KEY]['formulation'] = additionalJobData.get('formulation')
         # we generate no plots here
         return results
 
@@ -257,11 +499,13 @@ Error
 
 def l1l2_rls_job_wrapper(*args):
     r"""
-Wrapper job function for :func:`l1l2py.algorithms.ridge_regression`. This function
-transposes data subset if the dimensions do not match with labels vector, creates
-training and test splits based on supplied index sets, performs the call for each
-value of lambda parameter, calculates errors on training and test splits with
-supplied error function. See
+Wrapper job function that solves ridge regression, as :func:`l1l2py.algorithms.ridge_regression`
+does, for each value of lambda parameter. This function transposes data subset if
+the dimensions do not match with labels vector, creates training and test splits
+based on supplied index sets, computes the whole regularization path for each split
+with :func:`l1l2_ridge_path_batch` (single decomposition of training data per split;
+decompositions of similar splits are stacked),
+calculates errors on training and test splits with supplied error function. See
 `l1l2py documentation <http://slipguru.disi.unige.it/Software/L1L2Py/algorithms.html#regularization-algorithms>`__
 for more details.
 
@@ -279,6 +523,9 @@ calls : dict
             index set for training part of split 'i', obtained either from 'ext_split_sets' technique parameter or generated
         'splits'->i->'test_idxs'
             index set for test part of split 'i', obtained either from 'ext_split_sets' technique parameter or generated
+        'splits'->i->'gram' (:class:`numpy.ndarray`)
+            optional; precomputed covariance matrix of variables of normalized
+            training part of split 'i', used in primal formulation
         'error_func' (callable)
             callable used as error function
         'data_normalizer' (callable)
@@ -289,6 +536,9 @@ calls : dict
             if predictions shall be returned
         'lambda_range' (tuple of float)
             range of values of lambda parameter calculated from input technique parameters
+        'formulation' (string/None)
+            'primal' or 'dual' (see :data:`RIDGE_FORMULATIONS`); if None or not present,
+            it is chosen for each split with :func:`l1l2_ridge_formulation`
 
 Returns
 -------
@@ -307,42 +557,80 @@ results : dict
         i->'min_err_ts_pred'
             predicted labels associated with 'min_err_ts'
     """
-    data, labels, calls = args
-    # try to transpose if dimensions do not match
-    if data.shape[0] != labels.shape[0]:
-        data = data.T
-    lambda_range = calls['lambda_range']
-    error_func = calls['error_func']
-    data_normalizer = calls['data_normalizer']
-    labels_normalizer = calls['labels_normalizer']
-    results = dict()
-    for i, sdata in calls['splits'].iteritems():
-        train_idxs = sdata['train_idxs']
-        test_idxs = sdata['test_idxs']
-        Xtr, Ytr = data[train_idxs, :], labels[train_idxs, :]
-        Xts, Yts = data[test_idxs, :], labels[test_idxs, :]
-        if not data_normalizer is None:
-            Xtr, Xts = data_normalizer(Xtr, Xts)
-        if not labels_normalizer is None:
-            Ytr, Yts = labels_normalizer(Ytr, Yts)
+    return l1l2_rls_batch_wrapper([args])[0]
+
+def l1l2_rls_batch_wrapper(args_list):
+    r"""
+Batch function of :func:`l1l2_rls_job_wrapper` (see
+:func:`~kdvs.fw.Job.measureBatchExecution`), that solves problems of all splits
+of many jobs at once with :func:`l1l2_ridge_path_batch`; splits of jobs that share
+the range of lambda are solved together.
+
+Parameters
+----------
+args_list : list of tuple
+    arguments of :func:`l1l2_rls_job_wrapper` for each job
+
+Returns
+-------
+results : list of dict
+    results of :func:`l1l2_rls_job_wrapper` for each job, in the same order
+    """
+    # prepare training and test parts of all splits of all jobs
+    splits = list()
+    for k, (data, labels, calls) in enumerate(args_list):
+        # try to transpose if dimensions do not match
+        if data.shape[0] != labels.shape[0]:
+            data = data.T
+        data_normalizer = calls['data_normalizer']
+        labels_normalizer = calls['labels_normalizer']
+        for i, sdata in calls['splits'].iteritems():
+            train_idxs = sdata['train_idxs']
+            test_idxs = sdata['test_idxs']
+            Xtr, Ytr = data[train_idxs, :], labels[train_idxs, :]
+            Xts, Yts = data[test_idxs, :], labels[test_idxs, :]
+            if not data_normalizer is None:
+                Xtr, Xts = data_normalizer(Xtr, Xts)
+            if not labels_normalizer is None:
+                Ytr, Yts = labels_normalizer(Ytr, Yts)
+            splits.append((k, i, Xtr, Ytr, Xts, Yts, sdata.get('gram')))
+    # calculate betas for all lambdas at once, for all splits that share lambda range
+    groups = dict()
+    for s, split in enumerate(splits):
+        lambda_range = tuple(args_list[split[0]][2]['lambda_range'])
+        groups.setdefault(lambda_range, list()).append(s)
+    split_betas = [None] * len(splits)
+    for lambda_range, members in groups.iteritems():
+        betas = l1l2_ridge_path_batch([splits[s][2] for s in members],
+                                      [splits[s][3] for s in members], lambda_range,
+                                      [args_list[splits[s][0]][2].get('formulation') for s in members],
+                                      [splits[s][6] for s in members])
+        for s, beta in zip(members, betas):
+            split_betas[s] = beta
+    all_results = [dict() for _ in args_list]
+    for (k, i, Xtr, Ytr, Xts, Yts, _), betas in zip(splits, split_betas):
+        calls = args_list[k][2]
+        lambda_range = calls['lambda_range']
+        error_func = calls['error_func']
+        results = all_results[k]
         results[i] = dict()
         results[i]['beta'] = list()
         results[i]['error_ts'] = list()
         results[i]['error_tr'] = list()
         results[i]['pred'] = list()
+        # calculate predictions for all lambdas at once
+        preds_ts = numpy.dot(Xts, betas)
+        preds_tr = numpy.dot(Xtr, betas)
 
-        for lambda_ in lambda_range:
-            # calculate beta
-            beta = l1l2py.algorithms.ridge_regression(Xtr, Ytr, lambda_)
+        for j in range(len(lambda_range)):
+            beta = betas[:, j:j + 1]
             results[i]['beta'].append(beta)
             # calculate error on test set
-            labels_predicted_ts = numpy.dot(Xts, beta)
+            labels_predicted_ts = preds_ts[:, j:j + 1]
             error_ts = error_func(Yts, labels_predicted_ts)
-            labels_predicted_tr = numpy.dot(Xtr, beta)
+            labels_predicted_tr = preds_tr[:, j:j + 1]
             error_tr = error_func(Ytr, labels_predicted_tr)
 
-            error_tr = error_func(Ytr, labels_predicted_ts)
-
             results[i]['error_ts'].append(error_ts)
             results[i]['error_tr'].append(error_tr)
             results[i]['pred'].append(labels_predicted_ts)
@@ -425,13 +713,16 @@ results : dict
         # store associated prediction vector
         results[i]['min_err_ts_pred'] = [float(l) for l in results[i]['pred'][min_err_ts_idx]]
 
-    return results
+    return all_results
 
 class L1L2_RLS(Technique):
     r"""
 Classifier based on :func:`l1l2py.algorithms.ridge_regression`, called with range
 of `mu` values (also dubbed 'lambda' here). It uses l1l2py v1.0.5. This technique
-produces training and test splits. It can be configured with the following parameters:
+produces training and test splits. The problem is solved in primal or dual formulation,
+whichever decomposes the smaller matrix for the shape of data subset (see
+:func:`l1l2_ridge_formulation`); the formulation used is stored as 'formulation' in
+runtime data of Results. It can be configured with the following parameters:
 
     * 'error_func' (callable) -- callable used as error function
     * 'return_predictions' (boolean) -- if predictions shall be returned
@@ -447,6 +738,14 @@ produces training and test splits. It can be configured with the following param
     * 'labels_normalizer' (callable) -- callable used to normalize label values
     * 'ext_split_sets' (None) -- placeholder parameter for pre--computed splits (if any)
 
+The following parameters are optional:
+    * 'gram_statistics' (:class:`~kdvs.fw.impl.stat.Gram.GramStatistics`) -- placeholder
+        parameter for Gram statistics of primary data set (see
+        :class:`~kdvs.fw.impl.envop.L1L2.L1L2_GramStatisticsProvider`); if they
+        match normalizers and splits of the technique, covariance matrices of
+        training parts of splits are taken from them in primal formulation;
+        None by default
+
 The configuration parameters are interpreted once, during initialization. This
 technique uses single virtual degree of freedom (DOF). The following
 :class:`~kdvs.fw.Stat.Results` elements are produced:
@@ -475,7 +774,10 @@ technique uses single virtual degree of freedom (DOF). The following
         } }
 
 This technique creates empty 'Selection' Results element. This technique produces
-single :class:`~kdvs.fw.Job.Job` instance. This technique generates two boxplot
+single :class:`~kdvs.fw.Job.Job` instance; jobs of many small subsets may be executed
+together by job container that coalesces small jobs into batches (see
+:func:`~kdvs.fw.Job.measureBatchExecution` and :func:`l1l2_rls_batch_wrapper`).
+This technique generates two boxplot
 error plots (via :class:`L1L2ErrorBoxplotMuGraph`) for training and test splits.
 
 See Also
@@ -518,10 +820,13 @@ Error
     if l1l2py library is not present, or a wrong version of l1l2py is present
         """
         verifyDepModule('l1l2py')
+        # optional parameters
+        gram_statistics = kwargs.pop('gram_statistics', None)
         if self._verify_version():
             super(L1L2_RLS, self).__init__(list(itertools.chain(self._rls_parameters, self._global_parameters)), **kwargs)
         else:
             raise Error('L1L2Py version "%s" must be provided to use this class!' % self._version)
+        self.parameters['gram_statistics'] = gram_statistics
         self.results_elements.extend(DEFAULT_RESULTS)
         self.results_elements.extend(DEFAULT_CLASSIFICATION_RESULTS)
         self.results_elements.extend(DEFAULT_SELECTION_RESULTS)
@@ -566,17 +871,24 @@ primary data set; labels must be in the same order. By definition, KDVS does not
 check this.
         """
         super(L1L2_RLS, self).createJob(ssname, data, labels)
-        calls = self._prepareRLScall(data, labels)
+        calls = self._prepareRLScall(data, labels, ssname)
         external_k = self.parameters['external_k']
         ext_split_sets = self.parameters['ext_split_sets']
+        # beta and predictions are kept for each split and lambda
+        paths = external_k * len(calls['lambda_range'])
+        predictions = 2 * paths if self.parameters['return_predictions'] else 0
         jobData = {
-            'depfuncs' : (),
+            'depfuncs' : (l1l2_ridge_formulation, l1l2_ridge_path, l1l2_ridge_path_batch,
+                          l1l2_rls_batch_wrapper),
             'modules' : ('l1l2py', 'numpy', 'os'),
+            'formulation' : calls['formulation'],
+            'batch_call' : l1l2_rls_batch_wrapper,
             'external_k' : external_k,
             'ext_split_sets' : ext_split_sets,
             'ssname' : ssname,
             'calls' : calls,
             'data_shape' : data.shape,
+            'memory' : _job_memory(data, labels, paths, predictions),
             'labels' : labels,
         }
         jobData.update(additionalJobData)
@@ -744,6 +1056,7 @@ Error
         results['Selection'] = dict()
         # store selected runtime information
         results[RESULTS_RUNTIME_KEY]['techID'] = runtime_data['techID']
+        results[RESULTS_RUNTIME_KEY]['formulation'] = additionalJobData.get('formulation')
         return results
 
     def _producePlots(self, ssname, jobResult, additionalJobData, resultInst):
@@ -752,7 +1065,8 @@ Error
         # we store generated plots here
         plots = resultInst[RESULTS_PLOTS_ID_KEY]
         # ---- prediction error on TS
-        err_ts = resultInst['Err TS']
+        # errors across splits and lambda values form single box of null DOF
+        err_ts = resultInst['Err TS'].reshape(-1, 1)
         # create file name
         pred_error_ts_plot_name = '%s_prediction_error_ts' % ssname
         pred_error_ts_plot_full_name = '%s%s%s' % (pred_error_ts_plot_name, os.path.extsep, MATPLOTLIB_GRAPH_BACKEND_PDF['format'])
@@ -769,7 +1083,8 @@ Error
         # add to plots
         plots[pred_error_ts_plot_full_name] = pred_error_ts_plot_content
         # ---- prediction error on TR
-        err_tr = resultInst['Err TR']
+        # errors across splits and lambda values form single box of null DOF
+        err_tr = resultInst['Err TR'].reshape(-1, 1)
         # create file name
         pred_error_tr_plot_name = '%s_prediction_error_tr' % ssname
         pred_error_tr_plot_full_name = '%s%s%s' % (pred_error_tr_plot_name, os.path.extsep, MATPLOTLIB_GRAPH_BACKEND_PDF['format'])
@@ -786,7 +1101,7 @@ Error
         # add to plots
         plots[pred_error_tr_plot_full_name] = pred_error_tr_plot_content
 
-    def _prepareRLScall(self, data, labels):
+    def _prepareRLScall(self, data, labels, ssname=None):
         # try to transpose if dimensions do not match
         if data.shape[0] != labels.shape[0]:
             data = data.T
@@ -797,16 +1112,30 @@ Error
         ext_split_sets = self.parameters['ext_split_sets']
         if ext_split_sets is None:
             ext_split_sets = l1l2py.tools.stratified_kfold_splits(labels, self.parameters['external_k'])
+        formulation = l1l2_ridge_formulation(*data.shape)
+        # covariance matrices of splits may be precomputed
+        gram_stats = self.parameters['gram_statistics']
+        if gram_stats is not None and formulation == 'primal' and \
+                self.parameters['ext_split_sets'] is not None and \
+                gram_stats.matches(self.parameters['data_normalizer'],
+                                   self.parameters['labels_normalizer'],
+                                   self.parameters['ext_split_sets']):
+            grams = [gram_stats.getGram(ssname, i) for i in range(len(ext_split_sets))]
+        else:
+            grams = [None] * len(ext_split_sets)
         calls['splits'] = dict()
         for i, (train_idxs, test_idxs) in enumerate(ext_split_sets):
             calls['splits'][i] = dict()
             calls['splits'][i]['train_idxs'] = train_idxs
             calls['splits'][i]['test_idxs'] = test_idxs
+            if grams[i] is not None:
+                calls['splits'][i]['gram'] = grams[i]
         calls['error_func'] = self.parameters['error_func']
         calls['data_normalizer'] = self.parameters['data_normalizer']
         calls['labels_normalizer'] = self.parameters['labels_normalizer']
         calls['return_predictions'] = self.parameters['return_predictions']
         calls['lambda_range'] = lambda_range
+        calls['formulation'] = formulation
         return calls
 
     def _determine_lambda_range(self):
@@ -833,6 +1162,692 @@ Error
         return l1l2py.__version__ == self._version
 
 
+# ---- spectral estimates
+
+DEFAULT_GRAM_EIGENVALUES_OPTIONS = {
+    'tolerance' : 1e-8,
+    'exact_size' : 500,
+}
+r"""
+Default options of estimation of extreme eigenvalues of Gram matrix (see
+:func:`l1l2_gram_eigenvalues`): relative tolerance of Lanczos iterations, and the
+size of Gram matrix up to which the exact decomposition is used instead.
+"""
+
+def l1l2_gram_eigenvalues(data, smallest=True, tolerance=1e-8, exact_size=500, gram=None):
+    r"""
+Return the smallest and the largest eigenvalue of the smaller one of Gram matrices
+:math:`X X^T` and :math:`X^T X`, for data matrix :math:`X` of shape (n, p). If the
+Gram matrix is not larger than `exact_size`, it is formed and decomposed exactly.
+Otherwise, Lanczos iterations (with full reorthogonalization) are performed on
+the implicit Gram matrix, that only needs matrix--vector products with the data,
+until the residual bound of the largest Ritz pair falls within `tolerance`
+relative to the largest eigenvalue; if `smallest` is True, the residual bound of
+the smallest Ritz pair must fall within the same tolerance as well. The Lanczos
+basis is grown as the iterations proceed, up to the size of Gram matrix. If the
+smaller Gram matrix is already known, it is used instead of the data, both for
+exact decomposition and for matrix--vector products. Self--contained function, can be used as
+depfunc with :class:`~kdvs.fw.impl.job.PPlusJob.PPlusJobContainer`.
+
+Parameters
+----------
+data : numpy.ndarray
+    data matrix of shape (n, p)
+
+smallest : boolean
+    if the smallest eigenvalue must be estimated accurately as well; True by default
+
+tolerance : float
+    relative tolerance of Lanczos estimates; 1e-8 by default
+
+exact_size : integer
+    maximum size of Gram matrix decomposed exactly; 500 by default
+
+gram : numpy.ndarray/None
+    precomputed smaller Gram matrix of the data, of shape (min(n, p), min(n, p));
+    None by default
+
+Returns
+-------
+(smallest, largest) : tuple of float
+    extreme eigenvalues of the smaller Gram matrix
+    """
+    import numpy
+    n, p = data.shape
+    m = min(n, p)
+    if m <= exact_size:
+        if gram is not None:
+            tmp = gram
+        elif p > n:
+            tmp = numpy.dot(data, data.T)
+        else:
+            tmp = numpy.dot(data.T, data)
+        evals = numpy.linalg.eigvalsh(tmp)
+        return evals.min(), evals.max()
+    # Lanczos basis grows by doubling, up to the size of Gram matrix
+    Q = numpy.zeros((min(m, 32), m))
+    alphas = numpy.zeros(m)
+    betas = numpy.zeros(m)
+    # fixed starting vector keeps the estimate reproducible
+    q = numpy.random.RandomState(0).randn(m)
+    q /= numpy.linalg.norm(q)
+    for k in xrange(m):
+        if k == Q.shape[0]:
+            Q = numpy.vstack((Q, numpy.zeros((min(k, m - k), m))))
+        Q[k] = q
+        if gram is not None:
+            w = numpy.dot(gram, q)
+        elif p > n:
+            w = numpy.dot(data, numpy.dot(data.T, q))
+        else:
+            w = numpy.dot(data.T, numpy.dot(data, q))
+        alphas[k] = numpy.dot(w, q)
+        # reorthogonalize twice against all Lanczos vectors
+        w -= numpy.dot(Q[:k + 1].T, numpy.dot(Q[:k + 1], w))
+        w -= numpy.dot(Q[:k + 1].T, numpy.dot(Q[:k + 1], w))
+        betas[k] = numpy.linalg.norm(w)
+        # Ritz values are checked every few steps only
+        exhausted = betas[k] <= tolerance * numpy.abs(alphas[:k + 1]).max()
+        if (k + 1) % 5 == 0 or k + 1 == m or exhausted:
+            T = numpy.diag(alphas[:k + 1]) + numpy.diag(betas[:k], 1) + numpy.diag(betas[:k], -1)
+            ritz, vecs = numpy.linalg.eigh(T)
+            lo, hi = ritz[0], ritz[-1]
+            bound = tolerance * abs(hi)
+            # residual bounds of the extreme Ritz pairs
+            hi_done = betas[k] * abs(vecs[-1, -1]) <= bound
+            lo_done = not smallest or betas[k] * abs(vecs[-1, 0]) <= bound
+            if (hi_done and lo_done) or exhausted:
+                break
+        q = w / betas[k]
+    return lo, hi
+
+# ---- native L1L2 solver
+
+L1L2_ENGINES = ('l1l2py', 'native')
+r"""
+Engines of model selection used by :class:`L1L2_L1L2`: 'l1l2py' calls
+:func:`l1l2py.model_selection`, 'native' calls :func:`l1l2_native_model_selection`.
+"""
+
+DEFAULT_L1L2_ENGINE = 'l1l2py'
+r"""
+Default engine of model selection used by :class:`L1L2_L1L2`.
+"""
+
+L1L2_GRIDS = ('full', 'adaptive')
+r"""
+Searches of (`tau`, `lambda`) grid available in native engine of model selection:
+evaluation of the whole grid, and coarse--to--fine search (see
+:func:`l1l2_adaptive_kcv_errors`).
+"""
+
+DEFAULT_NATIVE_ENGINE_OPTIONS = {
+    'kmax' : 100000,
+    'tolerance' : 1e-5,
+    'screening' : True,
+    'grid' : 'full',
+    'grid_levels' : 2,
+    'grid_points' : 8,
+    }
+r"""
+Default options of native engine of model selection (see
+:func:`l1l2_native_model_selection`): maximum number of iterations and relative
+tolerance of single solution (the same as in l1l2py), if screening rules are
+used, and search of (`tau`, `lambda`) grid with its number of refinement levels
+and maximum number of cells evaluated at each level.
+"""
+
+def l1l2_gram_norm(data):
+    r"""
+Return the largest eigenvalue of :math:`X^T X / n` for data matrix :math:`X` of shape
+(n, p), i.e. the step size factor of :func:`l1l2py.algorithms.l1l2_regularization`
+without `mu`; the smaller one of :math:`X X^T` and :math:`X^T X` is decomposed.
+Self--contained function, can be used as depfunc with
+:class:`~kdvs.fw.impl.job.PPlusJob.PPlusJobContainer`.
+    """
+    import numpy
+    n, p = data.shape
+    if p > n:
+        tmp = numpy.dot(data, data.T)
+    else:
+        tmp = numpy.dot(data.T, data)
+    return numpy.linalg.eigvalsh(tmp).max() / n
+
+def l1l2_fista(data, labels, mu, tau, beta=None, sigma0=None, kmax=100000, tolerance=1e-5):
+    r"""
+Solve l1l2 regularization problem
+
+.. math::
+
+    \min_{\beta} \frac{1}{n} \| Y - X \beta \|_2^2 + \mu \| \beta \|_2^2 + \tau \| \beta \|_1
+
+with FISTA iterations, as :func:`l1l2py.algorithms.l1l2_regularization` does (with
+fixed step size), starting from given solution. If there are more samples than
+variables, the covariance matrix of variables is computed once and used in all
+iterations. Self--contained function, can be used as depfunc with
+:class:`~kdvs.fw.impl.job.PPlusJob.PPlusJobContainer` (together with
+:func:`l1l2_gram_norm`).
+
+Parameters
+----------
+data : :class:`numpy.ndarray`
+    data matrix of shape (n, p)
+
+labels : :class:`numpy.ndarray`
+    labels vector of shape (n,) or (n, 1)
+
+mu : float
+    l2 norm penalty
+
+tau : float
+    l1 norm penalty
+
+beta : :class:`numpy.ndarray`/None
+    initial solution (warm start); if None, zero solution is used; None by default
+
+sigma0 : float/None
+    step size factor computed with :func:`l1l2_gram_norm` for the data matrix or
+    any matrix that contains its columns; if None, it is computed; None by default
+
+kmax : int
+    maximum number of iterations; 100000 by default
+
+tolerance : float
+    relative tolerance of the solution used as convergence criterion; 1e-5 by default
+
+Returns
+-------
+(beta, iterations) : :class:`numpy.ndarray`, int
+    solution of shape (p, 1), and the number of iterations performed
+    """
+    import numpy
+    from math import sqrt
+    n, d = data.shape
+    if d == 0:
+        return numpy.zeros((0, 1)), 0
+    if sigma0 is None:
+        sigma0 = l1l2_gram_norm(data)
+    sigma = sigma0 + mu
+    if sigma < numpy.finfo(float).eps:
+        return numpy.zeros((d, 1)), 0
+    if beta is None:
+        beta = numpy.zeros(d)
+    else:
+        beta = beta.ravel()
+    X = data
+    Y = labels.ravel()
+    if n > d:
+        XTY = numpy.dot(X.T, Y)
+        XTX = numpy.dot(X.T, X)
+    mu_s = mu / sigma
+    tau_s = tau / (2.0 * sigma)
+    nsigma = n * sigma
+    aux_beta = beta
+    t = 1.
+    for k in xrange(kmax):
+        if n > d:
+            precalc = XTY - numpy.dot(XTX, aux_beta)
+        else:
+            precalc = numpy.dot(X.T, Y - numpy.dot(X, aux_beta))
+        value = (precalc / nsigma) + ((1.0 - mu_s) * aux_beta)
+        beta_next = numpy.sign(value) * numpy.clip(numpy.abs(value) - tau_s, 0, numpy.inf)
+        beta_diff = (beta_next - beta)
+        t_next = 0.5 * (1.0 + sqrt(1.0 + 4.0 * t * t))
+        aux_beta = beta_next + ((t - 1.0) / t_next) * beta_diff
+        max_diff = numpy.abs(beta_diff).max()
+        max_coef = numpy.abs(beta_next).max()
+        t = t_next
+        beta = beta_next
+        if max_coef == 0.0 or (max_diff / max_coef) <= tolerance:
+            break
+    return beta.reshape(-1, 1), k + 1
+
+def l1l2_screened_regularization(data, labels, mu, tau, beta=None, tau_prev=None,
+                                 sigma0=None, kmax=100000, tolerance=1e-5):
+    r"""
+Solve l1l2 regularization problem (see :func:`l1l2_fista`) only for variables that
+survive screening. Starting from given solution, obtained for `tau_prev`, the
+sequential strong rule discards each variable that is inactive in that solution
+and whose correlation with the residual, :math:`\frac{2}{n} | x_j^T (Y - X \beta) |`,
+is below :math:`2 \tau - \tau_{prev}`. The problem is then solved for remaining
+variables; discarded variables that violate optimality conditions of the solution
+(the correlation above `tau`) are put back and the problem is solved again, so the
+solution is the solution of the whole problem. Self--contained function, can be used
+as depfunc with :class:`~kdvs.fw.impl.job.PPlusJob.PPlusJobContainer` (together with
+:func:`l1l2_gram_norm` and :func:`l1l2_fista`).
+
+Parameters
+----------
+data : :class:`numpy.ndarray`
+    data matrix of shape (n, p)
+
+labels : :class:`numpy.ndarray`
+    labels vector of shape (n,) or (n, 1)
+
+mu : float
+    l2 norm penalty
+
+tau : float
+    l1 norm penalty
+
+beta : :class:`numpy.ndarray`/None
+    initial solution (warm start); if None, zero solution is used; None by default
+
+tau_prev : float/None
+    l1 norm penalty for which initial solution was obtained; if None, `tau` is
+    assumed (e.g. when initial solution was obtained for another `mu`); None by default
+
+sigma0 : float/None
+    step size factor computed with :func:`l1l2_gram_norm` for the data matrix; if
+    None, it is computed; None by default
+
+kmax : int
+    maximum number of iterations of single solution; 100000 by default
+
+tolerance : float
+    relative tolerance of the solution used as convergence criterion; 1e-5 by default
+
+Returns
+-------
+(beta, iterations) : :class:`numpy.ndarray`, int
+    solution of shape (p, 1), and the total number of iterations performed
+    """
+    import numpy
+    n, p = data.shape
+    Y = labels.reshape(-1, 1)
+    if sigma0 is None:
+        sigma0 = l1l2_gram_norm(data)
+    if beta is None:
+        beta = numpy.zeros((p, 1))
+    if tau_prev is None:
+        tau_prev = tau
+    corr = numpy.abs(numpy.dot(data.T, Y - numpy.dot(data, beta))).ravel() * (2.0 / n)
+    # variables active in initial solution are always kept
+    working = (corr >= 2.0 * tau - tau_prev) | (beta.ravel() != 0)
+    iterations = 0
+    while True:
+        beta_w, k = l1l2_fista(data[:, working], Y, mu, tau, beta[working], sigma0, kmax, tolerance)
+        iterations += k
+        beta = numpy.zeros((p, 1))
+        beta[working] = beta_w
+        # check optimality conditions of discarded variables
+        corr = numpy.abs(numpy.dot(data.T, Y - numpy.dot(data, beta))).ravel() * (2.0 / n)
+        violated = ~working & (corr > tau)
+        if not violated.any():
+            return beta, iterations
+        working |= violated
+
+def l1l2_native_path(data, labels, mu, tau_range, beta=None, sigma0=None, kmax=100000,
+                     tolerance=1e-5, screening=True):
+    r"""
+Compute solutions of l1l2 regularization problem for fixed `mu` and all values of
+`tau`, as :func:`l1l2py.algorithms.l1l2_path` does: values of `tau` are traversed
+in decreasing order, each solution is the warm start for the next one, and void
+solutions are skipped. The step size factor is computed only once. Self--contained
+function, can be used as depfunc with :class:`~kdvs.fw.impl.job.PPlusJob.PPlusJobContainer`
+(together with :func:`l1l2_gram_norm`, :func:`l1l2_fista`,
+:func:`l1l2_screened_regularization`, :func:`l1l2_ridge_formulation` and
+:func:`l1l2_ridge_path`).
+
+Parameters
+----------
+data : :class:`numpy.ndarray`
+    data matrix of shape (n, p)
+
+labels : :class:`numpy.ndarray`
+    labels vector of shape (n,) or (n, 1)
+
+mu : float
+    l2 norm penalty
+
+tau_range : iterable of float
+    l1 norm penalties, in increasing order
+
+beta : :class:`numpy.ndarray`/None
+    initial solution for the largest `tau`; if None, zero solution is used; None by default
+
+sigma0 : float/None
+    step size factor computed with :func:`l1l2_gram_norm` for the data matrix; if
+    None, it is computed; None by default
+
+kmax : int
+    maximum number of iterations of single solution; 100000 by default
+
+tolerance : float
+    relative tolerance of single solution; 1e-5 by default
+
+screening : boolean
+    if solutions shall be computed with :func:`l1l2_screened_regularization`
+    instead of :func:`l1l2_fista`; True by default
+
+Returns
+-------
+betas : :class:`collections.deque`
+    non--void solutions of shape (p, 1), in the order of increasing `tau`
+    """
+    import numpy
+    from collections import deque
+    n, p = data.shape
+    if sigma0 is None:
+        sigma0 = l1l2_gram_norm(data)
+    if mu == 0.0:
+        beta_ls = l1l2_ridge_path(data, labels, (0.0,))
+    if beta is None:
+        beta = numpy.zeros((p, 1))
+    out = deque()
+    nonzero = 0
+    tau_prev = None
+    for tau in reversed(tau_range):
+        if mu == 0.0 and nonzero >= n:
+            # lasso saturation
+            beta_next = beta_ls
+        elif screening:
+            beta_next, _ = l1l2_screened_regularization(data, labels, mu, tau, beta, tau_prev,
+                                                        sigma0, kmax, tolerance)
+        else:
+            beta_next, _ = l1l2_fista(data, labels, mu, tau, beta, sigma0, kmax, tolerance)
+        nonzero = len(beta_next.nonzero()[0])
+        if nonzero > 0:
+            out.appendleft(beta_next)
+        beta = beta_next
+        tau_prev = tau
+    return out
+
+def l1l2_adaptive_kcv_errors(folds, mu, tau_range, lambda_range, cv_error_function,
+                             sparse=False, regularized=True, kmax=100000, tolerance=1e-5,
+                             screening=True, levels=2, points=8):
+    r"""
+Compute cross validation errors of Stage I of model selection (see
+:func:`l1l2_native_model_selection`) with coarse--to--fine search of (`tau`, `lambda`)
+grid, instead of evaluating the whole grid. Coarse grid, made of every
+:math:`2^{levels}`--th value of `tau` and `lambda` (together with the last ones), is
+evaluated first. Then, at each refinement level, the step of the grid is halved,
+and at most `points` not evaluated cells of the finer grid, within two steps from
+the cell of minimum error and closest to it, are evaluated. The cell of minimum
+error is determined among evaluated cells, following the same rules as for
+selection of optimal values. Each cell is evaluated for all cross validation splits;
+solutions for new values of `tau` are warm started with the solution for the
+closest larger value already computed. Errors of cells not evaluated are
+interpolated linearly, first along `lambda` and then along `tau`, from the coarse
+grid, so the error surfaces have the same shape as the ones of the whole grid.
+Self--contained function, can be used as depfunc with
+:class:`~kdvs.fw.impl.job.PPlusJob.PPlusJobContainer` (together with all functions
+used by :func:`l1l2_native_path`).
+
+Parameters
+----------
+folds : iterable of (:class:`numpy.ndarray`, :class:`numpy.ndarray`, :class:`numpy.ndarray`, :class:`numpy.ndarray`)
+    normalized training data, test data, training labels, and test labels of
+    cross validation splits
+
+mu : float
+    l2 norm penalty
+
+tau_range : iterable of float
+    l1 norm penalties, in increasing order
+
+lambda_range : iterable of float
+    l2 norm penalties of regularized least squares solutions
+
+cv_error_function : callable
+    error function used for cross validation splits
+
+sparse : boolean
+    if the largest `tau` is preferred among cells of minimum error; False by default
+
+regularized : boolean
+    if the largest `lambda` is preferred among cells of minimum error; True by default
+
+kmax : int
+    maximum number of iterations of single solution; 100000 by default
+
+tolerance : float
+    relative tolerance of single solution; 1e-5 by default
+
+screening : boolean
+    if variables are screened (see :func:`l1l2_native_path`); True by default
+
+levels : int
+    number of refinement levels; 2 by default
+
+points : int
+    maximum number of cells evaluated at each refinement level; 8 by default
+
+Returns
+-------
+(kcv_err_ts, kcv_err_tr, evaluated) : :class:`numpy.ndarray`, :class:`numpy.ndarray`, :class:`numpy.ndarray`
+    mean errors of test and training parts of cross validation splits, of shape
+    (tau_number, lambda_number), where `tau` values that produce void solutions are
+    skipped; and boolean mask of the same shape that marks evaluated cells
+
+Raises
+------
+ValueError
+    if all values of `tau` produce void solutions
+    """
+    import numpy
+    nt = len(tau_range)
+    nl = len(lambda_range)
+    err_ts = numpy.zeros((len(folds), nt, nl))
+    err_tr = numpy.zeros((len(folds), nt, nl))
+    evaluated = numpy.zeros((nt, nl), dtype=numpy.bool)
+    # non--void solutions for each split, by index of tau
+    betas = [dict() for _ in folds]
+    sigmas = [l1l2_gram_norm(fold[0]) for fold in folds]
+    # number of tau values that produce non--void solutions for all splits
+    valid = [nt]
+
+    def _grid(n, step):
+        idxs = range(0, n, step)
+        if idxs[-1] != n - 1:
+            idxs.append(n - 1)
+        return idxs
+
+    def _evaluate(cells):
+        taus = sorted(set([j for j, _ in cells]))
+        for f, (data_tr, _, labels_tr, _) in enumerate(folds):
+            todo = [j for j in taus if j not in betas[f] and j < valid[0]]
+            if len(todo) == 0:
+                continue
+            above = [j for j in betas[f] if j > todo[-1]]
+            beta = betas[f][min(above)] if len(above) > 0 else None
+            path = l1l2_native_path(data_tr, labels_tr, mu, [tau_range[j] for j in todo], beta,
+                                    sigmas[f], kmax, tolerance, screening)
+            for j, beta in zip(todo, path):
+                betas[f][j] = beta
+            if len(path) < len(todo):
+                valid[0] = min(valid[0], todo[len(path)])
+        for j in taus:
+            if j >= valid[0]:
+                continue
+            ks = [k for jj, k in cells if jj == j]
+            lambdas = [lambda_range[k] for k in ks]
+            for f, (data_tr, data_ts, labels_tr, labels_ts) in enumerate(folds):
+                selected = (betas[f][j].ravel() != 0)
+                rbetas = l1l2_ridge_path(data_tr[:, selected], labels_tr, lambdas)
+                preds_ts = numpy.dot(data_ts[:, selected], rbetas)
+                preds_tr = numpy.dot(data_tr[:, selected], rbetas)
+                for i, k in enumerate(ks):
+                    err_ts[f, j, k] = cv_error_function(labels_ts, preds_ts[:, i:i + 1])
+                    err_tr[f, j, k] = cv_error_function(labels_tr, preds_tr[:, i:i + 1])
+            evaluated[j, ks] = True
+
+    def _best():
+        mean = numpy.where(evaluated[:valid[0]], err_ts[:, :valid[0]].mean(axis=0), numpy.inf)
+        tau_idxs, lambda_idxs = numpy.where(mean == mean.min())
+        j = tau_idxs.max() if sparse else tau_idxs.min()
+        lambda_idxs = lambda_idxs[tau_idxs == j]
+        k = lambda_idxs.max() if regularized else lambda_idxs.min()
+        return j, k
+
+    # ---- coarse grid
+    step = 2 ** levels
+    coarse_taus = _grid(nt, step)
+    coarse_lambdas = _grid(nl, step)
+    _evaluate([(j, k) for j in coarse_taus for k in coarse_lambdas])
+    if valid[0] == 0:
+        raise ValueError("the given range of 'tau' values produces all "
+                         "void solutions with the given data splits")
+    # ---- refinement around the cell of minimum error
+    for _ in range(levels):
+        step = max(step // 2, 1)
+        j0, k0 = _best()
+        cells = [(j0 + m * step, k0 + l * step) for m in range(-2, 3) for l in range(-2, 3)]
+        cells = [(j, k) for j, k in cells if 0 <= j < valid[0] and 0 <= k < nl and not evaluated[j, k]]
+        cells.sort(key=lambda c: (c[0] - j0) ** 2 + (c[1] - k0) ** 2)
+        if len(cells) > 0:
+            _evaluate(cells[:points])
+    # ---- interpolate cells not evaluated from the coarse grid
+    nt = valid[0]
+    evaluated = evaluated[:nt]
+    rows = [j for j in coarse_taus if j < nt]
+    out = list()
+    for err in (err_ts, err_tr):
+        mean = err[:, :nt].mean(axis=0)
+        coarse = numpy.array([numpy.interp(range(nl), coarse_lambdas, mean[j, coarse_lambdas]) for j in rows])
+        surface = numpy.empty((nt, nl))
+        for k in range(nl):
+            surface[:, k] = numpy.interp(range(nt), rows, coarse[:, k])
+        surface[evaluated] = mean[evaluated]
+        out.append(surface)
+    return out[0], out[1], evaluated
+
+def l1l2_native_model_selection(data, labels, test_data, test_labels, mu_range, tau_range,
+                                lambda_range, cv_splits, cv_error_function, error_function,
+                                data_normalizer=None, labels_normalizer=None, sparse=False,
+                                regularized=True, return_predictions=False, options=None):
+    r"""
+Complete model selection, as :func:`l1l2py.model_selection` does, with the same
+parameters and the same output, computed with the solver implemented here. In
+Stage I, solutions for all values of `tau` are computed with :func:`l1l2_native_path`
+for each cross validation split, and the regularized least squares solutions for
+all values of `lambda` are computed from single decomposition with
+:func:`l1l2_ridge_path`. In Stage II, solutions for increasing values of `mu` are
+warm started with the solution for the previous value. Optionally, variables are
+screened (see :func:`l1l2_screened_regularization`). The solutions are equivalent to
+the ones of l1l2py within the tolerance of iterative solver. Optionally, Stage I
+evaluates only part of (`tau`, `lambda`) grid (see :func:`l1l2_adaptive_kcv_errors`);
+the output contains then also 'kcv_evaluated', the mask of evaluated cells of
+'kcv_err_ts' and 'kcv_err_tr'. Self--contained function, can be used as depfunc with
+:class:`~kdvs.fw.impl.job.PPlusJob.PPlusJobContainer` (together with all functions
+used by :func:`l1l2_native_path`, and :func:`l1l2_adaptive_kcv_errors`).
+
+Parameters
+----------
+options : dict/None
+    options of the solver: 'kmax' (int), maximum number of iterations of single
+    solution; 'tolerance' (float), relative tolerance of single solution;
+    'screening' (boolean), if variables are screened; 'grid' (string), search of
+    (`tau`, `lambda`) grid, one of :data:`L1L2_GRIDS`; 'grid_levels' (int) and
+    'grid_points' (int), the number of refinement levels and the maximum number of
+    cells evaluated at each level by adaptive search; missing options take default
+    values (see :data:`DEFAULT_NATIVE_ENGINE_OPTIONS`); None by default
+
+See Also
+--------
+l1l2py.model_selection
+    """
+    import numpy
+    options = dict() if options is None else options
+    kmax = options.get('kmax', 100000)
+    tolerance = options.get('tolerance', 1e-5)
+    screening = options.get('screening', True)
+    # ---- stage I: minimal model for the smallest mu
+    mu = mu_range[0]
+    if options.get('grid', 'full') == 'adaptive':
+        folds = list()
+        for train_idxs, test_idxs in cv_splits:
+            data_tr, data_ts = data[train_idxs, :], data[test_idxs, :]
+            if not data_normalizer is None:
+                data_tr, data_ts = data_normalizer(data_tr, data_ts)
+            labels_tr, labels_ts = labels[train_idxs, :], labels[test_idxs, :]
+            if not labels_normalizer is None:
+                labels_tr, labels_ts = labels_normalizer(labels_tr, labels_ts)
+            folds.append((data_tr, data_ts, labels_tr, labels_ts))
+        out = dict()
+        out['kcv_err_ts'], out['kcv_err_tr'], out['kcv_evaluated'] = \
+            l1l2_adaptive_kcv_errors(folds, mu, tau_range, lambda_range, cv_error_function,
+                                     sparse, regularized, kmax, tolerance, screening,
+                                     options.get('grid_levels', 2), options.get('grid_points', 8))
+        # optimal values are selected among evaluated cells only
+        kcv_err_ts = numpy.where(out['kcv_evaluated'], out['kcv_err_ts'], numpy.inf)
+    else:
+        err_ts = list()
+        err_tr = list()
+        max_tau_num = len(tau_range)
+        for train_idxs, test_idxs in cv_splits:
+            data_tr, data_ts = data[train_idxs, :], data[test_idxs, :]
+            if not data_normalizer is None:
+                data_tr, data_ts = data_normalizer(data_tr, data_ts)
+            labels_tr, labels_ts = labels[train_idxs, :], labels[test_idxs, :]
+            if not labels_normalizer is None:
+                labels_tr, labels_ts = labels_normalizer(labels_tr, labels_ts)
+            beta_casc = l1l2_native_path(data_tr, labels_tr, mu, tau_range[:max_tau_num],
+                                         None, None, kmax, tolerance, screening)
+            if len(beta_casc) == 0:
+                raise ValueError("the given range of 'tau' values produces all "
+                                 "void solutions with the given data splits")
+            max_tau_num = min(max_tau_num, len(beta_casc))
+            _err_ts = numpy.empty((max_tau_num, len(lambda_range)))
+            _err_tr = numpy.empty_like(_err_ts)
+            for j, beta in zip(xrange(max_tau_num), beta_casc):
+                selected = (beta.ravel() != 0)
+                # regularized least squares solutions for all lambdas at once
+                betas = l1l2_ridge_path(data_tr[:, selected], labels_tr, lambda_range)
+                preds_ts = numpy.dot(data_ts[:, selected], betas)
+                preds_tr = numpy.dot(data_tr[:, selected], betas)
+                for k in range(len(lambda_range)):
+                    _err_ts[j, k] = cv_error_function(labels_ts, preds_ts[:, k:k + 1])
+                    _err_tr[j, k] = cv_error_function(labels_tr, preds_tr[:, k:k + 1])
+            err_ts.append(_err_ts)
+            err_tr.append(_err_tr)
+        out = dict()
+        out['kcv_err_ts'] = numpy.asarray([a[:max_tau_num] for a in err_ts]).mean(axis=0)
+        out['kcv_err_tr'] = numpy.asarray([a[:max_tau_num] for a in err_tr]).mean(axis=0)
+        kcv_err_ts = out['kcv_err_ts']
+    # ---- select the sparsest or the least sparse, and the most or the least
+    # regularized solution among the ones with minimum error
+    tau_idxs, lambda_idxs = numpy.where(kcv_err_ts == kcv_err_ts.min())
+    tau_opt = tau_idxs.max() if sparse else tau_idxs.min()
+    lambda_idxs = lambda_idxs[tau_idxs == tau_opt]
+    lambda_opt = lambda_idxs.max() if regularized else lambda_idxs.min()
+    out['tau_opt'] = tau_range[tau_opt]
+    out['lambda_opt'] = lambda_range[lambda_opt]
+    # ---- stage II: nested models for increasing mu
+    if not data_normalizer is None:
+        data, test_data = data_normalizer(data, test_data)
+    if not labels_normalizer is None:
+        labels, test_labels = labels_normalizer(labels, test_labels)
+    sigma0 = l1l2_gram_norm(data)
+    keys = ['beta_list', 'selected_list', 'err_ts_list', 'err_tr_list']
+    if return_predictions:
+        keys.extend(['prediction_ts_list', 'prediction_tr_list'])
+    for key in keys:
+        out[key] = list()
+    beta_l1l2 = None
+    for mu in mu_range:
+        # warm start with the solution for previous mu
+        if screening:
+            beta_l1l2, _ = l1l2_screened_regularization(data, labels, mu, out['tau_opt'], beta_l1l2,
+                                                        None, sigma0, kmax, tolerance)
+        else:
+            beta_l1l2, _ = l1l2_fista(data, labels, mu, out['tau_opt'], beta_l1l2, sigma0, kmax, tolerance)
+        selected = (beta_l1l2.ravel() != 0)
+        if not selected.any():
+            raise ValueError("the given value of 'tau' produces a void "
+                             "solution with the given data")
+        beta = l1l2_ridge_path(data[:, selected], labels, (out['lambda_opt'],))
+        out['beta_list'].append(beta)
+        out['selected_list'].append(selected)
+        prediction_ts = numpy.dot(test_data[:, selected], beta)
+        out['err_ts_list'].append(error_function(test_labels, prediction_ts))
+        prediction_tr = numpy.dot(data[:, selected], beta)
+        out['err_tr_list'].append(error_function(labels, prediction_tr))
+        if return_predictions:
+            out['prediction_ts_list'].append(prediction_ts)
+            out['prediction_tr_list'].append(prediction_tr)
+    return out
+
 
 # ---- L1L2_L1L2 classifier/feature selector
 
@@ -845,6 +1860,14 @@ for more details.
     """
     return l1l2py.model_selection(*args)
 
+def l1l2_native_job_wrapper(*args):
+    r"""
+Wrapper job function for :func:`l1l2_native_model_selection`. This function passes
+all properly prepared arguments directly to the call; they are the same as for
+:func:`l1l2_l1l2_job_wrapper`, followed by the dictionary of options of the solver.
+    """
+    return l1l2_native_model_selection(*args)
+
 
 class L1L2_L1L2(Technique):
     r"""
@@ -888,7 +1911,38 @@ It can be configured with the following parameters:
     * 'labels_normalizer' (callable) -- callable used to normalize label values
     * 'ext_split_sets' (None) -- placeholder parameter for pre--computed splits (if any)
 
-The configuration parameters are interpreted once, during initialization.
+The following parameters are optional:
+    * 'engine' (string) -- engine of model selection, one of :data:`L1L2_ENGINES`;
+        'l1l2py' calls :func:`l1l2py.model_selection`, 'native' calls
+        :func:`l1l2_native_model_selection` that warm starts solutions along
+        the tau path and across mu values, and screens inactive variables;
+        :data:`DEFAULT_L1L2_ENGINE` by default
+    * 'engine_options' (dict) -- options of 'native' engine: 'kmax', 'tolerance',
+        'screening', 'grid', 'grid_levels', 'grid_points'; missing ones are taken
+        from :data:`DEFAULT_NATIVE_ENGINE_OPTIONS`; with 'adaptive' grid, only part
+        of (tau, lambda) grid is evaluated in internal splits (see
+        :func:`l1l2_adaptive_kcv_errors`), and error surfaces of cells not
+        evaluated are interpolated
+    * 'mu_scaling_options' (dict) -- options of estimation of extreme eigenvalues
+        used to scale mu parameter range (see :func:`l1l2_gram_eigenvalues`):
+        'tolerance', 'exact_size'; missing ones are taken from
+        :data:`DEFAULT_GRAM_EIGENVALUES_OPTIONS`
+    * 'gram_statistics' (:class:`~kdvs.fw.impl.stat.Gram.GramStatistics`) -- placeholder
+        parameter for Gram statistics of primary data set (see
+        :class:`~kdvs.fw.impl.envop.L1L2.L1L2_GramStatisticsProvider`); if they
+        match normalizers of the technique, the bound of tau parameter range and
+        eigenvalues used to scale mu parameter range are computed from them;
+        None by default
+
+The configuration parameters are interpreted once, during initialization. The
+engine used is stored as 'engine' in runtime data of Results.
+
+Jobs of some external splits may be cancelled before their execution, when the
+data subset was rejected early (see
+:meth:`~kdvs.fw.impl.stat.PKCSelector.OuterSelector.rejectEarly`). Results are
+then produced only from external splits completed, and are flagged as partial:
+'partial' in runtime data of Results is True, and 'completed_splits' lists
+external splits used (for complete Results, 'partial' is False).
 
 The following :class:`~kdvs.fw.Stat.Results` elements are produced:
 
@@ -937,6 +1991,8 @@ This technique generates the following plots:
 See Also
 --------
 l1l2py.algorithms.l1_bound
+l1l2_native_model_selection
+l1l2_gram_eigenvalues
     """
     _version = '1.0.5'
     _global_parameters = DEFAULT_GLOBAL_PARAMETERS
@@ -973,12 +2029,49 @@ Raises
 ------
 Error
     if l1l2py library is not present, or a wrong version of l1l2py is present
+Error
+    if unknown engine or engine option was requested
+Error
+    if unknown grid search, or grid search other than 'full' with engine other
+    than 'native', or wrong number of refinement levels or grid points was requested
+Error
+    if unknown mu scaling option or non--positive tolerance was requested
         """
         verifyDepModule('l1l2py')
+        # optional parameters
+        engine = kwargs.pop('engine', DEFAULT_L1L2_ENGINE)
+        engine_options = kwargs.pop('engine_options', {})
+        if engine not in L1L2_ENGINES:
+            raise Error('Engine must be one of %s! (got %s)' % (L1L2_ENGINES, engine))
+        unknown_options = set(engine_options) - set(DEFAULT_NATIVE_ENGINE_OPTIONS)
+        if len(unknown_options) > 0:
+            raise Error('Unknown engine options! (got %s)' % sorted(unknown_options))
+        grid = engine_options.get('grid', DEFAULT_NATIVE_ENGINE_OPTIONS['grid'])
+        if grid not in L1L2_GRIDS:
+            raise Error('Grid search must be one of %s! (got %s)' % (L1L2_GRIDS, grid))
+        if grid != 'full' and engine != 'native':
+            raise Error('Grid search %s requires native engine! (got %s)' % (grid, engine))
+        if engine_options.get('grid_levels', 0) < 0:
+            raise Error('Number of grid refinement levels must not be negative! (got %s)' % engine_options['grid_levels'])
+        if engine_options.get('grid_points', 1) < 1:
+            raise Error('Number of grid points must be positive! (got %s)' % engine_options['grid_points'])
+        mu_scaling_options = dict(DEFAULT_GRAM_EIGENVALUES_OPTIONS)
+        unknown_options = set(kwargs.get('mu_scaling_options', {})) - set(mu_scaling_options)
+        if len(unknown_options) > 0:
+            raise Error('Unknown mu scaling options! (got %s)' % sorted(unknown_options))
+        mu_scaling_options.update(kwargs.pop('mu_scaling_options', {}))
+        if mu_scaling_options['tolerance'] <= 0:
+            raise Error('Tolerance of mu scaling must be positive! (got %s)' % mu_scaling_options['tolerance'])
+        gram_statistics = kwargs.pop('gram_statistics', None)
         if self._verify_version():
             super(L1L2_L1L2, self).__init__(list(itertools.chain(self._l1l2_parameters, self._global_parameters)), **kwargs)
         else:
             raise Error('L1L2Py %s must be provided to use this class!' % self._version)
+        self.parameters['engine'] = engine
+        self.parameters['engine_options'] = dict(DEFAULT_NATIVE_ENGINE_OPTIONS)
+        self.parameters['engine_options'].update(engine_options)
+        self.parameters['mu_scaling_options'] = mu_scaling_options
+        self.parameters['gram_statistics'] = gram_statistics
         self.results_elements.extend(DEFAULT_RESULTS)
         self.results_elements.extend(DEFAULT_CLASSIFICATION_RESULTS)
         self.results_elements.extend(DEFAULT_SELECTION_RESULTS)
@@ -1028,20 +2121,42 @@ primary data set; labels must be in the same order. By definition, KDVS does not
 check this.
         """
         super(L1L2_L1L2, self).createJob(ssname, data, labels)
-        calls = self._prepareL1L2call(data, labels)
+        calls = self._prepareL1L2call(data, labels, ssname)
+        # all jobs reference single lightweight instance of preparatory data;
+        # data of each split are passed only as arguments of its own job
+        shared_calls = self._shareL1L2call(calls)
+        calls_digest = computeDigest(shared_calls)
         external_k = self.parameters['external_k']
+        # tau paths are kept for each internal split, beta and selection for each mu
+        mu_number = len(calls['mu_range'])
+        paths = self.parameters['internal_k'] * len(calls['tau_range']) + 2 * mu_number
+        predictions = 2 * mu_number if self.parameters['return_predictions'] else 0
+        memory = _job_memory(data, labels, paths, predictions)
+        if self.parameters['engine'] == 'native':
+            call_func = l1l2_native_job_wrapper
+            depfuncs = (l1l2_ridge_formulation, l1l2_ridge_path, l1l2_gram_norm, l1l2_fista,
+                        l1l2_screened_regularization, l1l2_native_path,
+                        l1l2_adaptive_kcv_errors, l1l2_native_model_selection)
+            extra_args = (dict(self.parameters['engine_options']),)
+        else:
+            call_func = l1l2_l1l2_job_wrapper
+            depfuncs = ()
+            extra_args = ()
         for i in range(external_k):
             jobData = {
-                'depfuncs' : (),
+                'depfuncs' : depfuncs,
                 'modules' : ('l1l2py', 'numpy', 'os'),
+                'engine' : self.parameters['engine'],
                 'ext_split' : i,
                 'ssname' : ssname,
-                'calls' : calls,
+                'calls' : shared_calls,
+                'calls_digest' : calls_digest,
                 'data_shape' : data.shape,
+                'memory' : memory,
                 'labels' : labels,
                 }
             jobData.update(additionalJobData)
-            job = Job(call_func=l1l2_l1l2_job_wrapper, call_args=calls[i]['call_args'], additional_data=jobData)
+            job = Job(call_func=call_func, call_args=calls[i]['call_args'] + extra_args, additional_data=jobData)
             # make custom ID
             customID = '%s_split%d' % (ssname, i)
             # yield always pair (customID, job)
@@ -1052,7 +2167,9 @@ check this.
 Produce single :class:`~kdvs.fw.Stat.Results` instance for job results coming from
 all external splits performed on the same data subset. To produce the final Results
 instance, all job results must be completed correctly; sometimes this may not be
-the case (see l1l2py documentation for more details).
+the case (see l1l2py documentation for more details). Jobs cancelled due to early
+rejection of data subset are skipped, and partial Results are produced from the
+remaining ones.
 
 Parameters
 ----------
@@ -1083,13 +2200,14 @@ Warn
     if some jobs finished with an error (on l1l2py side)
 Warn
     if the result has not been produced for some jobs (other reasons) 
+Warn
+    if all jobs were cancelled
         """
         # ---- we expect that partial results for all external splits are produced
         external_k = self.parameters['external_k']
-        ext_splits = range(external_k)
         commonSSName = set()
         splits = set()
-        refSplits = set(ext_splits)
+        refSplits = set(range(external_k))
         for job in jobs:
             commonSSName.add(job.additional_data['ssname'])
             splits.add(job.additional_data['ext_split'])
@@ -1098,13 +2216,12 @@ Warn
             raise Error('%s Jobs for %s are generated for different subsets! (%s)' % (self._LOG_PREFIX, ssname, list(commonSSName)))
         else:
             ssname = next(iter(commonSSName))
-        # ---- verify that 'calls' instances are identical
-        calls = None
-        all_calls = [j.additional_data['calls'] for j in jobs]
-        group_calls = [g for g, _ in itertools.groupby(all_calls)]
-        if len(group_calls) == 1:
-            calls = group_calls[0]
-        else:
+        # ---- verify that 'calls' instances are identical; jobs created together
+        # share the same instance, otherwise (e.g. deserialized jobs) digests of
+        # instances are compared
+        calls = jobs[0].additional_data['calls']
+        same_calls = [j.additional_data['calls'] is calls for j in jobs]
+        if not all(same_calls) and len(set([self._callsDigest(j) for j in jobs])) > 1:
             raise Error('%s Multiple L1L2 preparatory data instances found for %s! Make sure that exactly one instance is distributed with each job!' % (self._LOG_PREFIX, ssname))
         # ---- verify that data shapes are identical
         data_shape = None
@@ -1119,14 +2236,19 @@ Warn
             raise Warn('%s Not all jobs for %s (external splits) were generated! (missing: %s). Check for possible job exceptions!' % (self._LOG_PREFIX, ssname, sorted(list(remSplits))))
         not_produced = [j.additional_data['ext_split'] for j in jobs if j.result == NOTPRODUCED]
         if len(not_produced) > 0:
-            raise Warn('%s Not all jobs for %s (external splits) produced raw results! (missing: %s). Check for possible job exceptions!' % (self._LOG_PREFIX, sorted(not_produced)))
+            raise Warn('%s Not all jobs for %s (external splits) produced raw results! (missing: %s). Check for possible job exceptions!' % (self._LOG_PREFIX, ssname, sorted(not_produced)))
+        # ---- jobs of external splits may be cancelled if data subset was rejected early
+        cancelled = set([j.additional_data['ext_split'] for j in jobs if j.result == JOBCANCELLED])
+        ext_splits = [i for i in range(external_k) if i not in cancelled]
+        if len(ext_splits) == 0:
+            raise Warn('%s All jobs for %s (external splits) were cancelled!' % (self._LOG_PREFIX, ssname))
         # obtain samples instance (single one is sufficient)
         samples = jobs[0].additional_data['samples']
         # obtain labels instance (single one is sufficient)
         labels = jobs[0].additional_data['labels']
         # proceed with generating Results
         resultsInst = Results(ssID=ssname, elements=self.results_elements)
-        # ---- sort jobs according to splits
+        # ---- sort jobs according to completed splits
         splitJobs = list()
         for i in ext_splits:
             for j in jobs:
@@ -1135,16 +2257,47 @@ Warn
         # ---- get raw output for each job
         outputs = [j.result for j in splitJobs]
         # ---- postprocess external splits
-        self._postprocessExtSplits(splitJobs, outputs, calls, data_shape, samples, labels, resultsInst)
+        self._postprocessExtSplits(ext_splits, outputs, calls, data_shape, samples, labels, resultsInst)
         # ---- produce plots
-        self._produceExtSplitsPlots(ssname, outputs, calls, resultsInst)
+        self._produceExtSplitsPlots(ssname, ext_splits, outputs, calls, resultsInst)
         # ---- store selected runtime information
         resultsInst[RESULTS_RUNTIME_KEY]['techID'] = runtime_data['techID']
+        resultsInst[RESULTS_RUNTIME_KEY]['engine'] = jobs[0].additional_data.get('engine')
+        resultsInst[RESULTS_RUNTIME_KEY]['partial'] = len(cancelled) > 0
+        resultsInst[RESULTS_RUNTIME_KEY]['completed_splits'] = ext_splits
         return resultsInst
 
-    def _postprocessExtSplits(self, splitJobs, outputs, calls, data_shape, samples, labels, result):
-        external_k = self.parameters['external_k']
-        ext_splits = range(external_k)
+    def collectSplitErrors(self, ssname, jobs):
+        r"""
+Collect errors obtained on external test splits for each DOF (i.e. 'mu' value),
+from jobs that already produced raw results (see
+:meth:`~kdvs.fw.Stat.Technique.collectSplitErrors`).
+
+Parameters
+----------
+ssname : string
+    identifier of data subset being processed; typically, equivalent to associated
+    prior knowledge concept
+
+jobs : iterable of :class:`~kdvs.fw.Job.Job`
+    finished job(s) that contain(s) raw results
+
+Returns
+-------
+(split_errors, numof_splits) : iterable of dict, integer
+    tuple of the following: errors obtained on external test splits processed
+    so far, each one as dictionary {DOF : error}, and the value of the parameter
+    'external_k'
+        """
+        dofs = self.parameters['global_degrees_of_freedom']
+        split_errors = list()
+        for job in jobs:
+            if isinstance(job.result, dict):
+                split_errors.append(dict(zip(dofs, job.result['err_ts_list'])))
+        return split_errors, self.parameters['external_k']
+
+    def _postprocessExtSplits(self, ext_splits, outputs, calls, data_shape, samples, labels, result):
+        # outputs are ordered as completed external splits
         # ---- obtain average results from raw outputs
         lambda_range = calls['lambda_range']
         tau_range = calls['tau_range']
@@ -1215,7 +2368,7 @@ Warn
         for mu in range(mu_number):
             add_result[mu] = dict()
             tp = tn = fp = fn = 0
-            for i in ext_splits:
+            for i, output in zip(ext_splits, outputs):
                 add_result[mu][i] = dict()
                 if self.parameters['return_predictions']:
                     # ---- calculate confusion matrix elements for external split
@@ -1226,7 +2379,7 @@ Warn
 #                        origSamples = samples[test_idxs, :]
                         origSamples = [samples[ti] for ti in test_idxs]
                         orig = [numpy.sign(l) for l in origLabels[test_idxs, :]]
-                        pred = [numpy.sign(l)[0] for l in outputs[i]['prediction_ts_list'][mu]]
+                        pred = [numpy.sign(l)[0] for l in output['prediction_ts_list'][mu]]
                         ttp, ttn, tfp, tfn = calculateConfusionMatrix(orig, pred)
                         tp += ttp
                         tn += ttn
@@ -1238,15 +2391,15 @@ Warn
                     except KeyError:
                         pass
                 # ---- store frequencies for external split
-                tfreqs[mu] += numpy.asarray(outputs[i]['selected_list'][mu], dtype=numpy.int)
+                tfreqs[mu] += numpy.asarray(output['selected_list'][mu], dtype=numpy.int)
                 # ---- store model for external split
-                add_result[mu][i]['model'] = outputs[i]['beta_list'][mu]
+                add_result[mu][i]['model'] = output['beta_list'][mu]
             if self.parameters['return_predictions']:
                 # ---- calculate average confusion matrix elements and MCC for each mu
                 mcc = calculateMCC(tp, tn, fp, fn)
                 add_result[mu]['cm_mcc'] = (tp, tn, fp, fn, mcc)
         # ---- normalize frequencies
-        freqs = tfreqs / float(external_k)
+        freqs = tfreqs / float(len(ext_splits))
         add_result['freqs'] = freqs
         # ---- store MuExt results
         result['MuExt'] = add_result
@@ -1265,9 +2418,15 @@ Warn
                         predictions[dof]['orig_labels'][ui] = add_result[mu][i]['orig_labels'][ti]
                         predictions[dof]['pred_labels'][ui] = add_result[mu][i]['pred_labels'][ti]
                         predictions[dof]['orig_samples'][ui] = add_result[mu][i]['orig_samples'][ti]
-                # make sure that indexing reconstruction was correct
-                assert list(predictions[dof]['orig_samples']) == list(samples)
-                assert list(predictions[dof]['orig_labels']) == list(labels)
+                if len(ext_splits) < self.parameters['external_k']:
+                    # partial results cover only test samples of completed splits
+                    covered = [ui for ui, s in enumerate(predictions[dof]['orig_samples']) if s is not None]
+                    for k in ('orig_labels', 'pred_labels', 'orig_samples'):
+                        predictions[dof][k] = [predictions[dof][k][ui] for ui in covered]
+                else:
+                    # make sure that indexing reconstruction was correct
+                    assert list(predictions[dof]['orig_samples']) == list(samples)
+                    assert list(predictions[dof]['orig_labels']) == list(labels)
             result['Predictions'] = predictions
         # ---- store MCC related information
         cm_mcc = dict()
@@ -1280,7 +2439,7 @@ Warn
         # ---- prepare space for selection results
         result['Selection'] = dict()
 
-    def _produceExtSplitsPlots(self, ssname, outputs, calls, result):
+    def _produceExtSplitsPlots(self, ssname, ext_splits, outputs, calls, result):
 #        calls = result['Calls']
         lambda_range = calls['lambda_range']
         tau_range = calls['tau_range']
@@ -1289,7 +2448,7 @@ Warn
         plots = result[RESULTS_PLOTS_ID_KEY]
         # ---- produce plots for external splits
         # ---- error surface for all individual external splits
-        for i, out in enumerate(outputs):
+        for i, out in zip(ext_splits, outputs):
             valid_tau = out['kcv_err_ts'].shape[0]
             # create file name
             plot_name = '%s_avg_kcv_err_%d' % (ssname, i)
@@ -1362,17 +2521,46 @@ Warn
         # add to plots
         plots[pred_error_tr_plot_full_name] = pred_error_tr_plot_content
 
-    def _prepareL1L2call(self, data, labels):
+    def _shareL1L2call(self, calls):
+        # preparatory data without call arguments of external splits
+        shared_calls = dict()
+        for k, v in calls.iteritems():
+            if isinstance(v, dict):
+                shared_calls[k] = dict([(ck, cv) for ck, cv in v.iteritems() if ck != 'call_args'])
+            else:
+                shared_calls[k] = v
+        return shared_calls
+
+    def _callsDigest(self, job):
+        try:
+            return job.additional_data['calls_digest']
+        except KeyError:
+            return computeDigest(job.additional_data['calls'])
+
+    def _prepareL1L2call(self, data, labels, ssname=None):
         # try to transpose if dimensions do not match
         if data.shape[0] != labels.shape[0]:
             data = data.T
         calls = dict()
         # obtain lambda range
         lambda_range = self._determine_lambda_range()
+        # Gram statistics of normalized subset may be precomputed
+        gram, corr = None, None
+        gram_stats = self.parameters['gram_statistics']
+        if gram_stats is not None and gram_stats.matches(self.parameters['data_normalizer'],
+                                                         self.parameters['labels_normalizer']):
+            gram = gram_stats.getGram(ssname)
+            corr = gram_stats.getCorrelation(ssname)
+        if gram is None:
+            # normalize whole subset once for both tau and mu ranges
+            norm_data, norm_labels = self._normalize_subset(data, labels)
+        else:
+            # only the shape of data is needed
+            norm_data, norm_labels = data, labels
         # obtain correct tau range
-        tau_range = self._calculate_tau_range(data, labels)
+        tau_range = self._calculate_tau_range(norm_data, norm_labels, corr)
         # obtain correct mu range
-        mu_range = self._calculate_mu_range(data)
+        mu_range = self._calculate_mu_range(norm_data, gram)
         # prepare external splits
 #        ext_cv_sets = l1l2py.tools.stratified_kfold_splits(labels, self.parameters['external_k'])
         ext_split_sets = self.parameters['ext_split_sets']
@@ -1403,17 +2591,25 @@ Warn
         calls['mu_range'] = mu_range
         return calls
 
-    def _calculate_tau_range(self, data, labels):
-        # determine tau parameter range
-        # normalize data if requested
+    def _normalize_subset(self, data, labels):
+        # normalize data and labels if requested
         data_normalizer = self.parameters['data_normalizer']
         labels_normalizer = self.parameters['labels_normalizer']
         if data_normalizer is not None:
             data = data_normalizer(data)
         if labels_normalizer is not None:
             labels = labels_normalizer(labels)
+        return data, labels
+
+    def _calculate_tau_range(self, data, labels, corr=None):
+        # determine tau parameter range
+        # data and labels are already normalized, unless their correlation is given
         # get scaling factors and determine min and max
-        upper_bound_tau = l1l2py.algorithms.l1_bound(data, labels)
+        if corr is None:
+            upper_bound_tau = l1l2py.algorithms.l1_bound(data, labels)
+        else:
+            # the same as l1l2py.algorithms.l1_bound
+            upper_bound_tau = numpy.abs(corr).max() * (2.0 / data.shape[0])
         tau_min_scale = self.parameters['tau_min_scale']
         tau_max_scale = self.parameters['tau_max_scale']
         tau_max = upper_bound_tau * tau_max_scale
@@ -1427,14 +2623,11 @@ Warn
         tau_range = rf(tau_min, tau_max, tau_number)
         return tau_range
 
-    def _calculate_mu_range(self, data):
+    def _calculate_mu_range(self, data, gram=None):
         # determine mu parameter range
-        # normalize data if requested
-        data_normalizer = self.parameters['data_normalizer']
-        if data_normalizer:
-            data = data_normalizer(data)
+        # data are already normalized, unless their covariance matrix is given
         # determine mu range
-        mu_fact = self._mu_scaling_factor(data)
+        mu_fact = self._mu_scaling_factor(data, gram)
         mu_min = mu_fact * self.parameters['mu_scaling_factor_min']
         mu_max = mu_fact * self.parameters['mu_scaling_factor_max']
         mtype = self.parameters['mu_range_type']
@@ -1446,15 +2639,15 @@ Warn
         mu_range = rf(mu_min, mu_max, mu_number)
         return mu_range
 
-    def _mu_scaling_factor(self, data):
+    def _mu_scaling_factor(self, data, gram=None):
         n, d = data.shape
+        options = self.parameters['mu_scaling_options']
         if d > n:
-            tmp = numpy.dot(data, data.T)
-            num = numpy.linalg.eigvalsh(tmp).max()
+            _, num = l1l2_gram_eigenvalues(data, smallest=False, **options)
         else:
-            tmp = numpy.dot(data.T, data)
-            evals = numpy.linalg.eigvalsh(tmp)
-            num = evals.max() + evals.min()
+            # precomputed covariance matrix is the smaller Gram matrix here
+            evals_min, evals_max = l1l2_gram_eigenvalues(data, smallest=True, gram=gram, **options)
+            num = evals_max + evals_min
         return (num / (2.*n))
 
     def _determine_lambda_range(self):
@@ -1481,6 +2674,299 @@ Warn
         return l1l2py.__version__ == self._version
 
 
+# ---- L1L2_Cascade meta technique
+
+L1L2_CASCADE_STAGES = ('screen', 'full')
+r"""
+Stages of :class:`L1L2_Cascade` that may produce Results: screening only, and
+full model selection.
+"""
+
+L1L2_CASCADE_STATISTICS = (
+    'Avg Err TS', 'Std Err TS', 'Med Err TS', 'Var Err TS',
+    'Avg Err TR', 'Std Err TR', 'Med Err TR', 'Var Err TR',
+    )
+r"""
+Error statistics of screening technique that are passed to Results of data subsets
+rejected by screening.
+"""
+
+
+class L1L2_Cascade(Technique):
+    r"""
+Meta technique that cascades cheap screening technique (e.g. :class:`L1L2_OLS`
+or :class:`L1L2_RLS`) and expensive full technique (e.g. :class:`L1L2_L1L2`). Each
+data subset is screened first; full model selection is performed only if the
+screening error, i.e. the smallest 'Classification Error' produced by screening
+technique, is below (<) the threshold. Since typically only a fraction of data
+subsets pass screening, whole--ontology runs perform much less computation. It
+can be configured with the following parameters:
+
+    * 'screening_technique' (:class:`~kdvs.fw.Stat.Technique`/dict) -- screening
+        technique instance, or its specification in the same format as used for
+        statistical techniques in application profile, i.e. {qualified_class_name : parameters}
+    * 'full_technique' (:class:`~kdvs.fw.Stat.Technique`/dict) -- full technique
+        instance, or its specification as above
+    * 'screening_threshold' (float) -- threshold of screening error
+
+The configuration parameters are interpreted once, during initialization. Degrees
+of freedom (DOFs) of this technique are those of full technique; if 'global_degrees_of_freedom'
+is None, they are taken from full technique. Screening technique that does not
+specify its DOFs uses the first DOF of this technique. Parameters 'external_k' and
+'ext_split_sets' of full technique, if present, are exposed by this technique, so
+that pre--computed splits may be provided by EnvOp (see
+:class:`~kdvs.fw.impl.envop.L1L2.L1L2_UniformExtSplitProvider`); they are used
+by wrapped techniques that make the same number of splits.
+
+Jobs of screening technique are created first, and are executed by job container
+as any other jobs. Jobs of full technique are created only for data subsets that
+passed screening, once their screening jobs are finished (see :meth:`createFollowUpJob`).
+For data subsets that passed screening, Results are produced by full technique.
+For data subsets rejected by screening, Results contain the same elements as
+Results of full technique, filled in as follows:
+
+    * 'Classification Error' -- screening error, for all DOFs
+    * error statistics (see :data:`L1L2_CASCADE_STATISTICS`) -- the ones produced
+        by screening technique for the best DOF, for all DOFs, or NaN if not produced
+    * 'CM MCC', 'Predictions' -- the ones produced by screening technique for the
+        best DOF, for all DOFs, if produced
+    * 'MuExt' -- zero frequencies of all variables, for all DOFs
+    * 'Selection' -- empty
+
+The remaining elements are not present. Such Results are marked as rejected by
+screening (see :data:`~kdvs.fw.Stat.RESULTS_SCREENED_OUT_KEY`), so that outer
+selectors do not select them on the basis of screening error. The stage that
+produced Results (one of :data:`L1L2_CASCADE_STAGES`) is stored as 'cascade_stage',
+and screening error as 'screening_error', in runtime data of Results.
+    """
+    _cascade_parameters = ('screening_technique', 'full_technique', 'screening_threshold')
+    _global_parameters = DEFAULT_GLOBAL_PARAMETERS
+    _shared_parameters = ('external_k', 'ext_split_sets')
+    _LOG_PREFIX = '[L1L2_Cascade]'
+
+    def __init__(self, **kwargs):
+        r"""
+Parameters
+----------
+kwargs : dict
+    keyworded parameters to configure this technique; refer to the documentation for
+    extensive list
+
+Raises
+------
+Error
+    if screening or full technique was not specified correctly
+        """
+        super(L1L2_Cascade, self).__init__(list(itertools.chain(self._cascade_parameters, self._global_parameters)), **kwargs)
+        self.screening = self._resolveTechnique(self.parameters['screening_technique'])
+        self.full = self._resolveTechnique(self.parameters['full_technique'])
+        if self.parameters['global_degrees_of_freedom'] is None:
+            self.parameters['global_degrees_of_freedom'] = self.full.parameters['global_degrees_of_freedom']
+        for param in self._shared_parameters:
+            if param in self.full.parameters:
+                self.parameters[param] = self.full.parameters[param]
+        self.results_elements = list(self.full.results_elements)
+        self.follow_up = True
+
+    def createJob(self, ssname, data, labels, additionalJobData={}):
+        r"""
+Create :class:`~kdvs.fw.Job.Job` instances of screening technique for data subset.
+Each job is marked with the stage 'screen' as 'cascade_stage' in its additional
+data; custom job IDs of screening technique are suffixed with '_screen'. Data
+subset is kept until jobs of full technique are created (see :meth:`createFollowUpJob`).
+
+Parameters
+----------
+ssname : string
+    identifier of data subset being processed; typically, equivalent to associated
+    prior knowledge concept
+
+data : :class:`numpy.ndarray`
+    data subset to be processed
+
+labels : :class:`numpy.ndarray`
+    associated label information to be processed
+
+additionalJobData : dict
+    any additional information that will be associated with each job produced;
+    empty dictionary by default
+
+Returns
+-------
+(jID, job) : string, :class:`~kdvs.fw.Job.Job`
+    tuple of the following: custom job ID, and Job instance to be executed
+        """
+        super(L1L2_Cascade, self).createJob(ssname, data, labels)
+        self._shareParameters()
+        # ---- data subset is needed by full technique, if screening is passed
+        self.techdata[ssname] = (data, labels, dict(additionalJobData))
+        for customID, job in self.screening.createJob(ssname, data, labels, additionalJobData):
+            job.additional_data['cascade_stage'] = 'screen'
+            # ---- data orientation: (variables, samples)
+            job.additional_data['cascade_numof_vars'] = data.shape[0]
+            if customID is not None:
+                customID = '%s_screen' % customID
+            yield (customID, job)
+
+    def createFollowUpJob(self, ssname, jobs):
+        r"""
+Produce Results of screening technique from finished screening jobs of data subset.
+If screening error is below (<) the value of the parameter 'screening_threshold',
+create all :class:`~kdvs.fw.Job.Job` instances of full technique, marked with
+the stage 'full' as 'cascade_stage', and with screening error as 'screening_error',
+in their additional data. Otherwise, or if any screening job did not produce its
+result, no jobs are created. Full technique follows screening only once.
+
+Parameters
+----------
+ssname : string
+    identifier of data subset being processed; typically, equivalent to associated
+    prior knowledge concept
+
+jobs : iterable of :class:`~kdvs.fw.Job.Job`
+    finished job(s) created so far for the data subset
+
+Returns
+-------
+(jID, job) : list of (string, :class:`~kdvs.fw.Job.Job`)
+    tuples of the following: custom job ID, and Job instance to be executed; empty
+    if data subset was rejected by screening, or full technique already follows
+        """
+        if ssname not in self.techdata:
+            return []
+        data, labels, additionalJobData = self.techdata.pop(ssname)
+        screening_jobs = [j for j in jobs if j.additional_data.get('cascade_stage') == 'screen']
+        if any([j.result is NOTPRODUCED or j.result is JOBCANCELLED for j in screening_jobs]):
+            return []
+        screening = self._screen(ssname, screening_jobs, additionalJobData.get('technique'))
+        if screening['error'] >= self.parameters['screening_threshold']:
+            return []
+        # ---- subset passed screening, proceed with full technique
+        self._shareParameters()
+        full_jobs = list()
+        for customID, job in self.full.createJob(ssname, data, labels, additionalJobData):
+            job.additional_data['cascade_stage'] = 'full'
+            job.additional_data['screening_error'] = screening['error']
+            full_jobs.append((customID, job))
+        return full_jobs
+
+    def produceResults(self, ssname, jobs, runtime_data):
+        r"""
+Produce single :class:`~kdvs.fw.Stat.Results` instance, either by full technique
+from its jobs, if data subset passed screening, or from the summary of screening
+jobs otherwise.
+
+Parameters
+----------
+ssname : string
+    identifier of data subset being processed; typically, equivalent to associated
+    prior knowledge concept
+
+jobs : iterable of :class:`~kdvs.fw.Job.Job`
+    executed job(s) that contain(s) raw results
+
+runtime_data : dict
+    data collected in runtime that shall be included in the final Results instance
+
+Returns
+-------
+final_results : :class:`~kdvs.fw.Stat.Results`
+    Results instance that contains final results of the technique
+        """
+        self._shareParameters()
+        # ---- data subset is not needed anymore
+        self.techdata.pop(ssname, None)
+        full_jobs = [j for j in jobs if j.additional_data.get('cascade_stage') == 'full']
+        if len(full_jobs) > 0:
+            stage = 'full'
+            results = self.full.produceResults(ssname, full_jobs, runtime_data)
+            screening_error = full_jobs[0].additional_data['screening_error']
+        else:
+            stage = 'screen'
+            screening_jobs = [j for j in jobs if j.additional_data.get('cascade_stage') == 'screen']
+            screening = self._screen(ssname, screening_jobs, runtime_data['techID'])
+            results = self._createScreenedResults(ssname, screening)
+            results[RESULTS_RUNTIME_KEY]['techID'] = runtime_data['techID']
+            results[RESULTS_RUNTIME_KEY][RESULTS_SCREENED_OUT_KEY] = True
+            screening_error = screening['error']
+        results[RESULTS_RUNTIME_KEY]['cascade_stage'] = stage
+        results[RESULTS_RUNTIME_KEY]['screening_error'] = screening_error
+        return results
+
+    def collectSplitErrors(self, ssname, jobs):
+        r"""
+Collect errors obtained on splits by full technique (see
+:meth:`~kdvs.fw.Stat.Technique.collectSplitErrors`). Until jobs of full technique
+are finished, errors are not collected and None is returned.
+        """
+        full_jobs = [j for j in jobs if j.additional_data.get('cascade_stage') == 'full']
+        if len(full_jobs) == 0:
+            return None
+        self._shareParameters()
+        return self.full.collectSplitErrors(ssname, full_jobs)
+
+    def _resolveTechnique(self, spec):
+        if isinstance(spec, Technique):
+            return spec
+        if not isinstance(spec, dict) or len(spec) != 1:
+            raise Error('%s Technique or single technique specification expected! (got %s)' % (self._LOG_PREFIX, spec))
+        componentID, params = next(iter(spec.iteritems()))
+        return importComponent(componentID)(**params)
+
+    def _shareParameters(self):
+        # DOFs and splits of this technique may be resolved after initialization
+        dofs = self.parameters['global_degrees_of_freedom']
+        self.full.parameters['global_degrees_of_freedom'] = dofs
+        if self.screening.parameters['global_degrees_of_freedom'] is None:
+            self.screening.parameters['global_degrees_of_freedom'] = tuple(dofs[:1])
+        ext_split_sets = self.parameters.get('ext_split_sets')
+        if ext_split_sets is not None:
+            for technique in (self.screening, self.full):
+                if technique.parameters.get('external_k') == self.parameters['external_k']:
+                    technique.parameters['ext_split_sets'] = ext_split_sets
+
+    def _screen(self, ssname, screening_jobs, techID):
+        screening_results = self.screening.produceResults(ssname, screening_jobs, {'techID' : techID})
+        return self._summarizeScreening(screening_results, screening_jobs[0].additional_data['cascade_numof_vars'])
+
+    def _summarizeScreening(self, results, numof_vars):
+        screening_dofs = list(self.screening.parameters['global_degrees_of_freedom'])
+        class_err = results['Classification Error']
+        best_dof = min(screening_dofs, key=class_err.__getitem__)
+        best_idx = screening_dofs.index(best_dof)
+        statistics = dict()
+        for element in L1L2_CASCADE_STATISTICS:
+            if element in results.keys() and results[element] is not NOTPRESENT:
+                statistics[element] = numpy.asarray(results[element]).ravel()[best_idx]
+        screening = {
+            'error' : class_err[best_dof],
+            'statistics' : statistics,
+            'numof_vars' : numof_vars,
+        }
+        for element in ('CM MCC', 'Predictions'):
+            if element in results.keys() and isinstance(results[element], dict):
+                screening[element] = results[element][best_dof]
+        return screening
+
+    def _createScreenedResults(self, ssname, screening):
+        results = Results(ssID=ssname, elements=self.results_elements)
+        dofs = self.parameters['global_degrees_of_freedom']
+        nof_dofs = len(dofs)
+        results['Classification Error'] = dict([(dof, screening['error']) for dof in dofs])
+        for element in L1L2_CASCADE_STATISTICS:
+            if element in self.results_elements:
+                value = screening['statistics'].get(element, numpy.nan)
+                results[element] = numpy.repeat(value, nof_dofs)
+        for element in ('CM MCC', 'Predictions'):
+            if element in self.results_elements and element in screening:
+                results[element] = dict([(dof, screening[element]) for dof in dofs])
+        if 'MuExt' in self.results_elements:
+            numof_vars = screening['numof_vars']
+            results['MuExt'] = {'freqs' : numpy.zeros((nof_dofs, numof_vars), dtype=numpy.float)}
+        results['Selection'] = dict()
+        return results
+
+
 # ---- L1L2_L1L2 specific graphs
 
 class L1L2KfoldErrorsGraph(MatplotlibPlot):
@@ -1639,7 +3125,8 @@ kwargs : dict
             raise Error('Necessary data element missed! (%s)' % ke)
         # create plot (with default matplotlib autoincrement)
         plt.figure(None)
-        plt.boxplot(errors, positions=numpy.log10(mu_range))
+        # errors of single 'mu' value across splits form single box
+        plt.boxplot(numpy.asarray(errors), positions=numpy.log10(mu_range))
         plt.suptitle(title)
         plt.xlabel('$log_{10}(\\mu)$')
         plt.ylabel('$error$')
@@ -24,8 +24,9 @@ sketched, the selectors implemented here are not freely portable and many detail
 are still hard--coded.
 """
 
-from kdvs.fw.Stat import Selector, SELECTIONERROR, SELECTED, NOTSELECTED
-from kdvs.core.error import Warn
+from kdvs.fw.Stat import Selector, SELECTIONERROR, SELECTED, NOTSELECTED, \
+    RESULTS_RUNTIME_KEY, RESULTS_SCREENED_OUT_KEY
+from kdvs.core.error import Error, Warn
 
 class OuterSelector(Selector):
     r"""
@@ -37,7 +38,9 @@ criteria related to classification error. Or, if individual classification
 error for that data subset is below median classification error computed across
 all considered data subsets, it may be marked as 'selected', etc. The concrete
 implementation accepts iterable of :class:`~kdvs.fw.Stat.Results` instances,
-and can compute whatever passing criteria it sees fit. It must fill Results
+and can compute whatever passing criteria it sees fit; Results of data subsets
+rejected by screening (see :data:`~kdvs.fw.Stat.RESULTS_SCREENED_OUT_KEY`) must not
+be selected. It must fill Results
 element 'Selection', subdictionary 'outer', for reporting; later, the associated
 Reporter must interpret it correctly. Very often, outer selector is closely tied
 to inner selector.
@@ -66,6 +69,31 @@ indResultIter : iterable of :class:`~kdvs.fw.Stat.Results`
         """
         pass
 
+    def rejectEarly(self, splitErrors, numof_splits):
+        r"""
+Decide if the prior knowledge concept can be rejected before all splits of the
+associated data subset are processed, i.e. if it provably cannot be 'selected'
+regardless of errors obtained on remaining splits. Used in 'experiment' application
+to cancel remaining jobs of rejected data subsets; errors are collected by
+statistical technique (see :meth:`~kdvs.fw.Stat.Technique.collectSplitErrors`).
+By default, no data subset is rejected.
+
+Parameters
+----------
+splitErrors : iterable of dict
+    classification errors obtained on splits processed so far, each one as
+    dictionary {DOF : error}
+
+numof_splits : integer
+    total number of splits processed by the technique
+
+Returns
+-------
+rejected : boolean
+    True if the prior knowledge concept can be rejected, False otherwise
+        """
+        return False
+
 class InnerSelector(Selector):
     r"""
 Base class for 'inner selectors'. The 'inner selection' refers to the individual
@@ -127,6 +155,12 @@ Outer selector that marks PKC as 'selected' if associated classification error
 (that must be present in :class:`~kdvs.fw.Stat.Results` instance as
 'Classification Error') is below (<) the configurable threshold. The error
 threshold is specified during initialization and interpreted once.
+
+Optionally, hopeless PKCs may be rejected early (see :meth:`rejectEarly`): after
+the configurable number of splits of the associated data subset is processed,
+the lower bound of its classification error is known, since errors of remaining
+splits cannot be negative. If the bound is not below the threshold for any DOF,
+PKC cannot be 'selected' anymore.
     """
     _parameters = ('error_threshold',)
 
@@ -137,8 +171,21 @@ Parameters
 kwargs : dict
     parameters to configure this outer selector; the following parameters are used:
         * 'error_threshold' (float) -- error threshold that this instance will use
+    the following parameters are optional:
+        * 'early_rejection_splits' (int) -- number of splits that must be processed
+          before PKC may be rejected early; None (no early rejection) by default
+
+Raises
+------
+Error
+    if number of splits for early rejection is not positive
         """
+        early_rejection_splits = kwargs.pop('early_rejection_splits', None)
+        if early_rejection_splits is not None and early_rejection_splits < 1:
+            raise Error('Number of splits for early rejection must be positive! (got %s)' % early_rejection_splits)
         super(OuterSelector_ClassificationErrorThreshold, self).__init__(self._parameters, **kwargs)
+        if early_rejection_splits is not None:
+            self.parameters['early_rejection_splits'] = early_rejection_splits
 
     def perform(self, indResultIter):
         r"""
@@ -147,6 +194,8 @@ Mark each individual :class:`~kdvs.fw.Stat.Results` instance as
 the classification error. The value of classification error is compared to
 error threshold; if it is smaller (<), then PKC is marked as
 :data:`~kdvs.fw.Stat.SELECTED`, and as :data:`~kdvs.fw.Stat.NOTSELECTED` otherwise.
+PKC rejected by screening (see :data:`~kdvs.fw.Stat.RESULTS_SCREENED_OUT_KEY`) is
+marked as :data:`~kdvs.fw.Stat.NOTSELECTED` for all DOFs.
 Note that for technique that uses not--null multiple degrees of freedom (DOFs),
 each DOF can be associated with different classification error; this is often the
 case when the statistical technique is regularized and certain parameter values
@@ -175,7 +224,11 @@ cres : iterable of dict
             for indResult in indResultIter:
                 try:
                     class_err = indResult['Classification Error']
-                    result = dict([(dof, SELECTED if err < cerr_thr else NOTSELECTED) for (dof, err) in class_err.iteritems()])
+                    if indResult[RESULTS_RUNTIME_KEY].get(RESULTS_SCREENED_OUT_KEY, False):
+                        # screening error does not qualify for selection
+                        result = dict([(dof, NOTSELECTED) for dof in class_err.keys()])
+                    else:
+                        result = dict([(dof, SELECTED if err < cerr_thr else NOTSELECTED) for (dof, err) in class_err.iteritems()])
                     indResult['Selection']['outer'] = result
                 except KeyError:
                     result = err_res
@@ -185,6 +238,41 @@ cres : iterable of dict
             cres.append(err_res)
             return cres
 
+    def rejectEarly(self, splitErrors, numof_splits):
+        r"""
+Decide if PKC can be rejected early. Classification error is the average of
+errors obtained on all splits; assuming zero error on splits not processed yet,
+its lower bound is the sum of errors obtained so far divided by the total number
+of splits. PKC is rejected if at least 'early_rejection_splits' splits are
+processed, and the lower bound is not below (>=) error threshold for any DOF
+(i.e. PKC would be marked as :data:`~kdvs.fw.Stat.NOTSELECTED` for all DOFs).
+
+Parameters
+----------
+splitErrors : iterable of dict
+    classification errors obtained on splits processed so far, each one as
+    dictionary {DOF : error}
+
+numof_splits : integer
+    total number of splits processed by the technique
+
+Returns
+-------
+rejected : boolean
+    True if PKC can be rejected, False otherwise
+        """
+        early_rejection_splits = self.parameters.get('early_rejection_splits')
+        splitErrors = list(splitErrors)
+        if early_rejection_splits is None or len(splitErrors) < early_rejection_splits or len(splitErrors) == 0:
+            return False
+        cerr_thr = self.parameters['error_threshold']
+        dofs = splitErrors[0].keys()
+        for dof in dofs:
+            bound = sum([se[dof] for se in splitErrors]) / float(numof_splits)
+            if bound < cerr_thr:
+                return False
+        return True
+
 class InnerSelector_ClassificationErrorThreshold_AllVars(InnerSelector):
     r"""
 Inner selector that marks all variables coming from 'properly selected' data subsets
@@ -0,0 +1,321 @@
+# Knowledge Driven Variable Selection (KDVS)
+# Copyright (C) 2014 KDVS Developers. All rights reserved.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from kdvs.bin.experiment import _resumeJobResult, _rawOutputWriter, \
+    _followUpScheduler, _jobFinishedNotifier, _flushJobWindow, _streamSeed
+from kdvs.core.error import Error
+from kdvs.core.util import BackgroundWriter, serializeObj, deserializeObj
+from kdvs.fw.Job import Job, NOTPRODUCED, JOBERROR, JobGroupManager, \
+    CompletionJobGroupManager
+from kdvs.fw.JobCache import computeJobKey
+from kdvs.fw.impl.job.SimpleJob import SimpleJobContainer
+from kdvs.tests import resolve_unittest, TEST_INVARIANTS
+import logging
+import os
+import shutil
+
+unittest = resolve_unittest()
+
+_RAW_OUTPUT_SUFFIX = 'RawOutput'
+
+def _f1(*args):
+    return sum(args)
+
+def _f2(*args):
+    raise ValueError(args)
+
+def _store(path, obj):
+    with open(path, 'wb') as f:
+        serializeObj(obj, f)
+
+def _load(path):
+    with open(path, 'rb') as f:
+        return deserializeObj(f)
+
+class TestResumeJobResult1(unittest.TestCase):
+
+    def setUp(self):
+        self.jobs_dir = os.path.join(TEST_INVARIANTS['test_write_root'], 'resume_jobs')
+        os.makedirs(self.jobs_dir)
+        self.job = Job(_f1, (1, 2), additional_data={'seed' : 11})
+        self.key = computeJobKey(self.job)
+        _store(os.path.join(self.jobs_dir, 'J1'), {'job' : self.job, 'key' : self.key})
+
+    def tearDown(self):
+        if os.path.exists(self.jobs_dir):
+            shutil.rmtree(self.jobs_dir)
+
+    def _storeOutput(self, result):
+        _store(os.path.join(self.jobs_dir, 'J1_%s' % _RAW_OUTPUT_SUFFIX), result)
+
+    def _resume(self, customID='J1', key=None):
+        return _resumeJobResult(self.jobs_dir, customID, _RAW_OUTPUT_SUFFIX,
+                                self.key if key is None else key)
+
+    def test_resume1(self):
+        self._storeOutput(3)
+        self.assertEqual(3, self._resume())
+        # job of interrupted run had different function, arguments or seed
+        other = Job(_f1, (1, 2), additional_data={'seed' : 12})
+        self.assertIs(NOTPRODUCED, self._resume(key=computeJobKey(other)))
+        # job descriptor without key comes from older run
+        _store(os.path.join(self.jobs_dir, 'J1'), {'job' : self.job})
+        self.assertIs(NOTPRODUCED, self._resume())
+
+    def test_resume2(self):
+        # raw output not written before interruption
+        self.assertIs(NOTPRODUCED, self._resume())
+        # job not submitted before interruption
+        self.assertIs(NOTPRODUCED, self._resume(customID='J2'))
+        # raw output truncated by interruption
+        self._storeOutput(list(range(100)))
+        path = os.path.join(self.jobs_dir, 'J1_%s' % _RAW_OUTPUT_SUFFIX)
+        with open(path, 'rb') as f:
+            content = f.read()
+        with open(path, 'wb') as f:
+            f.write(content[:len(content) // 2])
+        self.assertIs(NOTPRODUCED, self._resume())
+
+    def test_resume3(self):
+        # outputs of jobs not executed or failed are not reused
+        self._storeOutput(NOTPRODUCED)
+        self.assertIs(NOTPRODUCED, self._resume())
+        self._storeOutput((JOBERROR, 'Traceback'))
+        self.assertIs(NOTPRODUCED, self._resume())
+
+
+class TestRawOutputWriter1(unittest.TestCase):
+
+    def setUp(self):
+        self.jobs_dir = os.path.join(TEST_INVARIANTS['test_write_root'], 'raw_outputs')
+        os.makedirs(self.jobs_dir)
+        self.writer = BackgroundWriter(threads=0)
+        self.all_jobs = dict()
+
+    def tearDown(self):
+        self.writer.close()
+        if os.path.exists(self.jobs_dir):
+            shutil.rmtree(self.jobs_dir)
+
+    def _writer(self, jc):
+        notify, write = _rawOutputWriter(jc, self.all_jobs, self.writer, self.jobs_dir, _RAW_OUTPUT_SUFFIX)
+        jc.addJobFinishedCallback(notify)
+        return write
+
+    def _path(self, customID):
+        return os.path.join(self.jobs_dir, '%s_%s' % (customID, _RAW_OUTPUT_SUFFIX))
+
+    def test_write1(self):
+        jc = SimpleJobContainer(incrementID=True)
+        self._writer(jc)
+        jid1 = jc.addJob(Job(_f1, (1, 2)))
+        self.all_jobs[jid1] = {'customID' : 'J1'}
+        jid2 = jc.addJob(Job(_f1, (3, 4)))
+        self.all_jobs[jid2] = {'customID' : None}
+        jc.start()
+        # written as soon as jobs finish, before the container is closed
+        self.assertEqual(3, _load(self._path('J1')))
+        self.assertEqual(['J1_%s' % _RAW_OUTPUT_SUFFIX], os.listdir(self.jobs_dir))
+        jc.close()
+
+    def test_write2(self):
+        # streaming mode with jobs resumed from interrupted run
+        jc = SimpleJobContainer(incrementID=True)
+        write = self._writer(jc)
+        jc.start()
+        # resumed job finishes before it is registered, and is written
+        # during submission
+        jid1 = jc.addFinishedJob(Job(_f1, (1, 2)), 3)
+        self.assertEqual([], os.listdir(self.jobs_dir))
+        self.all_jobs[jid1] = {'customID' : 'J1'}
+        write(jid1)
+        self.assertEqual(3, _load(self._path('J1')))
+        jid2 = jc.addJob(Job(_f1, (3, 4)))
+        self.all_jobs[jid2] = {'customID' : 'J2'}
+        self.assertFalse(os.path.exists(self._path('J2')))
+        jc.flush()
+        self.assertEqual(7, _load(self._path('J2')))
+        # each raw output is written once
+        os.remove(self._path('J1'))
+        write(jid1)
+        self.assertFalse(os.path.exists(self._path('J1')))
+        self.assertEqual([], jc.close())
+
+
+class _Env(object):
+    # execution environment reduced to the logger
+    def __init__(self):
+        self.logger = logging.getLogger('kdvs.tests.t.bin.experiment')
+        if len(self.logger.handlers) == 0:
+            self.logger.addHandler(logging.NullHandler())
+        self.logger.propagate = False
+
+
+class _ScreeningTechnique(object):
+    # creates one full job per screening job, if all screening jobs
+    # produced results below the threshold
+    follow_up = True
+
+    def __init__(self, threshold):
+        self.threshold = threshold
+        self.calls = list()
+        self.followed = set()
+
+    def createFollowUpJob(self, ssname, jobs):
+        self.calls.append((ssname, len(jobs)))
+        results = [job.result for job in jobs]
+        if ssname in self.followed:
+            # full jobs already created
+            return []
+        if any([r is NOTPRODUCED for r in results]) or max(results) >= self.threshold:
+            return []
+        self.followed.add(ssname)
+        return [('%s_full%d' % (ssname, i), Job(_f1, (r, 10))) for i, r in enumerate(results)]
+
+
+class TestFollowUpScheduler1(unittest.TestCase):
+
+    def setUp(self):
+        self.jc = SimpleJobContainer(incrementID=True)
+        self.all_jobs = dict()
+        self.ss_followup = dict()
+        self.ss_rejected = dict()
+        self.window_jobs = list()
+        self.streaming = False
+        self.completed = list()
+
+    def _scheduler(self, jgm, random_seed=None):
+        self.jgm = jgm
+        self.jgm.addGroupCompletedCallback(self.completed.append)
+        self.jc.addJobFinishedCallback(_jobFinishedNotifier(self.jc, self.jgm))
+        notify, self.check, self.submit = _followUpScheduler(_Env(), self.jc, self.jgm, self.all_jobs,
+                                                             self.ss_followup, self.ss_rejected, self._submitJob,
+                                                             random_seed, isinstance(jgm, CompletionJobGroupManager))
+        self.jc.addJobFinishedCallback(notify)
+
+    def _submitJob(self, customID, job, ssctx):
+        # reduced submitJob of submitSubsetOperations
+        jobID = self.jc.addJob(job)
+        if self.streaming:
+            self.window_jobs.append(job)
+        self.jgm.addJobIDToGroup(ssctx['ssname'], jobID)
+        self.all_jobs[jobID] = {'job' : job, 'mat' : ssctx['ssname'], 'technique' : 'T1', 'customID' : customID}
+        return jobID
+
+    def _submitSubset(self, ssname, technique, jobs, window=None):
+        ssctx = {'ssname' : ssname}
+        for i, job in enumerate(jobs):
+            self._submitJob('%s_screen%d' % (ssname, i), job, ssctx)
+            if window is not None and len(self.window_jobs) >= window:
+                _flushJobWindow(self.jc, self.window_jobs)
+                self.submit()
+        self.ss_followup[ssname] = (technique, ssctx)
+        self.check(ssname)
+
+    def _execute(self):
+        # as in executeSubsetOperations
+        while len(self.ss_followup) > 0:
+            self.jc.flush()
+            if self.submit() == 0:
+                break
+        return self.jc.close()
+
+    def _groupResults(self, ssname):
+        return sorted([self.jc.getJobResult(jid) for jid in self.jgm.getGroupJobsIDs(ssname)])
+
+    def test_passed1(self):
+        self._scheduler(CompletionJobGroupManager(), random_seed=17)
+        technique = _ScreeningTechnique(5)
+        self._submitSubset('S1', technique, [Job(_f1, (1, 0)), Job(_f1, (0, 2))])
+        self.jc.start()
+        # screening jobs are finished but the group is not sealed yet
+        self.assertFalse(self.jgm.isGroupCompleted('S1'))
+        self.assertEqual([], technique.calls)
+        self.assertEqual([], self._execute())
+        self.assertEqual([('S1', 2), ('S1', 4)], technique.calls)
+        self.assertEqual([1, 2, 11, 12], self._groupResults('S1'))
+        self.assertEqual(['S1'], self.completed)
+        self.assertEqual({}, self.ss_followup)
+        # follow-up jobs get their own random streams
+        seeds = [self.jc.getJob(jid).additional_data.get('seed') for jid in self.jgm.getGroupJobsIDs('S1')]
+        self.assertItemsEqual([None, None, _streamSeed(17, 'S1', 2), _streamSeed(17, 'S1', 3)], seeds)
+
+    def test_passed2(self):
+        # without sealing, completed group is reopened by follow-up jobs
+        self._scheduler(JobGroupManager())
+        technique = _ScreeningTechnique(5)
+        self._submitSubset('S1', technique, [Job(_f1, (1, 0)), Job(_f1, (0, 2))])
+        self.jc.start()
+        self.assertEqual(['S1'], self.completed)
+        self.assertEqual([], self._execute())
+        self.assertEqual([1, 2, 11, 12], self._groupResults('S1'))
+        self.assertEqual(['S1', 'S1'], self.completed)
+        self.assertEqual(['S1'], self.jgm.getCompletedGroups())
+        self.assertEqual(['S1'], list(self.jgm.iterCompletedGroups()))
+
+    def test_rejected1(self):
+        self._scheduler(CompletionJobGroupManager())
+        technique = _ScreeningTechnique(5)
+        # screened out by the technique
+        self._submitSubset('S1', technique, [Job(_f1, (1, 0)), Job(_f1, (0, 7))])
+        # rejected early by outer selector
+        self.ss_rejected['S2'] = 2
+        self._submitSubset('S2', technique, [Job(_f1, (1, 0)), Job(_f1, (0, 2))])
+        self.jc.start()
+        self.assertEqual([], self._execute())
+        self.assertEqual([('S1', 2)], technique.calls)
+        self.assertEqual([1, 7], self._groupResults('S1'))
+        self.assertEqual([1, 2], self._groupResults('S2'))
+        self.assertEqual(['S1', 'S2'], self.completed)
+        self.assertEqual({}, self.ss_followup)
+
+    def test_failed1(self):
+        self._scheduler(CompletionJobGroupManager())
+        technique = _ScreeningTechnique(5)
+        self._submitSubset('S1', technique, [Job(_f1, (1, 0)), Job(_f2, (0, 2))])
+        self.jc.start()
+        exceptions = self._execute()
+        self.assertEqual(1, len(exceptions))
+        self.assertIsInstance(exceptions[0][1], Error)
+        # no follow-up jobs, and the group stays incomplete
+        self.assertEqual([('S1', 2)], technique.calls)
+        self.assertEqual({}, self.ss_followup)
+        self.assertEqual([], self.completed)
+        self.assertFalse(self.jgm.isGroupCompleted('S1'))
+        self.assertEqual(1, self.jgm.getOutstandingJobsCount('S1'))
+
+    def test_streaming1(self):
+        self._scheduler(CompletionJobGroupManager())
+        self.streaming = True
+        self.jc.start()
+        technique = _ScreeningTechnique(5)
+        self._submitSubset('S1', technique, [Job(_f1, (1, 0)), Job(_f1, (0, 2))], window=2)
+        # follow-up jobs of S1 are submitted when window of S2 is flushed
+        self._submitSubset('S2', technique, [Job(_f1, (1, 1)), Job(_f1, (0, 3))], window=2)
+        self.assertEqual([('S1', 2)], technique.calls)
+        self.assertEqual(2, len(self.window_jobs))
+        self.assertEqual(6, self.jc.getJobCount())
+        # remaining jobs are flushed at the end of submission
+        _flushJobWindow(self.jc, self.window_jobs)
+        self.assertEqual([], self._execute())
+        self.assertEqual([1, 2, 11, 12], self._groupResults('S1'))
+        self.assertEqual([2, 3, 12, 13], self._groupResults('S2'))
+        self.assertItemsEqual(['S1', 'S2'], self.completed)
+        self.assertEqual({}, self.ss_followup)
+        # arguments of jobs flushed with the window are released
+        for jid, jobdata in self.all_jobs.iteritems():
+            if jobdata['customID'].startswith('S1'):
+                self.assertEqual(tuple(), self.jc.getJob(jid).call_args)
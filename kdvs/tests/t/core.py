@@ -24,7 +24,8 @@ from kdvs.core.error import Error
 from kdvs.core.log import Logger, NullHandler, StreamLogger, RotatingFileLogger
 from kdvs.core.provider import fileProvider, SQLite3DBProvider
 from kdvs.core.util import isListOrTuple, CommentSkipper, isTuple, \
-    isIntegralNumber, className, emptyGenerator, Parametrizable, Configurable
+    isIntegralNumber, className, emptyGenerator, Parametrizable, Configurable, \
+    BackgroundWriter
 from kdvs.tests import resolve_unittest, TEST_INVARIANTS
 from kdvs.tests.utils import test_dir_writable, count_lines
 from logging import shutdown, DEBUG, ERROR
@@ -776,3 +777,60 @@ class TestConfigurable1(unittest.TestCase):
         # wrong type of component
         with self.assertRaises(Error):
             Configurable(self.def_c1, self.cx2)
+
+
+class TestBackgroundWriter1(unittest.TestCase):
+
+    def setUp(self):
+        self.written = list()
+
+    def _write(self, i, factor=1):
+        self.written.append(i * factor)
+
+    def _fail(self, i):
+        raise ValueError(i)
+
+    def test_init1(self):
+        with self.assertRaises(Error):
+            BackgroundWriter(threads=-1)
+
+    def test_submit1(self):
+        bw = BackgroundWriter(threads=3)
+        for i in range(20):
+            bw.submit(self._write, i, factor=2)
+        bw.wait()
+        self.assertItemsEqual([2 * i for i in range(20)], self.written)
+        bw.close()
+        with self.assertRaises(Error):
+            bw.submit(self._write, 0)
+
+    def test_submit2(self):
+        # synchronous execution
+        bw = BackgroundWriter(threads=0)
+        bw.submit(self._write, 1)
+        self.assertEqual([1], self.written)
+        bw.close()
+
+    def test_wait1(self):
+        bw = BackgroundWriter(threads=2, max_pending=1)
+        bw.submit(self._write, 1)
+        bw.submit(self._fail, 2)
+        bw.submit(self._write, 3)
+        with self.assertRaises(Error):
+            bw.wait()
+        self.assertItemsEqual([1, 3], self.written)
+        # errors are reported once
+        bw.wait()
+        bw.submit(self._fail, 4)
+        with self.assertRaises(Error):
+            bw.close()
+
+    def test_check1(self):
+        bw = BackgroundWriter(threads=0)
+        bw.check()
+        bw.submit(self._fail, 1)
+        with self.assertRaises(Error):
+            bw.check()
+        # errors are reported once
+        bw.check()
+        bw.close()
@@ -16,11 +16,16 @@
 
 from kdvs.core.error import Error, Warn
 from kdvs.fw.Job import Job, JobContainer, NOTPRODUCED, JobStatus, \
-    JobGroupManager
+    JobGroupManager, CompletionJobGroupManager, JOB_TELEMETRY_COLUMNS, \
+    getJobDataShape, measureJobExecution, estimateJobCost, deriveSeed, \
+    seededRandomState, estimateJobMemory, DEFAULT_JOB_MEMORY_FACTOR, \
+    measureBatchExecution, getDataSize
 from kdvs.fw.Map import SetBDMap
 from kdvs.tests import resolve_unittest, TEST_INVARIANTS
 import copy
+import numpy
 import os
+import random
 import re
 
 unittest = resolve_unittest()
@@ -34,6 +39,18 @@ def _f1(*args):
 def _f2():
     pass
 
+def _f3():
+    return random.random(), numpy.random.rand(3)
+
+_batch_calls = list()
+
+def _b1(args_list):
+    _batch_calls.append(len(args_list))
+    return [sum(args) for args in args_list]
+
+def _b2(args_list):
+    raise ValueError
+
 class TestJob1(unittest.TestCase):
 
     def setUp(self):
@@ -81,6 +98,125 @@ class TestJob1(unittest.TestCase):
         with self.assertRaises(Error):
             job6.execute()
 
+class TestJobTelemetry1(unittest.TestCase):
+
+    def setUp(self):
+        self.data = numpy.ones((10, 4))
+        self.labels = numpy.ones((10, 1))
+
+    def test_getJobDataShape1(self):
+        self.assertEqual((None, None), getJobDataShape(Job(_f0, ())))
+        self.assertEqual((10, 4), getJobDataShape(Job(_f1, (self.labels[:, 0], self.data))))
+        job = Job(_f1, (self.data,), additional_data={'data_shape' : (20, 8)})
+        self.assertEqual((20, 8), getJobDataShape(job))
+
+    def test_estimateJobCost1(self):
+        self.assertIsNone(estimateJobCost(Job(_f0, ())))
+        self.assertEqual(40, estimateJobCost(Job(_f1, (self.data,))))
+        self.assertEqual(3, estimateJobCost(Job(_f1, (self.data,), additional_data={'cost' : 3})))
+
+    def test_estimateJobMemory1(self):
+        self.assertIsNone(estimateJobMemory(Job(_f0, ())))
+        self.assertEqual(DEFAULT_JOB_MEMORY_FACTOR * 40 * 8, estimateJobMemory(Job(_f1, (self.data,))))
+        self.assertEqual(100, estimateJobMemory(Job(_f1, (self.data,), additional_data={'memory' : 100})))
+
+    def test_measureJobExecution1(self):
+        e, result, telemetry = measureJobExecution(Job(_f1, (1, 2, 3, 4)))
+        self.assertIsNone(e)
+        self.assertEqual(10, result)
+        self.assertItemsEqual(JOB_TELEMETRY_COLUMNS[1:], telemetry.keys())
+        self.assertGreaterEqual(telemetry['wall_time'], 0.0)
+        self.assertGreaterEqual(telemetry['cpu_time'], 0.0)
+        self.assertGreater(telemetry['input_bytes'], 0)
+        self.assertGreater(telemetry['output_bytes'], 0)
+        self.assertIsNone(telemetry['est_memory'])
+        self.assertEqual(str(os.getpid()), telemetry['worker'].rpartition(':')[2])
+
+    def test_getDataSize1(self):
+        data = numpy.ones((20, 5))
+        self.assertEqual(800, getDataSize(data))
+        self.assertGreater(getDataSize(1), 0)
+        # containers are traversed, shared arrays are counted once
+        size = getDataSize((data, [data, {'a' : data[:10]}]))
+        self.assertGreater(size, 1200)
+        self.assertLess(size, 2000)
+
+    def test_measureJobExecution2(self):
+        e, result, telemetry = measureJobExecution(Job(_f0, (1, 2)))
+        self.assertIsInstance(e, Error)
+        self.assertEqual(NOTPRODUCED, result)
+        self.assertIsNone(telemetry['output_bytes'])
+
+    def test_measureBatchExecution1(self):
+        del _batch_calls[:]
+        jobs = [Job(_f1, (i, i)) for i in range(2)]
+        jobs.extend([Job(_f1, (i, i), additional_data={'batch_call' : _b1}) for i in range(2, 5)])
+        jobs.append(Job(_f1, (5, 5)))
+        jobs.append(Job(_f1, (6, 6), additional_data={'batch_call' : _b1}))
+        outcomes = list(measureBatchExecution(jobs))
+        self.assertEqual([None] * 7, [o[0] for o in outcomes])
+        self.assertEqual([2 * i for i in range(7)], [o[1] for o in outcomes])
+        # single call for consecutive jobs that share batch function only
+        self.assertEqual([3], _batch_calls)
+        for _, _, telemetry in outcomes:
+            self.assertItemsEqual(JOB_TELEMETRY_COLUMNS[1:], telemetry.keys())
+            self.assertGreater(telemetry['output_bytes'], 0)
+
+    def test_measureBatchExecution2(self):
+        # failed batch function falls back to separate execution
+        jobs = [Job(_f1, (1, 2), additional_data={'batch_call' : _b2}),
+                Job(_f0, (1, 2), additional_data={'batch_call' : _b2})]
+        outcomes = list(measureBatchExecution(jobs))
+        self.assertIsNone(outcomes[0][0])
+        self.assertEqual(3, outcomes[0][1])
+        self.assertIsInstance(outcomes[1][0], Error)
+        self.assertEqual(NOTPRODUCED, outcomes[1][1])
+
+
+class TestJobSeed1(unittest.TestCase):
+
+    def test_deriveSeed1(self):
+        seed = deriveSeed(42, 'SS1', 0)
+        self.assertEqual(seed, deriveSeed(42, 'SS1', 0))
+        self.assertEqual(seed, deriveSeed(42, u'SS1', 0))
+        self.assertTrue(0 <= seed < 2 ** 32)
+        others = [deriveSeed(43, 'SS1', 0), deriveSeed(42, 'SS2', 0), deriveSeed(42, 'SS1', 1), deriveSeed(42, 'SS1')]
+        self.assertNotIn(seed, others)
+
+    def test_seededRandomState1(self):
+        with seededRandomState(10):
+            r1 = _f3()
+        with seededRandomState(10):
+            r2 = _f3()
+        self.assertEqual(r1[0], r2[0])
+        self.assertTrue(numpy.all(r1[1] == r2[1]))
+        # previous state is restored
+        numpy.random.seed(0)
+        random.seed(0)
+        ref = _f3()
+        numpy.random.seed(0)
+        random.seed(0)
+        with seededRandomState(10):
+            _f3()
+        res = _f3()
+        self.assertEqual(ref[0], res[0])
+        self.assertTrue(numpy.all(ref[1] == res[1]))
+        # no seed leaves generators intact
+        numpy.random.seed(0)
+        with seededRandomState(None):
+            res = numpy.random.rand(3)
+        self.assertTrue(numpy.all(ref[1] == res))
+
+    def test_execute1(self):
+        r1 = Job(_f3, (), additional_data={'seed' : 5}).execute()
+        _f3()
+        r2 = Job(_f3, (), additional_data={'seed' : 5}).execute()
+        r3 = Job(_f3, (), additional_data={'seed' : 6}).execute()
+        self.assertEqual(r1[0], r2[0])
+        self.assertTrue(numpy.all(r1[1] == r2[1]))
+        self.assertNotEqual(r1[0], r3[0])
+
+
 class TestJobContainer1(unittest.TestCase):
 
     def setUp(self):
@@ -112,6 +248,49 @@ class TestJobContainer1(unittest.TestCase):
         ids = set(jc.jobs.keys())
         self.assertEqual(ref_ids, ids)
 
+    def test_addFinishedJob1(self):
+        jc = JobContainer(incrementID=True)
+        for j in self.jobs[:5]:
+            jc.addJob(j)
+        for j in self.jobs[5:]:
+            jc.addFinishedJob(j, 100)
+        ref_ids = set(self.ref_increment_ids)
+        ids = set(jc.jobs.keys())
+        self.assertEqual(ref_ids, ids)
+        for jid in self.ref_increment_ids[:5]:
+            self.assertEqual(JobStatus.ADDED, jc.getJobStatus(jid))
+            self.assertEqual(NOTPRODUCED, jc.getJobResult(jid))
+        for jid in self.ref_increment_ids[5:]:
+            self.assertEqual(JobStatus.FINISHED, jc.getJobStatus(jid))
+            self.assertEqual(100, jc.getJobResult(jid))
+        jc.removeJob('Job7')
+        self.assertNotIn('Job7', jc.jobs)
+
+    def test_addJobFinishedCallback1(self):
+        jc = JobContainer(incrementID=True)
+        finished = list()
+        jc.addJobFinishedCallback(finished.append)
+        for j in self.jobs[:5]:
+            jc.addJob(j)
+        self.assertEqual([], finished)
+        for j in self.jobs[5:]:
+            jc.addFinishedJob(j, 100)
+        self.assertEqual(self.ref_increment_ids[5:], finished)
+
+    def test_getJobTelemetry1(self):
+        jc = JobContainer(incrementID=True)
+        for j in self.jobs[:2]:
+            jc.addJob(j)
+        self.assertIsNone(jc.getJobTelemetry('Job0'))
+        self.assertEqual([], jc.getJobTelemetryTable())
+        jc._recordJobTelemetry('Job1', {'worker' : 'w', 'n' : 10, 'p' : 4})
+        jc._recordJobTelemetry('Job0', {'worker' : 'w', 'wall_time' : 1.0})
+        self.assertEqual({'worker' : 'w', 'n' : 10, 'p' : 4}, jc.getJobTelemetry('Job1'))
+        ref_rows = [('Job0', 'w', 1.0, None, None, None, None, None, None, None),
+                    ('Job1', 'w', None, None, None, None, 10, 4, None, None)]
+        self.assertEqual(ref_rows, jc.getJobTelemetryTable())
+        self.assertIn('jobTelemetry', jc.getMiscData())
+
     def test_hasJobs1(self):
         jc = JobContainer(incrementID=True)
         self.assertFalse(jc.hasJobs())
@@ -285,3 +464,153 @@ class TestJobGroupManager1(unittest.TestCase):
         jgm.clear()
         self.assertItemsEqual({}, jgm._jgmap.getFwdMap())
         self.assertItemsEqual({}, jgm._jgmap.getBwdMap())
+
+    def test_jobFinished1(self):
+        jgm = JobGroupManager()
+        completed = list()
+        jgm.addGroupCompletedCallback(completed.append)
+        for g in range(10):
+            jgm.addGroup(g, self.groups1[g])
+        self.assertEqual(10, jgm.getOutstandingJobsCount(3))
+        for jid in self.groups1[3]:
+            self.assertEqual([], completed)
+            jgm.jobFinished(jid)
+            # repeated notifications are ignored
+            jgm.jobFinished(jid)
+        self.assertEqual([3], completed)
+        self.assertEqual(0, jgm.getOutstandingJobsCount(3))
+        self.assertTrue(jgm.isGroupCompleted(3))
+        self.assertTrue(jgm.isJobFinished('Job13'))
+        self.assertFalse(jgm.isJobFinished('Job14'))
+        with self.assertRaises(Error):
+            jgm.getOutstandingJobsCount(11)
+        # groups completed during iteration are visited
+        visited = list()
+        for g in jgm.iterCompletedGroups():
+            visited.append(g)
+            if g == 3:
+                for jid in self.groups1[7]:
+                    jgm.jobFinished(jid)
+        self.assertEqual([3, 7], visited)
+        self.assertEqual([3, 7], jgm.getCompletedGroups())
+
+    def test_jobFinished2(self):
+        jgm = JobGroupManager()
+        # jobs may finish before they are assigned to the group
+        jgm.jobFinished('Job0')
+        jgm.addJobIDToGroup(0, 'Job0')
+        self.assertTrue(jgm.isGroupCompleted(0))
+        # unfinished job makes the group not completed
+        jgm.addJobIDToGroup(0, 'Job1')
+        self.assertFalse(jgm.isGroupCompleted(0))
+        self.assertEqual([], jgm.getCompletedGroups())
+        jgm.jobFinished('Job1')
+        self.assertEqual([0], jgm.getCompletedGroups())
+        jgm.remGroup(0)
+        self.assertFalse(jgm.isGroupCompleted(0))
+        self.assertFalse(jgm.isJobFinished('Job0'))
+
+    def test_iterCompletedGroups1(self):
+        jgm = JobGroupManager()
+        for g in range(4):
+            jgm.addJobIDToGroup(g, 'Job%d' % g)
+            jgm.jobFinished('Job%d' % g)
+        self.assertEqual([0, 1, 2, 3], jgm.getCompletedGroups())
+        # groups reopened during iteration are skipped until completed again
+        visited = list()
+        for g in jgm.iterCompletedGroups():
+            visited.append(g)
+            if g == 0:
+                jgm.addJobIDToGroup(1, 'Job10')
+                jgm.addJobIDToGroup(2, 'Job20')
+                jgm.remGroup(3)
+                # completed again
+                jgm.jobFinished('Job10')
+        self.assertEqual([0, 1], visited)
+        self.assertEqual([0, 1], jgm.getCompletedGroups())
+        jgm.jobFinished('Job20')
+        self.assertEqual([0, 1, 2], jgm.getCompletedGroups())
+        self.assertEqual([0, 1, 2], list(jgm.iterCompletedGroups()))
+
+
+class TestCompletionJobGroupManager1(unittest.TestCase):
+
+    def setUp(self):
+        self.all_job_ids = ['Job%d' % i for i in range(20)]
+        self.groups = dict([(gk, ['Job%d' % i for i in range(20) if i % 4 == gk]) for gk in range(4)])
+
+    def _manager(self):
+        jgm = CompletionJobGroupManager()
+        completed = list()
+        jgm.addGroupCompletedCallback(completed.append)
+        return jgm, completed
+
+    def test_init1(self):
+        jgm = CompletionJobGroupManager()
+        self.assertIsInstance(jgm, JobGroupManager)
+        self.assertEqual([], jgm.getCompletedGroups())
+        self.assertEqual([], jgm.callbackExceptions)
+
+    def test_jobFinished1(self):
+        jgm, completed = self._manager()
+        for g in range(4):
+            jgm.addGroup(g, self.groups[g])
+            jgm.sealGroup(g)
+        for jid in self.groups[2]:
+            self.assertEqual([], completed)
+            jgm.jobFinished(jid)
+        self.assertEqual([2], completed)
+        self.assertTrue(jgm.isGroupCompleted(2))
+        self.assertFalse(jgm.isGroupCompleted(1))
+        for jid in reversed(self.all_job_ids):
+            jgm.jobFinished(jid)
+        self.assertEqual([2, 3, 1, 0], completed)
+        self.assertEqual(completed, jgm.getCompletedGroups())
+
+    def test_jobFinished2(self):
+        # group is not completed until sealed
+        jgm, completed = self._manager()
+        jgm.addGroup(0, self.groups[0][:2])
+        for jid in self.groups[0][:2]:
+            jgm.jobFinished(jid)
+        self.assertEqual([], completed)
+        # jobs may finish before they are assigned to the group
+        for jid in self.groups[0][2:]:
+            jgm.jobFinished(jid)
+            jgm.addJobIDToGroup(0, jid)
+        self.assertEqual([], completed)
+        jgm.sealGroup(0)
+        self.assertEqual([0], completed)
+        # callbacks are called once per group
+        jgm.jobFinished(self.groups[0][0])
+        jgm.sealGroup(0)
+        self.assertEqual([0], completed)
+
+    def test_callbackExceptions1(self):
+        jgm, completed = self._manager()
+        def _failing(group_name):
+            raise KeyError(group_name)
+        jgm.addGroupCompletedCallback(_failing)
+        for g in range(4):
+            jgm.addGroup(g, self.groups[g])
+            jgm.sealGroup(g)
+        for jid in self.all_job_ids:
+            jgm.jobFinished(jid)
+        self.assertEqual([0, 1, 2, 3], completed)
+        self.assertEqual([0, 1, 2, 3], [g for g, _ in jgm.callbackExceptions])
+        for _, e in jgm.callbackExceptions:
+            self.assertIsInstance(e, KeyError)
+
+    def test_remGroup1(self):
+        jgm, completed = self._manager()
+        for g in range(4):
+            jgm.addGroup(g, self.groups[g])
+            jgm.sealGroup(g)
+        for jid in self.groups[1]:
+            jgm.jobFinished(jid)
+        jgm.remGroup(1)
+        self.assertFalse(jgm.isGroupCompleted(1))
+        self.assertEqual([], jgm.getCompletedGroups())
+        jgm.clear()
+        self.assertItemsEqual({}, jgm._jgmap.getFwdMap())
+        self.assertEqual([], jgm.getCompletedGroups())
@@ -0,0 +1,151 @@
+# Knowledge Driven Variable Selection (KDVS)
+# Copyright (C) 2014 KDVS Developers. All rights reserved.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from kdvs.core.error import Error
+from kdvs.fw.Job import Job, NOTPRODUCED, JOBERROR
+from kdvs.fw.JobCache import JobResultCache, computeJobKey, isCacheableResult, \
+    computeDigest
+from kdvs.tests import resolve_unittest, TEST_INVARIANTS
+import numpy
+import os
+import shutil
+
+unittest = resolve_unittest()
+
+def _f1(*args):
+    return sum(args)
+
+def _f2(*args):
+    return sum(args)
+
+class TestComputeJobKey1(unittest.TestCase):
+
+    def setUp(self):
+        self.data = numpy.arange(20.0).reshape((4, 5))
+        self.params = {'mu' : [0.1, 1.0], 'tau' : [0.5], 'k' : 3}
+
+    def test_computeJobKey1(self):
+        key1 = computeJobKey(Job(_f1, (self.data, dict(self.params))))
+        key2 = computeJobKey(Job(_f1, (self.data.copy(), dict(self.params))))
+        self.assertRegexpMatches(key1, '^[a-f0-9]{40}$')
+        self.assertEqual(key1, key2)
+        # fortran order does not matter
+        key3 = computeJobKey(Job(_f1, (numpy.asfortranarray(self.data), dict(self.params))))
+        self.assertEqual(key1, key3)
+
+    def test_computeJobKey2(self):
+        key1 = computeJobKey(Job(_f1, (self.data, self.params)))
+        data = self.data.copy()
+        data[0, 0] = -1.0
+        self.assertNotEqual(key1, computeJobKey(Job(_f1, (data, self.params))))
+        self.assertNotEqual(key1, computeJobKey(Job(_f1, (self.data.astype(numpy.float32), self.params))))
+        self.assertNotEqual(key1, computeJobKey(Job(_f2, (self.data, self.params))))
+        params = dict(self.params)
+        params['k'] = 4
+        self.assertNotEqual(key1, computeJobKey(Job(_f1, (self.data, params))))
+
+    def test_computeJobKey3(self):
+        key1 = computeJobKey(Job(_f1, (self.data,), additional_data={'technique_class' : 'a.A', 'ssname' : 'S1'}))
+        key2 = computeJobKey(Job(_f1, (self.data,), additional_data={'technique_class' : 'a.A', 'ssname' : 'S2'}))
+        key3 = computeJobKey(Job(_f1, (self.data,), additional_data={'technique_class' : 'a.B', 'ssname' : 'S1'}))
+        self.assertEqual(key1, key2)
+        self.assertNotEqual(key1, key3)
+        key4 = computeJobKey(Job(_f1, (self.data,), additional_data={'technique_class' : 'a.A', 'seed' : 1}))
+        key5 = computeJobKey(Job(_f1, (self.data,), additional_data={'technique_class' : 'a.A', 'seed' : 2}))
+        self.assertNotEqual(key1, key4)
+        self.assertNotEqual(key4, key5)
+
+    def test_computeDigest1(self):
+        obj1 = {'a' : self.data, 'b' : [1, 2], 'c' : _f1}
+        obj2 = {'c' : _f1, 'b' : [1, 2], 'a' : self.data.copy()}
+        self.assertEqual(computeDigest(obj1), computeDigest(obj2))
+        obj2['b'] = [2, 1]
+        self.assertNotEqual(computeDigest(obj1), computeDigest(obj2))
+
+    def test_isCacheableResult1(self):
+        self.assertTrue(isCacheableResult(10))
+        self.assertTrue(isCacheableResult((1, 2)))
+        self.assertFalse(isCacheableResult(NOTPRODUCED))
+        self.assertFalse(isCacheableResult((JOBERROR.srepr, Error())))
+
+
+class TestJobResultCache1(unittest.TestCase):
+
+    def setUp(self):
+        self.cache_dir = os.path.join(TEST_INVARIANTS['test_write_root'], 'jobcache')
+        self.keys = ['%040x' % i for i in range(5)]
+
+    def tearDown(self):
+        if os.path.exists(self.cache_dir):
+            shutil.rmtree(self.cache_dir)
+
+    def test_init1(self):
+        cache = JobResultCache(self.cache_dir)
+        self.assertTrue(os.path.isdir(self.cache_dir))
+        self.assertEqual(0, len(cache))
+        self.assertEqual(0, cache.getSize())
+        with self.assertRaises(Error):
+            JobResultCache(self.cache_dir, max_size=0)
+
+    def test_getPut1(self):
+        cache = JobResultCache(self.cache_dir)
+        self.assertEqual(NOTPRODUCED, cache.get(self.keys[0]))
+        self.assertTrue(cache.put(self.keys[0], {'a' : numpy.ones(3)}))
+        self.assertFalse(cache.put(self.keys[1], NOTPRODUCED))
+        self.assertIn(self.keys[0], cache)
+        self.assertNotIn(self.keys[1], cache)
+        self.assertTrue(numpy.all(numpy.ones(3) == cache.get(self.keys[0])['a']))
+        stats = cache.getStatistics()
+        self.assertEqual(1, stats['hits'])
+        self.assertEqual(1, stats['misses'])
+        self.assertEqual(1, stats['stores'])
+        self.assertEqual(0, stats['evictions'])
+        self.assertEqual(1, stats['entries'])
+        self.assertEqual(os.path.getsize(os.path.join(self.cache_dir, self.keys[0])), stats['size'])
+
+    def test_evict1(self):
+        cache = JobResultCache(self.cache_dir)
+        cache.put(self.keys[0], 'x' * 1000)
+        size = cache.getSize()
+        cache = JobResultCache(self.cache_dir, max_size=3 * size)
+        cache.put(self.keys[1], 'x' * 1000)
+        cache.put(self.keys[2], 'x' * 1000)
+        # key 0 becomes the most recently used one
+        self.assertNotEqual(NOTPRODUCED, cache.get(self.keys[0]))
+        cache.put(self.keys[3], 'x' * 1000)
+        self.assertEqual(1, cache.getStatistics()['evictions'])
+        self.assertEqual([True, False, True, True], [k in cache for k in self.keys[:4]])
+        self.assertFalse(os.path.exists(os.path.join(self.cache_dir, self.keys[1])))
+
+    def test_persistence1(self):
+        cache1 = JobResultCache(self.cache_dir)
+        cache1.put(self.keys[0], 10)
+        cache1.put(self.keys[1], 20)
+        cache2 = JobResultCache(self.cache_dir)
+        self.assertEqual(2, len(cache2))
+        self.assertEqual(cache1.getSize(), cache2.getSize())
+        self.assertEqual(20, cache2.get(self.keys[1]))
+        cache2.clear()
+        self.assertEqual(0, len(cache2))
+        self.assertEqual([], os.listdir(self.cache_dir))
+
+    def test_corrupted1(self):
+        cache = JobResultCache(self.cache_dir)
+        cache.put(self.keys[0], 10)
+        with open(os.path.join(self.cache_dir, self.keys[0]), 'wb') as f:
+            f.write('XXX')
+        self.assertEqual(NOTPRODUCED, cache.get(self.keys[0]))
+        self.assertNotIn(self.keys[0], cache)
@@ -297,6 +297,11 @@ class TestTechnique1(unittest.TestCase):
         with self.assertRaises(NotImplementedError):
             t.produceResults(self.ss1, j, self.runtime1)
 
+    def test_createFollowUpJob1(self):
+        t = Technique(self.par1, **self.p1)
+        self.assertFalse(t.follow_up)
+        self.assertEqual([], list(t.createFollowUpJob(self.ss1, [])))
+
 
 class TestStatUtils1(unittest.TestCase):
 
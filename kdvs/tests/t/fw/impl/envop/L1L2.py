@@ -16,7 +16,8 @@
 
 from kdvs.core.env import ExecutionEnvironment
 from kdvs.core.error import Error
-from kdvs.fw.impl.envop.L1L2 import L1L2_UniformExtSplitProvider
+from kdvs.fw.impl.envop.L1L2 import L1L2_UniformExtSplitProvider, \
+    L1L2_GramStatisticsProvider
 from kdvs.tests import resolve_unittest
 try:
     import l1l2py
@@ -53,3 +54,27 @@ class TestL1L2_UniformExtSplitProvider1(unittest.TestCase):
         with self.assertRaises(ValueError):
             uesp.perform(self.env1)
 
+
+@unittest.skipUnless(l1l2pyFound, 'l1l2py not found')
+class TestL1L2_GramStatisticsProvider1(unittest.TestCase):
+
+    def setUp(self):
+        self.env1 = ExecutionEnvironment({}, {})
+        self.params1 = {
+            'enclosingCategorizerID' : 'Null',
+            'maxMemory' : 1024 * 1024,
+        }
+        self.params2 = {'enclosingCategorizerID' : 'Null'}
+
+    def test_init1(self):
+        gsp = L1L2_GramStatisticsProvider(**self.params1)
+        self.assertEqual(self.params1, gsp.parameters)
+
+    def test_init2(self):
+        with self.assertRaises(Error):
+            L1L2_GramStatisticsProvider(**self.params2)
+
+    def test_perform1(self):
+        gsp = L1L2_GramStatisticsProvider(**self.params1)
+        with self.assertRaises(ValueError):
+            gsp.perform(self.env1)
@@ -0,0 +1,209 @@
+# Knowledge Driven Variable Selection (KDVS)
+# Copyright (C) 2014 KDVS Developers. All rights reserved.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from kdvs.core.error import Error
+from kdvs.fw.Job import Job, JobStatus, JOBERROR, NOTPRODUCED
+from kdvs.fw.impl.job.FSQueueJob import FSQueueJobContainer, FSQueueWorker, \
+    runFSQueueWorker, FSQ_PENDING, FSQ_RUNNING, FSQ_DONE, FSQ_STOP
+from kdvs.tests import resolve_unittest, TEST_INVARIANTS
+import multiprocessing
+import os
+import shutil
+import time
+
+unittest = resolve_unittest()
+
+def _f1(*args):
+    return sum(args)
+
+def _f2(*args):
+    time.sleep(args[0])
+    return sum(args[1:])
+
+def _f3(*args):
+    raise KeyError
+
+class TestFSQueueJobContainer1(unittest.TestCase):
+
+    def setUp(self):
+        self.queue_dir = os.path.join(TEST_INVARIANTS['test_write_root'], 'fsqueue')
+        os.mkdir(self.queue_dir)
+        self.ref_increment_ids = ['Job%d' % i for i in range(10)]
+        self.jobs1 = [Job(_f1, (1, 2, 3, 4)) for _ in range(10)]
+        self.jobs2 = [Job(_f2, (0.2, 1, 2, 3, 4)) for _ in range(10)]
+        self.jobs3 = [Job(_f3, ()) for _ in range(10)]
+
+    def tearDown(self):
+        shutil.rmtree(self.queue_dir)
+
+    def test_init1(self):
+        jc = FSQueueJobContainer(queue_dir=self.queue_dir)
+        self.assertEqual({}, jc.jobs)
+        md = jc.getMiscData()
+        self.assertEqual(self.queue_dir, md['queueDir'])
+        self.assertEqual(os.path.join(self.queue_dir, md['sessionID']), md['sessionPath'])
+        for subdir in (FSQ_PENDING, FSQ_RUNNING, FSQ_DONE):
+            self.assertTrue(os.path.isdir(os.path.join(md['sessionPath'], subdir)))
+        self.assertEqual({}, md['requeuedJobs'])
+        self.assertEqual([], md['failedJobs'])
+
+    def test_init2(self):
+        with self.assertRaises(Error):
+            FSQueueJobContainer()
+        with self.assertRaises(Error):
+            FSQueueJobContainer(queue_dir=os.path.join(self.queue_dir, 'XXX'))
+        with self.assertRaises(Error):
+            FSQueueJobContainer(queue_dir=self.queue_dir, XXX=1)
+
+    def test_addJob1(self):
+        jc = FSQueueJobContainer(queue_dir=self.queue_dir)
+        jobIDs = [jc.addJob(j) for j in self.jobs1]
+        self.assertEqual(self.ref_increment_ids, jobIDs)
+        self.assertEqual(set([JobStatus.EXECUTING]), set([jc.getJobStatus(jid) for jid in jobIDs]))
+        pending = os.listdir(os.path.join(jc.session_dir, FSQ_PENDING))
+        self.assertItemsEqual([jc.getJobInputKey(jid) for jid in jobIDs], pending)
+        self.assertEqual(jobIDs, [jc.getJobIDForKey(jc.getJobInputKey(jid)) for jid in jobIDs])
+
+    def test_close1(self):
+        jc = FSQueueJobContainer(queue_dir=self.queue_dir, local_workers=3, poll_interval=0.01)
+        jobIDs = [jc.addJob(j) for j in self.jobs2]
+        jc.start()
+        exc = jc.close()
+        self.assertEqual([], exc)
+        self.assertEqual([10] * 10, [jc.getJobResult(jid) for jid in jobIDs])
+        self.assertEqual(set([JobStatus.FINISHED]), set([jc.getJobStatus(jid) for jid in jobIDs]))
+        for jid in jobIDs:
+            self.assertGreaterEqual(jc.getJobTelemetry(jid)['wall_time'], 0.2)
+        self.assertEqual([], os.listdir(os.path.join(jc.session_dir, FSQ_PENDING)))
+        self.assertEqual([], os.listdir(os.path.join(jc.session_dir, FSQ_RUNNING)))
+        self.assertTrue(os.path.exists(os.path.join(jc.session_dir, FSQ_STOP)))
+
+    def test_close2(self):
+        jc = FSQueueJobContainer(queue_dir=self.queue_dir, local_workers=2, poll_interval=0.01)
+        jobIDs1 = [jc.addJob(j) for j in self.jobs1[:3]]
+        jobIDs3 = [jc.addJob(j) for j in self.jobs3[:3]]
+        jc.start()
+        exc = jc.close()
+        self.assertEqual([10] * 3, [jc.getJobResult(jid) for jid in jobIDs1])
+        for jid in jobIDs3:
+            cns, e = jc.getJobResult(jid)
+            self.assertEqual(JOBERROR.srepr, cns)
+            self.assertIsInstance(e, Error)
+        self.assertItemsEqual(jobIDs3, [jid for jid, _ in exc])
+        self.assertItemsEqual(jobIDs3, jc.getMiscData()['failedJobs'])
+
+    def test_flush1(self):
+        jc = FSQueueJobContainer(queue_dir=self.queue_dir, local_workers=2, poll_interval=0.01)
+        finished = list()
+        jc.addJobFinishedCallback(finished.append)
+        jc.start()
+        jobIDs1 = [jc.addJob(j) for j in self.jobs1[:5]]
+        jc.flush()
+        self.assertItemsEqual(jobIDs1, finished)
+        jobIDs2 = [jc.addJob(j) for j in self.jobs1[5:]]
+        jc.close()
+        self.assertItemsEqual(jobIDs1 + jobIDs2, finished)
+
+    def test_externalWorkers1(self):
+        # workers independent of the container serve all sessions
+        workers = [multiprocessing.Process(target=runFSQueueWorker, args=(self.queue_dir,),
+                                           kwargs={'poll_interval' : 0.01}) for _ in range(2)]
+        for w in workers:
+            w.start()
+        try:
+            jc1 = FSQueueJobContainer(queue_dir=self.queue_dir, poll_interval=0.01)
+            jc2 = FSQueueJobContainer(queue_dir=self.queue_dir, poll_interval=0.01)
+            jobIDs1 = [jc1.addJob(j) for j in self.jobs1[:5]]
+            jobIDs2 = [jc2.addJob(j) for j in self.jobs1[5:]]
+            jc1.start()
+            jc2.start()
+            self.assertEqual([], jc1.close())
+            self.assertEqual([], jc2.close())
+            self.assertEqual([10] * 5, [jc1.getJobResult(jid) for jid in jobIDs1])
+            self.assertEqual([10] * 5, [jc2.getJobResult(jid) for jid in jobIDs2])
+        finally:
+            open(os.path.join(self.queue_dir, FSQ_STOP), 'w').close()
+            for w in workers:
+                w.join()
+
+    def test_lease1(self):
+        # job claimed by dead worker is executed again
+        jc = FSQueueJobContainer(queue_dir=self.queue_dir, local_workers=1, lease=0.3,
+                                 poll_interval=0.01, heartbeat=0.05)
+        jobID = jc.addJob(self.jobs2[0])
+        claimed = FSQueueWorker(self.queue_dir).claim()
+        self.assertEqual((jc.session_dir, jc.getJobInputKey(jobID)), claimed)
+        jc.start()
+        exc = jc.close()
+        self.assertEqual([], exc)
+        self.assertEqual(10, jc.getJobResult(jobID))
+        self.assertEqual({jobID : 1}, jc.getMiscData()['requeuedJobs'])
+
+    def test_lease2(self):
+        # heartbeat keeps lease of long job
+        jc = FSQueueJobContainer(queue_dir=self.queue_dir, local_workers=1, lease=0.3,
+                                 poll_interval=0.01, heartbeat=0.05)
+        jobID = jc.addJob(Job(_f2, (1.0, 5)))
+        jc.start()
+        exc = jc.close()
+        self.assertEqual([], exc)
+        self.assertEqual(5, jc.getJobResult(jobID))
+        self.assertEqual({}, jc.getMiscData()['requeuedJobs'])
+
+    def test_lease3(self):
+        jc = FSQueueJobContainer(queue_dir=self.queue_dir, lease=0.2, max_requeues=0,
+                                 poll_interval=0.01)
+        jobID = jc.addJob(self.jobs1[0])
+        FSQueueWorker(self.queue_dir).claim()
+        exc = jc.close()
+        self.assertEqual([jobID], [jid for jid, _ in exc])
+        self.assertEqual([jobID], jc.getMiscData()['failedJobs'])
+        self.assertEqual(NOTPRODUCED, jc.getJobResult(jobID))
+        self.assertEqual(JobStatus.FINISHED, jc.getJobStatus(jobID))
+
+
+class TestFSQueueWorker1(unittest.TestCase):
+
+    def setUp(self):
+        self.queue_dir = os.path.join(TEST_INVARIANTS['test_write_root'], 'fsqueue')
+        os.mkdir(self.queue_dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.queue_dir)
+
+    def test_init1(self):
+        with self.assertRaises(Error):
+            FSQueueWorker(os.path.join(self.queue_dir, 'XXX'))
+
+    def test_run1(self):
+        jc = FSQueueJobContainer(queue_dir=self.queue_dir)
+        for _ in range(5):
+            jc.addJob(Job(_f1, (1, 2)))
+        self.assertEqual(3, FSQueueWorker(self.queue_dir, max_jobs=3).run())
+        self.assertEqual(2, FSQueueWorker(self.queue_dir, idle_timeout=0.1, poll_interval=0.01).run())
+        self.assertIsNone(FSQueueWorker(self.queue_dir).claim())
+        jc.close()
+        self.assertEqual([3] * 5, [jc.getJobResult(jid) for jid in sorted(jc.jobs.keys())])
+
+    def test_run2(self):
+        # stopped sessions are ignored
+        jc = FSQueueJobContainer(queue_dir=self.queue_dir)
+        jc.addJob(Job(_f1, (1, 2)))
+        open(os.path.join(jc.session_dir, FSQ_STOP), 'w').close()
+        self.assertIsNone(FSQueueWorker(self.queue_dir).claim())
+        self.assertTrue(FSQueueWorker(self.queue_dir, session=jc.session).isStopped())
+        open(os.path.join(self.queue_dir, FSQ_STOP), 'w').close()
+        self.assertEqual(0, FSQueueWorker(self.queue_dir).run())
@@ -18,6 +18,7 @@
 # between individual tests; useful for error debugging
 TEAR_DOWN_PPLUS_DIRS = True
 
+from kdvs.core.error import Error
 from kdvs.fw.Job import Job, JobStatus, JOBERROR
 from kdvs.fw.impl.job.PPlusJob import PPlusJobContainer
 from kdvs.tests import resolve_unittest, TEST_INVARIANTS
@@ -216,6 +217,59 @@ class TestPPlusJobContainer1(unittest.TestCase):
                 except OSError:
                     self.skipTest('pplus not initialized properly')
 
+    def test_batch1(self):
+        with nostderr():
+            try:
+                ppjc1 = PPlusJobContainer(batch_cost=4)
+                ppjc1.start()
+                jobs = [Job(self.f1, self.arg1, additional_data={'cost' : 1}) for _ in range(10)]
+                jobIDs1 = [ppjc1.addJob(j, importable=True) for j in jobs]
+                self.assertEqual(self.ref_increment_ids, jobIDs1)
+                ist1 = [ppjc1.getJobStatus(jid) for jid in jobIDs1]
+                ref_ist1 = [JobStatus.EXECUTING] * 8 + [JobStatus.ADDED] * 2
+                self.assertEqual(ref_ist1, ist1)
+                ppjc1.close()
+                est1 = set([ppjc1.getJobStatus(jid) for jid in jobIDs1])
+                self.assertEqual(set([JobStatus.FINISHED]), est1)
+                res1 = [ppjc1.getJobResult(jid) for jid in jobIDs1]
+                self.assertEqual([10] * 10, res1)
+                ref_batches = {'Batch0' : jobIDs1[:4], 'Batch1' : jobIDs1[4:8], 'Batch2' : jobIDs1[8:]}
+                self.assertEqual(ref_batches, ppjc1.getMiscData()['jobBatches'])
+                for jid in jobIDs1:
+                    self.assertIsNotNone(ppjc1.getJobTelemetry(jid)['output_bytes'])
+                ppjc1.clear()
+                _destroyPPlusServer(ppjc1)
+            except OSError:
+                self.skipTest('pplus not initialized properly')
+
+    def test_submission1(self):
+        with nostderr():
+            try:
+                ppjc1 = PPlusJobContainer(submission_batch=3, writer_threads=2, warmup_timeout=1.0)
+                ppjc1.start()
+                self.assertLessEqual(ppjc1.getMiscData()['warmupTime'], 2.0)
+                jobs = [Job(self.f1, self.arg1) for _ in range(10)]
+                jobIDs1 = [ppjc1.addJob(j) for j in jobs]
+                self.assertEqual(set([JobStatus.EXECUTING]), set([ppjc1.getJobStatus(jid) for jid in jobIDs1]))
+                # only full submission batches are physically submitted
+                self.assertEqual(9, ppjc1.getMiscData()['submissionStats']['jobs'])
+                ppjc1.close()
+                self.assertEqual([10] * 10, [ppjc1.getJobResult(jid) for jid in jobIDs1])
+                stats = ppjc1.getMiscData()['submissionStats']
+                self.assertEqual(10, stats['jobs'])
+                self.assertGreater(stats['seconds'], 0)
+                self.assertGreater(stats['jobs_per_second'], 0)
+                for jid in jobIDs1:
+                    self.assertIsNotNone(ppjc1.getJobTelemetry(jid)['input_bytes'])
+                ppjc1.clear()
+                _destroyPPlusServer(ppjc1)
+            except OSError:
+                self.skipTest('pplus not initialized properly')
+
+    def test_submission2(self):
+        with self.assertRaises(Error):
+            PPlusJobContainer(submission_batch=0)
+
     def test_miscData1(self):
         with nostderr():
             try:
@@ -0,0 +1,427 @@
+# Knowledge Driven Variable Selection (KDVS)
+# Copyright (C) 2014 KDVS Developers. All rights reserved.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from kdvs.core.error import Error
+from kdvs.fw.Job import NOTPRODUCED, JOBCANCELLED, Job, JobStatus
+from kdvs.fw.impl.job.ProcessJob import ProcessJobContainer
+from kdvs.fw.impl.job.SimpleJob import SimpleJobContainer
+from kdvs.fw.impl.job.WorkerPool import WorkerPool, closeSharedWorkerPools
+from kdvs.tests import resolve_unittest
+import numpy
+import os
+import threading
+import time
+try:
+    import resource
+    resourceFound = True
+except ImportError:
+    resourceFound = False
+
+unittest = resolve_unittest()
+
+def _f1(*args):
+    return sum(args)
+
+def _f2(*args):
+    time.sleep(args[0])
+    return sum(args[1:])
+
+def _f3(*args):
+    time.sleep(args[0])
+    raise KeyError
+
+def _f4(path):
+    # fails on first attempt only
+    if not os.path.exists(path):
+        open(path, 'w').close()
+        raise KeyError
+    return 1
+
+def _f5(size):
+    return len(' ' * size)
+
+def _f6(data):
+    return data.sum()
+
+def _f7():
+    return os.getpid(), os.environ.get('OMP_NUM_THREADS')
+
+def _f8(n):
+    return numpy.random.rand(n)
+
+def _f9(delay):
+    started = time.time()
+    time.sleep(delay)
+    return started, time.time()
+
+def _b1(args_list):
+    # batch function of _f1; tells the size of joint call
+    return [(len(args_list), _f1(*args)) for args in args_list]
+
+class TestProcessJobContainer1(unittest.TestCase):
+
+    def setUp(self):
+        self.ref_increment_ids = ['Job%d' % i for i in range(10)]
+        self.jobs1 = [Job(_f1, (1, 2, 3, 4)) for _ in range(10)]
+        self.jobs2 = [Job(_f2, (0.2, 1, 2, 3, 4)) for _ in range(10)]
+        self.jobs3 = [Job(_f3, (0.01,)) for _ in range(10)]
+        self.jobs4 = [Job(_f2, (2.0, 1)) for _ in range(2)]
+
+    def test_init1(self):
+        jc = ProcessJobContainer()
+        self.assertEqual({}, jc.jobs)
+        self.assertEqual([], jc.getMiscData()['timedOutJobs'])
+        self.assertEqual([], jc.getMiscData()['failedJobs'])
+        self.assertEqual({}, jc.getMiscData()['jobRetries'])
+
+    def test_init2(self):
+        with self.assertRaises(Error):
+            ProcessJobContainer(workers=0)
+        with self.assertRaises(Error):
+            ProcessJobContainer(XXX=1)
+
+    def test_close1(self):
+        jc = ProcessJobContainer(workers=2)
+        jobIDs = [jc.addJob(j) for j in self.jobs1]
+        self.assertEqual(self.ref_increment_ids, jobIDs)
+        jc.start()
+        exc = jc.close()
+        self.assertEqual([], exc)
+        res = [jc.getJobResult(jid) for jid in jobIDs]
+        self.assertEqual([10] * 10, res)
+        st = set([jc.getJobStatus(jid) for jid in jobIDs])
+        self.assertEqual(set([JobStatus.FINISHED]), st)
+
+    def test_close2(self):
+        # jobs are executed in parallel
+        jc = ProcessJobContainer(workers=10)
+        jobIDs = [jc.addJob(j) for j in self.jobs2]
+        jc.start()
+        t0 = time.time()
+        exc = jc.close()
+        self.assertLess(time.time() - t0, 1.5)
+        self.assertEqual([], exc)
+        self.assertEqual([10] * 10, [jc.getJobResult(jid) for jid in jobIDs])
+
+    def test_close3(self):
+        jc = ProcessJobContainer(workers=4)
+        jobIDs = [jc.addJob(j) for j in self.jobs3]
+        jc.start()
+        exc = jc.close()
+        self.assertEqual([NOTPRODUCED] * 10, [jc.getJobResult(jid) for jid in jobIDs])
+        self.assertItemsEqual(jobIDs, [jid for jid, _ in exc])
+        for _, e in exc:
+            self.assertIsInstance(e, Error)
+        self.assertItemsEqual(jobIDs, jc.getMiscData()['failedJobs'])
+        self.assertEqual([], jc.getMiscData()['timedOutJobs'])
+
+    def test_timeout1(self):
+        jc = ProcessJobContainer(workers=2, timeout=0.5)
+        jobIDs = [jc.addJob(j) for j in self.jobs4]
+        jobIDs.append(jc.addJob(self.jobs1[0]))
+        jc.start()
+        t0 = time.time()
+        exc = jc.close()
+        self.assertLess(time.time() - t0, 1.5)
+        self.assertEqual(jobIDs[:2], sorted([jid for jid, _ in exc]))
+        self.assertEqual(jobIDs[:2], sorted(jc.getMiscData()['timedOutJobs']))
+        self.assertEqual([NOTPRODUCED, NOTPRODUCED, 10], [jc.getJobResult(jid) for jid in jobIDs])
+
+    def test_timeout2(self):
+        # technique timeout takes precedence
+        jc = ProcessJobContainer(workers=2, timeout=0.5, technique_timeouts={'T1' : 5.0})
+        job = Job(_f2, (1.0, 5), additional_data={'technique' : 'T1'})
+        jobID1 = jc.addJob(job)
+        jobID2 = jc.addJob(self.jobs4[0])
+        self.assertEqual(5.0, jc.getJobTimeout(jobID1))
+        self.assertEqual(0.5, jc.getJobTimeout(jobID2))
+        jc.start()
+        exc = jc.close()
+        self.assertEqual([jobID2], [jid for jid, _ in exc])
+        self.assertEqual(5, jc.getJobResult(jobID1))
+
+    def test_retries1(self):
+        path = os.path.join(os.path.abspath(os.curdir), '.kdvs_process_job_retry_%d' % os.getpid())
+        try:
+            jc = ProcessJobContainer(workers=1, max_retries=1)
+            jobID = jc.addJob(Job(_f4, (path,)))
+            jc.start()
+            exc = jc.close()
+            self.assertEqual([], exc)
+            self.assertEqual(1, jc.getJobResult(jobID))
+            self.assertEqual({jobID : 1}, jc.getMiscData()['jobRetries'])
+        finally:
+            if os.path.exists(path):
+                os.remove(path)
+
+    def test_retries2(self):
+        jc = ProcessJobContainer(workers=2, max_retries=2)
+        jobIDs = [jc.addJob(j) for j in self.jobs3[:2]]
+        jc.start()
+        exc = jc.close()
+        self.assertEqual(jobIDs, sorted([jid for jid, _ in exc]))
+        self.assertEqual(dict([(jid, 2) for jid in jobIDs]), jc.getMiscData()['jobRetries'])
+
+    @unittest.skipUnless(resourceFound, 'resource not found')
+    def test_maxMemory1(self):
+        jc = ProcessJobContainer(workers=1, max_memory=512 * 1024 * 1024)
+        jobID1 = jc.addJob(Job(_f5, (1024,)))
+        jobID2 = jc.addJob(Job(_f5, (1024 * 1024 * 1024,)))
+        jc.start()
+        exc = jc.close()
+        self.assertEqual(1024, jc.getJobResult(jobID1))
+        self.assertEqual([jobID2], [jid for jid, _ in exc])
+        self.assertEqual([jobID2], jc.getMiscData()['failedJobs'])
+
+    def test_flush1(self):
+        jc = ProcessJobContainer(workers=2)
+        finished = list()
+        jc.addJobFinishedCallback(finished.append)
+        jc.start()
+        jobIDs1 = [jc.addJob(j) for j in self.jobs1[:5]]
+        self.assertEqual([], finished)
+        jc.flush()
+        self.assertItemsEqual(jobIDs1, finished)
+        jobIDs2 = [jc.addJob(j) for j in self.jobs3[:5]]
+        exc = jc.close()
+        self.assertItemsEqual(jobIDs1 + jobIDs2, finished)
+        self.assertItemsEqual(jobIDs2, [jid for jid, _ in exc])
+
+    def test_cancelJob1(self):
+        # single worker process; the first job cancels jobs still in the queue
+        jc = ProcessJobContainer(workers=1)
+        finished = list()
+        def _callback(jobID):
+            finished.append(jobID)
+            if jobID == self.ref_increment_ids[0]:
+                for jid in self.ref_increment_ids[2:5]:
+                    self.assertTrue(jc.cancelJob(jid))
+        jc.addJobFinishedCallback(_callback)
+        jobIDs = [jc.addJob(j) for j in self.jobs1[:6]]
+        jc.start()
+        self.assertEqual([], jc.close())
+        self.assertItemsEqual(jobIDs, finished)
+        res = [jc.getJobResult(jid) for jid in jobIDs]
+        self.assertEqual([10, 10] + [JOBCANCELLED] * 3 + [10], res)
+        self.assertEqual(jobIDs[2:5], jc.getMiscData()['cancelledJobs'])
+        self.assertFalse(jc.cancelJob(jobIDs[0]))
+        # cancelled jobs were not started
+        self.assertEqual(3, len(jc.getMiscData()['jobBatches']))
+
+    def test_telemetry1(self):
+        jc = ProcessJobContainer(workers=2)
+        jobID1 = jc.addJob(Job(_f6, (numpy.ones((20, 5)),)))
+        jobID2 = jc.addJob(self.jobs3[0])
+        jc.start()
+        jc.close()
+        self.assertEqual(100.0, jc.getJobResult(jobID1))
+        tel1 = jc.getJobTelemetry(jobID1)
+        self.assertEqual((20, 5), (tel1['n'], tel1['p']))
+        self.assertGreater(tel1['input_bytes'], 800)
+        self.assertGreater(tel1['peak_rss'], 0)
+        self.assertNotEqual(str(os.getpid()), tel1['worker'].rpartition(':')[2])
+        tel2 = jc.getJobTelemetry(jobID2)
+        self.assertIsNone(tel2['output_bytes'])
+        self.assertEqual([jobID1, jobID2], [r[0] for r in jc.getJobTelemetryTable()])
+
+    def test_seed1(self):
+        # results of seeded jobs do not depend on container nor on number of workers
+        def _results(jc):
+            jobIDs = [jc.addJob(Job(_f8, (5,), additional_data={'seed' : s})) for s in range(8)]
+            jc.start()
+            jc.close()
+            return [jc.getJobResult(jid) for jid in jobIDs]
+        ref = _results(SimpleJobContainer())
+        for jc in (ProcessJobContainer(workers=1), ProcessJobContainer(workers=4)):
+            res = _results(jc)
+            for r1, r2 in zip(ref, res):
+                self.assertEqual(r1.tostring(), r2.tostring())
+        self.assertFalse(numpy.all(ref[0] == ref[1]))
+
+    def test_memoryBudget1(self):
+        with self.assertRaises(Error):
+            ProcessJobContainer(memory_budget=0)
+        jc = ProcessJobContainer(workers=4, memory_budget=100)
+        self.assertNotIn('memoryAdmission', ProcessJobContainer().getMiscData())
+        jobIDs = [jc.addJob(Job(_f9, (0.3,), additional_data={'memory' : 40})) for _ in range(4)]
+        # exceeds the budget alone
+        jobIDs.append(jc.addJob(Job(_f9, (0.3,), additional_data={'memory' : 200})))
+        jc.start()
+        exc = jc.close()
+        self.assertEqual([], exc)
+        # no more than 2 jobs were running at the same time, and the last one was running alone
+        spans = [jc.getJobResult(jid) for jid in jobIDs]
+        for started, _ in spans:
+            running = [s for s, e in spans if s <= started < e]
+            self.assertLessEqual(len(running), 2)
+        self.assertGreaterEqual(spans[4][0], max([e for _, e in spans[:4]]))
+        admission = jc.getMiscData()['memoryAdmission']
+        self.assertEqual(100, admission['budget'])
+        self.assertEqual(200, admission['peak_reserved'])
+        self.assertGreaterEqual(admission['deferred'], 2)
+        self.assertEqual([jobIDs[4]], admission['oversized'])
+        self.assertEqual(40, jc.getJobTelemetry(jobIDs[0])['est_memory'])
+
+    def test_batch1(self):
+        jc = ProcessJobContainer(workers=2, batch_cost=5)
+        jobIDs = [jc.addJob(Job(_f1, (1, 2, 3, 4), additional_data={'cost' : 1})) for _ in range(10)]
+        # unknown cost, never batched
+        jobIDs.append(jc.addJob(self.jobs1[0]))
+        jc.start()
+        exc = jc.close()
+        self.assertEqual([], exc)
+        self.assertEqual([10] * 11, [jc.getJobResult(jid) for jid in jobIDs])
+        self.assertEqual([jobIDs[:5], jobIDs[5:10], jobIDs[10:]], jc.getMiscData()['jobBatches'])
+        workers = set([jc.getJobTelemetry(jid)['worker'] for jid in jobIDs[:5]])
+        self.assertEqual(1, len(workers))
+
+    def test_batch2(self):
+        # timed out job ends worker process, remaining jobs of the batch are executed again
+        jc = ProcessJobContainer(workers=1, batch_cost=10, timeout=0.5)
+        jobs = [Job(_f2, (0.0, 1), additional_data={'cost' : 1}),
+                Job(_f2, (2.0, 2), additional_data={'cost' : 1}),
+                Job(_f2, (0.0, 3), additional_data={'cost' : 1}),
+                Job(_f3, (0.0,), additional_data={'cost' : 1}),
+                Job(_f2, (0.0, 5), additional_data={'cost' : 1})]
+        jobIDs = [jc.addJob(j) for j in jobs]
+        finished = list()
+        jc.addJobFinishedCallback(finished.append)
+        jc.start()
+        exc = jc.close()
+        self.assertItemsEqual(jobIDs, finished)
+        self.assertEqual([1, NOTPRODUCED, 3, NOTPRODUCED, 5], [jc.getJobResult(jid) for jid in jobIDs])
+        self.assertEqual([jobIDs[1], jobIDs[3]], sorted([jid for jid, _ in exc]))
+        self.assertEqual([jobIDs[1]], jc.getMiscData()['timedOutJobs'])
+        self.assertEqual([jobIDs[3]], jc.getMiscData()['failedJobs'])
+        self.assertEqual([jobIDs, jobIDs[2:]], jc.getMiscData()['jobBatches'])
+
+    def test_batch3(self):
+        # jobs of the batch that share batch function are executed with single call
+        jc = ProcessJobContainer(workers=2, batch_cost=5)
+        ad = {'cost' : 1, 'batch_call' : _b1}
+        jobIDs = [jc.addJob(Job(_f1, (1, 2, i), additional_data=ad)) for i in range(7)]
+        jc.start()
+        self.assertEqual([], jc.close())
+        self.assertEqual([(5, 3 + i) for i in range(5)] + [(2, 8), (2, 9)],
+                         [jc.getJobResult(jid) for jid in jobIDs])
+
+
+class TestProcessJobContainer2(unittest.TestCase):
+    # worker processes from the pool
+
+    def setUp(self):
+        self.pool = WorkerPool(size=2, preload=('numpy',))
+
+    def tearDown(self):
+        self.pool.close()
+
+    def test_init1(self):
+        with self.assertRaises(Error):
+            ProcessJobContainer(pool=1)
+        with self.assertRaises(Error):
+            ProcessJobContainer(blas_threads=2)
+
+    def test_close1(self):
+        jc = ProcessJobContainer(workers=4, pool=self.pool)
+        jobIDs = [jc.addJob(Job(_f7, ())) for _ in range(10)]
+        jobIDs.append(jc.addJob(Job(_f1, (1, 2, 3, 4))))
+        jc.start()
+        self.assertEqual([], jc.close())
+        res = [jc.getJobResult(jid) for jid in jobIDs[:10]]
+        # worker processes are reused
+        self.assertLessEqual(len(set([pid for pid, _ in res])), 2)
+        self.assertEqual(set(['1']), set([omp for _, omp in res]))
+        self.assertEqual(10, jc.getJobResult(jobIDs[10]))
+        # pool is reused by next container
+        jc2 = ProcessJobContainer(pool=self.pool)
+        jid = jc2.addJob(Job(_f7, ()))
+        jc2.close()
+        self.assertIn(jc2.getJobResult(jid)[0], set([pid for pid, _ in res]))
+
+    def test_close2(self):
+        jc = ProcessJobContainer(workers=2, pool=self.pool, max_retries=1)
+        jobIDs = [jc.addJob(Job(_f3, (0.01,)))]
+        # jobs that cannot be sent to worker process fail at once
+        jobIDs.append(jc.addJob(Job(lambda: 1, ())))
+        exc = jc.close()
+        self.assertItemsEqual(jobIDs, [jid for jid, _ in exc])
+        self.assertEqual({jobIDs[0] : 1}, jc.getMiscData()['jobRetries'])
+
+    def test_timeout1(self):
+        jc = ProcessJobContainer(workers=2, pool=self.pool, timeout=0.5)
+        jobIDs = [jc.addJob(Job(_f2, (2.0, 1)))]
+        jobIDs.append(jc.addJob(Job(_f1, (1, 2, 3, 4))))
+        t0 = time.time()
+        exc = jc.close()
+        self.assertLess(time.time() - t0, 1.5)
+        self.assertEqual([jobIDs[0]], [jid for jid, _ in exc])
+        self.assertEqual([jobIDs[0]], jc.getMiscData()['timedOutJobs'])
+        self.assertEqual(10, jc.getJobResult(jobIDs[1]))
+        # terminated worker process is replaced
+        jc2 = ProcessJobContainer(workers=2, pool=self.pool)
+        jobIDs2 = [jc2.addJob(Job(_f1, (1, 2))) for _ in range(4)]
+        self.assertEqual([], jc2.close())
+        self.assertEqual([3] * 4, [jc2.getJobResult(jid) for jid in jobIDs2])
+
+    def test_exhausted1(self):
+        # all worker processes are acquired by another user of the pool
+        workers = [self.pool.acquire() for _ in range(self.pool.size)]
+        self.assertTrue(self.pool.isExhausted())
+        def _release():
+            time.sleep(0.5)
+            for worker in workers:
+                self.pool.release(worker)
+        th = threading.Thread(target=_release)
+        th.start()
+        jc = ProcessJobContainer(workers=2, pool=self.pool)
+        jobIDs = [jc.addJob(Job(_f1, (1, 2))) for _ in range(3)]
+        self.assertEqual([], jc.close())
+        th.join()
+        self.assertEqual([3] * 3, [jc.getJobResult(jid) for jid in jobIDs])
+        self.assertFalse(self.pool.isExhausted())
+
+    def test_exhausted2(self):
+        # worker processes that are never released do not block forever
+        workers = [self.pool.acquire() for _ in range(self.pool.size)]
+        try:
+            jc = ProcessJobContainer(workers=2, pool=self.pool, pool_wait_timeout=0.3)
+            jobIDs = [jc.addJob(Job(_f1, (1, 2))) for _ in range(2)]
+            exceptions = jc.close()
+            self.assertEqual(jobIDs, [jid for jid, _ in exceptions])
+            for _, e in exceptions:
+                self.assertIsInstance(e, Error)
+                self.assertIn('No idle worker process in the pool', str(e))
+            self.assertItemsEqual(jobIDs, jc.miscData['failedJobs'])
+        finally:
+            for worker in workers:
+                self.pool.release(worker)
+        with self.assertRaises(Error):
+            ProcessJobContainer(pool=self.pool, pool_wait_timeout=-1)
+
+    def test_shared1(self):
+        try:
+            jc1 = ProcessJobContainer(workers=1, pool=True)
+            jc2 = ProcessJobContainer(workers=1, pool=True)
+            self.assertIs(jc1.pool, jc2.pool)
+            jid = jc1.addJob(Job(_f7, ()))
+            jc1.close()
+            self.assertEqual('1', jc1.getJobResult(jid)[1])
+            jc3 = ProcessJobContainer(workers=1, pool=True, blas_threads=3)
+            jid = jc3.addJob(Job(_f7, ()))
+            jc3.close()
+            self.assertEqual('3', jc3.getJobResult(jid)[1])
+        finally:
+            closeSharedWorkerPools()
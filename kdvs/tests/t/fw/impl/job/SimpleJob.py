@@ -15,10 +15,13 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 from kdvs.core.error import Error
-from kdvs.fw.Job import NOTPRODUCED, Job
+from kdvs.fw.Job import NOTPRODUCED, JOBCANCELLED, Job, JobStatus
+from kdvs.fw.JobCache import JobResultCache
 from kdvs.fw.impl.job.SimpleJob import SimpleJobContainer, SimpleJobExecutor
-from kdvs.tests import resolve_unittest
+from kdvs.tests import resolve_unittest, TEST_INVARIANTS
+import os
 import re
+import shutil
 import time
 
 unittest = resolve_unittest()
@@ -42,6 +45,12 @@ def _f4(*args):
     # square arguments
     return [a * a for a in args]
 
+_batch_sizes = list()
+
+def _b4(args_list):
+    _batch_sizes.append(len(args_list))
+    return [_f4(*args) for args in args_list]
+
 class TestSimpleJobContainer1(unittest.TestCase):
 
     def setUp(self):
@@ -145,6 +154,148 @@ class TestSimpleJobContainer1(unittest.TestCase):
         self.assertEqual([], exc)
         jc.clear()
 
+    def test_flush1(self):
+        jc = SimpleJobContainer(incrementID=True)
+        jc.start()
+        for j in self.jobs1[:5]:
+            jc.addJob(j)
+        res = [jc.getJobResult(jid) for jid in self.ref_increment_ids[:5]]
+        self.assertEqual([NOTPRODUCED] * 5, res)
+        jc.flush()
+        res = [jc.getJobResult(jid) for jid in self.ref_increment_ids[:5]]
+        self.assertEqual([10] * 5, res)
+        for j in self.jobs3[:5]:
+            jc.addJob(j)
+        jc.flush()
+        # already executed jobs shall not be executed again
+        jc.flush()
+        exc = jc.close()
+        res = [jc.getJobResult(jid) for jid in self.ref_increment_ids]
+        self.assertEqual([10] * 5 + [NOTPRODUCED] * 5, res)
+        self.assertEqual(self.ref_increment_ids[5:], [jid for jid, _ in exc])
+        for _, ex in exc:
+            self.assertIsInstance(ex, Error)
+        jc.clear()
+
+    def test_addJobFinishedCallback1(self):
+        jc = SimpleJobContainer(incrementID=True)
+        finished = list()
+        def _callback(jobID):
+            finished.append((jobID, jc.getJobResult(jobID)))
+        jc.addJobFinishedCallback(_callback)
+        for j in self.jobs1[:5]:
+            jc.addJob(j)
+        for j in self.jobs3[:5]:
+            jc.addJob(j)
+        self.assertEqual([], finished)
+        jc.start()
+        jc.close()
+        ref_finished = zip(self.ref_increment_ids, [10] * 5 + [NOTPRODUCED] * 5)
+        self.assertEqual(ref_finished, finished)
+        jc.clear()
+
+    def test_telemetry1(self):
+        jc = SimpleJobContainer(incrementID=True)
+        for j in self.jobs1[:5]:
+            jc.addJob(j)
+        for j in self.jobs3[:5]:
+            jc.addJob(j)
+        jc.start()
+        jc.close()
+        rows = jc.getJobTelemetryTable()
+        self.assertEqual(sorted(self.ref_increment_ids), [r[0] for r in rows])
+        for jid in self.ref_increment_ids[:5]:
+            self.assertGreater(jc.getJobTelemetry(jid)['output_bytes'], 0)
+        for jid in self.ref_increment_ids[5:]:
+            self.assertGreaterEqual(jc.getJobTelemetry(jid)['wall_time'], 0.5)
+            self.assertIsNone(jc.getJobTelemetry(jid)['output_bytes'])
+        jc.clear()
+
+    def test_batch1(self):
+        del _batch_sizes[:]
+        jc = SimpleJobContainer(incrementID=True, batch_cost=4)
+        for _ in range(10):
+            jc.addJob(Job(self.f4, self.arg4, additional_data={'cost' : 1, 'batch_call' : _b4}))
+        jc.start()
+        self.assertEqual([], jc.close())
+        self.assertEqual([4, 4, 2], _batch_sizes)
+        for jid in self.ref_increment_ids:
+            self.assertEqual([1, 9, 25, 49, 81], jc.getJobResult(jid))
+            self.assertIsNotNone(jc.getJobTelemetry(jid))
+        jc.clear()
+
+    def test_addFinishedJob1(self):
+        jc = SimpleJobContainer(incrementID=True)
+        for j in self.jobs1[:5]:
+            jc.addJob(j)
+        # finished jobs shall not be executed again
+        for j in self.jobs3[:5]:
+            jc.addFinishedJob(j, 20)
+        jc.start()
+        exc = jc.close()
+        res = [jc.getJobResult(jid) for jid in self.ref_increment_ids]
+        ref_res = [10] * 5 + [20] * 5
+        self.assertEqual(ref_res, res)
+        self.assertEqual([], exc)
+        jc.clear()
+
+    def test_cancelJob1(self):
+        jc = SimpleJobContainer(incrementID=True)
+        finished = list()
+        def _callback(jobID):
+            finished.append(jobID)
+            # the first job cancels the remaining ones
+            if jobID == self.ref_increment_ids[0]:
+                for jid in self.ref_increment_ids[1:5]:
+                    self.assertTrue(jc.cancelJob(jid))
+        jc.addJobFinishedCallback(_callback)
+        for j in self.jobs1[:5]:
+            jc.addJob(j)
+        jc.start()
+        self.assertEqual([], jc.close())
+        self.assertEqual(self.ref_increment_ids[:5], finished)
+        res = [jc.getJobResult(jid) for jid in self.ref_increment_ids[:5]]
+        self.assertEqual([10] + [JOBCANCELLED] * 4, res)
+        self.assertEqual(self.ref_increment_ids[1:5], jc.getMiscData()['cancelledJobs'])
+        for jid in self.ref_increment_ids[:5]:
+            self.assertEqual(JobStatus.FINISHED, jc.getJobStatus(jid))
+        # executed jobs cannot be cancelled
+        self.assertFalse(jc.cancelJob(self.ref_increment_ids[0]))
+        self.assertFalse(jc.cancelJob(self.ref_increment_ids[1]))
+        jc.clear()
+
+    def test_resultCache1(self):
+        cache_dir = os.path.join(TEST_INVARIANTS['test_write_root'], 'jobcache')
+        try:
+            jc1 = SimpleJobContainer(incrementID=True)
+            jc1.setResultCache(JobResultCache(cache_dir))
+            for j in self.jobs1[:5] + self.jobs3[:2]:
+                jc1.addJob(j)
+            jc1.start()
+            jc1.close()
+            self.assertEqual([], jc1.getMiscData()['cachedJobs'])
+            # failed jobs are not cached
+            self.assertEqual(1, len(jc1.getResultCache()))
+            # the same jobs are not executed again
+            cache = JobResultCache(cache_dir)
+            jc2 = SimpleJobContainer(incrementID=True)
+            jc2.setResultCache(cache)
+            finished = list()
+            jc2.addJobFinishedCallback(finished.append)
+            jobIDs = [jc2.addJob(j) for j in [Job(_f1, (1, 2, 3, 4)) for _ in range(3)]]
+            jobIDs.append(jc2.addJob(Job(_f1, (1, 2))))
+            self.assertEqual(jobIDs[:3], finished)
+            jc2.start()
+            jc2.close()
+            self.assertEqual([10, 10, 10, 3], [jc2.getJobResult(jid) for jid in jobIDs])
+            self.assertEqual(jobIDs[:3], jc2.getMiscData()['cachedJobs'])
+            self.assertIsNone(jc2.getJobTelemetry(jobIDs[0]))
+            self.assertEqual(3, cache.getStatistics()['hits'])
+            self.assertEqual(1, cache.getStatistics()['misses'])
+            self.assertEqual(2, len(cache))
+        finally:
+            shutil.rmtree(cache_dir)
+
 
 class TestSimpleJobExecutor1(unittest.TestCase):
 
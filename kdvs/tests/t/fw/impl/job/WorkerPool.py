@@ -0,0 +1,163 @@
+# Knowledge Driven Variable Selection (KDVS)
+# Copyright (C) 2014 KDVS Developers. All rights reserved.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from kdvs.core.error import Error
+from kdvs.fw.impl.job.WorkerPool import ForkServer, WorkerPool, \
+    getSharedWorkerPool, closeSharedWorkerPools, BLAS_THREADS_VARIABLES
+from kdvs.tests import resolve_unittest
+import os
+import sys
+import threading
+import time
+
+unittest = resolve_unittest()
+
+def _t1(conn, *args):
+    # report environment and imported modules of worker process
+    conn.send((os.getpid(), [os.environ.get(v) for v in BLAS_THREADS_VARIABLES],
+               'numpy' in sys.modules, sum(args)))
+
+def _t2(conn):
+    conn.send(os.getpid())
+    return False
+
+class TestForkServer1(unittest.TestCase):
+
+    def test_fork1(self):
+        fs = ForkServer(preload=('numpy', 'XXX_not_installed'), blas_threads=2)
+        try:
+            self.assertTrue(fs.isAlive())
+            self.assertEqual(['numpy'], fs.preloaded)
+            worker = fs.fork()
+            self.assertTrue(worker.is_alive())
+            self.assertNotEqual(os.getpid(), worker.pid)
+            worker.conn.send((_t1, (1, 2, 3)))
+            pid, blas, numpyLoaded, total = worker.conn.recv()
+            self.assertEqual(worker.pid, pid)
+            self.assertEqual(['2'] * len(BLAS_THREADS_VARIABLES), blas)
+            self.assertTrue(numpyLoaded)
+            self.assertEqual(6, total)
+            # worker process ends when task returns False
+            worker.conn.send((_t2, ()))
+            self.assertEqual(pid, worker.conn.recv())
+            worker.join(timeout=5.0)
+            self.assertFalse(worker.is_alive())
+        finally:
+            fs.close()
+        self.assertFalse(fs.isAlive())
+        with self.assertRaises(Error):
+            fs.fork()
+
+
+class TestWorkerPool1(unittest.TestCase):
+
+    def test_init1(self):
+        with self.assertRaises(Error):
+            WorkerPool(size=0)
+
+    def test_acquire1(self):
+        pool = WorkerPool(size=2, preload=())
+        try:
+            w1 = pool.acquire()
+            w2 = pool.acquire()
+            self.assertNotEqual(w1.pid, w2.pid)
+            with self.assertRaises(Error):
+                pool.acquire()
+            # released worker process is reused
+            pool.release(w1)
+            w3 = pool.acquire()
+            self.assertIs(w1, w3)
+            # discarded worker process is replaced
+            pool.discard(w2)
+            self.assertFalse(w2.is_alive())
+            w4 = pool.acquire()
+            self.assertNotEqual(w2.pid, w4.pid)
+            self.assertEqual({'forked' : 3, 'reused' : 1}, pool.stats)
+            pool.release(w3)
+            pool.release(w4)
+        finally:
+            pool.close()
+        self.assertTrue(pool.isClosed())
+        self.assertFalse(w1.is_alive())
+        self.assertFalse(w4.is_alive())
+        with self.assertRaises(Error):
+            pool.acquire()
+
+    def test_acquire2(self):
+        pool = WorkerPool(size=1, preload=())
+        try:
+            w1 = pool.acquire()
+            started = time.time()
+            with self.assertRaises(Error):
+                pool.acquire(timeout=0.2)
+            self.assertGreaterEqual(time.time() - started, 0.2)
+            # waiting caller gets worker process released by another thread
+            th = threading.Timer(0.2, pool.release, (w1,))
+            th.start()
+            w2 = pool.acquire(timeout=10.0)
+            th.join()
+            self.assertIs(w1, w2)
+            # waiting caller is woken up when the pool is closed
+            th = threading.Timer(0.2, pool.close)
+            th.start()
+            with self.assertRaises(Error):
+                pool.acquire(timeout=None)
+            th.join()
+        finally:
+            pool.close()
+
+    def test_acquire3(self):
+        # concurrent callers never exceed the size of the pool
+        pool = WorkerPool(size=2, preload=())
+        acquired = list()
+        peak = [0]
+        lock = threading.Lock()
+        def _use():
+            for _ in range(3):
+                worker = pool.acquire(timeout=30.0)
+                with lock:
+                    acquired.append(worker)
+                    peak[0] = max(peak[0], len(acquired))
+                time.sleep(0.01)
+                with lock:
+                    acquired.remove(worker)
+                pool.release(worker)
+        try:
+            threads = [threading.Thread(target=_use) for _ in range(6)]
+            for th in threads:
+                th.start()
+            for th in threads:
+                th.join()
+            self.assertLessEqual(peak[0], 2)
+            self.assertLessEqual(pool.stats['forked'], 2)
+            self.assertEqual(18, pool.stats['forked'] + pool.stats['reused'])
+            self.assertFalse(pool.isExhausted())
+        finally:
+            pool.close()
+
+    def test_shared1(self):
+        try:
+            pool1 = getSharedWorkerPool(size=1, preload=())
+            pool2 = getSharedWorkerPool(size=1, preload=())
+            pool3 = getSharedWorkerPool(size=1, preload=(), blas_threads=None)
+            self.assertIs(pool1, pool2)
+            self.assertIsNot(pool1, pool3)
+        finally:
+            closeSharedWorkerPools()
+        self.assertTrue(pool1.isClosed())
+        self.assertTrue(pool3.isClosed())
+        self.assertIsNot(pool1, getSharedWorkerPool(size=1, preload=()))
+        closeSharedWorkerPools()
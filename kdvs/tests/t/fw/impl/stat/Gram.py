@@ -0,0 +1,89 @@
+# Knowledge Driven Variable Selection (KDVS)
+# Copyright (C) 2014 KDVS Developers. All rights reserved.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from kdvs.core.error import Error
+from kdvs.fw.impl.stat.Gram import GramStatistics
+from kdvs.tests import resolve_unittest
+import numpy
+
+unittest = resolve_unittest()
+
+def _center(matrix, optional_matrix=None):
+    mean = matrix.mean(axis=0)
+    if optional_matrix is None:
+        return matrix - mean
+    return matrix - mean, optional_matrix - mean
+
+class TestGramStatistics1(unittest.TestCase):
+
+    def setUp(self):
+        rs = numpy.random.RandomState(4)
+        self.data = rs.randn(20, 12)
+        self.labels = numpy.sign(rs.randn(20, 1))
+        self.variables = ['V%02d' % i for i in range(12)]
+        self.split_sets = [(range(5, 20), range(0, 5)), (range(0, 15), range(15, 20))]
+        self.subset_vars = ['V07', 'V01', 'V03']
+        self.subset_idxs = [7, 1, 3]
+
+    def test_init1(self):
+        with self.assertRaises(Error):
+            GramStatistics(self.data, self.labels, self.variables[:-1])
+        with self.assertRaises(Error):
+            GramStatistics(self.data, self.labels, self.variables, max_memory=0)
+        gs = GramStatistics(self.data, self.labels, self.variables)
+        self.assertTrue(gs.hasStatistics())
+        self.assertFalse(gs.hasStatistics(0))
+        self.assertEqual((12 * 12 + 12) * 8, gs.getSize())
+        with self.assertRaises(Error):
+            gs.addSubset('SS1', ['V01', 'XXX'])
+
+    def test_statistics1(self):
+        gs = GramStatistics(self.data, self.labels, self.variables, self.split_sets, _center)
+        gs.addSubset('SS1', self.subset_vars)
+        self.assertTrue(gs.hasSubset('SS1'))
+        self.assertFalse(gs.hasSubset('SS2'))
+        self.assertIsNone(gs.getGram('SS2'))
+        # the same as computed from normalized subset
+        ss = self.data[:, self.subset_idxs]
+        X = _center(ss)
+        self.assertTrue(numpy.allclose(numpy.dot(X.T, X), gs.getGram('SS1')))
+        self.assertTrue(numpy.allclose(numpy.dot(X.T, self.labels).ravel(), gs.getCorrelation('SS1')))
+        for i, (train_idxs, test_idxs) in enumerate(self.split_sets):
+            Xtr, _ = _center(ss[train_idxs, :], ss[test_idxs, :])
+            self.assertTrue(numpy.allclose(numpy.dot(Xtr.T, Xtr), gs.getGram('SS1', i)))
+            self.assertTrue(numpy.allclose(numpy.dot(Xtr.T, self.labels[train_idxs]).ravel(), gs.getCorrelation('SS1', i)))
+
+    def test_memory1(self):
+        entry_size = (12 * 12 + 12) * 8
+        # only statistics that fit are computed
+        gs = GramStatistics(self.data, self.labels, self.variables, self.split_sets, max_memory=2 * entry_size)
+        gs.addSubset('SS1', self.subset_vars)
+        self.assertEqual(2 * entry_size, gs.getSize())
+        self.assertEqual([True, True, False], [gs.hasStatistics(s) for s in (None, 0, 1)])
+        self.assertIsNone(gs.getGram('SS1', 1))
+        self.assertIsNone(gs.getCorrelation('SS1', 1))
+        gs = GramStatistics(self.data, self.labels, self.variables, self.split_sets, max_memory=entry_size - 1)
+        gs.addSubset('SS1', self.subset_vars)
+        self.assertEqual(0, gs.getSize())
+        self.assertIsNone(gs.getGram('SS1'))
+
+    def test_matches1(self):
+        gs = GramStatistics(self.data, self.labels, self.variables, self.split_sets, _center)
+        self.assertTrue(gs.matches(_center, None))
+        self.assertTrue(gs.matches(_center, None, self.split_sets))
+        self.assertFalse(gs.matches(_center, None, list(self.split_sets)))
+        self.assertFalse(gs.matches(None, None))
+        self.assertFalse(gs.matches(_center, _center))
@@ -15,10 +15,16 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 from kdvs.core.error import Error
-from kdvs.fw.Job import Job
-from kdvs.fw.Stat import Results, RESULTS_RUNTIME_KEY
-from kdvs.fw.impl.job.SimpleJob import SimpleJobExecutor
-from kdvs.fw.impl.stat.L1L2 import L1L2_OLS, L1L2_L1L2, L1L2_RLS
+from kdvs.fw.Job import Job, JOBCANCELLED
+from kdvs.fw.Stat import Results, RESULTS_RUNTIME_KEY, RESULTS_SCREENED_OUT_KEY
+from kdvs.fw.impl.job.SimpleJob import SimpleJobExecutor, SimpleJobContainer
+from kdvs.fw.impl.stat.Gram import GramStatistics
+from kdvs.fw.impl.stat.L1L2 import L1L2_OLS, L1L2_L1L2, L1L2_RLS, \
+    l1l2_ridge_path, l1l2_ridge_formulation, l1l2_ridge_path_batch, \
+    l1l2_ols_batch_wrapper, l1l2_rls_batch_wrapper, l1l2_gram_norm, l1l2_fista, \
+    l1l2_screened_regularization, l1l2_native_path, l1l2_native_model_selection, \
+    l1l2_l1l2_job_wrapper, l1l2_native_job_wrapper, l1l2_gram_eigenvalues, \
+    L1L2_Cascade, l1l2_adaptive_kcv_errors
 from kdvs.tests import resolve_unittest, TEST_INVARIANTS
 import csv
 import numpy
@@ -110,8 +116,11 @@ class TestL1L2_OLS2(unittest.TestCase):
             'samples' : self.samples
             }
         self.additionalJobData1 = {
-            'depfuncs' : (),
+            'depfuncs' : (l1l2_ridge_formulation, l1l2_ridge_path, l1l2_ridge_path_batch,
+                          l1l2_ols_batch_wrapper),
             'modules' : ['os', 'l1l2py', 'numpy'],
+            'formulation' : 'dual',
+            'batch_call' : l1l2_ols_batch_wrapper,
             'samples' : self.samples
             }
         self.runtime1 = {'techID' : 'TECH_ID_OLS'}
@@ -249,17 +258,20 @@ class TestL1L2_L1L2_1(unittest.TestCase):
             jd = {
                 'depfuncs' : (),
                 'modules' : ('os', 'l1l2py', 'numpy'),
+                'engine' : 'l1l2py',
                 'samples' : self.samples,
                 'ext_split' : i,
                 'ssname' : self.ssname1,
                 'calls' : None,
+                'calls_digest' : None,
                 'data_shape' : self.data.shape,
+                'memory' : None,
                 'labels' : self.labels,
             }
             self.additionalJobData1.append(jd)
         self.additionalJobData_comparables = [
             'depfuncs', 'modules', 'samples', 'ext_split', 'ssname',
-            'data_shape', 'labels'
+            'data_shape', 'labels', 'engine'
             ]
         self.runtime1 = {'techID' : 'TECH_ID_L1L2'}
 
@@ -267,7 +279,8 @@ class TestL1L2_L1L2_1(unittest.TestCase):
         t = L1L2_L1L2(**self.l1l2_l1l2_cfg1)
         jobGen = t.createJob(self.ssname1, self.data, self.labels, self.initial_additionalJobData1)
         self.assertIsInstance(jobGen, types.GeneratorType)
-        for (jid, job), ref_ajd in zip(jobGen, self.additionalJobData1):
+        jobs1 = list(jobGen)
+        for (jid, job), ref_ajd in zip(jobs1, self.additionalJobData1):
             self.assertIsNotNone(jid)
             self.assertIsInstance(job, Job)
             ajd = job.additional_data
@@ -277,6 +290,10 @@ class TestL1L2_L1L2_1(unittest.TestCase):
                     self.assertItemsEqual(ref_ajd[k], ajd[k])
                 except TypeError:
                     self.assertEqual(ref_ajd[k], ajd[k])
+            self.assertGreater(ajd['memory'], self.data.nbytes)
+            # preparatory data are shared, without data of splits
+            self.assertIs(jobs1[0][1].additional_data['calls'], ajd['calls'])
+            self.assertNotIn('call_args', ajd['calls'][0])
 
     def test_produceResults1(self):
         t = L1L2_L1L2(**self.l1l2_l1l2_cfg1)
@@ -360,19 +377,23 @@ class TestL1L2_RLS_1(unittest.TestCase):
             'samples' : self.samples
             }
         self.additionalJobData1 = {
-            'depfuncs' : (),
+            'depfuncs' : (l1l2_ridge_formulation, l1l2_ridge_path, l1l2_ridge_path_batch,
+                          l1l2_rls_batch_wrapper),
             'modules' : ('l1l2py', 'numpy', 'os'),
+            'formulation' : 'dual',
+            'batch_call' : l1l2_rls_batch_wrapper,
             'external_k' : self.external_k,
             'ext_split_sets' : None,
             'ssname' : self.ssname1,
             'calls' : None,
             'data_shape' : self.data.shape,
+            'memory' : None,
             'samples' : self.samples,
             'labels' : self.labels,
         }
         self.additionalJobData_comparables = [
             'depfuncs', 'modules', 'samples', 'ext_split_sets', 'ssname',
-            'data_shape', 'labels'
+            'data_shape', 'labels', 'formulation', 'batch_call'
             ]
         self.runtime1 = {'techID' : 'TECH_ID_RLS'}
         self.default_null_dof = 'dof0'
@@ -392,6 +413,7 @@ class TestL1L2_RLS_1(unittest.TestCase):
                 self.assertItemsEqual(ref_ajd[k], ajd[k])
             except TypeError:
                 self.assertEqual(ref_ajd[k], ajd[k])
+        self.assertGreater(ajd['memory'], self.data.nbytes)
 
     def test_produceResults1(self):
         t = L1L2_RLS(**self.l1l2_rls_cfg1)
@@ -408,3 +430,615 @@ class TestL1L2_RLS_1(unittest.TestCase):
         results = t.produceResults(self.ssname1, jobs, self.runtime1)
         self.assertIsNotNone(outputs)
         self.assertIsNotNone(results)
+
+
+@unittest.skipUnless(l1l2pyFound, 'l1l2py not found')
+class TestL1L2RidgePath1(unittest.TestCase):
+
+    def setUp(self):
+        rs = numpy.random.RandomState(0)
+        # more variables than samples, more samples than variables, rank deficient
+        self.data = [rs.randn(12, 30), rs.randn(30, 12), l1l2py.tools.center(rs.randn(12, 30))]
+        self.labels = numpy.sign(rs.randn(30, 1))
+        self.lambda_range = [0.0, 1e-3, 1e-1, 1.0, 1e2]
+
+    def test_ridgePath1(self):
+        for data in self.data:
+            labels = self.labels[:data.shape[0]]
+            betas = l1l2_ridge_path(data, labels, self.lambda_range)
+            self.assertEqual((data.shape[1], len(self.lambda_range)), betas.shape)
+            for j, lambda_ in enumerate(self.lambda_range):
+                ref_beta = l1l2py.algorithms.ridge_regression(data, labels, lambda_)
+                self.assertTrue(numpy.allclose(ref_beta, betas[:, j:j + 1], rtol=1e-6, atol=1e-8))
+
+    def test_ridgeFormulation1(self):
+        self.assertEqual('dual', l1l2_ridge_formulation(12, 30))
+        self.assertEqual('primal', l1l2_ridge_formulation(30, 12))
+        self.assertEqual('primal', l1l2_ridge_formulation(12, 12))
+        # both formulations give the same regularized solutions
+        for data in self.data[:2]:
+            labels = self.labels[:data.shape[0]]
+            betas1 = l1l2_ridge_path(data, labels, self.lambda_range[1:], 'primal')
+            betas2 = l1l2_ridge_path(data, labels, self.lambda_range[1:], 'dual')
+            self.assertTrue(numpy.allclose(betas1, betas2, rtol=1e-6, atol=1e-8))
+
+    def test_ridgePathBatch1(self):
+        rs = numpy.random.RandomState(1)
+        # stacked in both formulations, with padding, and with different numbers of samples
+        datas = list(self.data) + [rs.randn(12, p) for p in (5, 8, 12, 20)] + [rs.randn(30, 3)]
+        labels = [self.labels[:data.shape[0]] for data in datas]
+        betas = l1l2_ridge_path_batch(datas, labels, self.lambda_range)
+        self.assertEqual(len(datas), len(betas))
+        for data, lab, beta in zip(datas, labels, betas):
+            ref_betas = l1l2_ridge_path(data, lab, self.lambda_range)
+            self.assertEqual(ref_betas.shape, beta.shape)
+            self.assertTrue(numpy.allclose(ref_betas, beta, rtol=1e-6, atol=1e-8))
+        # requested formulations
+        betas = l1l2_ridge_path_batch(datas[:2], labels[:2], self.lambda_range[1:], ['primal', 'dual'])
+        self.assertTrue(numpy.allclose(l1l2_ridge_path(datas[0], labels[0], self.lambda_range[1:], 'primal'), betas[0]))
+        self.assertTrue(numpy.allclose(l1l2_ridge_path(datas[1], labels[1], self.lambda_range[1:], 'dual'), betas[1]))
+
+    def test_ridgePathGram1(self):
+        # precomputed covariance matrices are used in primal formulation
+        datas = [self.data[1], self.data[1][:, :7], self.data[1][:20, :5]]
+        labels = [self.labels[:data.shape[0]] for data in datas]
+        grams = [numpy.dot(data.T, data) for data in datas]
+        for data, lab, gram in zip(datas, labels, grams):
+            self.assertTrue(numpy.allclose(l1l2_ridge_path(data, lab, self.lambda_range),
+                                           l1l2_ridge_path(data, lab, self.lambda_range, None, gram)))
+        grams[0] = None
+        betas = l1l2_ridge_path_batch(datas, labels, self.lambda_range, None, grams)
+        for data, lab, beta in zip(datas, labels, betas):
+            self.assertTrue(numpy.allclose(l1l2_ridge_path(data, lab, self.lambda_range), beta))
+        # wrong matrix gives wrong solution
+        gram = 2 * numpy.dot(datas[1].T, datas[1])
+        self.assertFalse(numpy.allclose(l1l2_ridge_path(datas[1], labels[1], self.lambda_range[1:]),
+                                        l1l2_ridge_path(datas[1], labels[1], self.lambda_range[1:], None, gram)))
+
+
+@unittest.skipUnless(l1l2pyFound, 'l1l2py not found')
+class TestL1L2Batch1(unittest.TestCase):
+
+    def setUp(self):
+        rs = numpy.random.RandomState(2)
+        # many small subsets of the same samples
+        self.labels = numpy.sign(rs.randn(20))
+        self.labels[:2] = (-1.0, 1.0)
+        self.subsets = [('SS%d' % i, rs.randn(p, 20)) for i, p in enumerate((2, 3, 5, 5, 8, 30))]
+        self.ols_cfg = {
+            'error_func' : l1l2py.tools.balanced_classification_error,
+            'return_predictions' : False,
+            'global_degrees_of_freedom' : ('dof0',),
+            'job_importable' : False,
+            }
+        self.rls_cfg = {
+            'external_k' : 4,
+            'lambda_min' : 1e-1,
+            'lambda_max' : 1e2,
+            'lambda_range_type' : 'geometric',
+            'lambda_number' : 5,
+            'lambda_range' : None,
+            'error_func' : l1l2py.tools.balanced_classification_error,
+            'data_normalizer' : l1l2py.tools.center,
+            'labels_normalizer' : None,
+            'return_predictions' : False,
+            'global_degrees_of_freedom' : ('dof0',),
+            'ext_split_sets' : [(range(5, 20), range(0, 5)), (range(0, 15), range(15, 20))],
+            'job_importable' : False,
+            }
+
+    def _execute(self, technique, batch_cost, labels):
+        jc = SimpleJobContainer(batch_cost=batch_cost)
+        jobs = list()
+        for ssname, data in self.subsets:
+            for _, job in technique.createJob(ssname, data, labels):
+                jc.addJob(job)
+                jobs.append(job)
+        jc.start()
+        self.assertEqual([], jc.close())
+        return [job.result for job in jobs]
+
+    def test_batchOLS1(self):
+        t = L1L2_OLS(**self.ols_cfg)
+        ref_outputs = self._execute(t, None, self.labels)
+        outputs = self._execute(t, 1000, self.labels)
+        for ref_output, output in zip(ref_outputs, outputs):
+            self.assertTrue(numpy.allclose(ref_output[0], output[0], atol=1e-8))
+            self.assertEqual(ref_output[1], output[1])
+        # batch function gives the results of job function
+        jobs = [job for ssname, data in self.subsets for _, job in t.createJob(ssname, data, self.labels)]
+        outputs = l1l2_ols_batch_wrapper([job.call_args for job in jobs])
+        for ref_output, output in zip(ref_outputs, outputs):
+            self.assertTrue(numpy.allclose(ref_output[3], output[3], atol=1e-8))
+
+    def test_batchRLS1(self):
+        t = L1L2_RLS(**self.rls_cfg)
+        labels = self.labels.reshape(-1, 1)
+        ref_outputs = self._execute(t, None, labels)
+        outputs = self._execute(t, 1000, labels)
+        for ref_output, output in zip(ref_outputs, outputs):
+            self.assertItemsEqual(ref_output.keys(), output.keys())
+            for i in ref_output:
+                self.assertEqual(ref_output[i]['error_ts'], output[i]['error_ts'])
+                self.assertEqual(ref_output[i]['error_tr'], output[i]['error_tr'])
+                for ref_beta, beta in zip(ref_output[i]['beta'], output[i]['beta']):
+                    self.assertTrue(numpy.allclose(ref_beta, beta, atol=1e-8))
+        # batch function gives the results of job function
+        jobs = [job for ssname, data in self.subsets for _, job in t.createJob(ssname, data, labels)]
+        outputs = l1l2_rls_batch_wrapper([job.call_args for job in jobs])
+        for ref_output, output in zip(ref_outputs, outputs):
+            for i in ref_output:
+                self.assertEqual(ref_output[i]['min_err_ts'], output[i]['min_err_ts'])
+
+    def test_gramRLS1(self):
+        labels = self.labels.reshape(-1, 1)
+        variables = ['%s_%d' % (ssname, j) for ssname, data in self.subsets for j in range(data.shape[0])]
+        all_data = numpy.vstack([data for _, data in self.subsets]).T
+        gs = GramStatistics(all_data, labels, variables, self.rls_cfg['ext_split_sets'],
+                            self.rls_cfg['data_normalizer'], self.rls_cfg['labels_normalizer'])
+        for ssname, data in self.subsets:
+            gs.addSubset(ssname, ['%s_%d' % (ssname, j) for j in range(data.shape[0])])
+        ref_outputs = self._execute(L1L2_RLS(**self.rls_cfg), None, labels)
+        t = L1L2_RLS(gram_statistics=gs, **self.rls_cfg)
+        self.assertIs(gs, t.parameters['gram_statistics'])
+        for ssname, data in self.subsets:
+            _, job = next(t.createJob(ssname, data, labels))
+            splits = job.call_args[2]['splits']
+            # only in primal formulation
+            primal = data.shape[0] <= data.shape[1]
+            self.assertEqual([primal] * 2, ['gram' in splits[i] for i in range(2)])
+        for batch_cost in (None, 1000):
+            outputs = self._execute(t, batch_cost, labels)
+            for ref_output, output in zip(ref_outputs, outputs):
+                for i in ref_output:
+                    self.assertEqual(ref_output[i]['error_ts'], output[i]['error_ts'])
+                    for ref_beta, beta in zip(ref_output[i]['beta'], output[i]['beta']):
+                        self.assertTrue(numpy.allclose(ref_beta, beta, atol=1e-8))
+        # statistics of other splits or normalizers are not used
+        cfg = dict(self.rls_cfg)
+        cfg['ext_split_sets'] = list(cfg['ext_split_sets'])
+        t = L1L2_RLS(gram_statistics=gs, **cfg)
+        _, job = next(t.createJob(self.subsets[0][0], self.subsets[0][1], labels))
+        self.assertNotIn('gram', job.call_args[2]['splits'][0])
+        cfg = dict(self.rls_cfg)
+        cfg['data_normalizer'] = l1l2py.tools.standardize
+        t = L1L2_RLS(gram_statistics=gs, **cfg)
+        _, job = next(t.createJob(self.subsets[0][0], self.subsets[0][1], labels))
+        self.assertNotIn('gram', job.call_args[2]['splits'][0])
+
+
+@unittest.skipUnless(l1l2pyFound, 'l1l2py not found')
+class TestL1L2Native1(unittest.TestCase):
+
+    def setUp(self):
+        rs = numpy.random.RandomState(3)
+        # more variables than samples, and more samples than variables
+        self.data = [l1l2py.tools.center(rs.randn(40, 60)), l1l2py.tools.center(rs.randn(40, 15))]
+        w = numpy.zeros(60)
+        w[:4] = 1.0
+        self.labels = [numpy.sign(numpy.dot(d, w[:d.shape[1]]) + 0.5 * rs.randn(40)).reshape(-1, 1) for d in self.data]
+        self.mu = 1e-2
+        self.cfg = {
+            'external_k' : 2, 'internal_k' : 3,
+            'tau_min_scale' : 1. / 3, 'tau_max_scale' : 1. / 8, 'tau_number' : 5, 'tau_range_type' : 'geometric',
+            'mu_scaling_factor_min' : 0.005, 'mu_scaling_factor_max' : 1, 'mu_number' : 2, 'mu_range_type' : 'geometric',
+            'lambda_min' : 1e-1, 'lambda_max' : 1e2, 'lambda_range_type' : 'geometric', 'lambda_number' : 4,
+            'lambda_range' : None,
+            'error_func' : l1l2py.tools.balanced_classification_error,
+            'cv_error_func' : l1l2py.tools.balanced_classification_error,
+            'sparse' : True, 'regularized' : False,
+            'data_normalizer' : l1l2py.tools.center, 'labels_normalizer' : None,
+            'return_predictions' : False,
+            'global_degrees_of_freedom' : ('mu0', 'mu1'),
+            'ext_split_sets' : None,
+            'job_importable' : False,
+        }
+
+    def _tau_range(self, data, labels):
+        tau_max = l1l2py.algorithms.l1_bound(data, labels)
+        return l1l2py.tools.geometric_range(tau_max * 0.05, tau_max * 0.9, 6)
+
+    def test_fista1(self):
+        for data, labels in zip(self.data, self.labels):
+            n = data.shape[0]
+            sigma0 = l1l2py.algorithms._sigma(data, 0.0)
+            self.assertAlmostEqual(sigma0, l1l2_gram_norm(data))
+            for tau in self._tau_range(data, labels):
+                ref_beta = l1l2py.algorithms.l1l2_regularization(data, labels, self.mu, tau)
+                beta, iterations = l1l2_fista(data, labels, self.mu, tau)
+                self.assertEqual((data.shape[1], 1), beta.shape)
+                self.assertGreater(iterations, 0)
+                self.assertTrue(numpy.allclose(ref_beta, beta, atol=1e-8))
+                # the same solution for variables that survived screening
+                sbeta, _ = l1l2_screened_regularization(data, labels, self.mu, tau)
+                self.assertTrue(numpy.all((sbeta != 0) == (ref_beta != 0)))
+                self.assertTrue(numpy.allclose(ref_beta, sbeta, atol=1e-3))
+                # optimality conditions of inactive variables hold
+                corr = numpy.abs(numpy.dot(data.T, labels - numpy.dot(data, sbeta))) * (2.0 / n)
+                self.assertTrue(numpy.all(corr[sbeta == 0] <= tau))
+
+    def test_nativePath1(self):
+        for data, labels in zip(self.data, self.labels):
+            tau_range = self._tau_range(data, labels)
+            ref_betas = l1l2py.algorithms.l1l2_path(data, labels, self.mu, tau_range)
+            for screening in (True, False):
+                betas = l1l2_native_path(data, labels, self.mu, tau_range, screening=screening)
+                self.assertEqual(len(ref_betas), len(betas))
+                for ref_beta, beta in zip(ref_betas, betas):
+                    self.assertTrue(numpy.all((beta != 0) == (ref_beta != 0)))
+                    self.assertTrue(numpy.allclose(ref_beta, beta, rtol=1e-3, atol=1e-4))
+
+    def test_nativeModelSelection1(self):
+        data, labels = self.data[0], self.labels[0]
+        ext_splits = l1l2py.tools.stratified_kfold_splits(labels, 4)
+        tr, ts = ext_splits[0]
+        int_splits = l1l2py.tools.stratified_kfold_splits(labels[tr], 3)
+        tau_range = self._tau_range(data[tr], labels[tr])
+        mu_range = l1l2py.tools.geometric_range(self.mu, 1.0, 3)
+        lambda_range = l1l2py.tools.geometric_range(1e-1, 1e2, 5)
+        args = (data[tr], labels[tr], data[ts], labels[ts], mu_range, tau_range, lambda_range,
+                int_splits, l1l2py.tools.balanced_classification_error,
+                l1l2py.tools.balanced_classification_error, l1l2py.tools.center, None,
+                True, False, True)
+        ref_out = l1l2_l1l2_job_wrapper(*args)
+        for options in ({}, {'screening' : False}):
+            out = l1l2_native_job_wrapper(*(args + (options,)))
+            self.assertItemsEqual(ref_out.keys(), out.keys())
+            numpy.testing.assert_equal(ref_out['kcv_err_ts'], out['kcv_err_ts'])
+            self.assertEqual(ref_out['tau_opt'], out['tau_opt'])
+            self.assertEqual(ref_out['lambda_opt'], out['lambda_opt'])
+            self.assertEqual(ref_out['err_ts_list'], out['err_ts_list'])
+            for ref_selected, selected in zip(ref_out['selected_list'], out['selected_list']):
+                numpy.testing.assert_equal(ref_selected, selected)
+
+    def test_gramStatistics1(self):
+        data, labels = self.data[1], self.labels[1]
+        variables = ['V%d' % i for i in range(data.shape[1])]
+        t1 = L1L2_L1L2(**self.cfg)
+        ref_calls = t1._prepareL1L2call(data, labels)
+        # statistics of subset with variables in reversed order
+        gs = GramStatistics(data, labels, variables, None, self.cfg['data_normalizer'])
+        gs.addSubset('SS1', variables[::-1])
+        calls = []
+        t2 = L1L2_L1L2(gram_statistics=gs, **self.cfg)
+        t2._normalize_subset = lambda data, labels: calls.append(data.shape)
+        calls2 = t2._prepareL1L2call(data[:, ::-1], labels, 'SS1')
+        self.assertEqual([], calls)
+        self.assertTrue(numpy.allclose(ref_calls['tau_range'], calls2['tau_range']))
+        self.assertTrue(numpy.allclose(ref_calls['mu_range'], calls2['mu_range']))
+        # subset not registered
+        t2._normalize_subset = t1._normalize_subset
+        calls2 = t2._prepareL1L2call(data, labels, 'SS2')
+        self.assertTrue(numpy.allclose(ref_calls['tau_range'], calls2['tau_range']))
+
+    def test_partialResults1(self):
+        cfg = dict(self.cfg)
+        cfg['external_k'] = 4
+        cfg['return_predictions'] = True
+        t = L1L2_L1L2(**cfg)
+        samples = ['S%d' % i for i in range(40)]
+        # subsets are oriented as (variables, samples)
+        jobs = [job for _, job in t.createJob('SS1', self.data[1].T, self.labels[1], {'samples' : samples})]
+        for job in jobs:
+            job.result = job.execute()
+        results = t.produceResults('SS1', jobs, {'techID' : 'T1'})
+        self.assertFalse(results[RESULTS_RUNTIME_KEY]['partial'])
+        self.assertEqual(range(4), results[RESULTS_RUNTIME_KEY]['completed_splits'])
+        # jobs of the last two splits are cancelled
+        for job in jobs[2:]:
+            job.result = JOBCANCELLED
+        split_errors, numof_splits = t.collectSplitErrors('SS1', jobs)
+        self.assertEqual(4, numof_splits)
+        self.assertEqual([dict(zip(('mu0', 'mu1'), job.result['err_ts_list'])) for job in jobs[:2]], split_errors)
+        results = t.produceResults('SS1', jobs, {'techID' : 'T1'})
+        self.assertTrue(results[RESULTS_RUNTIME_KEY]['partial'])
+        self.assertEqual([0, 1], results[RESULTS_RUNTIME_KEY]['completed_splits'])
+        ref_err_ts = numpy.mean([job.result['err_ts_list'] for job in jobs[:2]], axis=0)
+        self.assertTrue(numpy.allclose(ref_err_ts, results['Avg Err TS']))
+        self.assertItemsEqual([0, 1, 'cm_mcc'], results['MuExt'][0].keys())
+        self.assertTrue(numpy.all(results['MuExt']['freqs'] <= 1.0))
+        # predictions cover test samples of completed splits only
+        test_idxs = [ti for job in jobs[:2] for ti in job.additional_data['calls'][job.additional_data['ext_split']]['ext_cv_test_idxs']]
+        self.assertEqual([samples[ti] for ti in sorted(test_idxs)], results['Predictions']['mu0']['orig_samples'])
+
+    def test_adaptiveGrid1(self):
+        data, labels = self.data[0], self.labels[0]
+        ext_splits = l1l2py.tools.stratified_kfold_splits(labels, 4)
+        tr, ts = ext_splits[0]
+        int_splits = l1l2py.tools.stratified_kfold_splits(labels[tr], 3)
+        tau_range = l1l2py.tools.geometric_range(*(tuple(self._tau_range(data[tr], labels[tr])[[0, -1]]) + (9,)))
+        mu_range = l1l2py.tools.geometric_range(self.mu, 1.0, 2)
+        lambda_range = l1l2py.tools.geometric_range(1e-1, 1e2, 9)
+        args = (data[tr], labels[tr], data[ts], labels[ts], mu_range, tau_range, lambda_range,
+                int_splits, l1l2py.tools.balanced_classification_error,
+                l1l2py.tools.balanced_classification_error, l1l2py.tools.center, None,
+                True, False, False)
+        ref_out = l1l2_native_job_wrapper(*(args + ({},)))
+        # without refinement the whole grid is evaluated
+        out = l1l2_native_job_wrapper(*(args + ({'grid' : 'adaptive', 'grid_levels' : 0},)))
+        self.assertTrue(out['kcv_evaluated'].all())
+        self.assertTrue(numpy.allclose(ref_out['kcv_err_ts'], out['kcv_err_ts']))
+        self.assertEqual(ref_out['tau_opt'], out['tau_opt'])
+        self.assertEqual(ref_out['lambda_opt'], out['lambda_opt'])
+        # coarse grid and refinement evaluate part of the grid only
+        out = l1l2_native_job_wrapper(*(args + ({'grid' : 'adaptive', 'grid_levels' : 2, 'grid_points' : 8},)))
+        evaluated = out['kcv_evaluated']
+        self.assertEqual(ref_out['kcv_err_ts'].shape, out['kcv_err_ts'].shape)
+        self.assertEqual(ref_out['kcv_err_tr'].shape, out['kcv_err_tr'].shape)
+        self.assertEqual(out['kcv_err_ts'].shape, evaluated.shape)
+        self.assertLessEqual(evaluated.sum(), 9 + 2 * 8)
+        self.assertTrue(evaluated[::4, ::4].all())
+        self.assertFalse(numpy.isnan(out['kcv_err_ts']).any())
+        self.assertTrue(numpy.allclose(ref_out['kcv_err_ts'][evaluated], out['kcv_err_ts'][evaluated]))
+        # optimal values come from evaluated cells
+        tau_opt = list(tau_range).index(out['tau_opt'])
+        lambda_opt = list(lambda_range).index(out['lambda_opt'])
+        self.assertTrue(evaluated[tau_opt, lambda_opt])
+        self.assertEqual(out['kcv_err_ts'][evaluated].min(), out['kcv_err_ts'][tau_opt, lambda_opt])
+        self.assertEqual(2, len(out['selected_list']))
+        # adaptive grid is configured for native engine only
+        with self.assertRaises(Error):
+            L1L2_L1L2(engine_options={'grid' : 'XXX'}, **self.cfg)
+        with self.assertRaises(Error):
+            L1L2_L1L2(engine_options={'grid' : 'adaptive'}, **self.cfg)
+        with self.assertRaises(Error):
+            L1L2_L1L2(engine='native', engine_options={'grid' : 'adaptive', 'grid_points' : 0}, **self.cfg)
+        cfg = dict(self.cfg)
+        cfg['return_predictions'] = True
+        t = L1L2_L1L2(engine='native', engine_options={'grid' : 'adaptive'}, **cfg)
+        self.assertEqual(2, t.parameters['engine_options']['grid_levels'])
+        jobs = [job for _, job in t.createJob('SS1', self.data[1].T, self.labels[1], {'samples' : range(40)})]
+        self.assertIn(l1l2_adaptive_kcv_errors, jobs[0].additional_data['depfuncs'])
+        for job in jobs:
+            job.result = job.execute()
+        results = t.produceResults('SS1', jobs, {'techID' : 'T1'})
+        self.assertEqual(2, len(results['Avg Err TS']))
+
+    def test_engine1(self):
+        cfg = self.cfg
+        with self.assertRaises(Error):
+            L1L2_L1L2(engine='XXX', **cfg)
+        with self.assertRaises(Error):
+            L1L2_L1L2(engine='native', engine_options={'XXX' : 1}, **cfg)
+        with self.assertRaises(Error):
+            L1L2_L1L2(mu_scaling_options={'XXX' : 1}, **cfg)
+        with self.assertRaises(Error):
+            L1L2_L1L2(mu_scaling_options={'tolerance' : 0}, **cfg)
+        # estimated and exact mu scaling give the same mu range
+        t1 = L1L2_L1L2(**cfg)
+        t2 = L1L2_L1L2(mu_scaling_options={'exact_size' : 0}, **cfg)
+        self.assertEqual(500, t1.parameters['mu_scaling_options']['exact_size'])
+        for data in self.data:
+            self.assertTrue(numpy.allclose(t1._calculate_mu_range(data), t2._calculate_mu_range(data), rtol=1e-7))
+            # precomputed covariance matrix honours the same options
+            if data.shape[1] <= data.shape[0]:
+                gram = numpy.dot(data.T, data)
+                self.assertTrue(numpy.allclose(t1._calculate_mu_range(data),
+                                               t2._calculate_mu_range(data, gram), rtol=1e-7))
+        # subset is normalized once for both tau and mu ranges
+        calls = []
+        def _normalizer(data, *args):
+            calls.append(data.shape)
+            return l1l2py.tools.center(data, *args)
+        ncfg = dict(cfg)
+        ncfg['data_normalizer'] = _normalizer
+        t3 = L1L2_L1L2(**ncfg)
+        ref_calls = t1._prepareL1L2call(self.data[0], self.labels[0])
+        calls3 = t3._prepareL1L2call(self.data[0], self.labels[0])
+        self.assertEqual([self.data[0].shape], calls)
+        numpy.testing.assert_equal(ref_calls['tau_range'], calls3['tau_range'])
+        numpy.testing.assert_equal(ref_calls['mu_range'], calls3['mu_range'])
+        t = L1L2_L1L2(engine='native', engine_options={'tolerance' : 1e-6}, **cfg)
+        self.assertEqual(1e-6, t.parameters['engine_options']['tolerance'])
+        self.assertTrue(t.parameters['engine_options']['screening'])
+        jobs = [job for _, job in t.createJob('SS1', self.data[0], self.labels[0])]
+        self.assertEqual(2, len(jobs))
+        for job in jobs:
+            self.assertIs(l1l2_native_job_wrapper, job.call_func)
+            self.assertEqual('native', job.additional_data['engine'])
+            self.assertIn(l1l2_native_model_selection, job.additional_data['depfuncs'])
+            self.assertEqual(t.parameters['engine_options'], job.call_args[-1])
+            out = job.execute()
+            self.assertEqual(2, len(out['selected_list']))
+
+
+class TestL1L2Cascade1(unittest.TestCase):
+
+    def setUp(self):
+        rs = numpy.random.RandomState(7)
+        data = l1l2py.tools.center(rs.randn(40, 15))
+        w = numpy.zeros(15)
+        w[:4] = 1.0
+        self.labels = numpy.sign(numpy.dot(data, w) + 0.5 * rs.randn(40)).reshape(-1, 1)
+        # subsets are oriented as (variables, samples)
+        self.data = data.T
+        self.samples = ['S%d' % i for i in range(40)]
+        self.rls_cfg = {
+            'external_k' : 2,
+            'lambda_min' : 1e-1, 'lambda_max' : 1e2, 'lambda_range_type' : 'geometric', 'lambda_number' : 4,
+            'lambda_range' : None,
+            'error_func' : l1l2py.tools.balanced_classification_error,
+            'data_normalizer' : l1l2py.tools.center, 'labels_normalizer' : None,
+            'return_predictions' : True,
+            'global_degrees_of_freedom' : None,
+            'ext_split_sets' : None,
+            'job_importable' : False,
+        }
+        self.l1l2_cfg = {
+            'external_k' : 2, 'internal_k' : 3,
+            'tau_min_scale' : 1. / 3, 'tau_max_scale' : 1. / 8, 'tau_number' : 5, 'tau_range_type' : 'geometric',
+            'mu_scaling_factor_min' : 0.005, 'mu_scaling_factor_max' : 1, 'mu_number' : 2, 'mu_range_type' : 'geometric',
+            'lambda_min' : 1e-1, 'lambda_max' : 1e2, 'lambda_range_type' : 'geometric', 'lambda_number' : 4,
+            'lambda_range' : None,
+            'error_func' : l1l2py.tools.balanced_classification_error,
+            'cv_error_func' : l1l2py.tools.balanced_classification_error,
+            'sparse' : True, 'regularized' : False,
+            'data_normalizer' : l1l2py.tools.center, 'labels_normalizer' : None,
+            'return_predictions' : True,
+            'global_degrees_of_freedom' : ('mu0', 'mu1'),
+            'ext_split_sets' : None,
+            'job_importable' : False,
+        }
+        self.additionalJobData = {'samples' : self.samples, 'technique' : 'T1'}
+
+    def _cascade(self, threshold):
+        return L1L2_Cascade(screening_technique={'kdvs.fw.impl.stat.L1L2.L1L2_RLS' : self.rls_cfg},
+                            full_technique=L1L2_L1L2(**self.l1l2_cfg),
+                            screening_threshold=threshold,
+                            global_degrees_of_freedom=None, job_importable=False)
+
+    def _execute(self, jobs):
+        for job in jobs:
+            job.result = job.execute()
+        return jobs
+
+    def _screen(self, t):
+        created = list(t.createJob('SS1', self.data, self.labels, self.additionalJobData))
+        self.assertEqual(['SS1_screen'], [customID for customID, _ in created])
+        for _, job in created:
+            self.assertEqual('screen', job.additional_data['cascade_stage'])
+        return self._execute([job for _, job in created])
+
+    def test_init1(self):
+        t = self._cascade(0.5)
+        self.assertIsInstance(t.screening, L1L2_RLS)
+        self.assertIsInstance(t.full, L1L2_L1L2)
+        self.assertEqual(('mu0', 'mu1'), t.parameters['global_degrees_of_freedom'])
+        self.assertEqual(t.full.results_elements, t.results_elements)
+        # pre-computed splits are passed to techniques with the same number of splits
+        self.assertEqual(2, t.parameters['external_k'])
+        ext_split_sets = l1l2py.tools.stratified_kfold_splits(self.labels, 2)
+        t.parameters['ext_split_sets'] = ext_split_sets
+        t._shareParameters()
+        self.assertIs(ext_split_sets, t.screening.parameters['ext_split_sets'])
+        self.assertIs(ext_split_sets, t.full.parameters['ext_split_sets'])
+        self.assertEqual(('mu0',), t.screening.parameters['global_degrees_of_freedom'])
+        with self.assertRaises(Error):
+            L1L2_Cascade(screening_technique={}, full_technique=L1L2_L1L2(**self.l1l2_cfg),
+                         screening_threshold=0.5, global_degrees_of_freedom=None, job_importable=False)
+
+    def test_full1(self):
+        t = self._cascade(1.1)
+        self.assertTrue(t.follow_up)
+        screening_jobs = self._screen(t)
+        self.assertIsNone(t.collectSplitErrors('SS1', screening_jobs))
+        created = t.createFollowUpJob('SS1', screening_jobs)
+        self.assertEqual(['SS1_split0', 'SS1_split1'], [customID for customID, _ in created])
+        full_jobs = self._execute([job for _, job in created])
+        for job in full_jobs:
+            self.assertEqual('full', job.additional_data['cascade_stage'])
+            self.assertIs(l1l2_l1l2_job_wrapper, job.call_func)
+        jobs = screening_jobs + full_jobs
+        # full technique follows screening only once
+        self.assertEqual([], t.createFollowUpJob('SS1', jobs))
+        split_errors, numof_splits = t.collectSplitErrors('SS1', jobs)
+        self.assertEqual(2, numof_splits)
+        results = t.produceResults('SS1', jobs, {'techID' : 'T1'})
+        self.assertEqual('full', results[RESULTS_RUNTIME_KEY]['cascade_stage'])
+        self.assertNotIn(RESULTS_SCREENED_OUT_KEY, results[RESULTS_RUNTIME_KEY])
+        self.assertLess(results[RESULTS_RUNTIME_KEY]['screening_error'], 1.1)
+        self.assertItemsEqual(('mu0', 'mu1'), results['Classification Error'].keys())
+        ref_results = L1L2_L1L2(**self.l1l2_cfg).produceResults('SS1', full_jobs, {'techID' : 'T1'})
+        self.assertEqual(ref_results['Classification Error'], results['Classification Error'])
+        self.assertEqual({}, t.techdata)
+
+    def test_screen1(self):
+        t = self._cascade(0.0)
+        jobs = self._screen(t)
+        self.assertEqual([], t.createFollowUpJob('SS1', jobs))
+        self.assertIsNone(t.collectSplitErrors('SS1', jobs))
+        results = t.produceResults('SS1', jobs, {'techID' : 'T1'})
+        screening_error = results[RESULTS_RUNTIME_KEY]['screening_error']
+        self.assertEqual('screen', results[RESULTS_RUNTIME_KEY]['cascade_stage'])
+        self.assertEqual('T1', results[RESULTS_RUNTIME_KEY]['techID'])
+        self.assertTrue(results[RESULTS_RUNTIME_KEY][RESULTS_SCREENED_OUT_KEY])
+        self.assertEqual({'mu0' : screening_error, 'mu1' : screening_error}, results['Classification Error'])
+        self.assertTrue(numpy.allclose([screening_error] * 2, results['Avg Err TS']))
+        self.assertEqual((2, 15), results['MuExt']['freqs'].shape)
+        self.assertFalse(results['MuExt']['freqs'].any())
+        self.assertEqual(self.samples, results['Predictions']['mu1']['orig_samples'])
+        self.assertEqual(results['CM MCC']['mu0'], results['CM MCC']['mu1'])
+        self.assertEqual({}, results['Selection'])
+        # screening error is the one produced by screening technique
+        rls = L1L2_RLS(**self.rls_cfg)
+        rls.parameters['global_degrees_of_freedom'] = ('mu0',)
+        rls_jobs = [job for _, job in rls.createJob('SS1', self.data, self.labels, self.additionalJobData)]
+        for job in rls_jobs:
+            job.result = job.execute()
+        ref_results = rls.produceResults('SS1', rls_jobs, {'techID' : 'T1'})
+        self.assertEqual(ref_results['Classification Error']['mu0'], screening_error)
+
+    def test_screenFailed1(self):
+        # no full jobs follow screening job that did not produce its result
+        t = self._cascade(1.1)
+        jobs = [job for _, job in t.createJob('SS1', self.data, self.labels, self.additionalJobData)]
+        self.assertEqual([], t.createFollowUpJob('SS1', jobs))
+
+    def test_experiment1(self):
+        # follow-up jobs are executed by job container
+        t = self._cascade(1.1)
+        jc = SimpleJobContainer()
+        jobIDs = [jc.addJob(job) for _, job in t.createJob('SS1', self.data, self.labels, self.additionalJobData)]
+        jc.start()
+        jobs = [jc.getJob(jid) for jid in jobIDs]
+        jobIDs.extend([jc.addJob(job) for _, job in t.createFollowUpJob('SS1', jobs)])
+        self.assertEqual(3, len(jobIDs))
+        jc.flush()
+        jc.close()
+        jobs = [jc.getJob(jid) for jid in jobIDs]
+        results = t.produceResults('SS1', jobs, {'techID' : 'T1'})
+        self.assertEqual('full', results[RESULTS_RUNTIME_KEY]['cascade_stage'])
+
+
+class TestL1L2GramEigenvalues1(unittest.TestCase):
+
+    def setUp(self):
+        rs = numpy.random.RandomState(5)
+        self.data = [rs.randn(60, 45), rs.randn(45, 60), rs.randn(80, 80), rs.randn(30, 200)]
+
+    def _exact(self, data):
+        n, p = data.shape
+        if p > n:
+            evals = numpy.linalg.eigvalsh(numpy.dot(data, data.T))
+        else:
+            evals = numpy.linalg.eigvalsh(numpy.dot(data.T, data))
+        return evals.min(), evals.max()
+
+    def test_exact1(self):
+        for data in self.data:
+            self.assertEqual(self._exact(data), l1l2_gram_eigenvalues(data))
+
+    def test_lanczos1(self):
+        for data in self.data:
+            ref_lo, ref_hi = self._exact(data)
+            lo, hi = l1l2_gram_eigenvalues(data, tolerance=1e-10, exact_size=0)
+            self.assertAlmostEqual(1.0, hi / ref_hi, places=9)
+            self.assertLess(abs(lo - ref_lo) / ref_hi, 1e-7)
+            # largest one alone
+            _, hi = l1l2_gram_eigenvalues(data, smallest=False, tolerance=1e-10, exact_size=0)
+            self.assertAlmostEqual(1.0, hi / ref_hi, places=9)
+        # precomputed Gram matrix
+        for data in self.data:
+            gram = numpy.dot(data, data.T) if data.shape[1] > data.shape[0] else numpy.dot(data.T, data)
+            self.assertEqual(self._exact(data), l1l2_gram_eigenvalues(data, gram=gram))
+            lo, hi = l1l2_gram_eigenvalues(data, tolerance=1e-10, exact_size=0, gram=gram)
+            ref_lo, ref_hi = self._exact(data)
+            self.assertAlmostEqual(1.0, hi / ref_hi, places=9)
+            self.assertLess(abs(lo - ref_lo) / ref_hi, 1e-7)
+        # Lanczos basis grown past its initial size
+        data = numpy.random.RandomState(9).randn(150, 120)
+        ref_lo, ref_hi = self._exact(data)
+        lo, hi = l1l2_gram_eigenvalues(data, tolerance=1e-10, exact_size=0)
+        self.assertAlmostEqual(1.0, hi / ref_hi, places=9)
+        self.assertLess(abs(lo - ref_lo) / ref_hi, 1e-7)
+        # reproducible
+        self.assertEqual(l1l2_gram_eigenvalues(self.data[0], exact_size=0),
+                         l1l2_gram_eigenvalues(self.data[0], exact_size=0))
+
+    def test_lanczos2(self):
+        # low rank data: Krylov subspace is exhausted early
+        rs = numpy.random.RandomState(7)
+        data = numpy.dot(rs.randn(50, 3), rs.randn(3, 40))
+        ref_lo, ref_hi = self._exact(data)
+        lo, hi = l1l2_gram_eigenvalues(data, smallest=False, exact_size=0)
+        self.assertAlmostEqual(1.0, hi / ref_hi, places=7)
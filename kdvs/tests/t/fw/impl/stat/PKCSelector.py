@@ -14,8 +14,10 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+from kdvs.core.error import Error
 from kdvs.fw.Stat import Results, DEFAULT_RESULTS, \
-    DEFAULT_CLASSIFICATION_RESULTS, DEFAULT_SELECTION_RESULTS, NOTSELECTED, SELECTED
+    DEFAULT_CLASSIFICATION_RESULTS, DEFAULT_SELECTION_RESULTS, NOTSELECTED, SELECTED, \
+    RESULTS_RUNTIME_KEY, RESULTS_SCREENED_OUT_KEY
 from kdvs.fw.impl.stat.PKCSelector import \
     OuterSelector_ClassificationErrorThreshold, \
     InnerSelector_ClassificationErrorThreshold_AllVars, \
@@ -61,6 +63,35 @@ class TestOuterSelector_ClassificationErrorThreshold1(unittest.TestCase):
         selres = self.results1['Selection']['outer'][self.dof]
         self.assertEqual(self.ref_selres2, selres)
 
+    def test_perform3(self):
+        # subset rejected by screening is not selected regardless of its error
+        self.results1[RESULTS_RUNTIME_KEY][RESULTS_SCREENED_OUT_KEY] = True
+        osel = OuterSelector_ClassificationErrorThreshold(**self.osel_cfg2)
+        osel.perform([self.results1])
+        self.assertEqual({self.dof : NOTSELECTED}, self.results1['Selection']['outer'])
+
+    def test_init2(self):
+        osel = OuterSelector_ClassificationErrorThreshold(early_rejection_splits=2, **self.osel_cfg1)
+        self.assertEqual(2, osel.parameters['early_rejection_splits'])
+        with self.assertRaises(Error):
+            OuterSelector_ClassificationErrorThreshold(early_rejection_splits=0, **self.osel_cfg1)
+
+    def test_rejectEarly1(self):
+        split_errors = [{'DOF0' : 0.4, 'DOF1' : 0.2}, {'DOF0' : 0.5, 'DOF1' : 0.2}]
+        # early rejection not requested
+        osel = OuterSelector_ClassificationErrorThreshold(error_threshold=0.1)
+        self.assertFalse(osel.rejectEarly(split_errors, 5))
+        osel = OuterSelector_ClassificationErrorThreshold(error_threshold=0.1, early_rejection_splits=2)
+        # not enough splits processed
+        self.assertFalse(osel.rejectEarly(split_errors[:1], 5))
+        # lower bounds: 0.18 and 0.08
+        self.assertFalse(osel.rejectEarly(split_errors, 5))
+        # lower bounds: 0.225 and 0.1
+        self.assertTrue(osel.rejectEarly(split_errors, 4))
+        # rejected PKC is not selected for any DOF
+        self.results1['Classification Error'] = {'DOF0' : 0.225, 'DOF1' : 0.1}
+        self.assertEqual([{'DOF0' : NOTSELECTED, 'DOF1' : NOTSELECTED}], osel.perform([self.results1]))
+
 
 class TestInnerSelector_ClassificationErrorThreshold_AllVars1(unittest.TestCase):
 